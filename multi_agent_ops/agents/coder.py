@@ -1,25 +1,52 @@
 from crewai import Agent
 from memory.memory_store import memory
 from tools.file_writer import write_to_file
-from tools.git_ops import git_commit_and_pr
 from config.llm_config import get_shared_coding_llm
+from pipeline.context_budget import fit_memory
+from agents.prompt_layout import memory_block
 
 file_writer_tool = write_to_file  # correct binding
 
 class CoderAgent:
-    def build(self):
-        planning_context = memory.retrieve("plan") or "No plan provided."
+    def build(self, llm=None, use_git=True, max_execution_time=None, memory_tokens=None, store=None,
+              layout="inline", workspace=None):
+        self.memory_tokens, self.layout = memory_tokens, layout
+        self.model = getattr(llm, "model", None)
+        planner_text = ""
+        self.memory_context = None
+        if store is None:
+            plan = memory.retrieve("plan")
+            planning_context = fit_memory([plan or "No plan provided."], memory_tokens, self.model,
+                                          name="coder memory")
+            self.memory_context = memory_block("Context from the planner", planning_context) if plan else None
+            planner_text = f"\n\nYour context from the planner:\n{planning_context}" if layout == "inline" else ""
+        # with a run store the plan doesn't exist yet: the coder reads it by key with read_run_output
+
+        # bound to the run's workspace when given, so parallel runs don't share one output file
+        if workspace is not None:
+            from tools.file_writer import file_writer_for
+            tools = [file_writer_for(workspace)]
+        else:
+            tools = [file_writer_tool]
+        if use_git:
+            from tools.git_ops import git_commit_and_pr, git_tool_for
+            tools.append(git_tool_for(workspace) if workspace is not None else git_commit_and_pr)
+        if store is not None:
+            from tools.run_memory import run_memory_tool_for
+            tools.append(run_memory_tool_for(store))
+        extra = {"max_execution_time": max_execution_time} if max_execution_time else {}
 
         return Agent(
             role='Python Developer',
             goal='Write clean, functional Python code, save it to a file, and commit it to GitHub.',
             backstory=(
                 f"You are a top-tier Python engineer who writes clean, well-documented code. "
-                f"You save your code to files and commit to GitHub repositories.\n\n"
-                f"Your context from the planner:\n{planning_context}"
+                f"You save your code to files and commit to GitHub repositories."
+                + planner_text
             ),
-            llm=get_shared_coding_llm(),  # Using specialized coding model
-            tools=[file_writer_tool, git_commit_and_pr],
+            llm=llm or get_shared_coding_llm(),  # Using specialized coding model
+            tools=tools,
             allow_delegation=False,
-            verbose=True
-        )
\ No newline at end of file
+            verbose=True,
+            **extra
+        )
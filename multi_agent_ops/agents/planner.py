@@ -1,33 +1,49 @@
 from crewai import Agent
-from memory.vector_store import VectorMemory
+from memory.vector_store import get_vector_memory
+from memory.summaries import get_summary_store
 from config.llm_config import get_shared_llm
+from pipeline.context_budget import fit_memory
+from agents.prompt_layout import memory_block
 
-vector_memory = VectorMemory()
+PLANNING_QUERY = "project planning development steps"
 
 def save_to_vector_store(output):
-    vector_memory.add(str(output), metadata={"agent": "Planner"})
+    get_vector_memory().add(str(output), metadata={"agent": "Planner"})
     return output
 
 class PlannerAgent:
-    def build(self):
-        try:
-            # Get planning context from memory
-            related_plans = vector_memory.search("project planning development steps", k=3)
-            context = "\n".join([doc.page_content for doc in related_plans]) if related_plans else "No previous planning context available."
-        except Exception as e:
-            print(f"⚠️ Vector memory error in planner: {e}")
-            context = "No previous planning context available."
-        
+    def build(self, llm=None, use_memory=True, max_execution_time=None, memory_tokens=None, layout="inline"):
+        context = "No previous planning context available."
+        self.memory_context = None
+        if use_memory:
+            try:
+                # Get planning context from memory
+                related_plans = get_vector_memory().search(PLANNING_QUERY, k=3)
+                if related_plans:
+                    context = fit_memory([doc.page_content for doc in related_plans], memory_tokens,
+                                         getattr(llm, "model", None), name="planner memory",
+                                         summarizer=get_summary_store().fit)
+                    self.memory_context = memory_block("Previous planning context", context)
+            except Exception as e:
+                print(f"⚠️ Vector memory error in planner: {e}")
+
+        extra = {"output_router": save_to_vector_store} if use_memory else {}
+        if max_execution_time:
+            extra["max_execution_time"] = max_execution_time
+
+        backstory = (
+            "You are an expert project planner who knows how to design efficient workflows. "
+            "You create detailed, actionable development plans with clear steps and dependencies."
+        )
+        if layout == "inline":
+            backstory += f"\n\nPrevious planning context:\n{context}"
+
         return Agent(
             role='Task Planner',
             goal='Break down the main goal into clear, achievable steps',
-            backstory=(
-                "You are an expert project planner who knows how to design efficient workflows. "
-                "You create detailed, actionable development plans with clear steps and dependencies.\n\n"
-                f"Previous planning context:\n{context}"
-            ),
-            llm=get_shared_llm(),
+            backstory=backstory,
+            llm=llm or get_shared_llm(),
             allow_delegation=False,  # Disable delegation to avoid rate limits
             verbose=True,
-            output_router=save_to_vector_store
+            **extra
         )
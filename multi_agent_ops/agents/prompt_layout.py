@@ -0,0 +1,89 @@
+"""
+Prompt layout: where dynamic text goes in an agent's prompts.
+
+Local servers (Ollama, llama.cpp) keep the KV cache of the previous prompt
+and only evaluate the part of a new prompt after the longest shared prefix.
+crewai renders the agent's role, backstory and goal into the system message
+and the task description into the user message, so any run-specific text
+early in either one (retrieved memory in the backstory, the project query in
+the middle of a task description) forces the whole prompt to be re-evaluated.
+
+    inline  the original layout: memory in the backstory, {query} in place
+    stable  backstories are static, so an agent's system prompt is identical
+            across runs; task descriptions keep their static instructions
+            first and end with the project and the agent's memory
+
+PrefixTracker measures the result: for every LLM call, the share of the
+prompt that matches the previous prompt sent to the same model (what the
+server can reuse). instrument_llm records it on each llm_call span.
+"""
+
+import os
+import threading
+
+LAYOUTS = ("inline", "stable")
+PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT")   # overrides the profile's prompt_layout when set
+QUERY_PLACEHOLDER = "the project below"
+
+
+def memory_block(title, context):
+    return f"{title}:\n{context}"
+
+
+def task_description(template, query, layout="inline", memory=None):
+    """Render a profile task template ({query} placeholder) in the given layout"""
+    if layout == "inline":
+        return template.format(query=query)
+    parts = [template.format(query=QUERY_PLACEHOLDER), f"Project: {query}"]
+    if memory:
+        parts.append(memory)
+    return "\n\n".join(parts)
+
+
+def common_prefix(a, b):
+    """Length of the longest common prefix of two strings"""
+    limit = min(len(a), len(b))
+    lo, hi = 0, limit
+    while lo < hi:  # binary search on slices: fast for long prompts
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class PrefixTracker:
+    """Prefix reuse of each prompt against the previous prompt on the same model"""
+
+    def __init__(self):
+        self._last = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model, prompt):
+        """Returns (shared prefix chars, reuse ratio) and remembers prompt for the next call"""
+        with self._lock:
+            shared = common_prefix(self._last.get(model, ""), prompt)
+            self._last[model] = prompt
+            total = self._totals.setdefault(model, [0, 0])
+            total[0] += shared
+            total[1] += len(prompt)
+        return shared, (shared / len(prompt) if prompt else 0.0)
+
+    def summary(self):
+        """{model: overall reuse ratio}"""
+        with self._lock:
+            return {model: round(shared / total, 3) if total else 0.0
+                    for model, (shared, total) in self._totals.items()}
+
+
+_prefix_tracker = None
+
+
+def get_prefix_tracker():
+    """Get shared PrefixTracker instance (singleton pattern)"""
+    global _prefix_tracker
+    if _prefix_tracker is None:
+        _prefix_tracker = PrefixTracker()
+    return _prefix_tracker
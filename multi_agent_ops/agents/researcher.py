@@ -1,29 +1,60 @@
 from crewai import Agent
-from tools.web_search import web_search_tool
-from memory.vector_store import VectorMemory
+from memory.vector_store import get_vector_memory
+from memory.summaries import get_summary_store
 from config.llm_config import get_shared_llm
+from pipeline.context_budget import fit_memory
+from agents.prompt_layout import memory_block
 
 class ResearcherAgent:
-    def build(self, query="CLI To-Do app"):
-        try:
-            vector_memory = VectorMemory()
-            related_plans = vector_memory.search(query, k=3)
-            context = "\n".join([doc.page_content for doc in related_plans]) if related_plans else "No related plans found."
-        except Exception as e:
-            print(f"⚠️ Vector memory error: {e}")
-            context = "No related plans found."
-        
+    def build(self, query="CLI To-Do app", llm=None, use_memory=True, web_search=True, max_execution_time=None,
+              memory_tokens=None, search_tool=None, layout="inline"):
+        context = "No related plans found."
+        self.memory_context = None
+        if use_memory:
+            try:
+                related_plans = get_vector_memory().search(query, k=3)
+                if related_plans:
+                    context = fit_memory([doc.page_content for doc in related_plans], memory_tokens,
+                                         getattr(llm, "model", None), query=query, name="researcher memory",
+                                         summarizer=get_summary_store().fit)
+                    self.memory_context = memory_block("Relevant memory from past plans", context)
+            except Exception as e:
+                print(f"⚠️ Vector memory error: {e}")
+        memory_text = f"\n\nHere's relevant memory from past plans:\n{context}" if layout == "inline" else ""
+
+        extra = {"max_execution_time": max_execution_time} if max_execution_time else {}
+
+        if web_search:
+            if search_tool is None:
+                from tools.web_search import web_search_tool as search_tool
+            return Agent(
+                role='Technical Researcher',
+                goal='Gather detailed, relevant technical information to support the task',
+                backstory=(
+                    "You're a technical researcher who assists with accurate insights and examples. "
+                    "You search the web for current best practices, libraries, and code examples. "
+                    "You provide comprehensive research with links, examples, and recommendations."
+                    + memory_text
+                ),
+                llm=llm or get_shared_llm(),
+                tools=[search_tool],
+                allow_delegation=False,
+                verbose=True,
+                **extra
+            )
+
+        # Knowledge-only researcher: no search tool, no network round-trips
         return Agent(
             role='Technical Researcher',
-            goal='Gather detailed, relevant technical information to support the task',
+            goal='Provide detailed technical recommendations based on knowledge and experience',
             backstory=(
-                "You're a technical researcher who assists with accurate insights and examples. "
-                "You search the web for current best practices, libraries, and code examples. "
-                "You provide comprehensive research with links, examples, and recommendations.\n\n"
-                f"Here's relevant memory from past plans:\n{context}"
+                "You're a technical researcher with deep knowledge of programming tools, libraries, and best practices. "
+                "You provide comprehensive research and recommendations based on your extensive experience. "
+                "You focus on popular, well-documented solutions and proven patterns."
+                + memory_text
             ),
-            llm=get_shared_llm(),
-            tools=[web_search_tool],
+            llm=llm or get_shared_llm(),
             allow_delegation=False,
-            verbose=True
-        )
\ No newline at end of file
+            verbose=True,
+            **extra
+        )
@@ -2,7 +2,8 @@ from crewai import Agent
 from config.llm_config import get_shared_llm
 
 class ReviewerAgent:
-    def build(self):
+    def build(self, llm=None, max_execution_time=None):
+        extra = {"max_execution_time": max_execution_time} if max_execution_time else {}
         return Agent(
             role='Code Reviewer',
             goal='Evaluate the quality of outputs and recommend improvements',
@@ -11,7 +12,8 @@ class ReviewerAgent:
                 "You read other agents' work, point out flaws, and suggest clear, actionable improvements. "
                 "You provide detailed feedback on code quality, structure, and best practices."
             ),
-            llm=get_shared_llm(),
+            llm=llm or get_shared_llm(),
             allow_delegation=False,
-            verbose=True
+            verbose=True,
+            **extra
         )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Recall and latency of the IVF index against exact search.
+
+Builds a NumpyVectorStore of synthetic clustered unit vectors (real sentence
+embeddings are clustered by topic; uniform random vectors would be the worst
+case for any ANN index) and held-out queries drawn from the same topics, then
+for every nprobe reports recall@k against exact search and p50/p99
+single-query latency. --off-topic draws the queries around other topics
+instead, so their neighbours spread over many lists. Results go to
+bench/results/ann-<commit>.json.
+
+Usage:
+    python -m bench.ann_benchmark                               # 10k, 100k and 1M vectors
+    python -m bench.ann_benchmark --sizes 10000 --nprobe 1 4 16 --queries 200
+    python -m bench.ann_benchmark --off-topic                   # worst case for recall
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench.run_benchmark import RESULTS_DIR, git_commit
+from memory.ann_index import IVFIndex
+from memory.numpy_store import NumpyVectorStore
+
+
+def clustered_vectors(count, dim, clusters=None, seed=0, spread=0.35):
+    """Unit vectors scattered around `clusters` random topic directions"""
+    rng = np.random.default_rng(seed)
+    clusters = clusters or max(8, count // 500)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 100000):
+        rows = min(100000, count - start)
+        noise = rng.normal(scale=spread, size=(rows, dim)).astype(np.float32)
+        vectors[start:start + rows] = centers[rng.integers(clusters, size=rows)] / np.sqrt(dim) * 3 + \
+            noise / np.sqrt(dim) * 3
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentile(values, q):
+    return float(np.percentile(np.array(values) * 1000, q))
+
+
+def bench_size(count, dim, k, nprobes, queries, dtype, off_topic=False):
+    if off_topic:   # queries around other topics: no close neighbours, the hard case for IVF
+        vectors, probes = clustered_vectors(count, dim), clustered_vectors(queries, dim, seed=1)
+    else:           # held-out queries on the stored topics
+        vectors = clustered_vectors(count + queries, dim)
+        vectors, probes = vectors[:count], vectors[count:]
+    with tempfile.TemporaryDirectory(prefix="ann-") as tmp:
+        store = NumpyVectorStore(tmp, dtype=dtype)
+        store.add_texts([str(i) for i in range(count)], embeddings=vectors, ids=[str(i) for i in range(count)])
+        del vectors
+
+        exact, exact_times = [], []
+        for probe in probes:
+            start = time.perf_counter()
+            exact.append(set(store.search_rows([probe], k)[0].tolist()))
+            exact_times.append(time.perf_counter() - start)
+        rows = [{"size": count, "index": "exact", "recall": 1.0,
+                 "p50_ms": percentile(exact_times, 50), "p99_ms": percentile(exact_times, 99)}]
+        print(f"{count:>9} exact          p50 {rows[0]['p50_ms']:8.2f}ms  p99 {rows[0]['p99_ms']:8.2f}ms")
+
+        start = time.perf_counter()
+        index = IVFIndex().train(store.vectors)
+        build = time.perf_counter() - start
+        for nprobe in nprobes:
+            recalls, times = [], []
+            for probe, truth in zip(probes, exact):
+                start = time.perf_counter()
+                found, _ = index.search(store.vectors, [probe], k, nprobe)[0]
+                times.append(time.perf_counter() - start)
+                recalls.append(len(truth & set(found.tolist())) / k)
+            row = {"size": count, "index": "ivf", "nlist": index.nlist, "nprobe": nprobe,
+                   "build_seconds": round(build, 2), "recall": round(float(np.mean(recalls)), 4),
+                   "p50_ms": percentile(times, 50), "p99_ms": percentile(times, 99)}
+            rows.append(row)
+            print(f"{count:>9} ivf nprobe={nprobe:<4} p50 {row['p50_ms']:8.2f}ms  p99 {row['p99_ms']:8.2f}ms"
+                  f"  recall@{k} {row['recall']:.3f}  (nlist {index.nlist}, build {build:.1f}s)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF recall/latency benchmark against exact search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--float16", action="store_true", help="Store the matrix as float16")
+    parser.add_argument("--off-topic", action="store_true", help="Query around topics that aren't stored")
+    args = parser.parse_args()
+
+    dtype = np.float16 if args.float16 else np.float32
+    rows = []
+    for count in args.sizes:
+        rows.extend(bench_size(count, args.dim, args.k, args.nprobe, args.queries, dtype, args.off_topic))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"ann-{git_commit()}-{int(time.time())}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"commit": git_commit(), "dim": args.dim, "k": args.k,
+                   "dtype": np.dtype(dtype).name, "off_topic": args.off_topic, "rows": rows}, f, indent=2)
+    print(f"📊 Results: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Diff two benchmark result files and flag regressions.
+
+Usage:
+    python -m bench.compare bench/results/old.json bench/results/new.json [--threshold 0.10]
+Exits with status 1 when any metric regressed by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+from bench.run_benchmark import METRICS
+
+
+def compare(old, new, threshold):
+    """Yield (variant, metric, old, new, relative change, regressed) rows"""
+    for variant in sorted(set(old["summary"]) | set(new["summary"])):
+        before = old["summary"].get(variant, {})
+        after = new["summary"].get(variant, {})
+        for metric in METRICS:
+            a, b = before.get(metric), after.get(metric)
+            if a is None or b is None:
+                continue
+            change = (b - a) / a if a else 0.0
+            # every metric is lower-is-better
+            yield variant, metric, a, b, change, change > threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as regression")
+    args = parser.parse_args()
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"📊 {old['commit']} → {new['commit']}")
+
+    regressions = 0
+    for variant, metric, a, b, change, regressed in compare(old, new, args.threshold):
+        mark = "🔺" if regressed else ("🔻" if change < -args.threshold else "  ")
+        print(f"{mark} {variant:<26}{metric:<22}{a:>10.3f} → {b:>10.3f} ({change:+.1%})")
+        regressions += regressed
+    print(f"\n{'❌' if regressions else '✅'} {regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Replayable fake LLM backend with realistic latency.
+
+Speaks enough of the Ollama API (/api/generate, /api/chat, /api/tags, /api/ps)
+and the OpenAI-compatible API (/v1/chat/completions) for crewai/litellm to run
+against it. Latency follows a per-model profile: model load on a swap, prompt
+evaluation per input token not already in the KV cache (the prefix shared
+with the previous prompt on that model, which Ollama reuses), then streaming
+at a fixed tokens/second rate.
+Responses are replayed from a fixtures file (first matching keyword wins; a
+fixture with a "seed" only matches requests with that seed) with
+deterministic role-based fallbacks. A request with a JSON schema (OpenAI
+response_format or Ollama format) gets bare JSON shaped by the schema, as a
+grammar-constrained server would answer.
+
+Every call is recorded (a stream the client closed early as "cancelled");
+GET /__stats returns the call log, POST /__reset clears it.
+
+Run standalone:
+    python -m bench.fake_llm_server --port 11500 --speedup 10
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# seconds to load, prompt tokens/s, generated tokens/s - rough CPU numbers
+LATENCY_PROFILES = {
+    "llama3.2:3b": (1.5, 400.0, 25.0),
+    "llama3.1:8b": (4.0, 150.0, 10.0),
+    "qwen2.5-coder:7b": (3.5, 170.0, 11.0),
+    "default": (2.0, 250.0, 15.0),
+}
+
+CANNED = {
+    "code": (
+        "```python\n"
+        "def main():\n"
+        "    tasks = []\n"
+        "    while True:\n"
+        "        choice = input('1) add 2) list 3) quit: ')\n"
+        "        if choice == '1':\n"
+        "            tasks.append(input('Task: '))\n"
+        "        elif choice == '2':\n"
+        "            for i, task in enumerate(tasks, 1):\n"
+        "                print(f'{i}. {task}')\n"
+        "        else:\n"
+        "            break\n"
+        "\n"
+        "if __name__ == '__main__':\n"
+        "    main()\n"
+        "```"
+    ),
+    "review": "The code works for the basic flow. 1) Validate empty input. 2) Persist tasks to a JSON file.",
+    "plan": "1. Define the data model\n2. Implement add/list/delete commands\n3. Add persistence\n4. Write tests",
+    "research": "argparse for the CLI, json for storage, pathlib for file paths.",
+}
+
+
+def example_for(schema, root=None, name="item", index=1):
+    """Deterministic instance of a JSON schema (objects, arrays, enums, $refs, scalars)"""
+    root = root or schema
+    if "$ref" in schema:
+        return example_for(root["$defs"][schema["$ref"].split("/")[-1]], root, name, index)
+    if "anyOf" in schema:
+        return example_for(next((s for s in schema["anyOf"] if s.get("type") != "null"), {}), root, name, index)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: example_for(sub, root, key, index) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        count = max(2, schema.get("minItems", 0))
+        return [example_for(schema.get("items", {}), root, name, i) for i in range(1, count + 1)]
+    if kind == "integer":
+        return index
+    if kind == "number":
+        return float(index)
+    if kind == "boolean":
+        return True
+    return f"{name} {index}"
+
+
+def request_schema(payload):
+    """JSON schema a request constrains its answer to, if any"""
+    fmt = payload.get("response_format") or {}
+    if fmt.get("type") == "json_schema":
+        return fmt.get("json_schema", {}).get("schema")
+    if isinstance(payload.get("format"), dict):
+        return payload["format"]
+    return None
+
+
+def count_tokens(text):
+    return max(1, len(text or "") // 4)
+
+
+def model_key(model):
+    name = (model or "").split("/")[-1]
+    return name if name in LATENCY_PROFILES else "default"
+
+
+class FakeBackend:
+    """Shared state for one fake server: latency model, fixtures, resident models and call log"""
+
+    def __init__(self, speedup=1.0, fixtures=None, extra_latency=0.0, fail_next=0, max_resident=1, parallel=None):
+        self.speedup = speedup
+        self.slots = threading.BoundedSemaphore(parallel) if parallel else None   # like OLLAMA_NUM_PARALLEL
+        self.fixtures = fixtures or []
+        self.extra_latency = extra_latency
+        self.fail_next = fail_next
+        self.max_resident = max_resident
+        self.resident = []  # most recently used last
+        self.calls = []
+        self.loads = []     # every model load, from a request or a preload hint
+        self.kv_prompt = {} # model -> previous prompt, whose prefix the server can reuse
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_fixture_file(cls, path, **kwargs):
+        fixtures = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    fixtures.append(json.loads(line))
+        return cls(fixtures=fixtures, **kwargs)
+
+    def respond_text(self, prompt, seed=None):
+        lowered = prompt.lower()
+        for fixture in self.fixtures:
+            if fixture["match"].lower() in lowered and fixture.get("seed", seed) == seed:
+                return fixture["response"]
+        if "python developer" in lowered or ("write" in lowered and "code" in lowered):
+            kind = "code"
+        elif "review" in lowered:
+            kind = "review"
+        elif "research" in lowered:
+            kind = "research"
+        else:
+            kind = "plan"
+        return CANNED[kind]
+
+    def _sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds / self.speedup)
+
+    def load(self, model, hint=False):
+        """Make model resident; returns seconds spent loading (0 when already resident)"""
+        with self.lock:
+            if model in self.resident:
+                self.resident.remove(model)
+                self.resident.append(model)
+                return 0.0
+            self.resident.append(model)
+            while len(self.resident) > self.max_resident:
+                self.resident.pop(0)
+        load_s = LATENCY_PROFILES[model_key(model)][0]
+        with self.lock:
+            self.loads.append({"model": model, "start": time.time(), "seconds": load_s, "hint": hint})
+        self._sleep(load_s)
+        return load_s
+
+    def unload(self, model):
+        with self.lock:
+            if model in self.resident:
+                self.resident.remove(model)
+            self.kv_prompt.pop(model, None)
+
+    def cached_prefix(self, model, prompt):
+        """Tokens of prompt shared with the previous prompt on model (a KV-cache hit, like Ollama)"""
+        from agents.prompt_layout import common_prefix
+        with self.lock:
+            previous = self.kv_prompt.get(model, "")
+            self.kv_prompt[model] = prompt
+        shared = common_prefix(previous, prompt)
+        return count_tokens(prompt[:shared]) if shared else 0
+
+    def generate(self, model, prompt, on_token=None, agent_format=True, schema=None, seed=None):
+        """Simulate one completion; on_token(piece) is called per streamed token"""
+        if self.slots is None:
+            return self._generate(model, prompt, on_token, agent_format, schema, seed)
+        with self.slots:   # requests beyond the parallel slots queue, as on a real server
+            return self._generate(model, prompt, on_token, agent_format, schema, seed)
+
+    def _generate(self, model, prompt, on_token, agent_format, schema, seed):
+        with self.lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                raise RuntimeError("injected backend failure")
+        record = {"model": model, "start": time.time(), "prompt_tokens": count_tokens(prompt)}
+        self._sleep(self.extra_latency)
+        record["load_seconds"] = self.load(model)
+        if record["load_seconds"]:
+            with self.lock:
+                self.kv_prompt.pop(model, None)   # a fresh load starts with an empty cache
+        record["cached_tokens"] = self.cached_prefix(model, prompt)
+        _, prompt_rate, gen_rate = LATENCY_PROFILES[model_key(model)]
+        record["prompt_eval_seconds"] = (record["prompt_tokens"] - record["cached_tokens"]) / prompt_rate
+        self._sleep(record["prompt_eval_seconds"])
+
+        if schema:
+            text = json.dumps(example_for(schema))
+        else:
+            text = self.respond_text(prompt, seed)
+        if agent_format and not schema and "final answer" in prompt.lower():
+            text = f"Thought: I now know the final answer\nFinal Answer: {text}"
+        pieces = [text[i:i + 4] for i in range(0, len(text), 4)]
+        record["completion_tokens"] = len(pieces)
+        for i, piece in enumerate(pieces):
+            self._sleep(1.0 / gen_rate)
+            if i == 0:
+                record["first_token"] = time.time()
+            if on_token:
+                try:
+                    on_token(piece)
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client closed the stream; a real server stops generating too
+                    record["cancelled"] = True
+                    record["completion_tokens"] = i
+                    break
+        record["end"] = time.time()
+        with self.lock:
+            self.calls.append(record)
+        return text, record
+
+    def stats(self):
+        with self.lock:
+            return {
+                "calls": list(self.calls),
+                "resident": list(self.resident),
+                "loads": list(self.loads),
+                "swaps": len(self.loads),
+            }
+
+    def reset(self):
+        with self.lock:
+            self.calls = []
+            self.loads = []
+            self.resident = []
+            self.kv_prompt = {}
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    backend = None  # set by make_server
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # the client went away, e.g. closed a stream it no longer needs
+
+    def _json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data):
+        raw = data.encode()
+        self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._json({"models": [{"name": m, "size": 0} for m in LATENCY_PROFILES if m != "default"]})
+        elif self.path == "/api/ps":
+            self._json({"models": [{"name": m, "model": m} for m in self.backend.stats()["resident"]]})
+        elif self.path == "/__stats":
+            self._json(self.backend.stats())
+        elif self.path in ("/", "/health"):
+            self._json({"status": "ok"})
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/__reset":
+            self.backend.reset()
+            return self._json({"status": "reset"})
+        try:
+            if self.path == "/api/generate":
+                return self._ollama(payload, payload.get("prompt", ""), chat=False)
+            if self.path == "/api/chat":
+                prompt = "\n".join(m.get("content", "") for m in payload.get("messages", []))
+                return self._ollama(payload, prompt, chat=True)
+            if self.path in ("/v1/chat/completions", "/chat/completions"):
+                return self._openai(payload)
+        except RuntimeError as e:
+            return self._json({"error": str(e)}, 500)
+        self._json({"error": "not found"}, 404)
+
+    def _ollama(self, payload, prompt, chat):
+        model = payload.get("model", "")
+        keep_alive = payload.get("keep_alive")
+        if not prompt and not payload.get("messages"):
+            # Preload / unload hint: empty prompt, keep_alive decides
+            if keep_alive in (0, "0", "0s"):
+                self.backend.unload(model)
+            else:
+                self.backend.load(model, hint=True)
+            return self._json({"model": model, "response": "", "done": True})
+
+        def message(text, done, record=None):
+            out = {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"), "done": done}
+            if chat:
+                out["message"] = {"role": "assistant", "content": text}
+            else:
+                out["response"] = text
+            if record:
+                out["prompt_eval_count"] = record["prompt_tokens"]
+                out["eval_count"] = record["completion_tokens"]
+                out["total_duration"] = int((record["end"] - record["start"]) * 1e9)
+            return out
+
+        if payload.get("stream", True):
+            self._start_stream("application/x-ndjson")
+            _, record = self.backend.generate(
+                model, prompt, lambda piece: self._chunk(json.dumps(message(piece, False)) + "\n"),
+                schema=request_schema(payload), seed=(payload.get("options") or {}).get("seed"))
+            if record.get("cancelled"):
+                self.close_connection = True
+                return None
+            self._chunk(json.dumps(message("", True, record)) + "\n")
+            return self._end_stream()
+        text, record = self.backend.generate(model, prompt, schema=request_schema(payload),
+                                             seed=(payload.get("options") or {}).get("seed"))
+        self._json(message(text, True, record))
+
+    def _openai(self, payload):
+        model = payload.get("model", "")
+        prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        if payload.get("stream"):
+            self._start_stream("text/event-stream")
+
+            def send(piece):
+                chunk = {"object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                self._chunk(f"data: {json.dumps(chunk)}\n\n")
+
+            _, record = self.backend.generate(model, prompt, send, schema=request_schema(payload),
+                                              seed=payload.get("seed"))
+            if record.get("cancelled"):
+                self.close_connection = True
+                return None
+            self._chunk("data: [DONE]\n\n")
+            return self._end_stream()
+        text, record = self.backend.generate(model, prompt, schema=request_schema(payload), seed=payload.get("seed"))
+        self._json({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": record["prompt_tokens"],
+                "completion_tokens": record["completion_tokens"],
+                "total_tokens": record["prompt_tokens"] + record["completion_tokens"],
+                "prompt_tokens_details": {"cached_tokens": record["cached_tokens"]},
+            },
+        })
+
+
+def make_server(backend=None, host="127.0.0.1", port=0):
+    """Create (but don't start) a fake server; port 0 picks a free port"""
+    backend = backend or FakeBackend()
+    handler = type("BoundFakeLLMHandler", (FakeLLMHandler,), {"backend": backend})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.backend = backend
+    return server
+
+
+def start_in_thread(backend=None, host="127.0.0.1", port=0):
+    """Start a fake server in a daemon thread; returns (server, base_url)"""
+    server = make_server(backend, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama/OpenAI backend with realistic latency")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--speedup", type=float, default=1.0, help="Divide all simulated latencies by this")
+    parser.add_argument("--fixtures", help="JSONL file of {\"match\": ..., \"response\": ...} replays")
+    parser.add_argument("--extra-latency", type=float, default=0.0, help="Seconds added to every call")
+    parser.add_argument("--parallel", type=int, help="Requests generated at once (more queue); unlimited by default")
+    args = parser.parse_args()
+
+    kwargs = dict(speedup=args.speedup, extra_latency=args.extra_latency, parallel=args.parallel)
+    backend = FakeBackend.from_fixture_file(args.fixtures, **kwargs) if args.fixtures else FakeBackend(**kwargs)
+    server = make_server(backend, args.host, args.port)
+    print(f"🤖 Fake LLM backend on http://{args.host}:{server.server_port} (speedup x{args.speedup})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
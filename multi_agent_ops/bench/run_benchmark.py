@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the crew entry points.
+
+Starts the fake LLM backend, then runs every variant against a fixed query set,
+each run in a fresh interpreter and a scratch working directory. Reports
+startup time, time-to-first-token, total latency, LLM calls, tokens and peak
+RSS, and stores everything as JSON under bench/results/ so runs on different
+commits can be diffed with bench.compare.
+
+Usage:
+    python -m bench.run_benchmark                      # all variants, all queries
+    python -m bench.run_benchmark --variants main_fast main_ultra_fast --speedup 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.fake_llm_server import FakeBackend, start_in_thread
+from bench.variants import VARIANTS
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+METRICS = ("startup_seconds", "time_to_first_token", "latency_seconds", "total_seconds",
+           "llm_calls", "prompt_tokens", "prompt_eval_seconds", "completion_tokens", "model_swaps",
+           "model_load_seconds", "peak_rss_mb")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_once(variant, query, backend_url, timeout):
+    """Run one variant/query in a fresh interpreter inside a scratch directory"""
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        out = os.path.join(workdir, "result.json")
+        env = dict(
+            os.environ,
+            PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+            OLLAMA_BASE_URL=backend_url,
+            OPENAI_API_BASE=f"{backend_url}/v1",
+            OPENAI_API_KEY="fake-key",
+            OPENAI_MODEL="openai/llama3.1:8b",
+            SERPER_API_KEY="",
+            GITHUB_TOKEN="",
+            SANDBOX_EXECUTION="0",
+            REVISION_ITERATIONS="0",
+        )
+        cmd = [sys.executable, "-m", "bench.run_variant", "--variant", variant,
+               "--query", query, "--backend", backend_url, "--out", out]
+        try:
+            subprocess.run(cmd, cwd=workdir, env=env, timeout=timeout,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except subprocess.TimeoutExpired:
+            return {"variant": variant, "query": query, "error": f"timeout after {timeout}s"}
+        if not os.path.exists(out):
+            return {"variant": variant, "query": query, "error": "no result written"}
+        with open(out, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def summarize(runs):
+    """Median of each metric over the successful runs of one variant"""
+    ok = [r for r in runs if "error" not in r]
+    summary = {"runs": len(runs), "errors": len(runs) - len(ok)}
+    for metric in METRICS:
+        values = [r[metric] for r in ok if r.get(metric) is not None]
+        summary[metric] = round(statistics.median(values), 4) if values else None
+    return summary
+
+
+def print_table(summaries):
+    header = f"{'variant':<26}{'startup':>9}{'ttft':>8}{'latency':>9}{'calls':>7}{'tokens':>8}{'rss MB':>8}{'err':>5}"
+    print(header)
+    print("-" * len(header))
+    for variant, s in summaries.items():
+        def fmt(value, width, digits=2):
+            return f"{value:>{width}.{digits}f}" if isinstance(value, (int, float)) else f"{'-':>{width}}"
+        tokens = (s["prompt_tokens"] or 0) + (s["completion_tokens"] or 0)
+        print(f"{variant:<26}{fmt(s['startup_seconds'], 9)}{fmt(s['time_to_first_token'], 8)}"
+              f"{fmt(s['latency_seconds'], 9)}{fmt(s['llm_calls'], 7, 0)}{tokens:>8.0f}"
+              f"{fmt(s['peak_rss_mb'], 8, 0)}{s['errors']:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crew entry points against a fake LLM backend")
+    parser.add_argument("--variants", nargs="*", default=sorted(VARIANTS), choices=sorted(VARIANTS))
+    parser.add_argument("--queries", default=os.path.join(BENCH_DIR, "queries.json"))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--speedup", type=float, default=10.0, help="Fake backend latency divisor")
+    parser.add_argument("--fixtures", help="JSONL replay fixtures for the fake backend")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--out", help="Result file (default bench/results/<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    with open(args.queries, encoding="utf-8") as f:
+        queries = json.load(f)
+    backend = (FakeBackend.from_fixture_file(args.fixtures, speedup=args.speedup)
+               if args.fixtures else FakeBackend(speedup=args.speedup))
+    server, backend_url = start_in_thread(backend)
+    print(f"🤖 Fake backend: {backend_url} (speedup x{args.speedup})")
+
+    runs = {}
+    for variant in args.variants:
+        runs[variant] = []
+        for query in queries:
+            for _ in range(args.repeat):
+                backend.reset()  # every run starts with a cold model, like a fresh process would
+                result = run_once(variant, query, backend_url, args.timeout)
+                status = f"❌ {result['error']}" if "error" in result else f"✅ {result.get('total_seconds')}s"
+                print(f"  {variant:<26} {query[:40]:<40} {status}")
+                runs[variant].append(result)
+    server.shutdown()
+
+    summaries = {variant: summarize(items) for variant, items in runs.items()}
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "speedup": args.speedup,
+        "queries": queries,
+        "summary": summaries,
+        "runs": runs,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print()
+    print_table(summaries)
+    print(f"\n💾 Results: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark child process: import one variant, build its crew, run it once.
+
+Started by bench.run_benchmark in a fresh interpreter (so import/startup cost
+is real) with OLLAMA_BASE_URL / OPENAI_API_BASE pointing at the fake backend.
+Writes one JSON object with the measurements to --out.
+"""
+
+import argparse
+import builtins
+import importlib
+import json
+import os
+import sys
+import time
+
+import requests
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from bench.variants import VARIANTS, build_crew
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def llm_metrics(backend_url, since):
+    """LLM calls and model loads the fake backend saw after `since`"""
+    stats = requests.get(f"{backend_url}/__stats", timeout=10).json()
+    calls = [c for c in stats["calls"] if c["start"] >= since]
+    loads = [load for load in stats["loads"] if load["start"] >= since]
+    first_tokens = [c["first_token"] for c in calls if c.get("first_token")]
+    return {
+        "llm_calls": len(calls),
+        "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+        "prompt_eval_seconds": round(sum(c.get("prompt_eval_seconds", 0) for c in calls), 3),
+        "completion_tokens": sum(c["completion_tokens"] for c in calls),
+        "time_to_first_token": round(min(first_tokens) - since, 4) if first_tokens else None,
+        "model_swaps": len(loads),
+        "model_load_seconds": round(sum(load["seconds"] for load in loads), 3),
+    }
+
+
+def run(variant, query, backend_url):
+    spec = VARIANTS[variant]
+    builtins.input = lambda *args, **kwargs: query  # entry points prompt for the project
+
+    t0 = time.perf_counter()
+    wall0 = time.time()
+    module = importlib.import_module(spec["module"])
+    startup = time.perf_counter() - t0
+    result = {"variant": variant, "query": query, "startup_seconds": round(startup, 4)}
+
+    if spec.get("script"):
+        result["total_seconds"] = round(startup, 4)
+        result.update(llm_metrics(backend_url, wall0))
+    else:
+        t1 = time.perf_counter()
+        crew = build_crew(spec, module, query)
+        result["build_seconds"] = round(time.perf_counter() - t1, 4)
+        kickoff_wall = time.time()
+        t2 = time.perf_counter()
+        crew.kickoff()
+        result["latency_seconds"] = round(time.perf_counter() - t2, 4)
+        result["total_seconds"] = round(time.perf_counter() - t0, 4)
+        result.update(llm_metrics(backend_url, kickoff_wall))
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variant", required=True, choices=sorted(VARIANTS))
+    parser.add_argument("--query", required=True)
+    parser.add_argument("--backend", default=os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11500"))
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    try:
+        result = run(args.variant, args.query, args.backend)
+    except BaseException as e:  # SystemExit from entry points that call exit() too
+        result = {"variant": args.variant, "query": args.query, "error": f"{type(e).__name__}: {e}",
+                  "peak_rss_mb": peak_rss_mb()}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+if __name__ == "__main__":
+    main()
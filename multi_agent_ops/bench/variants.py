@@ -0,0 +1,33 @@
+"""
+Registry of what the benchmark knows how to build.
+
+Every profile in config/profiles.py is a variant (built through the runner),
+plus the standalone scripts that don't go through profiles:
+  attr    - name of a module-level crew built at import time
+  factory - name of a function taking the project query
+  script  - the module runs everything at import; only total time is measured
+"""
+
+from config.profiles import PROFILES
+
+VARIANTS = {name: {"module": "runner.crew_builder", "profile": name} for name in PROFILES}
+VARIANTS.update({
+    "main": {"module": "main", "attr": "crew"},
+    "main_simple": {"module": "main_simple", "attr": "crew"},
+    "main_minimal": {"module": "main_minimal", "factory": "run_single_task", "args": ["code"]},
+    "main_ultra_simple": {"module": "main_ultra_simple", "script": True},
+})
+
+
+def build_crew(spec, module, query):
+    """Return the crew object described by spec from an imported module"""
+    if spec.get("profile"):
+        from config.profiles import get_profile
+        return module.build_crew(get_profile(spec["profile"]), query).crew
+    if spec.get("attr"):
+        return getattr(module, spec["attr"])
+    factory = getattr(module, spec["factory"])
+    built = factory(query, *spec.get("args", []))
+    if isinstance(built, tuple):
+        built = built[0]
+    return built
@@ -0,0 +1,233 @@
+"""
+Hedged requests and failover across LLM backends.
+
+A run used to be bound to one server: a slow call (another client on the
+box, a model reload) stalls the crew, and a dead server fails it. With a
+backend pool an agent's LLM has a primary backend (its own model on the
+configured Ollama server) followed by secondaries:
+
+    "http://gpu-box:11434"   another Ollama server with the same model
+    "openai"                 the OpenAI-compatible endpoint of OPENAI_API_BASE
+                             (OPENAI_MODEL, OPENAI_API_KEY), as main_ultra_simple.py uses
+
+Every call goes to the first healthy backend. When it hasn't answered after
+the HEDGE_PERCENTILE latency of that backend (HEDGE_AFTER seconds until it
+has MIN_SAMPLES calls), a duplicate goes to the next backend and whichever
+answers first is used. An error fails over to the next backend at once and
+keeps the failed one out of first place for FAILOVER_COOLDOWN seconds.
+crewai calls can't be interrupted, so the losing call runs to completion in
+the background; its latency still goes into its backend's histogram.
+
+    "backends": ["openai"]   # in a profile; LLM_BACKENDS="url,openai" overrides it
+"""
+
+import asyncio
+import bisect
+import os
+import queue
+import threading
+import time
+
+from tracing.tracer import get_tracer
+
+LLM_BACKENDS = os.getenv("LLM_BACKENDS")   # comma-separated; overrides the profile's backends when set
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_AFTER = float(os.getenv("HEDGE_AFTER", "30"))        # hedge delay until a backend has MIN_SAMPLES calls
+MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "5"))
+FAILOVER_COOLDOWN = float(os.getenv("FAILOVER_COOLDOWN", "30"))
+
+# latency bucket upper bounds in seconds: 50 ms to ~15 min, each 1.5x the last
+BUCKETS = tuple(round(0.05 * 1.5 ** i, 3) for i in range(25))
+
+
+class LatencyHistogram:
+    """Bucketed latencies; percentiles are the upper bound of the bucket they fall in"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # the last bucket is everything slower
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = max(1, round(p * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self):
+        return {"count": self.count, "mean": round(self.total / self.count, 3) if self.count else None,
+                "p50": self.percentile(0.5), "p95": self.percentile(0.95)}
+
+
+class Backend:
+    def __init__(self, name, call):
+        self.name = name
+        self.call = call
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.errors = 0
+        self.wins = 0
+        self.hedges = 0            # calls this backend got as a hedged duplicate
+        self.down_until = 0.0
+        self.last_error = ""
+
+
+class BackendPool:
+    """
+    backends: [(name, call)] in preference order, call(messages, *args, **kwargs)
+    like crewai's LLM.call. hedge_after overrides the percentile-based delay.
+    """
+
+    def __init__(self, backends, hedge_percentile=HEDGE_PERCENTILE, hedge_after=None,
+                 min_samples=MIN_SAMPLES, cooldown=FAILOVER_COOLDOWN):
+        self.backends = [Backend(name, call) for name, call in backends]
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, backend):
+        """Seconds to wait for backend before sending a duplicate elsewhere"""
+        if self.hedge_after is not None:
+            return self.hedge_after
+        with self._lock:
+            if backend.latency.count < self.min_samples:
+                return HEDGE_AFTER
+            delay = backend.latency.percentile(self.hedge_percentile)
+        return None if delay == float("inf") else delay   # None: wait for it
+
+    def order(self):
+        """Healthy backends first, each group in preference order"""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(self.backends, key=lambda b: b.down_until > now)
+
+    def _attempt(self, backend, messages, args, kwargs, results):
+        start = time.perf_counter()
+        try:
+            result, error = backend.call(messages, *args, **kwargs), None
+        except Exception as e:   # any backend failure is a reason to fail over
+            result, error = None, e
+        seconds = time.perf_counter() - start
+        with self._lock:
+            backend.calls += 1
+            if error is None:
+                backend.latency.add(seconds)
+                backend.down_until = 0.0
+            else:
+                backend.errors += 1
+                backend.last_error = str(error)[:200]
+                backend.down_until = time.monotonic() + self.cooldown
+        results.put((backend, result, error, seconds))
+
+    def call(self, messages, *args, **kwargs):
+        order = self.order()
+        results = queue.Queue()
+        started, hedged, pending = 0, False, 0
+        last_error = None
+
+        def launch(hedge=False):
+            nonlocal started, pending
+            backend = order[started]
+            started += 1
+            pending += 1
+            if hedge:
+                with self._lock:
+                    backend.hedges += 1
+            copy = [dict(m) for m in messages] if isinstance(messages, list) else messages
+            threading.Thread(target=self._attempt, args=(backend, copy, args, kwargs, results),
+                             daemon=True).start()
+            return backend
+
+        current = launch()
+        while True:
+            delay = self.hedge_delay(current) if not hedged and started < len(order) else None
+            try:
+                backend, result, error, seconds = results.get(timeout=delay)
+            except queue.Empty:
+                hedged = True
+                secondary = launch(hedge=True)
+                print(f"🪃 {current.name} slower than {delay:.1f}s - hedging on {secondary.name}")
+                continue
+            pending -= 1
+            if error is None:
+                with self._lock:
+                    backend.wins += 1
+                get_tracer().record("backend", backend.name, seconds, hedged=hedged, first=order[0].name)
+                return result
+            last_error = error
+            print(f"⚠️ Backend {backend.name} failed: {str(error)[:120]}")
+            if started < len(order):
+                print(f"↪️ Failing over to {order[started].name}")
+                current = launch()
+            elif not pending:
+                get_tracer().record("backend", backend.name, seconds, error=str(error)[:200])
+                raise last_error
+
+    def summary(self):
+        """{backend: {"calls", "errors", "wins", "hedges", "latency": {...}}}"""
+        with self._lock:
+            return {b.name: {"calls": b.calls, "errors": b.errors, "wins": b.wins, "hedges": b.hedges,
+                             "latency": b.latency.to_dict()} for b in self.backends}
+
+
+_pools = {}
+
+
+def pool_summaries():
+    """{model spec key: pool summary} for every pool built in this process"""
+    return {name: pool.summary() for name, pool in _pools.items()}
+
+
+def backend_llm(name, spec, options):
+    """A crewai LLM for one secondary backend of spec"""
+    from crewai import LLM
+    if name == "openai":
+        base_url = os.getenv("OPENAI_API_BASE")
+        if not base_url:
+            raise ValueError("backend 'openai' needs OPENAI_API_BASE")
+        return LLM(model=os.getenv("OPENAI_MODEL", spec["model"].split("/", 1)[-1]),
+                   api_key=os.getenv("OPENAI_API_KEY"), base_url=base_url,
+                   **{k: v for k, v in options.items() if k not in ("base_url", "api_key")})
+    return LLM(model=spec["model"], **{**options, "base_url": name})
+
+
+def pool_llm(llm, spec, options):
+    """
+    Wrap llm.call (and llm.acall) so calls go through a BackendPool: llm's own
+    server first, then spec["backends"] in order.
+    """
+    if getattr(llm, "_pooled", None):
+        return llm
+    backends = [(options.get("base_url") or spec["model"], llm.call)]
+    for name in spec["backends"]:
+        backends.append((name, backend_llm(name, spec, options).call))
+    pool = BackendPool(backends)
+    _pools[f"{spec['model']} via {', '.join(name for name, _ in backends)}"] = pool
+
+    def pooled_call(messages, *args, **kwargs):
+        return pool.call(messages, *args, **kwargs)
+
+    async def pooled_acall(messages, *args, **kwargs):
+        return await asyncio.to_thread(pool.call, messages, *args, **kwargs)
+
+    try:
+        object.__setattr__(llm, "call", pooled_call)
+        if getattr(llm, "acall", None) is not None:
+            object.__setattr__(llm, "acall", pooled_acall)
+        object.__setattr__(llm, "_pooled", pool)
+    except (AttributeError, TypeError) as e:
+        print(f"⚠️ Could not pool backends for {spec['model']}: {e}")
+    return llm
@@ -5,6 +5,9 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Ollama server; override to point at another host or the benchmark's fake backend
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
 def get_llm():
     """
     Get configured LLM instance for all agents
@@ -13,7 +16,7 @@ def get_llm():
     """
     return LLM(
         model="ollama/llama3.1:8b",
-        base_url="http://localhost:11434"
+        base_url=OLLAMA_BASE_URL
     )
 
 def get_coding_llm():
@@ -22,7 +25,7 @@ def get_coding_llm():
     """
     return LLM(
         model="ollama/qwen2.5-coder:7b",
-        base_url="http://localhost:11434"
+        base_url=OLLAMA_BASE_URL
     )
 
 # Create singleton instances
@@ -42,3 +45,44 @@ def get_shared_coding_llm():
     if _coding_llm_instance is None:
         _coding_llm_instance = get_coding_llm()
     return _coding_llm_instance
+
+_llm_instances = {}
+
+def get_llm_for(spec):
+    """
+    Get shared LLM for a profile model spec such as
+    {"model": "ollama/llama3.2:3b", "temperature": 0.1, "max_tokens": 500}.
+    One instance per distinct spec, so agents with the same model share it.
+    A "structured" key (a config/structured.py schema name) gives an instance
+    that sends that JSON schema and parses its answers against it, and a
+    "candidates" count one that races that many streamed answers per call
+    (pipeline/candidates.py). "backends" (a tuple of secondary servers) puts
+    the calls through a hedging / failover pool (config/backend_pool.py).
+    With several OLLAMA_HOSTS, Ollama calls are balanced over them
+    (config/ollama_balancer.py).
+    """
+    key = tuple(sorted(spec.items()))
+    if key not in _llm_instances:
+        options = {k: v for k, v in spec.items() if k not in ("model", "structured", "candidates", "backends")}
+        if spec["model"].startswith("ollama/"):
+            options.setdefault("base_url", OLLAMA_BASE_URL)
+        if spec.get("structured"):
+            from config.structured import response_format
+            options["response_format"] = response_format(spec["structured"])
+        llm = LLM(model=spec["model"], **options)
+        from config.ollama_balancer import get_balancer
+        balancer = get_balancer() if spec["model"].startswith("ollama/") else None
+        if balancer is not None:
+            from config.ollama_balancer import balanced_llm
+            llm = balanced_llm(llm, spec, options, balancer)
+        if spec.get("backends"):
+            from config.backend_pool import pool_llm
+            llm = pool_llm(llm, spec, options)
+        if spec.get("structured"):
+            from config.structured import structure_llm
+            llm = structure_llm(llm, spec["structured"])
+        elif spec.get("candidates", 1) > 1:
+            from pipeline.candidates import candidate_llm
+            llm = candidate_llm(llm, spec, spec["candidates"], OLLAMA_BASE_URL)
+        _llm_instances[key] = llm
+    return _llm_instances[key]
@@ -1,10 +1,13 @@
+import os
 from crewai import LLM
 
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
 def get_fast_llm():
     """Get the fast local LLM configuration"""
     return LLM(
         model="ollama/llama3.2:3b",
-        base_url="http://localhost:11434",
+        base_url=OLLAMA_BASE_URL,
         temperature=0.1,  # Lower temperature for faster processing
         max_tokens=500,   # Smaller responses for speed
     )
@@ -17,7 +20,7 @@ def get_shared_coding_llm():
     """Get coding LLM - use fast model for speed"""
     return LLM(
         model="ollama/llama3.2:3b",
-        base_url="http://localhost:11434", 
+        base_url=OLLAMA_BASE_URL, 
         temperature=0.0,  # Deterministic for coding
         max_tokens=800,   # Slightly more for code
     )
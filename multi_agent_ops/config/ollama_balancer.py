@@ -0,0 +1,214 @@
+"""
+Load balancing across several Ollama hosts.
+
+One Ollama server caps a run at one machine's generation throughput. With
+
+    OLLAMA_HOSTS=http://box1:11434,http://box2:11434,http://box3:11434
+
+every Ollama LLM call picks a host:
+
+- sticky: calls of the same run (and model) go back to the host that served
+  the previous one, so the host's KV cache still holds the shared prompt
+  prefix (see agents/prompt_layout.py). Batch mode makes each query its own
+  run, so queries spread over the hosts and each one stays on its host.
+- least outstanding requests, model-aware: a host without the model resident
+  (/api/ps, plus the models this process sent there) counts
+  OLLAMA_LOAD_PENALTY extra requests for the load it would need; ties go to
+  the less busy host, then the one that served fewer calls.
+- health checks: hosts are re-checked every OLLAMA_HEALTH_INTERVAL seconds;
+  a host that fails a call and its check is skipped (and a sticky run moves)
+  until it answers again.
+
+With a single host (the default, OLLAMA_BASE_URL) nothing changes.
+"""
+
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+import requests
+
+from config.ollama_residency import ollama_model
+
+OLLAMA_HOSTS = [h.strip().rstrip("/") for h in os.getenv("OLLAMA_HOSTS", "").split(",") if h.strip()]
+HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "15"))
+HEALTH_TIMEOUT = 2.0
+LOAD_PENALTY = float(os.getenv("OLLAMA_LOAD_PENALTY", "1"))   # a model load costs about this many queued calls
+
+_sticky_key = contextvars.ContextVar("ollama_sticky_key", default=None)
+
+
+def _norm(name):
+    """Ollama names default to the :latest tag"""
+    name = ollama_model(name) or name
+    return name if ":" in name else f"{name}:latest"
+
+
+@contextlib.contextmanager
+def sticky(key):
+    """Calls in this block (and the threads it starts with its context) stick to one host per model"""
+    token = _sticky_key.set(key)
+    try:
+        yield
+    finally:
+        _sticky_key.reset(token)
+
+
+def current_key():
+    """The sticky key of the caller: set with sticky(), else the trace's run id"""
+    key = _sticky_key.get()
+    if key is None:
+        from tracing.tracer import get_tracer
+        key = get_tracer().run_id
+    return key
+
+
+class Host:
+    def __init__(self, url):
+        self.url = url
+        self.healthy = True
+        self.resident = set()
+        self.outstanding = 0
+        self.served = 0
+        self.failures = 0
+        self.checked = 0.0
+
+
+class OllamaBalancer:
+    def __init__(self, hosts, check_interval=HEALTH_INTERVAL):
+        self.hosts = [Host(url.rstrip("/")) for url in hosts]
+        self.check_interval = check_interval
+        self.session = requests.Session()
+        self._sticky = {}   # (key, model) -> Host
+        self._lock = threading.Lock()
+
+    def check(self, host):
+        """Ask the host for its resident models; False when it doesn't answer"""
+        try:
+            response = self.session.get(f"{host.url}/api/ps", timeout=HEALTH_TIMEOUT)
+            response.raise_for_status()
+            resident = {_norm(m.get("name") or m.get("model")) for m in response.json().get("models", [])}
+            healthy = True
+        except (requests.RequestException, ValueError):
+            resident, healthy = set(), False
+        with self._lock:
+            if healthy and not host.healthy:
+                print(f"💚 Ollama host {host.url} is back")
+            elif not healthy and host.healthy:
+                print(f"💔 Ollama host {host.url} is not answering")
+            host.healthy, host.checked = healthy, time.monotonic()
+            if healthy:
+                host.resident = resident
+        return healthy
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        stale = [h for h in self.hosts if force or now - h.checked >= self.check_interval]
+        threads = [threading.Thread(target=self.check, args=(h,), daemon=True) for h in stale]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def pick(self, model, key=None):
+        """Host for one call of model; key (a run) sticks to the host it got first"""
+        self.refresh()
+        name = _norm(model)
+        with self._lock:
+            healthy = [h for h in self.hosts if h.healthy] or self.hosts   # all down: try anyway
+            host = self._sticky.get((key, name)) if key is not None else None
+            if host not in healthy:
+                host = min(healthy, key=lambda h: (h.outstanding + (0 if name in h.resident else LOAD_PENALTY),
+                                                   h.outstanding, h.served))
+                if key is not None:
+                    self._sticky[(key, name)] = host
+            host.resident.add(name)   # it will be once this call starts
+            return host
+
+    @contextlib.contextmanager
+    def lease(self, model, use_sticky=True):
+        """Yields the URL of the host to call; counts the call as outstanding meanwhile"""
+        host = self.pick(model, current_key() if use_sticky else None)
+        with self._lock:
+            host.outstanding += 1
+        try:
+            yield host.url
+        finally:
+            with self._lock:
+                host.outstanding -= 1
+                host.served += 1
+
+    def down(self, url):
+        """After a failed call: True when the host fails its health check too (call elsewhere)"""
+        host = next(h for h in self.hosts if h.url == url.rstrip("/"))
+        with self._lock:
+            host.failures += 1
+        return not self.check(host)
+
+    def stats(self):
+        with self._lock:
+            return {h.url: {"served": h.served, "outstanding": h.outstanding, "failures": h.failures,
+                            "healthy": h.healthy, "resident": sorted(h.resident)} for h in self.hosts}
+
+
+_balancer = None
+
+
+def get_balancer():
+    """Shared OllamaBalancer over OLLAMA_HOSTS, or None with fewer than two hosts"""
+    global _balancer
+    if len(OLLAMA_HOSTS) < 2:
+        return None
+    if _balancer is None or [h.url for h in _balancer.hosts] != OLLAMA_HOSTS:
+        _balancer = OllamaBalancer(OLLAMA_HOSTS)
+    return _balancer
+
+
+def balanced_llm(llm, spec, options, balancer):
+    """
+    Wrap llm.call (and llm.acall) so each call goes to the host the balancer
+    picks, through one LLM instance per host. A call that fails on a host that
+    then fails its health check is retried once on another host.
+    """
+    if getattr(llm, "_balanced", None):
+        return llm
+    from crewai import LLM
+    per_host = {}
+    lock = threading.Lock()
+
+    def llm_for(url):
+        with lock:
+            if url not in per_host:
+                per_host[url] = LLM(model=spec["model"], **{**options, "base_url": url})
+            return per_host[url]
+
+    def balanced_call(messages, *args, **kwargs):
+        for attempt in range(2):
+            with balancer.lease(spec["model"]) as url:
+                try:
+                    return llm_for(url).call(messages, *args, **kwargs)
+                except Exception:
+                    if attempt or not balancer.down(url):
+                        raise
+                    print(f"↪️ Retrying on another Ollama host ({url} is down)")
+
+    async def balanced_acall(messages, *args, **kwargs):
+        for attempt in range(2):
+            with balancer.lease(spec["model"]) as url:
+                try:
+                    return await llm_for(url).acall(messages, *args, **kwargs)
+                except Exception:
+                    if attempt or not balancer.down(url):
+                        raise
+                    print(f"↪️ Retrying on another Ollama host ({url} is down)")
+
+    try:
+        object.__setattr__(llm, "call", balanced_call)
+        if getattr(llm, "acall", None) is not None:
+            object.__setattr__(llm, "acall", balanced_acall)
+        object.__setattr__(llm, "_balanced", balancer)
+    except (AttributeError, TypeError) as e:
+        print(f"⚠️ Could not balance {spec['model']} over Ollama hosts: {e}")
+    return llm
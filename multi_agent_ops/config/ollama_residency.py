@@ -0,0 +1,187 @@
+"""
+Ollama model residency: which models are loaded, and keeping swaps off the
+critical path.
+
+A crew that alternates llama3.1:8b and qwen2.5-coder:7b can make a small
+machine reload a model between every task. ResidencyManager asks the server
+which models are resident (/api/ps), loads the next task's model with a
+preload hint (empty prompt + keep_alive) and unloads models no remaining task
+needs (keep_alive 0), counting every swap and the time spent loading.
+
+plan_order() reorders independent task chains (batch mode, one chain per
+query) so consecutive steps share a model whenever the dependencies allow it.
+"""
+
+import os
+import threading
+import time
+
+import requests
+
+from tracing.tracer import get_tracer
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "10m")
+
+
+def ollama_model(model):
+    """'ollama/llama3.1:8b' -> 'llama3.1:8b'; None for models not served by Ollama"""
+    if not model or not model.startswith("ollama/"):
+        return None
+    return model.split("/", 1)[1]
+
+
+def _same(a, b):
+    """Ollama names default to the :latest tag"""
+    def norm(name):
+        return name if ":" in name else f"{name}:latest"
+    return norm(a) == norm(b)
+
+
+class ResidencyManager:
+    def __init__(self, base_url=None, keep_alive=KEEP_ALIVE, timeout=600):
+        self.base_url = (base_url or OLLAMA_BASE_URL).rstrip("/")
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.swaps = 0
+        self.swap_seconds = 0.0
+        self.loads = {}
+        self.unloads = 0
+        self._lock = threading.Lock()
+
+    def resident(self):
+        """Models the server currently has in memory ([] if it can't be asked)"""
+        try:
+            response = self.session.get(f"{self.base_url}/api/ps", timeout=5)
+            response.raise_for_status()
+            return [m.get("name") or m.get("model") for m in response.json().get("models", [])]
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️ Could not query resident models: {e}")
+            return []
+
+    def is_resident(self, model):
+        return any(_same(model, name) for name in self.resident())
+
+    def _hint(self, model, keep_alive):
+        response = self.session.post(f"{self.base_url}/api/generate",
+                                     json={"model": model, "prompt": "", "keep_alive": keep_alive},
+                                     timeout=self.timeout)
+        response.raise_for_status()
+
+    def ensure(self, model, keep=()):
+        """
+        Make model resident before it is needed. Models not in keep (the models
+        later steps still use) are unloaded first so the load doesn't have to
+        wait for the server to evict them. Returns seconds spent loading.
+        """
+        name = ollama_model(model)
+        if name is None:
+            return 0.0
+        resident = self.resident()
+        if any(_same(name, r) for r in resident):
+            return 0.0
+        needed = {ollama_model(m) for m in keep} - {None}
+        for other in resident:
+            if not any(_same(other, n) for n in needed):
+                self.unload(other)
+        start = time.perf_counter()
+        with get_tracer().span("model_swap", name, evicted=resident) as span:
+            try:
+                self._hint(name, self.keep_alive)
+            except requests.RequestException as e:
+                span.set(error=str(e))
+                print(f"⚠️ Preload of {name} failed: {e}")
+                return 0.0
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.swaps += 1
+            self.swap_seconds += seconds
+            self.loads[name] = self.loads.get(name, 0) + 1
+        print(f"🔁 Loaded {name} in {seconds:.1f}s")
+        return seconds
+
+    def unload(self, model):
+        name = ollama_model(model) or model
+        try:
+            self._hint(name, 0)
+            with self._lock:
+                self.unloads += 1
+        except requests.RequestException as e:
+            print(f"⚠️ Unload of {name} failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {"swaps": self.swaps, "swap_seconds": round(self.swap_seconds, 3),
+                    "loads": dict(self.loads), "unloads": self.unloads}
+
+    def attach(self, built, profile):
+        """
+        Sequential crews: before kickoff load the first task's model, and when
+        each task finishes load the next one and release models no longer needed.
+        """
+        from pipeline.context_budget import chain_callbacks
+        specs = profile["tasks"]
+        models = [profile["llms"][spec["agent"]]["model"] for spec in specs]
+
+        def prepare(index):
+            def callback(_output):
+                if index < len(models):
+                    self.ensure(models[index], keep=models[index:])
+            return callback
+
+        for i, spec in enumerate(specs[:-1]):
+            task = built.tasks[spec["name"]]
+            task.callback = chain_callbacks(prepare(i + 1), task.callback)
+        if models:
+            self.ensure(models[0], keep=models)
+        return self
+
+
+def plan_order(jobs, resident=()):
+    """
+    jobs: list of chains, each a list of models (one per step, run in order).
+    Returns [(job index, step index), ...] covering every step, keeping each
+    chain's order and greedily staying on the current model: run every ready
+    step on the loaded model, then switch to the model with the most ready
+    steps (earliest job wins ties).
+    """
+    heads = [0] * len(jobs)
+    current = next(iter(resident), None)
+    order = []
+    remaining = sum(len(job) for job in jobs)
+    while remaining:
+        ready = [j for j, job in enumerate(jobs) if heads[j] < len(job)]
+        on_current = [j for j in ready if current is not None and jobs[j][heads[j]] == current]
+        if not on_current:
+            counts = {}
+            for j in ready:
+                counts.setdefault(jobs[j][heads[j]], []).append(j)
+            current = max(counts, key=lambda m: (len(counts[m]), -counts[m][0]))
+            continue
+        for j in on_current:
+            order.append((j, heads[j]))
+            heads[j] += 1
+            remaining -= 1
+    return order
+
+
+def count_swaps(models, resident=()):
+    """Loads needed to run models in sequence with one model resident at a time"""
+    swaps, current = 0, next(iter(resident), None)
+    for model in models:
+        if model != current:
+            swaps += 1
+            current = model
+    return swaps
+
+
+_residency = None
+
+
+def get_residency_manager():
+    """Get shared ResidencyManager instance (singleton pattern)"""
+    global _residency
+    if _residency is None:
+        _residency = ResidencyManager()
+    return _residency
@@ -0,0 +1,335 @@
+"""
+Declarative run profiles.
+
+Each profile says which agents to build, which model each agent uses, the task
+templates ({query} is replaced by the project description), and which optional
+components (vector memory, web search, git, validation) are switched on.
+The runner only imports what a profile needs, so profiles with memory and web
+search off never load Chroma, langchain or sentence-transformers.
+
+Run one with:  python run.py --profile <name>
+"""
+
+GENERAL_8B = {"model": "ollama/llama3.1:8b"}
+CODER_7B = {"model": "ollama/qwen2.5-coder:7b"}
+FAST_3B = {"model": "ollama/llama3.2:3b", "temperature": 0.1, "max_tokens": 500}
+FAST_3B_CODING = {"model": "ollama/llama3.2:3b", "temperature": 0.0, "max_tokens": 800}
+
+LOCAL_LLMS = {"planner": GENERAL_8B, "researcher": GENERAL_8B, "coder": CODER_7B, "reviewer": GENERAL_8B}
+FAST_LLMS = {"planner": FAST_3B, "researcher": FAST_3B, "coder": FAST_3B_CODING, "reviewer": FAST_3B}
+
+# Routing policies (config/routing.py): per agent, models to try cheapest first.
+# A task moves to the next model only when its output fails validation.
+ROUTING_POLICIES = {
+    "cascade": {"planner": [FAST_3B, GENERAL_8B], "researcher": [FAST_3B, GENERAL_8B],
+                "coder": [FAST_3B_CODING, CODER_7B], "reviewer": [FAST_3B, GENERAL_8B]},
+    "coder_cascade": {"coder": [FAST_3B_CODING, CODER_7B]},
+}
+
+DEFAULTS = {
+    "agents": ["planner", "researcher", "coder", "reviewer"],
+    "llms": LOCAL_LLMS,
+    "memory": True,             # vector memory for context and for saving results
+    "web_search": True,         # researcher gets the Serper search tool
+    "git": True,                # coder can queue commits; flushed once per run
+    "validation": True,         # static checks (+ sandbox with SANDBOX_EXECUTION=1) between coder and reviewer
+    "review_profile": "always",
+    "revision_iterations": 0,   # diff-based revision rounds after the crew finishes
+    "timeout": None,            # per-agent max execution time in seconds
+    "task_timeouts": {},        # {task name: seconds}; enforced per task by the async runner
+    "retries": 0,               # crew retries on rate-limit errors
+    "memory_chars": None,       # truncate the saved result to this many characters
+    "routing": None,            # routing policy name or {agent: [spec, ...]}; overrides llms for those agents
+    "context_budget": "auto",   # prompt tokens for task + upstream context; "auto" = from the model, None = unbudgeted
+    "prompt_layout": "stable",  # "stable": static prompt text first, query and memory last (KV-cache reuse); "inline"
+    "structured_outputs": [],   # agents answering schema-constrained JSON: "planner" (step list), "reviewer" (issue list)
+    "coder_candidates": 1,      # >1: each coder call races that many streamed answers; the first whose code parses wins
+    "backends": [],             # secondary LLM servers for hedging and failover: Ollama URLs or "openai" (OPENAI_API_BASE)
+    "default_query": "CLI To-Do app with database and file persistence",
+    "examples": ["CLI To-Do app with database", "Web scraper for news articles",
+                 "Discord bot with commands", "REST API with FastAPI", "Data analysis tool"],
+}
+
+PROFILES = {
+    "local": {
+        "description": "Full team on local Ollama: llama3.1:8b + qwen2.5-coder:7b, web search, git",
+        "revision_iterations": 2,
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Create a comprehensive development plan for: {query}. Include key steps, dependencies, and technologies needed.",
+             "expected_output": "Detailed development plan with clear steps and dependencies"},
+            {"name": "research", "agent": "researcher", "context": ["plan"],
+             "description": "Research the best tools, libraries, and practices for: {query}. Find code examples and documentation.",
+             "expected_output": "Research findings with recommended tools, libraries, and best practices"},
+            {"name": "code", "agent": "coder", "context": ["plan", "research"],
+             "description": "Write complete, working code for: {query}. Use the research findings and development plan. Save code to appropriate files.",
+             "expected_output": "Complete, functional code saved to files with proper structure"},
+            {"name": "review", "agent": "reviewer", "context": ["code"],
+             "description": "Review the generated code for: {query}. Check for bugs, improvements, and best practices. Provide specific feedback.",
+             "expected_output": "Detailed code review with specific feedback and improvement suggestions"},
+        ],
+    },
+    "fast": {
+        "description": "Speed optimized: llama3.2:3b for every agent, short tasks, no web search",
+        "llms": FAST_LLMS,
+        "web_search": False,
+        "task_timeouts": {"plan": 60, "research": 60, "code": 180, "review": 60},
+        "default_query": "Simple CLI calculator with basic operations",
+        "examples": ["CLI calculator", "Simple file organizer", "Basic web scraper", "Data processor", "Utility script"],
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Quick plan for: {query}. List 3-4 main steps only.",
+             "expected_output": "Brief development plan"},
+            {"name": "research", "agent": "researcher", "context": ["plan"],
+             "description": "Find 2-3 key libraries for: {query}. No web search - use knowledge.",
+             "expected_output": "Library recommendations"},
+            {"name": "code", "agent": "coder", "context": ["plan", "research"],
+             "description": "Write minimal working code for: {query}. Keep it simple and functional.",
+             "expected_output": "Working code in one file"},
+            {"name": "review", "agent": "reviewer", "context": ["code"],
+             "description": "Quick review - check if code works and suggest 1-2 improvements.",
+             "expected_output": "Brief code review"},
+        ],
+    },
+    "streamlined": {
+        "description": "Full team with shorter task descriptions to reduce token usage",
+        "memory_chars": 2000,
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Create a development plan for: {query}. Include key steps and dependencies.",
+             "expected_output": "A step-by-step development plan with clear tasks and dependencies."},
+            {"name": "research", "agent": "researcher", "context": ["plan"],
+             "description": "Research tools and libraries for: {query}. Find best practices and examples.",
+             "expected_output": "Research report with recommended tools, libraries, and implementation strategies."},
+            {"name": "code", "agent": "coder", "context": ["plan", "research"],
+             "description": "Implement {query} using the plan and research. Write clean, functional code.",
+             "expected_output": "Complete, functional codebase with proper structure and documentation."},
+            {"name": "review", "agent": "reviewer", "context": ["code"],
+             "description": "Review the {query} implementation. Check for bugs and suggest improvements.",
+             "expected_output": "Code review with specific feedback and improvement suggestions."},
+        ],
+    },
+    "noweb": {
+        "description": "Full team without web search; the researcher answers from knowledge",
+        "web_search": False,
+        "default_query": "CLI To-Do app with database",
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Create a development plan for: {query}. Include key steps and dependencies.",
+             "expected_output": "A detailed development plan with clear steps and dependencies"},
+            {"name": "research", "agent": "researcher",
+             "description": "Research tools and libraries for: {query}. Provide recommendations based on your knowledge.",
+             "expected_output": "Technical recommendations with libraries, tools, and best practices"},
+            {"name": "code", "agent": "coder",
+             "description": "Write the main application code for: {query}. Use the research findings.",
+             "expected_output": "Complete, functional Python code with proper documentation"},
+            {"name": "review", "agent": "reviewer",
+             "description": "Review the code and provide feedback for improvements.",
+             "expected_output": "Code review with suggestions for improvements and best practices"},
+        ],
+    },
+    "advanced": {
+        "description": "Full team with memory, web search, file operations and git",
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Create development plan for: {query}. Include key steps and dependencies.",
+             "expected_output": "Development plan with clear steps and dependencies"},
+            {"name": "research", "agent": "researcher", "context": ["plan"],
+             "description": "Research tools and libraries for: {query}. Find best practices and examples.",
+             "expected_output": "Research findings with recommended tools and best practices"},
+            {"name": "code", "agent": "coder", "context": ["plan", "research"],
+             "description": "Write code for: {query}. Use research findings and save to files.",
+             "expected_output": "Working code saved to appropriate files"},
+            {"name": "review", "agent": "reviewer", "context": ["code"],
+             "description": "Review the code. Check for issues and suggest improvements.",
+             "expected_output": "Code review with specific feedback and suggestions"},
+        ],
+    },
+    "advanced_optimized": {
+        "description": "Full team, terse tasks, retries on rate limits",
+        "retries": 2,
+        "memory_chars": 1000,
+        "default_query": "CLI todo app with database",
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Create development plan for: {query}. Include steps and dependencies.",
+             "expected_output": "Development plan with clear steps"},
+            {"name": "research", "agent": "researcher", "context": ["plan"],
+             "description": "Research tools and libraries for: {query}. Find best practices.",
+             "expected_output": "Research findings with recommended tools"},
+            {"name": "code", "agent": "coder", "context": ["plan", "research"],
+             "description": "Write code for: {query}. Use research findings.",
+             "expected_output": "Working code saved to files"},
+            {"name": "review", "agent": "reviewer", "context": ["code"],
+             "description": "Review the code. Check for issues and suggest improvements.",
+             "expected_output": "Code review with improvement suggestions"},
+        ],
+    },
+    "advanced_final": {
+        "description": "Two agents (Planner + Coder) with ultra-short tasks",
+        "agents": ["planner", "coder"],
+        "validation": False,
+        "retries": 1,
+        "memory_chars": 500,
+        "default_query": "CLI todo app",
+        "examples": ["todo app", "calculator", "file organizer", "password generator"],
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Plan {query}: key steps only",
+             "expected_output": "Simple development steps"},
+            {"name": "code", "agent": "coder", "context": ["plan"],
+             "description": "Code {query}: working implementation",
+             "expected_output": "Complete working code"},
+        ],
+    },
+    "cascade": {
+        "description": "Full team on llama3.2:3b; a task escalates to the 7-8B model only when its output fails validation",
+        "routing": "cascade",
+        "web_search": False,
+        "task_timeouts": {"plan": 120, "research": 120, "code": 300, "review": 120},
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Create a development plan for: {query}. Include key steps and dependencies.",
+             "expected_output": "A step-by-step development plan with clear tasks and dependencies."},
+            {"name": "research", "agent": "researcher", "context": ["plan"],
+             "description": "Recommend tools and libraries for: {query}. Use your knowledge; no web search.",
+             "expected_output": "Library recommendations with short reasons"},
+            {"name": "code", "agent": "coder", "context": ["plan", "research"],
+             "description": "Write complete, working code for: {query}. Save code to appropriate files.",
+             "expected_output": "Complete, functional code saved to files"},
+            {"name": "review", "agent": "reviewer", "context": ["code"],
+             "description": "Review the {query} implementation. Check for bugs and suggest improvements.",
+             "expected_output": "Code review with specific feedback"},
+        ],
+    },
+    "structured": {
+        "description": "Full team without web search; planner and reviewer answer schema-constrained JSON",
+        "web_search": False,
+        "structured_outputs": ["planner", "reviewer"],
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Create a development plan for: {query}. Give each step its dependencies and files.",
+             "expected_output": "Plan steps with dependencies and files"},
+            {"name": "research", "agent": "researcher", "context": ["plan"],
+             "description": "Recommend tools and libraries for: {query}. Use your knowledge; no web search.",
+             "expected_output": "Library recommendations with short reasons"},
+            {"name": "code", "agent": "coder", "context": ["plan", "research"],
+             "description": "Write complete, working code for: {query}. Follow the plan steps. Save code to appropriate files.",
+             "expected_output": "Complete, functional code saved to files"},
+            {"name": "review", "agent": "reviewer", "context": ["code"],
+             "description": "Review the {query} implementation. List concrete issues with file, line and fix.",
+             "expected_output": "Review verdict and issue list"},
+        ],
+    },
+    "candidates": {
+        "description": "Fast models; the coder races 3 sampled answers and keeps the first whose code passes validation",
+        "llms": FAST_LLMS,
+        "web_search": False,
+        "coder_candidates": 3,
+        "task_timeouts": {"plan": 60, "research": 60, "code": 180, "review": 60},
+        "default_query": "Simple CLI calculator with basic operations",
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Quick plan for: {query}. List 3-4 main steps only.",
+             "expected_output": "Brief development plan"},
+            {"name": "research", "agent": "researcher", "context": ["plan"],
+             "description": "Find 2-3 key libraries for: {query}. No web search - use knowledge.",
+             "expected_output": "Library recommendations"},
+            {"name": "code", "agent": "coder", "context": ["plan", "research"],
+             "description": "Write minimal working code for: {query}. Keep it simple and functional.",
+             "expected_output": "Working code in one file"},
+            {"name": "review", "agent": "reviewer", "context": ["code"],
+             "description": "Quick review - check if code works and suggest 1-2 improvements.",
+             "expected_output": "Brief code review"},
+        ],
+    },
+    "ultra_fast": {
+        "description": "Planner + Coder on llama3.2:3b; no memory, search, git or review",
+        "agents": ["planner", "coder"],
+        "llms": {"planner": FAST_3B, "coder": FAST_3B},
+        "memory": False,
+        "web_search": False,
+        "git": False,
+        "validation": False,
+        "default_query": "simple calculator",
+        "examples": ["calculator", "file counter", "password generator"],
+        "tasks": [
+            {"name": "plan", "agent": "planner",
+             "description": "Quick plan: {query}. Just list 3 steps.",
+             "expected_output": "3 step plan"},
+            {"name": "code", "agent": "coder", "context": ["plan"],
+             "description": "Write simple working code for: {query}. One file, minimal code.",
+             "expected_output": "Working Python code"},
+        ],
+    },
+}
+
+
+def get_profile(name):
+    """Profile merged over the defaults; raises ValueError for unknown names or bad task wiring"""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown profile '{name}'. Available: {', '.join(sorted(PROFILES))}")
+    profile = {**DEFAULTS, **PROFILES[name], "name": name}
+    routing = profile["routing"]
+    if isinstance(routing, str):
+        if routing not in ROUTING_POLICIES:
+            raise ValueError(f"Profile {name}: unknown routing policy '{routing}'")
+        routing = ROUTING_POLICIES[routing]
+    if routing:
+        routing = {agent: tiers for agent, tiers in routing.items() if agent in profile["agents"]}
+        for agent, tiers in routing.items():
+            if not tiers:
+                raise ValueError(f"Profile {name}: routing for '{agent}' has no models")
+        profile["routing"] = routing
+        profile["llms"] = {**profile["llms"], **{agent: tiers[0] for agent, tiers in routing.items()}}
+    seen = set()
+    for task in profile["tasks"]:
+        if task["agent"] not in profile["agents"]:
+            raise ValueError(f"Profile {name}: task '{task['name']}' uses agent '{task['agent']}' not in agents")
+        for upstream in task.get("context", []):
+            if upstream not in seen:
+                raise ValueError(f"Profile {name}: task '{task['name']}' context '{upstream}' must come earlier")
+        seen.add(task["name"])
+    for task_name in profile["task_timeouts"]:
+        if task_name not in seen:
+            raise ValueError(f"Profile {name}: timeout for unknown task '{task_name}'")
+    for agent in profile["agents"]:
+        if agent not in profile["llms"]:
+            raise ValueError(f"Profile {name}: no model configured for agent '{agent}'")
+    from config.structured import AGENT_SCHEMAS, STRUCTURED_OUTPUTS
+    if STRUCTURED_OUTPUTS is not None:
+        profile["structured_outputs"] = [a.strip() for a in STRUCTURED_OUTPUTS.split(",") if a.strip()]
+    for agent in profile["structured_outputs"]:
+        if agent not in AGENT_SCHEMAS:
+            raise ValueError(f"Profile {name}: no structured output schema for agent '{agent}'")
+        if agent in profile["agents"]:
+            schema = {"structured": AGENT_SCHEMAS[agent]}
+            profile["llms"] = {**profile["llms"], agent: {**profile["llms"][agent], **schema}}
+            if profile["routing"] and agent in profile["routing"]:
+                profile["routing"] = {**profile["routing"],
+                                      agent: [{**spec, **schema} for spec in profile["routing"][agent]]}
+    from pipeline.candidates import CODER_CANDIDATES
+    candidates = int(CODER_CANDIDATES or profile["coder_candidates"])
+    if candidates < 1:
+        raise ValueError(f"Profile {name}: coder_candidates must be at least 1")
+    profile["coder_candidates"] = candidates
+    if candidates > 1 and "coder" in profile["agents"]:
+        option = {"candidates": candidates}
+        profile["llms"] = {**profile["llms"], "coder": {**profile["llms"]["coder"], **option}}
+        if profile["routing"] and "coder" in profile["routing"]:
+            profile["routing"] = {**profile["routing"],
+                                  "coder": [{**spec, **option} for spec in profile["routing"]["coder"]]}
+    from config.backend_pool import LLM_BACKENDS
+    if LLM_BACKENDS is not None:
+        profile["backends"] = [b.strip() for b in LLM_BACKENDS.split(",") if b.strip()]
+    if profile["backends"]:
+        option = {"backends": tuple(profile["backends"])}
+        profile["llms"] = {agent: {**spec, **option} for agent, spec in profile["llms"].items()}
+        if profile["routing"]:
+            profile["routing"] = {agent: [{**spec, **option} for spec in tiers]
+                                  for agent, tiers in profile["routing"].items()}
+    from agents.prompt_layout import LAYOUTS, PROMPT_LAYOUT
+    profile["prompt_layout"] = PROMPT_LAYOUT or profile["prompt_layout"]
+    if profile["prompt_layout"] not in LAYOUTS:
+        raise ValueError(f"Profile {name}: unknown prompt layout '{profile['prompt_layout']}'")
+    return profile
@@ -0,0 +1,161 @@
+"""
+Per-agent model routing with an automatic cascade.
+
+A routing policy maps each agent to a list of model specs, cheapest first:
+
+    {"coder": [FAST_3B_CODING, CODER_7B], "planner": [FAST_3B, GENERAL_8B]}
+
+Every task starts on its agent's first model. The router installs a crewai
+task guardrail that validates the output; when it fails (code that doesn't
+parse, an empty or aborted answer) the agent is switched to the next model
+and crewai retries the task. When the task passes, the agent drops back to
+its cheapest model for its next task. Every routing decision and escalation
+is printed, traced and appended to runs/routing.jsonl when it happens (as a
+task's answer is checked), so building a crew writes nothing.
+"""
+
+import json
+import os
+import time
+
+from pipeline.static_check import extract_code_blocks, validate_files
+from tracing.tracer import get_tracer, instrument_llm
+
+ROUTING_LOG = os.path.join("runs", "routing.jsonl")
+
+# Findings that mean the code is unusable, not merely imperfect
+BLOCKING_CODES = ("syntax-error", "compile-error")
+
+ABORTED_MARKERS = (
+    "agent stopped due to iteration limit or time limit",
+    "i cannot help with",
+    "i'm unable to",
+)
+MIN_ANSWER_CHARS = 40
+
+
+def validate_text_output(text, **_):
+    """(ok, reason) for planner/researcher/reviewer answers"""
+    stripped = (text or "").strip()
+    if len(stripped) < MIN_ANSWER_CHARS:
+        return False, f"answer too short ({len(stripped)} chars)"
+    lowered = stripped.lower()
+    for marker in ABORTED_MARKERS:
+        if marker in lowered:
+            return False, f"answer aborted ('{marker}')"
+    return True, ""
+
+
+def validate_code_output(text, files=None, **_):
+    """(ok, reason) for coder answers: written files and inline code must parse"""
+    blocks = extract_code_blocks(text or "")
+    files = [path for path in files or [] if path.endswith(".py")]
+    if not blocks and not files:
+        return False, "no code written or shown"
+    sources = {f"<coder-output-{i}>": block for i, block in enumerate(blocks, start=1)}
+    report = validate_files(paths=files, sources=sources, linter="none")
+    blocking = [f for f in report.findings if f.code in BLOCKING_CODES]
+    if blocking:
+        return False, "; ".join(str(f) for f in blocking[:3])
+    return True, ""
+
+
+VALIDATORS = {
+    "coder": validate_code_output,
+}
+
+
+def _model(spec):
+    return spec["model"].split("/", 1)[-1]
+
+
+class ModelRouter:
+    """
+    policy: {agent name: [model spec, ...]} cheapest first.
+    llm_factory(spec) builds an LLM (defaults to config.llm_config.get_llm_for).
+    """
+
+    def __init__(self, policy, llm_factory=None, log_path=ROUTING_LOG, files_fn=None):
+        self.policy = policy
+        self.llm_factory = llm_factory
+        self.log_path = log_path
+        self.files_fn = files_fn
+        self.events = []
+        self._tier = {}
+        self._routed = set()   # tasks whose first attempt has been logged
+
+    def _llm(self, spec):
+        if self.llm_factory is None:
+            from config.llm_config import get_llm_for
+            self.llm_factory = get_llm_for
+        return self.llm_factory(spec)
+
+    def _files(self):
+        if self.files_fn is None:
+            from tools.manifest import manifest
+            self.files_fn = manifest.files
+        return self.files_fn()
+
+    def record(self, event, task, agent, spec, reason=""):
+        entry = {"ts": time.time(), "run_id": get_tracer().run_id, "event": event, "task": task,
+                 "agent": agent, "model": spec["model"], "reason": reason}
+        self.events.append(entry)
+        get_tracer().record("routing", f"{event}:{agent}", 0.0, task=task, model=spec["model"], reason=reason)
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def initial_spec(self, agent_name):
+        return self.policy[agent_name][0]
+
+    def _switch(self, agent, agent_name, tier):
+        self._tier[agent_name] = tier
+        llm = self._llm(self.policy[agent_name][tier])
+        instrument_llm(llm, getattr(agent, "role", agent_name))
+        agent.llm = llm
+
+    def guardrail_for(self, task_name, agent_name, agent):
+        """crewai guardrail: (True, output) to accept, (False, reason) to retry on the next model"""
+        tiers = self.policy[agent_name]
+        validate = VALIDATORS.get(agent_name, validate_text_output)
+
+        def guardrail(output):
+            tier = self._tier.get(agent_name, 0)
+            if task_name not in self._routed:
+                self._routed.add(task_name)
+                self.record("route", task_name, agent_name, tiers[tier], f"cascade of {len(tiers)}")
+            text = str(getattr(output, "raw", output) or "")
+            ok, reason = validate(text, files=self._files())
+            if ok:
+                self.record("accept", task_name, agent_name, tiers[tier])
+                if tier:
+                    self._switch(agent, agent_name, 0)
+                return True, output
+            if tier + 1 >= len(tiers):
+                print(f"⚠️ {task_name}: {reason} - no larger model left, keeping the answer")
+                self.record("exhausted", task_name, agent_name, tiers[tier], reason)
+                self._switch(agent, agent_name, 0)
+                return True, output
+            print(f"⬆️ Escalating {task_name}: {_model(tiers[tier])} → {_model(tiers[tier + 1])} ({reason})")
+            self.record("escalate", task_name, agent_name, tiers[tier + 1], reason)
+            self._switch(agent, agent_name, tier + 1)
+            return False, f"{reason}. Answer the task again completely."
+
+        return guardrail
+
+    def route(self, task_kwargs, task_name, agent_name):
+        """Add the cascade guardrail to Task kwargs for an agent covered by the policy"""
+        if agent_name not in self.policy:
+            return task_kwargs
+        agent = task_kwargs["agent"]
+        task_kwargs["guardrail"] = self.guardrail_for(task_name, agent_name, agent)
+        task_kwargs["guardrail_max_retries"] = len(self.policy[agent_name]) - 1
+        return task_kwargs
+
+    def summary(self):
+        """{agent: {"accept": n, "escalate": n, ...}}"""
+        counts = {}
+        for event in self.events:
+            per_agent = counts.setdefault(event["agent"], {})
+            per_agent[event["event"]] = per_agent.get(event["event"], 0) + 1
+        return counts
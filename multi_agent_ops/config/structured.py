@@ -0,0 +1,310 @@
+"""
+Schema-constrained structured outputs for the planner and reviewer.
+
+Free-form plans and reviews are long (small models ramble up to max_tokens)
+and every downstream agent re-reads them in full. With structured outputs on,
+the agent's LLM sends a JSON schema with each request (OpenAI-compatible
+response_format, which Ollama turns into its `format` grammar), so the
+server can only produce the fields the schema has.
+
+What comes back is still parsed tolerantly: JSONStreamParser takes the first
+JSON value out of the text (code fences, prose and trailing rambling are
+ignored) and closes a value cut off at max_tokens. When that doesn't validate
+against the schema, one repair call sends the broken JSON and the errors back
+to the model. The task then keeps the typed object on output.pydantic and
+passes a compact rendering (a numbered step list, an issue list) downstream
+instead of the prose.
+
+    "structured_outputs": ["planner", "reviewer"]   # in a profile
+"""
+
+import json
+import os
+import re
+from typing import Literal
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from tracing.tracer import get_tracer
+
+STRUCTURED_REPAIRS = int(os.getenv("STRUCTURED_REPAIRS", "1"))   # repair calls per answer
+STRUCTURED_OUTPUTS = os.getenv("STRUCTURED_OUTPUTS")   # comma-separated agents; overrides the profile when set
+
+
+class PlanStep(BaseModel):
+    id: int
+    title: str = Field(max_length=160)
+    depends_on: list[int] = Field(default_factory=list)
+    files: list[str] = Field(default_factory=list)
+
+
+class Plan(BaseModel):
+    steps: list[PlanStep] = Field(min_length=1, max_length=12)
+    technologies: list[str] = Field(default_factory=list, max_length=8)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _coerce(cls, data):
+        # small models answer with a bare list, or with step titles only
+        if isinstance(data, list):
+            data = {"steps": data}
+        if isinstance(data, dict) and isinstance(data.get("steps"), list):
+            data = {**data, "steps": [{"id": i, "title": step} if isinstance(step, str) else step
+                                      for i, step in enumerate(data["steps"], start=1)]}
+        return data
+
+
+class ReviewIssue(BaseModel):
+    severity: Literal["high", "medium", "low"]
+    file: str = ""
+    line: int = 0
+    issue: str = Field(max_length=300)
+    fix: str = Field(default="", max_length=300)
+
+
+class Review(BaseModel):
+    verdict: Literal["approve", "revise"]
+    issues: list[ReviewIssue] = Field(default_factory=list, max_length=10)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _coerce(cls, data):
+        if isinstance(data, list):
+            data = {"verdict": "revise" if data else "approve", "issues": data}
+        return data
+
+
+# schema name -> (model, one-line answer format for the task description)
+SCHEMAS = {
+    "plan": (Plan, 'Answer with JSON only: {"steps": [{"id": 1, "title": "...", "depends_on": [], '
+                   '"files": []}], "technologies": []}'),
+    "review": (Review, 'Answer with JSON only: {"verdict": "approve" or "revise", "issues": [{"severity": '
+                       '"high|medium|low", "file": "", "line": 0, "issue": "...", "fix": "..."}]}'),
+}
+AGENT_SCHEMAS = {"planner": "plan", "reviewer": "review"}
+
+
+def response_format(name):
+    """LLM response_format for schema name: the model class, which crewai sends as a json_schema"""
+    return SCHEMAS[name][0]
+
+
+def schema_hint(name):
+    return SCHEMAS[name][1]
+
+
+class JSONStreamParser:
+    """
+    Incremental scanner for the first JSON object or array in a text stream.
+    feed() returns True once that value is closed (anything after it can be
+    dropped); text() is the value so far, closed if it was cut off.
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.stack = []         # closing brackets of the open containers
+        self.in_string = False
+        self.escape = False
+        self.done = False
+
+    def feed(self, chunk):
+        for ch in chunk:
+            if self.done:
+                break
+            if not self.stack:
+                if ch in "{[":
+                    self.buffer.append(ch)
+                    self.stack.append("}" if ch == "{" else "]")
+                continue
+            self.buffer.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                self.stack.pop()
+                self.done = not self.stack
+        return self.done
+
+    def text(self):
+        text = "".join(self.buffer)
+        if self.done or not text:
+            return text
+        if self.in_string:
+            text = (text[:-1] if self.escape else text) + '"'
+        return _drop_dangling(text, self.stack[-1]) + "".join(reversed(self.stack))
+
+
+_PARTIAL_LITERAL = re.compile(r"(?<![\w\"])(?:t|tr|tru|f|fa|fal|fals|n|nu|nul|-|\d+\.|\d+[eE][-+]?)$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _last_string_start(text):
+    """Index of the quote opening the string text ends with"""
+    i = len(text) - 2
+    while i >= 0:
+        if text[i] == '"':
+            backslashes = len(text[:i]) - len(text[:i].rstrip("\\"))
+            if backslashes % 2 == 0:
+                return i
+        i -= 1
+    return -1
+
+
+def _drop_dangling(text, closer):
+    """Remove a cut-off tail (comma, key without value, partial literal) so closing brackets make valid JSON"""
+    while True:
+        text = text.rstrip()
+        if text.endswith(","):
+            text = text[:-1]
+        elif text.endswith(":"):
+            text = text[:_last_string_start(text[:-1].rstrip())]
+        elif _PARTIAL_LITERAL.search(text):
+            text = _PARTIAL_LITERAL.sub("", text)
+        elif closer == "}" and text.endswith('"') and text[:_last_string_start(text)].rstrip()[-1:] in "{,":
+            text = text[:_last_string_start(text)]   # an object key with no value yet
+        else:
+            return text
+
+
+def parse_json(text):
+    """First JSON object or array in text (a truncated one is closed), or None"""
+    parser = JSONStreamParser()
+    parser.feed(text or "")
+    candidate = parser.text()
+    if not candidate:
+        return None
+    for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+        try:
+            return json.loads(attempt)
+        except ValueError:
+            pass
+    return None
+
+
+def parse_output(text, name):
+    """(model instance, None) or (None, reason) for an answer that should match schema name"""
+    data = parse_json(text)
+    if data is None:
+        return None, "no JSON object found"
+    try:
+        return SCHEMAS[name][0].model_validate(data), None
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()[:5])
+
+
+def repair_messages(name, text, error):
+    model, hint = SCHEMAS[name]
+    return [
+        {"role": "system", "content": "You fix JSON so it matches a schema. Answer with the corrected JSON only."},
+        {"role": "user", "content": f"Schema:\n{json.dumps(model.model_json_schema())}\n\n"
+                                    f"Errors: {error}\n\nJSON to fix:\n{text[-4000:]}\n\n{hint}"},
+    ]
+
+
+def render(obj):
+    """Compact text of a structured answer for downstream prompts"""
+    if isinstance(obj, Plan):
+        lines = ["Plan:"]
+        for step in obj.steps:
+            line = f"{step.id}. {step.title}"
+            if step.depends_on:
+                line += f" (after {', '.join(str(d) for d in step.depends_on)})"
+            if step.files:
+                line += f" [{', '.join(step.files)}]"
+            lines.append(line)
+        if obj.technologies:
+            lines.append(f"Technologies: {', '.join(obj.technologies)}")
+        return "\n".join(lines)
+    if isinstance(obj, Review):
+        lines = [f"Review verdict: {obj.verdict}"]
+        for issue in obj.issues:
+            where = f" {issue.file}:{issue.line}" if issue.file and issue.line else (f" {issue.file}" if issue.file else "")
+            lines.append(f"- [{issue.severity}]{where} {issue.issue}" + (f" -> {issue.fix}" if issue.fix else ""))
+        return "\n".join(lines)
+    return obj.model_dump_json()
+
+
+def _final_answer(obj, text):
+    """crewai expects 'Final Answer:'; a schema-constrained server answers with bare JSON"""
+    if obj is not None:
+        return f"Thought: I now know the final answer\nFinal Answer: {obj.model_dump_json()}"
+    return text if "Final Answer:" in text else f"Final Answer: {text}"
+
+
+def structure_llm(llm, name, repairs=STRUCTURED_REPAIRS):
+    """
+    Wrap llm.call (and llm.acall): answers are parsed against schema name,
+    repaired with up to `repairs` extra calls, and returned as a crewai final
+    answer holding the validated JSON (or the original text when repair fails).
+    """
+    if getattr(llm, "_structured", None):
+        return llm
+    original_call = llm.call
+    original_acall = getattr(llm, "acall", None)
+
+    def report(obj, error, attempts):
+        outcome = "parsed" if obj is not None and not attempts else "repaired" if obj is not None else "fallback"
+        if outcome == "repaired":
+            print(f"🩹 Repaired {name} JSON after {attempts} call(s)")
+        elif outcome == "fallback":
+            print(f"⚠️ {name} answer doesn't match its schema ({error}) - keeping it as text")
+        get_tracer().record("structured", name, 0.0, outcome=outcome, repairs=attempts,
+                            model=getattr(llm, "model", None), error=error or "")
+
+    def structured_call(messages, *args, **kwargs):
+        text = original_call(messages, *args, **kwargs)
+        if isinstance(text, BaseModel):
+            text = text.model_dump_json()   # crewai already validated it against the schema
+        if not isinstance(text, str):
+            return text   # tool calls pass through
+        obj, error = parse_output(text, name)
+        attempts = 0
+        while obj is None and attempts < repairs:
+            attempts += 1
+            repaired = original_call(repair_messages(name, text, error))
+            obj, error = parse_output(repaired.model_dump_json() if isinstance(repaired, BaseModel) else str(repaired), name)
+        report(obj, error, attempts)
+        return _final_answer(obj, text)
+
+    async def structured_acall(messages, *args, **kwargs):
+        text = await original_acall(messages, *args, **kwargs)
+        if isinstance(text, BaseModel):
+            text = text.model_dump_json()
+        if not isinstance(text, str):
+            return text
+        obj, error = parse_output(text, name)
+        attempts = 0
+        while obj is None and attempts < repairs:
+            attempts += 1
+            repaired = await original_acall(repair_messages(name, text, error))
+            obj, error = parse_output(repaired.model_dump_json() if isinstance(repaired, BaseModel) else str(repaired), name)
+        report(obj, error, attempts)
+        return _final_answer(obj, text)
+
+    try:
+        object.__setattr__(llm, "call", structured_call)
+        if original_acall is not None:
+            object.__setattr__(llm, "acall", structured_acall)
+        object.__setattr__(llm, "_structured", name)
+    except (AttributeError, TypeError) as e:
+        print(f"⚠️ Could not enable structured output on {getattr(llm, 'model', llm)}: {e}")
+    return llm
+
+
+def structured_callback(name):
+    """Task callback: keep the typed answer on output.pydantic and pass its compact rendering downstream"""
+    def callback(output):
+        obj, _ = parse_output(str(output.raw), name)
+        if obj is not None:
+            output.pydantic = obj
+            output.json_dict = obj.model_dump()
+            output.raw = render(obj)
+    return callback
@@ -4,6 +4,7 @@ from agents.researcher import ResearcherAgent
 from agents.coder import CoderAgent
 from agents.reviewer import ReviewerAgent
 from memory.vector_store import VectorMemory
+from tools.git_pipeline import flush_commits
 import time
 
 from dotenv import load_dotenv
@@ -62,6 +63,7 @@ crew = Crew(
 def run_with_memory():
     print("� Starting multi-agent development process...")
     result = crew.kickoff()
+    flush_commits()
     
     # Save results to vector memory for future use
     try:
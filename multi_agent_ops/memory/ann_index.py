@@ -0,0 +1,117 @@
+"""
+Inverted-file (IVF) approximate nearest-neighbour index over the rows of a
+NumpyVectorStore matrix.
+
+Rows are clustered with spherical k-means into nlist lists; a query scores
+the nprobe closest centroids and searches only their rows. nprobe is the
+recall/latency knob: nprobe = nlist is exact search, small nprobe touches a
+fraction of the matrix. New rows are assigned to their nearest centroid as
+they are added; once the store has grown RETRAIN_GROWTH times past the size
+the centroids were trained on, the store retrains on its next search.
+
+    python -m bench.ann_benchmark    # recall@k and p50/p99 latency vs exact search
+"""
+
+import math
+import os
+
+import numpy as np
+
+# recall@10 (bench): 1.0 on stored topics at 10k-1M; off-topic 0.96 at 10k, 1.0 at 100k, 0.74 at 1M
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))
+RETRAIN_GROWTH = 4
+TRAIN_SAMPLE_PER_LIST = 64
+ASSIGN_CHUNK_ROWS = 65536
+
+
+def default_nlist(count):
+    """~2 sqrt(n) lists"""
+    return max(1, min(count, int(2 * math.sqrt(count))))
+
+
+def _unit(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class IVFIndex:
+    def __init__(self, nlist=None, nprobe=ANN_NPROBE, seed=0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_count = 0
+        self._lists = None
+
+    def __len__(self):
+        return len(self.assignments)
+
+    def train(self, matrix, iterations=10):
+        """Spherical k-means on a sample of matrix, then assign every row"""
+        count = len(matrix)
+        nlist = min(self.nlist or default_nlist(count), count)
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(count, nlist * TRAIN_SAMPLE_PER_LIST)
+        sample = np.asarray(matrix[np.sort(rng.choice(count, sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            sums[empty] = centroids[empty]   # keep empty clusters where they were
+            centroids = _unit(sums)
+        self.centroids = centroids
+        self.nlist = nlist
+        self.trained_count = count
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.add(matrix)
+        return self
+
+    def assign(self, vectors):
+        """Nearest centroid of each vector"""
+        labels = [np.argmax(np.asarray(vectors[i:i + ASSIGN_CHUNK_ROWS], dtype=np.float32) @ self.centroids.T, axis=1)
+                  for i in range(0, len(vectors), ASSIGN_CHUNK_ROWS)]
+        return np.concatenate(labels).astype(np.int32) if labels else np.zeros(0, dtype=np.int32)
+
+    def add(self, vectors):
+        """Index rows appended to the matrix (in order, after the rows already indexed)"""
+        self.assignments = np.concatenate([self.assignments, self.assign(vectors)])
+        self._lists = None
+
+    def needs_retrain(self, count):
+        return self.centroids is None or count > RETRAIN_GROWTH * self.trained_count
+
+    def lists(self):
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable")
+            bounds = np.searchsorted(self.assignments[order], np.arange(self.nlist + 1))
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.nlist)]
+        return self._lists
+
+    def search(self, matrix, queries, k, nprobe=None):
+        """[(row indices best first, scores), ...] per query"""
+        from memory.numpy_store import top_k
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        queries = np.asarray(queries, dtype=np.float32)
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+        lists = self.lists()
+        results = []
+        for query, probe in zip(queries, probes):
+            rows = np.concatenate([lists[p] for p in probe])
+            scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+            best = top_k(scores, k)
+            results.append((rows[best], scores[best]))
+        return results
+
+    def state(self):
+        return {"centroids": self.centroids, "assignments": self.assignments,
+                "trained_count": np.array(self.trained_count), "nprobe": np.array(self.nprobe)}
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls(nlist=len(state["centroids"]), nprobe=int(state["nprobe"]))
+        index.centroids = state["centroids"]
+        index.assignments = state["assignments"]
+        index.trained_count = int(state["trained_count"])
+        return index
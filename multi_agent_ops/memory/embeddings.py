@@ -0,0 +1,222 @@
+"""
+Embedding backends for vector memory.
+
+    huggingface  sentence-transformers through langchain (torch); the original backend
+    onnx         all-MiniLM-L6-v2 on onnxruntime, int8-quantized, no torch
+
+Pick one with EMBED_BACKEND (default huggingface, so existing stores keep
+their vectors). Both produce L2-normalized 384-d vectors from the same model,
+so a store can switch backends without re-embedding. Backends expose the
+langchain Embeddings methods (embed_documents, embed_query), which is all
+Chroma needs.
+
+The ONNX backend uses the model Chroma ships (downloaded once to
+~/.cache/chroma/onnx_models/all-MiniLM-L6-v2/onnx) or ONNX_MODEL_DIR. On first
+use it writes a dynamically quantized copy (model_quantized.onnx) next to it.
+EMBED_THREADS sets onnxruntime's intra-op threads and EMBED_BATCH the batch size.
+
+    python -m memory.embeddings --download   # fetch the ONNX model
+    python -m memory.embeddings --compare    # parity, cold start, throughput, RSS per backend
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "huggingface")
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))   # 0 = onnxruntime default (all cores)
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", "32"))
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(
+    os.path.expanduser("~"), ".cache", "chroma", "onnx_models", "all-MiniLM-L6-v2", "onnx"))
+
+
+def mean_pool(hidden, mask):
+    """Mean of token vectors over the attention mask, L2-normalized (sentence-transformers pooling)"""
+    mask = mask[..., None].astype(np.float32)
+    summed = (hidden * mask).sum(axis=1)
+    pooled = summed / np.maximum(mask.sum(axis=1), 1e-9)
+    return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+
+class HuggingFaceBackend:
+    """langchain HuggingFaceEmbeddings (loads torch)"""
+
+    def __init__(self, model_name=MODEL_NAME):
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        self.model = HuggingFaceEmbeddings(model_name=model_name)
+
+    def embed_documents(self, texts):
+        return self.model.embed_documents(list(texts))
+
+    def embed_query(self, text):
+        return self.model.embed_query(text)
+
+
+class OnnxEmbeddings:
+    """all-MiniLM-L6-v2 on onnxruntime with batched, optionally int8-quantized inference"""
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=True, threads=EMBED_THREADS,
+                 batch_size=EMBED_BATCH, max_length=256):
+        self.model_dir = model_dir
+        self.quantized = quantized
+        self.threads = threads
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._load()
+
+    def model_path(self):
+        plain = os.path.join(self.model_dir, "model.onnx")
+        if not self.quantized:
+            return plain
+        quantized = os.path.join(self.model_dir, "model_quantized.onnx")
+        if not os.path.exists(quantized):
+            try:
+                quantize(plain, quantized)
+            except ImportError as e:
+                print(f"⚠️ Cannot quantize ({e}); using the float32 model")
+                return plain
+        return quantized
+
+    def _load(self):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        if not os.path.exists(os.path.join(self.model_dir, "model.onnx")):
+            raise FileNotFoundError(f"No ONNX model in {self.model_dir}; run: python -m memory.embeddings --download")
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        options = ort.SessionOptions()
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        self.session = ort.InferenceSession(self.model_path(), options, providers=["CPUExecutionProvider"])
+
+    def _embed_batch(self, texts):
+        encoded = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask, "token_type_ids": np.zeros_like(ids)}
+        names = {i.name for i in self.session.get_inputs()}
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in names})[0]
+        return mean_pool(hidden, mask)
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        vectors = [self._embed_batch(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        return np.concatenate(vectors).tolist() if vectors else []
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def quantize(src, dst):
+    """Dynamic int8 quantization of the weights (needs the onnx package)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    print(f"🗜️ Quantizing {src} -> {dst}")
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+
+
+def download_onnx_model():
+    """Fetch all-MiniLM-L6-v2 ONNX through Chroma's downloader (into ~/.cache/chroma)"""
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+    ONNXMiniLM_L6_V2()._download_model_if_not_exists()
+    return ONNX_MODEL_DIR
+
+
+BACKENDS = {
+    "huggingface": HuggingFaceBackend,
+    "onnx": OnnxEmbeddings,
+}
+
+
+def register_backend(name, factory):
+    """Add an embedding backend: factory() returns an object with embed_documents/embed_query"""
+    BACKENDS[name] = factory
+
+
+def get_embeddings(backend=None):
+    name = backend or EMBED_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}' (available: {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name]()
+
+
+SAMPLE_TEXTS = [
+    "Build a Flask todo app with SQLite storage",
+    "CLI calculator that parses arithmetic expressions",
+    "Password generator with configurable length and symbols",
+    "Scrape a web page and count word frequencies",
+    "project planning development steps",
+    "Write unit tests for the parser module",
+]
+
+
+def _rss_mb():
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(backend, texts=None, repeat=20):
+    """Cold start, throughput and peak RSS of one backend in this process"""
+    texts = texts or SAMPLE_TEXTS
+    start = time.perf_counter()
+    model = get_embeddings(backend)
+    cold = time.perf_counter() - start
+    vectors = model.embed_documents(texts)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.embed_documents(texts)
+    rate = repeat * len(texts) / (time.perf_counter() - start)
+    return {"backend": backend, "cold_start_s": round(cold, 3), "docs_per_s": round(rate, 1),
+            "peak_rss_mb": round(_rss_mb(), 1), "vectors": vectors}
+
+
+def _measure_child(backend, results):
+    try:
+        results.put(measure(backend))
+    except Exception as e:
+        results.put({"backend": backend, "error": str(e)})
+
+
+def compare(backends=("huggingface", "onnx")):
+    """Measure each backend in a fresh process; cosine parity is against the first that works"""
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for backend in backends:
+        results = context.Queue()
+        child = context.Process(target=_measure_child, args=(backend, results))
+        child.start()
+        rows.append(results.get())
+        child.join()
+    reference = next((r["vectors"] for r in rows if "vectors" in r), None)
+    for row in rows:
+        vectors = row.pop("vectors", None)
+        if vectors is not None and reference is not None:
+            row["min_cosine"] = round(float(np.min(np.sum(np.array(vectors) * np.array(reference), axis=1))), 4)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backends for vector memory")
+    parser.add_argument("--download", action="store_true", help="Download the ONNX all-MiniLM-L6-v2 model")
+    parser.add_argument("--compare", action="store_true", help="Compare backends: parity, cold start, speed, RSS")
+    parser.add_argument("--backends", default="huggingface,onnx")
+    args = parser.parse_args()
+    if args.download:
+        try:
+            print(f"✅ ONNX model in {download_onnx_model()}")
+        except Exception as e:
+            print(f"❌ Could not download the ONNX model ({type(e).__name__}: {e}); "
+                  f"copy it to ONNX_MODEL_DIR ({ONNX_MODEL_DIR}) instead")
+            raise SystemExit(1)
+    if args.compare:
+        for row in compare(args.backends.split(",")):
+            print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
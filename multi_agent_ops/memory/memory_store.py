@@ -1,15 +1,198 @@
+"""
+Key-value store for intermediate outputs (plans, research notes, task results).
+
+Values live in namespaces so concurrent crews don't see each other's keys:
+build_crew gives each run its own scope and saves every task's output there.
+
+    store = memory.scope("run-42")
+    store.save("plan", text)
+    store.retrieve("plan")
+
+The store is bounded (least recently used keys are evicted past max_entries or
+max_bytes) and safe to share between threads; asave/aretrieve run the same
+operations off the event loop. Agents read earlier outputs of their run by key
+with the read_run_output tool (tools/run_memory.py) instead of getting whole
+strings pasted into their prompts.
+
+With a path (or MEMORY_DB) it is backed by SQLite in WAL mode. Multi-process
+modes (pool workers, job queue workers) call share_between_processes(), which
+switches the module store to SQLite (MEMORY_DB, else runs/memory.sqlite), so
+every process sees the same keys.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.getenv("MEMORY_MAX_ENTRIES", "1024"))
+MAX_BYTES = int(os.getenv("MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+DEFAULT_NAMESPACE = "default"
+SHARED_DB = os.path.join("runs", "memory.sqlite")
+
+
+def _size(value):
+    return len(value.encode("utf-8")) if isinstance(value, str) else len(repr(value))
+
+
+class _DictBackend:
+    """In-process LRU of {(namespace, key): value}"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def save(self, namespace, key, value):
+        with self._lock:
+            old = self._items.pop((namespace, key), None)
+            if old is not None:
+                self._bytes -= _size(old)
+            self._items[(namespace, key)] = value
+            self._bytes += _size(value)
+            while len(self._items) > 1 and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= _size(evicted)
+
+    def retrieve(self, namespace, key):
+        with self._lock:
+            if (namespace, key) not in self._items:
+                return None
+            self._items.move_to_end((namespace, key))
+            return self._items[(namespace, key)]
+
+    def delete(self, namespace, key):
+        with self._lock:
+            old = self._items.pop((namespace, key), None)
+            if old is not None:
+                self._bytes -= _size(old)
+
+    def items(self, namespace):
+        with self._lock:
+            return {k: v for (ns, k), v in self._items.items() if ns == namespace}
+
+    def clear(self, namespace):
+        with self._lock:
+            for ns, key in [k for k in self._items if k[0] == namespace]:
+                self.delete(ns, key)
+
+
+class _SQLiteBackend:
+    """Same operations on a SQLite table, one connection per thread"""
+
+    def __init__(self, path, max_entries, max_bytes):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS memory (namespace TEXT, key TEXT, value TEXT, "
+                         "size INTEGER, accessed REAL, PRIMARY KEY (namespace, key))")
+            conn.execute("CREATE INDEX IF NOT EXISTS memory_accessed ON memory (accessed)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, namespace, key, value):
+        with self._lock, self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO memory VALUES (?, ?, ?, ?, ?)",
+                         (namespace, key, value, _size(value), time.time()))
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM memory").fetchone()
+            while count > 1 and (count > self.max_entries or total > self.max_bytes):
+                # least recently used first, never the row just saved; at most the excess rows per pass
+                evicted = conn.execute(
+                    "DELETE FROM memory WHERE rowid IN (SELECT rowid FROM memory WHERE NOT "
+                    "(namespace = ? AND key = ?) ORDER BY accessed LIMIT ?) RETURNING size",
+                    (namespace, key, max(count - self.max_entries, 1))).fetchall()
+                if not evicted:
+                    break
+                count, total = count - len(evicted), total - sum(size for size, in evicted)
+
+    def retrieve(self, namespace, key):
+        with self._conn() as conn:
+            row = conn.execute("SELECT value FROM memory WHERE namespace = ? AND key = ?",
+                               (namespace, key)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE memory SET accessed = ? WHERE namespace = ? AND key = ?",
+                             (time.time(), namespace, key))
+        return row[0] if row else None
+
+    def delete(self, namespace, key):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM memory WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def items(self, namespace):
+        rows = self._conn().execute("SELECT key, value FROM memory WHERE namespace = ? ORDER BY accessed",
+                                    (namespace,)).fetchall()
+        return dict(rows)
+
+    def clear(self, namespace):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM memory WHERE namespace = ?", (namespace,))
+
+
 class MemoryStore:
-    def __init__(self):
-        self._memory = {}
+    def __init__(self, path=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES,
+                 namespace=DEFAULT_NAMESPACE, _backend=None):
+        if _backend is None:
+            if path:
+                _backend = _SQLiteBackend(path, max_entries, max_bytes)
+            else:
+                _backend = _DictBackend(max_entries, max_bytes)
+        self._backend = _backend
+        self.namespace = namespace
+
+    def scope(self, namespace):
+        """A view of the same store restricted to namespace"""
+        return MemoryStore(namespace=namespace, _backend=self._backend)
 
     def save(self, key, value):
-        self._memory[key] = value
+        if value is None:
+            self.delete(key)
+            return
+        self._backend.save(self.namespace, key, value)
 
     def retrieve(self, key):
-        return self._memory.get(key, None)
+        return self._backend.retrieve(self.namespace, key)
+
+    def delete(self, key):
+        self._backend.delete(self.namespace, key)
 
     def all(self):
-        return self._memory
+        """Snapshot of this namespace as a dict"""
+        return self._backend.items(self.namespace)
+
+    def clear(self):
+        self._backend.clear(self.namespace)
+
+    async def asave(self, key, value):
+        await asyncio.to_thread(self.save, key, value)
+
+    async def aretrieve(self, key):
+        return await asyncio.to_thread(self.retrieve, key)
+
+
+memory = MemoryStore(path=os.getenv("MEMORY_DB"))
+
 
-# 🔥 Add this line
-memory = MemoryStore()
+def share_between_processes(path=None):
+    """
+    Back the module store with SQLite (path, MEMORY_DB, else runs/memory.sqlite)
+    unless it already is, so crews in other processes read each other's outputs.
+    """
+    if not isinstance(memory._backend, _SQLiteBackend):
+        path = os.path.abspath(path or os.getenv("MEMORY_DB") or SHARED_DB)
+        memory._backend = _SQLiteBackend(path, MAX_ENTRIES, MAX_BYTES)
+    return memory
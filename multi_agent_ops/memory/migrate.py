@@ -0,0 +1,99 @@
+"""
+Convert vector memory to a compressed NumPy store and report what it costs.
+
+Reads the Chroma collection in vector_db/ (or an existing NumPy store),
+writes a NumpyVectorStore with the chosen encoding and prints bytes per
+vector, disk size and recall@k against exact float32 search on the same
+vectors. The source is left untouched; point VectorMemory at the result with
+VECTOR_ENGINE=numpy VECTOR_ENCODING=<encoding>.
+
+    python -m memory.migrate --encoding pq      # 480 B/vector (3.2x), recall@10 >= 0.95
+    python -m memory.migrate --source vector_db/numpy --encoding float16 --target /tmp/f16
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+from memory.numpy_store import ENCODINGS, NUMPY_DIR, PQ_MIN_ROWS, NumpyVectorStore, top_k
+
+
+def read_chroma(path, collection="agent_memory"):
+    import chromadb
+    data = chromadb.PersistentClient(path=path).get_collection(collection).get(
+        include=["documents", "metadatas", "embeddings"])
+    return data["ids"], data["documents"], data["metadatas"], np.asarray(data["embeddings"], dtype=np.float32)
+
+
+def read_source(path):
+    """(ids, texts, metadatas, float32 vectors) from a NumPy store or a Chroma directory"""
+    if os.path.exists(os.path.join(path, "docs.json")):
+        data = NumpyVectorStore(path).get(include=["documents", "metadatas", "embeddings"])
+        return data["ids"], data["documents"], data["metadatas"], data["embeddings"]
+    return read_chroma(path)
+
+
+def disk_bytes(path, names=("vectors.npy", "codes.npy", "pq.npz", "ivf.npz", "vectors.log", "codes.log")):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in names if os.path.exists(os.path.join(path, f)))
+
+
+def recall_report(vectors, store, k=10, queries=100, seed=0):
+    """recall@k of store against exact float32 search, for perturbed stored vectors as queries"""
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), min(queries, len(vectors)), replace=False)
+    probes = vectors[picks] + rng.normal(scale=0.05, size=(len(picks), vectors.shape[1])).astype(np.float32)
+    found = store.search_rows(probes, k)
+    recalls = []
+    for probe, rows in zip(probes, found):
+        exact = set(top_k(vectors @ (probe / np.linalg.norm(probe)), k).tolist())
+        recalls.append(len(exact & set(rows.tolist())) / min(k, len(vectors)))
+    return float(np.mean(recalls))
+
+
+def migrate(source, target, encoding, rerank=True, k=10):
+    ids, texts, metadatas, vectors = read_source(source)
+    if not len(texts):
+        raise ValueError(f"No vectors found in {source}")
+    tmp = f"{target}.migrating"
+    shutil.rmtree(tmp, ignore_errors=True)
+    store = NumpyVectorStore(tmp, encoding=encoding, rerank=rerank)
+    store.add_texts(texts, metadatas=metadatas, embeddings=vectors, ids=list(ids))
+    if encoding == "pq" and store.pq is None:
+        # the codebooks would outweigh the codes; the store trains once it reaches PQ_MIN_ROWS
+        print(f"ℹ️ {len(texts)} vectors (< {PQ_MIN_ROWS}): kept as float16 until there is enough data for PQ")
+    store.persist()
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.replace(tmp, target)
+    store = NumpyVectorStore(target, encoding=encoding, rerank=rerank)
+    footprint = store.footprint()
+    per_vector = footprint["code_bytes"] + footprint["vector_bytes"]
+    report = {"source": source, "target": target, "vectors": len(texts), "dim": int(vectors.shape[1]),
+              **footprint, "bytes_per_vector": per_vector,
+              "compression": round(footprint["float32_bytes"] / per_vector, 2),
+              "disk_bytes": disk_bytes(target),   # includes the fixed-size (192 KB) PQ codebooks
+              "float32_disk_bytes": int(vectors.shape[0] * vectors.shape[1] * 4),
+              f"recall@{k}": round(recall_report(vectors, store, k), 4)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate vector memory to a compressed NumPy store")
+    parser.add_argument("--source", default="vector_db", help="Chroma directory or NumPy store")
+    parser.add_argument("--target", default=NUMPY_DIR)
+    parser.add_argument("--encoding", choices=ENCODINGS, default="pq")
+    parser.add_argument("--no-rerank", action="store_true", help="pq only: drop the int8 re-ranking vectors")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    if os.path.abspath(args.source) == os.path.abspath(args.target):
+        parser.error("--target must differ from --source")
+    report = migrate(args.source, args.target, args.encoding, rerank=not args.no_rerank, k=args.k)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
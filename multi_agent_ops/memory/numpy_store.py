@@ -0,0 +1,378 @@
+"""
+In-process vector store on a NumPy matrix, an alternative to Chroma for
+VectorMemory (VectorMemory(engine="numpy") or VECTOR_ENGINE=numpy).
+
+Vectors are L2-normalized rows of one contiguous float32 (or float16) matrix,
+so a top-k search is a single matrix-vector product plus argpartition, with
+no SQLite or client layer in between. On disk:
+  vectors.npy   the matrix, opened memory-mapped on load (copied on first add)
+  docs.json     ids, texts and metadata in row order
+persist() appends the rows added since the last call to vectors.log /
+codes.log (raw rows) and docs.log (one JSON line per document), so saving
+after every add doesn't rewrite the store. Once the logs hold more rows than
+the base files (or PQ / IVF was retrained) it rewrites the base files
+atomically and drops the logs, which keeps persisting amortized O(1) per row.
+
+It implements the subset of langchain's Chroma API VectorMemory and the
+snapshot/summary tools use: add_texts, persist, similarity_search, get,
+plus similarity_search_batch for many queries in one product.
+
+With index="ivf" (VECTOR_INDEX=ivf) searches go through an IVF approximate
+index (memory/ann_index.py) once the store has ANN_MIN_ROWS rows; below that
+exact search is already fast. The index is saved next to the matrix (ivf.npz)
+and nprobe can be passed per search.
+
+encoding (VECTOR_ENCODING) trades footprint for recall: float32 (1536 bytes
+per 384-d vector), float16 (768), or pq: product-quantized codes
+(memory/pq.py, 96 bytes) searched without decoding, with the shortlist
+re-ranked against int8 rows kept memory-mapped on disk (384 bytes). pq with
+re-ranking is 480 bytes per vector (3.2x smaller than float32) at
+recall@10 >= 0.95; rerank=False drops the int8 rows for a 16x smaller store
+at much lower recall. A pq store keeps float16 vectors until it has
+PQ_MIN_ROWS rows: below that the 192 KB of codebooks would cost more than
+they save. Convert an existing store with python -m memory.migrate.
+"""
+
+import json
+import os
+import threading
+import uuid
+
+import numpy as np
+
+from memory.snapshot import MemoryDocument
+
+NUMPY_DIR = os.path.join("vector_db", "numpy")
+ANN_MIN_ROWS = int(os.getenv("ANN_MIN_ROWS", "20000"))
+ENCODINGS = ("float32", "float16", "pq")
+VECTOR_ENCODING = os.getenv("VECTOR_ENCODING")
+PQ_MIN_ROWS = 1024          # pq stores keep float16 vectors until there is enough data to train
+RERANK_FACTOR = 20          # PQ shortlist size per result before re-ranking with the int8 rows
+SEARCH_CHUNK_ROWS = 65536   # float16 rows are upcast this many at a time
+COMPACT_MIN_ROWS = 1024     # logged rows always allowed before persist() rewrites the base files
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def top_k(scores, k):
+    """Indices of the k largest scores, best first (argpartition, then sort only those)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _append(array, count, values, dtype):
+    """array[count:count + len(values)] = values, doubling capacity when full (an mmap is copied to RAM)"""
+    needed = count + len(values)
+    if array is not None and array.shape[1:] != values.shape[1:]:
+        raise ValueError(f"Vector shape {values.shape[1:]} does not match the store ({array.shape[1:]})")
+    if array is None or isinstance(array, np.memmap) or len(array) < needed:
+        capacity = max(needed, 2 * (len(array) if array is not None else 0), 64)
+        grown = np.empty((capacity,) + values.shape[1:], dtype=dtype)
+        if count:
+            grown[:count] = array[:count]
+        array = grown
+    array[count:needed] = values
+    return array
+
+
+class NumpyVectorStore:
+    def __init__(self, persist_directory=NUMPY_DIR, embedding_function=None, dtype=np.float32,
+                 index=None, ann_min_rows=ANN_MIN_ROWS, nprobe=None, encoding=None, rerank=True):
+        self.persist_directory = persist_directory
+        self.embedding_function = embedding_function
+        self.encoding = encoding or VECTOR_ENCODING or np.dtype(dtype).name
+        if self.encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding '{self.encoding}' (available: {', '.join(ENCODINGS)})")
+        self.dtype = np.dtype(np.float32 if self.encoding == "float32" else np.float16)
+        self.rerank = rerank
+        self.index_kind = index
+        self.ann_min_rows = ann_min_rows
+        self.nprobe = nprobe
+        self.index = None
+        self.pq = None
+        self._lock = threading.RLock()
+        self._persist_lock = threading.Lock()
+        self._matrix = None
+        self._codes = None
+        self._count = 0
+        self._saved = 0        # rows in the base files
+        self._logged = 0       # rows in the append logs after them
+        self._rewrite = False  # the base files are stale (PQ trained, IVF retrained)
+        self.docs = []
+        self._load()
+
+    def _paths(self):
+        return (os.path.join(self.persist_directory, "vectors.npy"),
+                os.path.join(self.persist_directory, "docs.json"))
+
+    def _path(self, name):
+        return os.path.join(self.persist_directory, name)
+
+    def _index_path(self):
+        return self._path("ivf.npz")
+
+    def _load(self):
+        vectors_path, docs_path = self._paths()
+        if not os.path.exists(docs_path):
+            return
+        with open(docs_path, encoding="utf-8") as f:
+            self.docs = json.load(f)
+        self._saved = len(self.docs)
+        if os.path.exists(vectors_path):
+            self._matrix = np.load(vectors_path, mmap_mode="r")
+        if os.path.exists(self._path("pq.npz")):
+            from memory.pq import ProductQuantizer
+            with np.load(self._path("pq.npz")) as state:
+                self.pq = ProductQuantizer.from_state(dict(state))
+            self._codes = np.load(self._path("codes.npy"), mmap_mode="r")
+        self._count = self._saved
+        self._load_logs()
+        if self.index_kind == "ivf" and os.path.exists(self._index_path()):
+            from memory.ann_index import IVFIndex
+            with np.load(self._index_path()) as state:
+                index = IVFIndex.from_state(dict(state))
+            if len(index) == self._saved:  # stale otherwise: rebuilt on the next search
+                if self._count > self._saved:
+                    index.add(np.asarray(self._search_matrix()[self._saved:self._count], dtype=np.float32))
+                self.index = index
+
+    def _load_logs(self):
+        """Append the rows persisted since the base files were written; a torn last row is dropped"""
+        docs = []
+        if os.path.exists(self._path("docs.log")):
+            with open(self._path("docs.log"), encoding="utf-8") as f:
+                header = f.readline()
+                for line in f:
+                    try:
+                        docs.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+            if not header.strip() or json.loads(header).get("base") != self._saved:
+                return   # written for older base files: a rewrite already folded these rows in
+        rows = len(docs)
+        logged = {}
+        for name, array in (("vectors.log", self._matrix), ("codes.log", self._codes)):
+            if array is not None and os.path.exists(self._path(name)):
+                values = np.fromfile(self._path(name), dtype=array.dtype)
+                values = values[:len(values) - len(values) % array.shape[1]].reshape(-1, array.shape[1])
+                logged[name] = values
+                rows = min(rows, len(values))
+        if not logged or not rows:
+            return
+        if "vectors.log" in logged:
+            self._matrix = _append(self._matrix, self._saved, logged["vectors.log"][:rows], self._matrix.dtype)
+        if "codes.log" in logged:
+            self._codes = _append(self._codes, self._saved, logged["codes.log"][:rows], np.uint8)
+        self.docs.extend(docs[:rows])
+        self._count = self._saved + rows
+        self._logged = rows
+
+    @property
+    def vectors(self):
+        """The live (count x dim) matrix (decoded PQ vectors when no re-rank rows are kept)"""
+        if self._matrix is None:
+            if self.pq is not None and self._count:
+                return self.pq.decode(self._codes[:self._count])
+            return np.zeros((0, 0), dtype=self.dtype)
+        if self._matrix.dtype == np.int8:
+            return self.pq.dequantize(self._matrix[:self._count])
+        return self._matrix[:self._count]
+
+    def _matrix_rows(self, vectors):
+        """Normalized vectors as rows of the stored matrix (int8 once a pq store re-ranks with them)"""
+        if self._matrix is not None and self._matrix.dtype == np.int8:
+            return self.pq.quantize(vectors), np.int8
+        return vectors, self.dtype
+
+    def __len__(self):
+        return self._count
+
+    def _keeps_matrix(self):
+        return self.encoding != "pq" or self.rerank or self.pq is None
+
+    def train_pq(self):
+        """Switch a pq store from vectors to codes once there is enough data to train on"""
+        from memory.pq import ProductQuantizer
+        matrix = self._matrix[:self._count]
+        self.pq = ProductQuantizer(matrix.shape[1]).train(matrix)
+        self._codes = self.pq.encode(matrix)
+        self._matrix = self.pq.quantize(matrix) if self.rerank else None
+        self.index = None   # IVF is retrained on the decoded vectors
+        self._rewrite = True
+
+    def add_texts(self, texts, metadatas=None, embeddings=None, ids=None):
+        texts = list(texts)
+        if not texts:
+            return []
+        if embeddings is None:
+            embeddings = self.embedding_function.embed_documents(texts)
+        vectors = _normalize(embeddings)
+        metadatas = metadatas or [{}] * len(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        with self._lock:
+            if self._keeps_matrix():
+                self._matrix = _append(self._matrix, self._count, *self._matrix_rows(vectors))
+            if self.pq is not None:
+                self._codes = _append(self._codes, self._count, self.pq.encode(vectors), np.uint8)
+            self._count += len(texts)
+            if self.encoding == "pq" and self.pq is None and self._count >= PQ_MIN_ROWS:
+                self.train_pq()
+            elif self.index is not None:
+                self.index.add(vectors)
+            self.docs.extend({"id": i, "text": t, "metadata": m or {}} for i, t, m in zip(ids, texts, metadatas))
+        return ids
+
+    def persist(self):
+        """Save rows added since the last call: appended to the logs, or a full rewrite when due"""
+        with self._persist_lock:
+            with self._lock:
+                on_disk = self._saved + self._logged
+                if self._count == on_disk and not self._rewrite:
+                    return
+                if self._saved and not self._rewrite and self._count - self._saved <= max(COMPACT_MIN_ROWS, self._saved):
+                    self._append_logs(on_disk)
+                    return
+            self._write_all()
+
+    def _append_logs(self, start):
+        """Append rows start..count to the logs (called with the lock held)"""
+        rows = slice(start, self._count)
+        for name, array in (("vectors.log", self._matrix), ("codes.log", self._codes)):
+            if array is not None:
+                with open(self._path(name), "ab") as f:
+                    f.write(np.ascontiguousarray(array[rows]).tobytes())
+        with open(self._path("docs.log"), "a", encoding="utf-8") as f:
+            if not self._logged:
+                f.write(json.dumps({"base": self._saved}) + "\n")
+            f.write("".join(json.dumps(doc) + "\n" for doc in self.docs[rows]))
+        self._logged = self._count - self._saved
+
+    def _write_all(self):
+        vectors_path, docs_path = self._paths()
+        os.makedirs(self.persist_directory, exist_ok=True)
+        with self._lock:
+            count = self._count
+            docs = list(self.docs[:count])
+            arrays = {}
+            if self._matrix is not None:
+                arrays[vectors_path] = np.array(self._matrix[:count])
+            if self.pq is not None:
+                arrays[self._path("codes.npy")] = np.array(self._codes[:count])
+            index = self.index.state() if self.index is not None and len(self.index) == count else None
+            pq = self.pq.state() if self.pq is not None else None
+            self._rewrite = False
+        tmp = f".tmp-{os.getpid()}"
+        for path, state in ((self._index_path(), index), (self._path("pq.npz"), pq)):
+            if state is not None:
+                np.savez(path + tmp, **state)
+                os.replace(path + tmp + ".npz", path)
+        for path, array in arrays.items():
+            np.save(path + tmp, array)
+            os.replace(path + tmp + ".npy", path)
+        if self._matrix is None and os.path.exists(vectors_path):
+            os.remove(vectors_path)
+        with open(docs_path + tmp, "w", encoding="utf-8") as f:
+            json.dump(docs, f)
+        os.replace(docs_path + tmp, docs_path)
+        for name in ("vectors.log", "codes.log", "docs.log"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        with self._lock:
+            self._saved, self._logged = count, 0
+
+    def footprint(self):
+        """Bytes per vector: codes, full-precision rows and the float32 baseline"""
+        dim = self.pq.dim if self.pq is not None else (self._matrix.shape[1] if self._matrix is not None else 0)
+        return {"encoding": self.encoding,
+                "code_bytes": self.pq.m if self.pq is not None else 0,
+                "vector_bytes": dim * self._matrix.dtype.itemsize if self._matrix is not None else 0,
+                "float32_bytes": dim * 4}
+
+    def _scores(self, queries):
+        """(count x len(queries)) cosine similarities, upcasting float16 in chunks"""
+        if self.pq is not None:
+            codes = self._codes[:self._count]
+            return np.stack([self.pq.scores(codes, query) for query in queries], axis=1)
+        matrix = self.vectors
+        if matrix.dtype == np.float32:
+            return matrix @ queries.T
+        return np.concatenate([matrix[i:i + SEARCH_CHUNK_ROWS].astype(np.float32) @ queries.T
+                               for i in range(0, len(matrix), SEARCH_CHUNK_ROWS)])
+
+    def _search_matrix(self):
+        """What the IVF index reads rows from: the vectors, or the PQ codes decoded on access"""
+        if self.pq is not None:
+            from memory.pq import DecodedView
+            return DecodedView(self._codes[:self._count], self.pq)
+        return self.vectors
+
+    def _ann(self):
+        """The IVF index when it should be used, (re)trained if the store outgrew it"""
+        if self.index_kind != "ivf" or self._count < self.ann_min_rows:
+            return None
+        from memory.ann_index import ANN_NPROBE, IVFIndex
+        if self.index is None or self.index.needs_retrain(self._count):
+            self.index = IVFIndex(nprobe=self.nprobe or ANN_NPROBE).train(self._search_matrix())
+            self._rewrite = True   # the next persist() saves the new index
+        return self.index
+
+    def _rerank(self, rows, query, k):
+        """Re-score a PQ shortlist with the int8 (or, in older stores, float16) rows"""
+        rows = np.sort(rows)   # in file order for the memory-mapped reads
+        if self._matrix.dtype == np.int8:
+            scores = self.pq.dequantize(self._matrix[rows]) @ query
+        else:
+            scores = np.asarray(self._matrix[rows], dtype=np.float32) @ query
+        return rows[top_k(scores, k)]
+
+    def search_rows(self, vectors, k=4, nprobe=None):
+        """Row indices of the top k rows for each query vector, best first"""
+        queries = _normalize(vectors)
+        with self._lock:
+            if not self._count:
+                return [np.array([], dtype=np.int64) for _ in range(len(queries))]
+            shortlist = k * RERANK_FACTOR if self.pq is not None else k
+            index = self._ann()
+            if index is not None:
+                found = [rows for rows, _ in index.search(self._search_matrix(), queries, shortlist, nprobe)]
+            else:
+                scores = self._scores(queries)
+                found = [top_k(scores[:, column], shortlist) for column in range(scores.shape[1])]
+            if self.pq is None:
+                return found
+            if self._matrix is None:
+                return [rows[:k] for rows in found]
+            return [self._rerank(rows, query, k) for rows, query in zip(found, queries)]
+
+    def similarity_search_by_vector_batch(self, vectors, k=4, nprobe=None):
+        rows = self.search_rows(vectors, k, nprobe)
+        docs = self.docs
+        return [[MemoryDocument(docs[i]["text"], docs[i]["metadata"]) for i in hits] for hits in rows]
+
+    def similarity_search_batch(self, queries, k=4, nprobe=None):
+        """Top k documents for each query, all queries in one matrix product"""
+        queries = list(queries)
+        if not queries:
+            return []
+        return self.similarity_search_by_vector_batch(self.embedding_function.embed_documents(queries), k, nprobe)
+
+    def similarity_search(self, query, k=4, nprobe=None):
+        return self.similarity_search_by_vector_batch([self.embedding_function.embed_query(query)], k, nprobe)[0]
+
+    def get(self, include=("documents", "metadatas")):
+        """Chroma-style dump of the whole store"""
+        with self._lock:
+            data = {"ids": [d["id"] for d in self.docs]}
+            if "documents" in include:
+                data["documents"] = [d["text"] for d in self.docs]
+            if "metadatas" in include:
+                data["metadatas"] = [d["metadata"] for d in self.docs]
+            if "embeddings" in include:
+                data["embeddings"] = np.array(self.vectors, dtype=np.float32)
+        return data
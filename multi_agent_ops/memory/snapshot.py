@@ -0,0 +1,203 @@
+"""
+Read-only, memory-mapped snapshot of vector memory for worker processes.
+
+A snapshot directory holds
+  vectors.npy                 float32 (documents x dim), L2-normalized
+  texts.npy, metadata.npy     UTF-8 document texts and JSON metadata, concatenated,
+                              with their *_offsets.npy (documents + 1 offsets)
+  terms.npy, postings.npy     BM25 index: sorted 64-bit term hashes and, per term,
+  posting_docs.npy,           the offsets of its (document, term frequency) postings
+  posting_tf.npy, lengths.npy
+  queries.npy / queries.json  embedding cache: precomputed query vectors
+The .npy files are opened with mmap_mode="r", so every worker maps the same
+pages from the OS page cache instead of holding its own copy of the documents
+or the lexical index, and no worker loads the embedding model: queries in the
+cache are searched by cosine similarity, anything else falls back to BM25.
+
+SnapshotMemory has the VectorMemory interface (add/search), so agents use it
+unchanged through get_vector_memory(). add() forwards to a writer queue when
+one is given (see runner/pool.py); the snapshot itself is never modified.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+from collections import Counter
+
+import numpy as np
+
+from tracing.tracer import get_tracer
+
+SNAPSHOT_DIR = os.path.join("vector_db", "snapshot")
+
+
+class MemoryDocument:
+    """Stands in for a langchain Document"""
+
+    def __init__(self, page_content, metadata=None):
+        self.page_content = page_content
+        self.metadata = metadata or {}
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not vectors.size:
+        return vectors.reshape(len(vectors), 0)
+    if vectors.ndim != 2:
+        return vectors.reshape(len(vectors), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _tokens(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _term_hash(term):
+    return np.uint64(int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little"))
+
+
+def _save_strings(directory, name, strings):
+    """Concatenated UTF-8 bytes plus offsets, so string i is blob[offsets[i]:offsets[i + 1]]"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, f"{name}.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(os.path.join(directory, f"{name}_offsets.npy"), offsets)
+
+
+def _save_lexical(directory, texts):
+    """BM25 statistics as arrays: postings grouped by term hash, documents in order within a term"""
+    terms, docs, freqs, lengths = [], [], [], np.zeros(len(texts), dtype=np.float32)
+    for i, text in enumerate(texts):
+        counts = Counter(_tokens(text))
+        lengths[i] = sum(counts.values())
+        terms.extend(_term_hash(t) for t in counts)
+        docs.extend([i] * len(counts))
+        freqs.extend(counts.values())
+    terms = np.array(terms, dtype=np.uint64)
+    order = np.lexsort((np.array(docs, dtype=np.int32), terms))
+    vocabulary, counts = np.unique(terms[order], return_counts=True)
+    postings = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    np.cumsum(counts, out=postings[1:])
+    np.save(os.path.join(directory, "terms.npy"), vocabulary)
+    np.save(os.path.join(directory, "postings.npy"), postings)
+    np.save(os.path.join(directory, "posting_docs.npy"), np.array(docs, dtype=np.int32)[order])
+    np.save(os.path.join(directory, "posting_tf.npy"), np.array(freqs, dtype=np.float32)[order])
+    np.save(os.path.join(directory, "lengths.npy"), lengths)
+
+
+def write_snapshot(path, texts, metadatas, vectors, queries=(), query_vectors=None):
+    """Write a snapshot atomically (built next to path, then swapped in)"""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    texts = list(texts)
+    np.save(os.path.join(tmp, "vectors.npy"), _normalize(vectors))
+    _save_strings(tmp, "texts", texts)
+    _save_strings(tmp, "metadata", [json.dumps(m or {}) for m in metadatas])
+    _save_lexical(tmp, texts)
+    queries = list(queries)
+    if queries:
+        np.save(os.path.join(tmp, "queries.npy"), _normalize(query_vectors))
+        with open(os.path.join(tmp, "queries.json"), "w", encoding="utf-8") as f:
+            json.dump(queries, f)
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def export_snapshot(path=SNAPSHOT_DIR, queries=(), vector_memory=None):
+    """
+    Snapshot the Chroma store and embed queries (the searches workers will run)
+    with the one embedding model in this process.
+    """
+    if vector_memory is None:
+        from memory.vector_store import get_vector_memory
+        vector_memory = get_vector_memory()
+    texts, metadatas, vectors = [], [], np.zeros((0, 0), dtype=np.float32)
+    query_vectors = None
+    queries = list(dict.fromkeys(queries))
+    if vector_memory.db is not None:
+        data = vector_memory.db.get(include=["documents", "metadatas", "embeddings"])
+        texts = data["documents"] or []
+        metadatas = data["metadatas"] or [{}] * len(texts)
+        if len(texts):
+            vectors = np.asarray(data["embeddings"], dtype=np.float32)
+        if queries:
+            query_vectors = vector_memory.embeddings.embed_documents(queries)
+    else:
+        queries = []
+    print(f"📸 Memory snapshot: {len(texts)} documents, {len(queries)} cached query embeddings")
+    return write_snapshot(path, texts, metadatas, vectors, queries, query_vectors)
+
+
+class SnapshotMemory:
+    def __init__(self, path=SNAPSHOT_DIR, writer=None):
+        self.path = path
+        self.writer = writer
+        self.db = None
+        load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        self.vectors = load("vectors")
+        self.texts, self.text_offsets = load("texts"), load("texts_offsets")
+        self.metadata, self.metadata_offsets = load("metadata"), load("metadata_offsets")
+        self.terms, self.postings = load("terms"), load("postings")
+        self.posting_docs, self.posting_tf, self.lengths = load("posting_docs"), load("posting_tf"), load("lengths")
+        self.average_length = max(float(self.lengths.mean()), 1.0) if len(self.lengths) else 1.0
+        self.query_index = {}
+        self.query_vectors = None
+        if os.path.exists(os.path.join(path, "queries.json")):
+            with open(os.path.join(path, "queries.json"), encoding="utf-8") as f:
+                self.query_index = {q: i for i, q in enumerate(json.load(f))}
+            self.query_vectors = np.load(os.path.join(path, "queries.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def _string(self, blob, offsets, i):
+        return bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def document(self, i):
+        return MemoryDocument(self._string(self.texts, self.text_offsets, i),
+                              json.loads(self._string(self.metadata, self.metadata_offsets, i)))
+
+    def add(self, text, metadata=None):
+        if self.writer is None:
+            print("⚠️ Memory snapshot is read-only; not saved")
+            return
+        self.writer.put(("add", text, metadata or {}))
+
+    def search(self, query, k=3):
+        if not len(self):
+            return []
+        cached = query in self.query_index and self.vectors.shape[0] > 0
+        with get_tracer().span("vector_search", "snapshot_search", k=k, cache_hit=cached) as span:
+            if cached:   # embedding from the snapshot's query cache
+                scores = self.vectors @ self.query_vectors[self.query_index[query]]
+            else:
+                scores = self._bm25(query)
+            top = np.argsort(-scores)[:k]
+            results = [self.document(i) for i in top if scores[i] > 0]
+            span.set(hits=len(results))
+        print(f"🔍 Found {len(results)} related memories")
+        return results
+
+    def _bm25(self, query, k1=1.5, b=0.75):
+        n = len(self)
+        scores = np.zeros(n, dtype=np.float32)
+        for term in set(_tokens(query)):
+            key = _term_hash(term)
+            found = int(np.searchsorted(self.terms, key))
+            if found == len(self.terms) or self.terms[found] != key:
+                continue
+            start, end = self.postings[found], self.postings[found + 1]
+            docs, tf = self.posting_docs[start:end], self.posting_tf[start:end]
+            idf = math.log(1 + (n - (end - start) + 0.5) / (end - start + 0.5))
+            scores[docs] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * self.lengths[docs] / self.average_length))
+        return scores
@@ -0,0 +1,261 @@
+"""
+Cached multi-level summaries of memory documents.
+
+Every document saved to vector memory is summarized once, in a background
+thread, into three levels:
+  line      - one sentence
+  paragraph - a short paragraph
+  full      - the document itself
+Summaries are stored next to the vector store (keyed by a hash of the text),
+so later runs pick the largest level that fits the caller's token budget
+instead of re-reading whole past transcripts on every prompt.
+
+Long documents are summarized hierarchically: each chunk is summarized, then
+the chunk summaries are summarized, and the one-liner is made from the paragraph.
+Documents that were stored before this existed can be summarized at idle time:
+
+    python -m memory.summaries --backfill
+"""
+
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+from pipeline.context_budget import count_tokens, trim_extractive, split_paragraphs
+from tracing.tracer import get_tracer
+
+LEVELS = ("line", "paragraph", "full")
+LEVEL_TOKENS = {"line": 40, "paragraph": 200}
+CHUNK_TOKENS = 1500          # summarize long documents this many tokens at a time
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "ollama/llama3.2:3b")
+SUMMARY_PATH = os.path.join("vector_db", "summaries.json")
+
+PROMPTS = {
+    "paragraph": "Summarize the following project notes in one short paragraph (at most {tokens} tokens). "
+                 "Keep project names, chosen libraries, decisions and open problems.\n\n{text}",
+    "line": "Summarize the following in one sentence of at most {tokens} tokens.\n\n{text}",
+}
+
+
+def text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def extractive_summarizer(text, level, max_tokens):
+    """LLM-free fallback: the most representative paragraphs (or first sentence for a one-liner)"""
+    if level == "line":
+        first = text.strip().split("\n", 1)[0]
+        sentence = first.split(". ", 1)[0]
+        return trim_extractive(sentence, max_tokens)
+    return trim_extractive(text, max_tokens)
+
+
+def llm_summarizer(llm):
+    """Summarizer calling llm (a crewai LLM); falls back to extractive when the call fails"""
+    def summarize(text, level, max_tokens):
+        prompt = PROMPTS[level].format(tokens=max_tokens, text=text)
+        try:
+            return str(llm.call([{"role": "user", "content": prompt}])).strip()
+        except Exception as e:
+            print(f"⚠️ Summary LLM failed ({e}); using extractive summary")
+            return extractive_summarizer(text, level, max_tokens)
+    return summarize
+
+
+def _default_summarizer():
+    try:
+        from config.llm_config import get_llm_for
+        return llm_summarizer(get_llm_for({"model": SUMMARY_MODEL, "temperature": 0.0, "max_tokens": 300}))
+    except Exception as e:
+        print(f"⚠️ Summary LLM unavailable ({e}); using extractive summaries")
+        return extractive_summarizer
+
+
+class SummaryStore:
+    """
+    Persistent {text hash: {"line", "paragraph", "tokens"}} with a background
+    worker that fills it. summarize_fn(text, level, max_tokens) -> str; it
+    defaults to SUMMARY_MODEL through crewai, loaded on first use.
+    """
+
+    def __init__(self, path=SUMMARY_PATH, summarize_fn=None, model=None):
+        self.path = path
+        self.model = model
+        self._summarize_fn = summarize_fn
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+        self.writer = None   # queue to the pool's writer process, which summarizes instead
+        self._entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not read summaries ({e}); starting empty")
+
+    def _summarizer(self):
+        if self._summarize_fn is None:
+            self._summarize_fn = _default_summarizer()
+        return self._summarize_fn
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+
+    def get(self, text):
+        with self._lock:
+            return self._entries.get(text_key(text))
+
+    def summarize(self, text):
+        """Compute and store all levels for text now (no-op if already stored)"""
+        key = text_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            get_tracer().record("summary", "summarize", 0.0, chars=len(text), cache_hit=True)
+            return entry
+        summarize = self._summarizer()
+        start = time.perf_counter()
+        with get_tracer().span("summary", "summarize", chars=len(text)) as span:
+            chunks = self._chunk(text)
+            paragraphs = [summarize(chunk, "paragraph", LEVEL_TOKENS["paragraph"]) for chunk in chunks]
+            paragraph = paragraphs[0]
+            if len(paragraphs) > 1:
+                paragraph = summarize("\n\n".join(paragraphs), "paragraph", LEVEL_TOKENS["paragraph"])
+            line = summarize(paragraph, "line", LEVEL_TOKENS["line"])
+            span.set(chunks=len(chunks))
+        entry = {
+            "line": line,
+            "paragraph": paragraph,
+            "tokens": count_tokens(text, self.model),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._save()
+        return entry
+
+    def _chunk(self, text):
+        chunks, current = [], []
+        for part in split_paragraphs(text) or [text]:
+            if current and count_tokens("\n\n".join(current + [part]), self.model) > CHUNK_TOKENS:
+                chunks.append("\n\n".join(current))
+                current = []
+            current.append(part)
+        chunks.append("\n\n".join(current))
+        return chunks
+
+    def level_for(self, text, max_tokens):
+        """(level name, text) of the largest stored level within max_tokens, or None if not summarized yet"""
+        if count_tokens(text, self.model) <= max_tokens:
+            return "full", text
+        entry = self.get(text)
+        if entry is None:
+            return None
+        for level in ("paragraph", "line"):
+            if count_tokens(entry[level], self.model) <= max_tokens:
+                return level, entry[level]
+        return "line", entry["line"]
+
+    def fit(self, text, max_tokens):
+        """
+        Summarizer hook for the context assembler: the level that fits, or
+        None (and the text is queued for summarizing) when nothing is stored yet.
+        """
+        found = self.level_for(text, max_tokens)
+        if found is None:
+            self.submit(text)
+            return None
+        if found[0] != "full":
+            get_tracer().record("summary", "fit", 0.0, level=found[0], cache_hit=True)
+        return found[1]
+
+    def submit(self, text):
+        """Queue text for background summarizing"""
+        if not text or self.get(text) is not None:
+            return
+        if self.writer is not None:
+            self.writer.put(("summarize", text, {}))
+            return
+        self._queue.put((text, contextvars.copy_context()))   # traced under the submitting run
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="memory-summaries", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            try:
+                text, context = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+            try:
+                context.run(self.summarize, text)
+            except Exception as e:
+                print(f"⚠️ Could not summarize memory: {e}")
+            finally:
+                self._queue.task_done()
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def drain(self, timeout=None):
+        """Wait for queued summaries; returns True when all are done"""
+        deadline = None if timeout is None else time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.time() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+
+_summary_store = None
+
+
+def get_summary_store():
+    """Get shared SummaryStore instance (singleton pattern)"""
+    global _summary_store
+    if _summary_store is None:
+        _summary_store = SummaryStore()
+    return _summary_store
+
+
+def backfill(store, documents):
+    """Summarize documents that have no stored summary yet; returns how many were done"""
+    done = 0
+    for text in documents:
+        if text and store.get(text) is None:
+            store.summarize(text)
+            done += 1
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize stored memories at idle time")
+    parser.add_argument("--backfill", action="store_true", help="Summarize every document in vector memory")
+    args = parser.parse_args()
+    store = get_summary_store()
+    if args.backfill:
+        from memory.vector_store import get_vector_memory
+        db = get_vector_memory().db
+        documents = db.get()["documents"] if db is not None else []
+        print(f"🧾 Summarized {backfill(store, documents)} of {len(documents)} memories")
+    else:
+        print(f"🧾 {len(store._entries)} summarized memories in {store.path}")
+
+
+if __name__ == "__main__":
+    main()
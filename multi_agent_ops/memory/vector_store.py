@@ -1,19 +1,40 @@
-import chromadb
 import os
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+from tracing.tracer import get_tracer
+
+# Chroma, langchain and the embedding backend are imported inside VectorMemory()
+# so that importing this module (e.g. from an agent) costs nothing for profiles
+# that run without vector memory. EMBED_BACKEND picks the backend (memory/embeddings.py).
+# engine (or VECTOR_ENGINE) picks the store: "chroma", or "numpy" (memory/numpy_store.py).
+# VECTOR_INDEX=ivf adds an approximate index to the numpy engine (memory/ann_index.py);
+# Chroma always uses HNSW, and ANN_EF sets its search ef for new collections.
+VECTOR_ENGINE = os.getenv("VECTOR_ENGINE", "chroma")
+VECTOR_INDEX = os.getenv("VECTOR_INDEX") or None
+ANN_EF = os.getenv("ANN_EF")
+
 
 class VectorMemory:
-    def __init__(self, persist_directory="vector_db"):
+    def __init__(self, persist_directory="vector_db", engine=None, embeddings=None):
         self.persist_directory = persist_directory
+        self.engine = engine or VECTOR_ENGINE
         try:
-            self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-            self.db = Chroma(
-                collection_name="agent_memory",
-                embedding_function=self.embeddings,
-                persist_directory=self.persist_directory
-            )
-            print("✅ Vector store initialized successfully")
+            if embeddings is None:
+                from memory.embeddings import EMBED_BACKEND, get_embeddings
+                with get_tracer().span("embedding", "load_model", model="all-MiniLM-L6-v2", backend=EMBED_BACKEND):
+                    embeddings = get_embeddings()
+            self.embeddings = embeddings
+            if self.engine == "numpy":
+                from memory.numpy_store import NumpyVectorStore
+                self.db = NumpyVectorStore(os.path.join(self.persist_directory, "numpy"), self.embeddings,
+                                           index=VECTOR_INDEX)
+            else:
+                from langchain_community.vectorstores import Chroma
+                self.db = Chroma(
+                    collection_name="agent_memory",
+                    embedding_function=self.embeddings,
+                    persist_directory=self.persist_directory,
+                    collection_metadata={"hnsw:search_ef": int(ANN_EF)} if ANN_EF else None
+                )
+            print(f"✅ Vector store initialized successfully ({self.engine})")
         except Exception as e:
             print(f"⚠️ Vector store initialization error: {e}")
             self.db = None
@@ -23,9 +44,13 @@ class VectorMemory:
             print("⚠️ Vector store not available")
             return
         try:
-            self.db.add_texts([text], metadatas=[metadata or {}])
-            self.db.persist()
+            with get_tracer().span("embedding", "add_texts", chars=len(text)):
+                self.db.add_texts([text], metadatas=[metadata or {}])
+                self.db.persist()
             print("✅ Added to vector memory")
+            # summarized once in the background so later prompts can use a short level
+            from memory.summaries import get_summary_store
+            get_summary_store().submit(text)
         except Exception as e:
             print(f"⚠️ Error adding to vector store: {e}")
 
@@ -34,9 +59,35 @@ class VectorMemory:
             print("⚠️ Vector store not available")
             return []
         try:
-            results = self.db.similarity_search(query, k=k)
+            with get_tracer().span("vector_search", "similarity_search", k=k) as span:
+                results = self.db.similarity_search(query, k=k)
+                span.set(hits=len(results))
             print(f"🔍 Found {len(results)} related memories")
             return results
         except Exception as e:
             print(f"⚠️ Error searching vector store: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def search_many(self, queries, k=3):
+        """search() for several queries; the numpy engine answers them in one matrix product"""
+        if self.db is None:
+            print("⚠️ Vector store not available")
+            return [[] for _ in queries]
+        if not hasattr(self.db, "similarity_search_batch"):
+            return [self.search(query, k) for query in queries]
+        try:
+            with get_tracer().span("vector_search", "similarity_search_batch", k=k, queries=len(queries)):
+                return self.db.similarity_search_batch(queries, k=k)
+        except Exception as e:
+            print(f"⚠️ Error searching vector store: {e}")
+            return [[] for _ in queries]
+
+# Shared instance so agents and entry points don't each load the embedding model
+_vector_memory = None
+
+def get_vector_memory():
+    """Get shared VectorMemory instance (singleton pattern)"""
+    global _vector_memory
+    if _vector_memory is None:
+        _vector_memory = VectorMemory()
+    return _vector_memory
@@ -0,0 +1,258 @@
+"""
+Parallel candidate generation for the coder: first valid answer wins.
+
+A small local model often answers the coding task with code that doesn't
+parse, and the only remedy used to be re-running the crew. With candidates
+on, each coder LLM call starts N completions at once on the Ollama server
+(OpenAI-compatible streaming), each with its own seed and temperature.
+The requests are identical up to the sampling options, so the server can
+reuse one prompt prefix for all of them (run Ollama with
+OLLAMA_NUM_PARALLEL >= N for them to actually decode in parallel).
+
+Every stream is checked as it arrives: as soon as its first ```python block
+closes, the block goes through the static validator. A candidate whose code
+doesn't parse is dropped on the spot; the first one that passes wins, the
+other streams are closed (which stops their generation on the server), and
+its code is saved to generated_output.py like write_to_file does. When no
+candidate passes, the first one to finish is used and saved, as a single
+call would.
+
+Candidates answer in one shot: the tools the agent would call are not sent.
+
+    "coder_candidates": 3   # in a profile; CODER_CANDIDATES overrides it
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from pipeline.static_check import extract_code_blocks, validate_files
+from tracing.tracer import get_tracer
+
+CODER_CANDIDATES = os.getenv("CODER_CANDIDATES")   # overrides the profile's coder_candidates when set
+CANDIDATE_TEMPERATURES = (0.2, 0.5, 0.8, 1.0)      # candidate i samples at [i % 4]; candidate 0 keeps the spec's
+CANDIDATE_TIMEOUT = float(os.getenv("CANDIDATE_TIMEOUT", "600"))
+BLOCKING_CODES = ("syntax-error", "compile-error")
+CODE_INSTRUCTION = "Answer with the complete program in a single ```python code block."
+OUTPUT_FILE = "generated_output.py"
+
+
+class Cancelled(Exception):
+    pass
+
+
+def check_code(text):
+    """(ok, reason) for the first closed code block in text; None while there isn't one yet"""
+    blocks = extract_code_blocks(text)
+    if not blocks:
+        return None
+    report = validate_files(sources={"<candidate>": blocks[0]}, linter="none")
+    blocking = [f for f in report.findings if f.code in BLOCKING_CODES]
+    if blocking:
+        return False, str(blocking[0])
+    return True, ""
+
+
+def _chat_url(base_url):
+    base = base_url.rstrip("/")
+    return (base if base.endswith("/v1") else base + "/v1") + "/chat/completions"
+
+
+def stream_chat(base_url, model, messages, options, cancelled):
+    """Yield content pieces of a streamed chat completion; closing the response stops the server"""
+    payload = {"model": model, "messages": messages, "stream": True, **options}
+    with requests.post(_chat_url(base_url), json=payload, stream=True, timeout=CANDIDATE_TIMEOUT) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if cancelled.is_set():
+                raise Cancelled()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                return
+            choices = json.loads(data).get("choices") or [{}]
+            piece = (choices[0].get("delta") or {}).get("content")
+            if piece:
+                yield piece
+
+
+class Candidate:
+    def __init__(self, index, options):
+        self.index = index
+        self.options = options
+        self.text = ""
+        self.status = "running"   # passed | failed | no code | cancelled | error
+        self.reason = ""
+        self.seconds = 0.0
+
+
+class CandidateRace:
+    """
+    Run n candidates for one prompt; the first whose code passes wins.
+    stream(messages, options, cancelled) yields text pieces (stream_chat by default).
+    """
+
+    def __init__(self, n, stream, base_options=None, check=check_code):
+        self.n = n
+        self.stream = stream
+        self.base_options = dict(base_options or {})
+        self.check = check
+        self.candidates = []
+
+    def options_for(self, index):
+        options = dict(self.base_options)
+        if index or "temperature" not in options:
+            options["temperature"] = CANDIDATE_TEMPERATURES[index % len(CANDIDATE_TEMPERATURES)]
+        options["seed"] = options.get("seed", 0) + index
+        return options
+
+    def _run(self, candidate, messages, cancelled, done):
+        start = time.perf_counter()
+        try:
+            for piece in self.stream(messages, candidate.options, cancelled):
+                candidate.text += piece
+                verdict = self.check(candidate.text) if candidate.text.count("```") >= 2 else None
+                if verdict is not None:
+                    ok, candidate.reason = verdict
+                    candidate.status = "passed" if ok else "failed"
+                    break
+            else:
+                candidate.status = "no code"
+        except Cancelled:
+            candidate.status = "cancelled"
+        except (requests.RequestException, ValueError) as e:
+            candidate.status, candidate.reason = "error", str(e)
+        except Exception as e:   # an unexpected failure still finishes the candidate, or run() waits forever
+            candidate.status, candidate.reason = "error", f"{type(e).__name__}: {e}"
+        finally:
+            candidate.seconds = time.perf_counter() - start
+            done(candidate)
+
+    def run(self, messages):
+        """The winning Candidate (or the first to finish when none passes); None when all errored"""
+        self.candidates = [Candidate(i, self.options_for(i)) for i in range(self.n)]
+        cancelled = threading.Event()
+        finished = []
+        lock = threading.Lock()
+        all_done = threading.Event()
+
+        def done(candidate):
+            with lock:
+                finished.append(candidate)
+                if candidate.status == "passed":
+                    cancelled.set()
+                if len(finished) == self.n:
+                    all_done.set()
+
+        pool = ThreadPoolExecutor(max_workers=self.n)
+        for candidate in self.candidates:
+            pool.submit(self._run, candidate, messages, cancelled, done)
+        while not all_done.wait(0.05):
+            if cancelled.is_set():
+                break
+        pool.shutdown(wait=False)   # losing streams notice the cancel at their next piece and close
+
+        with lock:
+            order = list(finished)
+        winner = next((c for c in order if c.status == "passed"), None)
+        if winner is None:
+            winner = next((c for c in order if c.status != "error"), None)
+        return winner
+
+
+def save_code(text, workspace=None):
+    """
+    Save the winner's code where write_to_file would (the validation gate reads it
+    from the manifest): the current run's workspace, else generated_output.py here.
+    """
+    from tools.manifest import manifest
+    from tools.workspace import current_workspace
+    blocks = extract_code_blocks(text)
+    if not blocks:
+        return None
+    workspace = workspace or current_workspace()
+    if workspace is not None:
+        return workspace.write(blocks[0], OUTPUT_FILE)
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        f.write(blocks[0])
+    manifest.record(OUTPUT_FILE)
+    return OUTPUT_FILE
+
+
+def _final_answer(text, messages):
+    """The ReAct parser needs 'Final Answer:'; native tool calling takes any text"""
+    react = "Final Answer:" in (messages if isinstance(messages, str) else json.dumps(messages))
+    if react and "Final Answer:" not in text:
+        return f"Thought: I now know the final answer\nFinal Answer: {text}"
+    return text
+
+
+def candidate_llm(llm, spec, n, base_url):
+    """
+    Wrap llm.call (and llm.acall) of an Ollama model so each call races n
+    streamed candidates. Other providers are returned unchanged.
+    """
+    from config.ollama_residency import ollama_model
+    model = ollama_model(spec["model"])
+    if n <= 1 or getattr(llm, "_candidates", None):
+        return llm
+    if model is None:
+        print(f"⚠️ Parallel candidates need an Ollama model, not {spec['model']} - using single calls")
+        return llm
+    base_options = {k: spec[k] for k in ("temperature", "max_tokens", "seed") if k in spec}
+    stop = getattr(llm, "stop", None)
+    if stop:
+        base_options["stop"] = stop
+
+    from config.ollama_balancer import get_balancer
+    balancer = get_balancer()
+
+    def stream(messages, options, cancelled):
+        if balancer is None:
+            yield from stream_chat(base_url, model, messages, options, cancelled)
+            return
+        with balancer.lease(spec["model"], use_sticky=False) as url:   # candidates spread over the hosts
+            yield from stream_chat(url, model, messages, options, cancelled)
+
+    def race(messages):
+        chat = [{"role": "user", "content": messages}] if isinstance(messages, str) else list(messages)
+        chat.append({"role": "user", "content": CODE_INSTRUCTION})
+        start = time.perf_counter()
+        contest = CandidateRace(n, stream, base_options)
+        winner = contest.run(chat)
+        seconds = time.perf_counter() - start
+        statuses = [c.status for c in contest.candidates]
+        get_tracer().record("candidates", model, seconds, n=n, statuses=statuses,
+                            winner=winner.index if winner else None,
+                            passed=bool(winner and winner.status == "passed"))
+        if winner is None:
+            raise RuntimeError(f"all {n} candidates failed: {contest.candidates[0].reason}")
+        if winner.status == "passed":
+            stopped = statuses.count("running") + statuses.count("cancelled")
+            print(f"🏁 Candidate {winner.index + 1}/{n} passed validation in {winner.seconds:.1f}s "
+                  f"({statuses.count('failed')} failed, {stopped} cancelled)")
+        else:
+            print(f"⚠️ No candidate passed validation ({', '.join(statuses)}) - using candidate {winner.index + 1}")
+        save_code(winner.text)   # the validation gate and revision loop work on the saved file either way
+        return _final_answer(winner.text, messages)
+
+    def candidates_call(messages, *args, **kwargs):
+        return race(messages)
+
+    async def candidates_acall(messages, *args, **kwargs):
+        import asyncio
+        return await asyncio.to_thread(race, messages)
+
+    try:
+        object.__setattr__(llm, "call", candidates_call)
+        if getattr(llm, "acall", None) is not None:
+            object.__setattr__(llm, "acall", candidates_acall)
+        object.__setattr__(llm, "_candidates", n)
+    except (AttributeError, TypeError) as e:
+        print(f"⚠️ Could not enable parallel candidates on {model}: {e}")
+    return llm
@@ -0,0 +1,384 @@
+"""
+Token-budgeted context assembly between tasks.
+
+crewai's `context=[...]` pastes every upstream output into the next prompt in
+full, and agents put whole past transcripts from vector memory into their
+backstory. On small local models (llama3.2:3b, 2-4k token windows) that makes
+prompts slow or silently truncated.
+
+The assembler works out a prompt budget per model (context window minus the
+tokens reserved for the answer and crewai's own scaffolding), then shares it
+between the task description (always kept), upstream outputs and memory
+snippets. Anything over its share is trimmed extractively (paragraphs most
+relevant to the task are kept, in their original order) or replaced by a
+cached summary when a summarizer is configured. What was trimmed or dropped
+is printed and written to the run trace.
+"""
+
+import hashlib
+import os
+import re
+
+from tracing.tracer import get_tracer
+
+# Ollama serves every model with num_ctx tokens unless the request says
+# otherwise, regardless of what the model itself supports.
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+
+# Context windows for non-Ollama models, matched by model-name prefix
+MODEL_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5": 16385,
+    "claude": 200000,
+    "groq/": 8192,
+}
+DEFAULT_WINDOW = 8192
+
+# Average characters per token by model family (measured on English + Python)
+CHARS_PER_TOKEN = {
+    "llama3": 4.0,
+    "qwen2.5-coder": 3.4,
+    "qwen": 3.6,
+    "mistral": 3.7,
+    "gpt-": 4.0,
+}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+DEFAULT_MAX_TOKENS = 1024   # answer reserve when the spec has no max_tokens
+OVERHEAD_TOKENS = 350       # crewai's system prompt, format instructions and tool schema
+MEMORY_SHARE = 0.25         # part of the prompt budget agent backstories may use for memory
+MIN_SECTION_TOKENS = 40     # below this a trimmed section is worthless; drop it
+
+_tokenizers = {}
+_summary_cache = {}
+
+
+def register_tokenizer(model_prefix, count_fn):
+    """Use an exact tokenizer (text -> token count) for models starting with model_prefix"""
+    _tokenizers[model_prefix] = count_fn
+
+
+def _model_name(model):
+    return (model or "").split("/", 1)[-1] if (model or "").startswith("ollama/") else (model or "")
+
+
+def _lookup(table, model, default):
+    name = _model_name(model)
+    for prefix in sorted(table, key=len, reverse=True):
+        if name.startswith(prefix) or (model or "").startswith(prefix):
+            return table[prefix]
+    return default
+
+
+def count_tokens(text, model=None):
+    """Token count of text for model: exact if a tokenizer is registered, else a per-family estimate"""
+    if not text:
+        return 0
+    count_fn = _lookup(_tokenizers, model, None)
+    if count_fn is not None:
+        return count_fn(text)
+    return max(1, int(len(text) / _lookup(CHARS_PER_TOKEN, model, DEFAULT_CHARS_PER_TOKEN) + 0.5))
+
+
+def context_window(spec):
+    """Tokens the backend will actually accept for a profile model spec"""
+    if spec.get("num_ctx"):
+        return spec["num_ctx"]
+    if spec["model"].startswith("ollama/"):
+        return OLLAMA_NUM_CTX
+    return _lookup(MODEL_WINDOWS, spec["model"], DEFAULT_WINDOW)
+
+
+def prompt_budget(spec):
+    """Prompt tokens available for one call: window minus answer reserve and crewai overhead"""
+    reserve = spec.get("max_tokens") or DEFAULT_MAX_TOKENS
+    return max(0, context_window(spec) - reserve - OVERHEAD_TOKENS)
+
+
+def memory_budget(spec):
+    """Tokens an agent backstory may spend on memory snippets"""
+    return int(prompt_budget(spec) * MEMORY_SHARE)
+
+
+class Section:
+    def __init__(self, name, text, weight=1.0, required=False):
+        self.name = name
+        self.text = text or ""
+        self.weight = weight
+        self.required = required
+
+
+def allocate(needs, weights, budget):
+    """
+    Share budget between sections by weight. Sections needing less than their
+    share get exactly what they need and the rest is redistributed (water-filling).
+    """
+    alloc = {name: 0 for name in needs}
+    active = {name for name, need in needs.items() if need > 0}
+    remaining = budget
+    while active and remaining > 0:
+        total_weight = sum(weights[name] for name in active)
+        satisfied = [name for name in active
+                     if needs[name] <= remaining * weights[name] / total_weight]
+        if not satisfied:
+            for name in active:
+                alloc[name] = int(remaining * weights[name] / total_weight)
+            break
+        for name in satisfied:
+            alloc[name] = needs[name]
+            remaining -= needs[name]
+            active.discard(name)
+    return alloc
+
+
+_WORD = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]{3,}")
+_FENCE = re.compile(r"(```.*?```)", re.DOTALL)
+
+
+def split_paragraphs(text):
+    """Split into paragraphs, keeping fenced code blocks whole"""
+    chunks = []
+    for part in _FENCE.split(text):
+        if part.startswith("```"):
+            chunks.append(part)
+        else:
+            chunks.extend(p.strip() for p in re.split(r"\n\s*\n", part) if p.strip())
+    return chunks
+
+
+def _cut(text, max_tokens, model):
+    """Keep whole lines from the top of text until max_tokens (words of the first line if it alone is too long)"""
+    kept = []
+    for line in text.splitlines():
+        if count_tokens("\n".join(kept + [line]), model) > max_tokens:
+            if not kept:
+                words = line.split(" ")
+                while words and count_tokens(" ".join(words), model) > max_tokens:
+                    words.pop()
+                kept.append(" ".join(words))
+            break
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def trim_extractive(text, max_tokens, model=None, query=""):
+    """
+    Fit text into max_tokens by keeping the paragraphs that share the most
+    words with query (the first paragraph gets a bonus), in original order,
+    with "[...]" where paragraphs were left out.
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    chunks = split_paragraphs(text)
+    keywords = {w.lower() for w in _WORD.findall(query or "")}
+
+    def score(index):
+        words = {w.lower() for w in _WORD.findall(chunks[index])}
+        return len(words & keywords) + (2 if index == 0 else 0) - index * 0.01
+
+    marker_tokens = count_tokens("[...]", model) + 1
+    chosen, used = set(), 0
+    for index in sorted(range(len(chunks)), key=score, reverse=True):
+        cost = count_tokens(chunks[index], model) + marker_tokens
+        if used + cost <= max_tokens:
+            chosen.add(index)
+            used += cost
+    if not chosen:
+        return _cut(chunks[0], max_tokens - marker_tokens, model) + "\n[...]"
+
+    parts = []
+    for index in range(len(chunks)):
+        if index in chosen:
+            parts.append(chunks[index])
+        elif not parts or parts[-1] != "[...]":
+            parts.append("[...]")
+    return "\n\n".join(parts)
+
+
+def summarize_cached(text, max_tokens, summarizer, model=None, query=""):
+    """
+    Summary of text in max_tokens from summarizer(text, max_tokens), computed
+    once per text. A summarizer may return None (nothing ready yet); the text
+    is then trimmed extractively and the summarizer is asked again next time.
+    """
+    key = (hashlib.sha1(text.encode("utf-8")).hexdigest(), max_tokens)
+    if key not in _summary_cache:
+        summary = summarizer(text, max_tokens)
+        if summary is None:
+            return trim_extractive(text, max_tokens, model, query)
+        _summary_cache[key] = str(summary)
+    return trim_extractive(_summary_cache[key], max_tokens, model)
+
+
+class FitReport:
+    """What happened to each section while fitting a budget"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.kept = {}      # name -> tokens
+        self.trimmed = {}   # name -> (tokens before, tokens after)
+        self.dropped = {}   # name -> tokens
+
+    @property
+    def used(self):
+        return sum(self.kept.values()) + sum(after for _, after in self.trimmed.values())
+
+    def to_dict(self):
+        return {"budget": self.budget, "used": self.used, "kept": self.kept,
+                "trimmed": {name: list(sizes) for name, sizes in self.trimmed.items()},
+                "dropped": self.dropped}
+
+    def describe(self):
+        parts = [f"{name} {before}→{after}" for name, (before, after) in self.trimmed.items()]
+        parts = ([f"trimmed {', '.join(parts)}"] if parts else []) + (
+            [f"dropped {', '.join(self.dropped)}"] if self.dropped else [])
+        return "; ".join(parts) or "everything fits"
+
+
+def fit_sections(sections, budget, model=None, query="", summarizer=None):
+    """
+    Fit sections into budget tokens. Required sections are kept whole (cut
+    only if they alone exceed the budget); the rest share what is left.
+    Returns ({name: text} in section order, FitReport).
+    """
+    report = FitReport(budget)
+    fitted = {}
+    sizes = {s.name: count_tokens(s.text, model) for s in sections}
+    remaining = budget
+    for section in sections:
+        if section.required:
+            text = section.text
+            if sizes[section.name] > remaining:
+                text = _cut(text, remaining, model)
+                report.trimmed[section.name] = (sizes[section.name], count_tokens(text, model))
+            else:
+                report.kept[section.name] = sizes[section.name]
+            fitted[section.name] = text
+            remaining -= count_tokens(text, model)
+
+    optional = [s for s in sections if not s.required]
+    alloc = allocate({s.name: sizes[s.name] for s in optional},
+                     {s.name: s.weight for s in optional}, max(0, remaining))
+    for section in optional:
+        share, size = alloc[section.name], sizes[section.name]
+        if size == 0:
+            continue
+        if share >= size:
+            fitted[section.name] = section.text
+            report.kept[section.name] = size
+        elif share < MIN_SECTION_TOKENS:
+            report.dropped[section.name] = size
+        else:
+            if summarizer is not None:
+                text = summarize_cached(section.text, share, summarizer, model, query)
+            else:
+                text = trim_extractive(section.text, share, model, query)
+            fitted[section.name] = text
+            report.trimmed[section.name] = (size, count_tokens(text, model))
+    ordered = {s.name: fitted[s.name] for s in sections if s.name in fitted}
+    return ordered, report
+
+
+def fit_memory(snippets, max_tokens=None, model=None, query="", name="memory", summarizer=None):
+    """
+    Join memory snippets (best match first) for an agent backstory, within
+    max_tokens when given. Lower-ranked snippets get less of the budget and
+    are dropped first.
+    """
+    if max_tokens is None:
+        return "\n".join(snippets)
+    sections = [Section(f"memory[{i}]", text, weight=1.0 / (i + 1)) for i, text in enumerate(snippets)]
+    fitted, report = fit_sections(sections, max_tokens, model, query, summarizer)
+    log_fit("memory", name, report)
+    return "\n".join(fitted.values())
+
+
+def log_fit(kind, name, report):
+    """Print (when something was cut) and trace a FitReport"""
+    if report.trimmed or report.dropped:
+        print(f"✂️ Context for {name}: {report.describe()} ({report.used}/{report.budget} tokens)")
+    get_tracer().record("context", name, 0.0, source=kind, **report.to_dict())
+
+
+class ContextAssembler:
+    """
+    Replaces crewai's full-text task context with budgeted context.
+
+    wire() clears each task's crewai context and instead, when the last of a
+    task's upstream tasks finishes, rewrites the task description as
+    "<description> + fitted upstream outputs" within the agent's budget.
+    """
+
+    def __init__(self, budget=None, summarizer=None):
+        self.budget = budget           # fixed prompt budget; None derives it per model
+        self.summarizer = summarizer
+        self.outputs = {}
+        self.reports = {}
+        self._targets = []             # (task, name, upstream names, spec, base description, query)
+
+    def budget_for(self, task, spec):
+        """Prompt budget left for description + upstream context of task"""
+        budget = self.budget or prompt_budget(spec)
+        agent = getattr(task, "agent", None)
+        if agent is not None:
+            model = spec["model"]
+            budget -= count_tokens(f"{agent.role}\n{agent.goal}\n{agent.backstory}", model)
+            for tool in getattr(agent, "tools", None) or []:
+                budget -= count_tokens(str(getattr(tool, "description", "")), model)
+        return max(0, budget)
+
+    def assemble(self, name, base_description, upstream, spec, budget, query=""):
+        """Description followed by the upstream outputs that fit in budget"""
+        header = "\n\nContext from earlier tasks:"
+        sections = [Section("description", base_description + header, required=True)]
+        # the closest upstream task is usually the one the agent builds on
+        sections += [Section(up, f"### {up}\n{self.outputs.get(up, '')}", weight=1.0 + i)
+                     for i, up in enumerate(upstream)]
+        fitted, report = fit_sections(sections, budget, spec["model"], query or base_description,
+                                      self.summarizer)
+        self.reports[name] = report
+        log_fit("task", name, report)
+        if len(fitted) == 1:
+            return base_description
+        return "\n\n".join(fitted.values())
+
+    def _on_done(self, name):
+        def callback(output):
+            self.outputs[name] = str(getattr(output, "raw", output) or "")
+            for task, target, upstream, spec, base, query in self._targets:
+                if name in upstream and all(up in self.outputs for up in upstream):
+                    task.description = self.assemble(
+                        target, base, upstream, spec, self.budget_for(task, spec), query)
+        return callback
+
+    def wire(self, tasks, task_specs, llm_specs, query=""):
+        """
+        tasks: {name: Task}; task_specs: profile task dicts in order; llm_specs:
+        {agent name: model spec}. A task spec without "context" gets every
+        earlier task, as crewai does by default.
+        """
+        earlier = []
+        for spec in task_specs:
+            task = tasks[spec["name"]]
+            upstream = spec.get("context", list(earlier))
+            earlier.append(spec["name"])
+            task.context = []
+            if upstream:
+                self._targets.append((task, spec["name"], upstream, llm_specs[spec["agent"]],
+                                      task.description, query))
+        for name in earlier:
+            if any(name in target[2] for target in self._targets):
+                tasks[name].callback = chain_callbacks(self._on_done(name), tasks[name].callback)
+        return self
+
+
+def chain_callbacks(first, second):
+    """Task callback running first then second (if any)"""
+    if second is None:
+        return first
+
+    def callback(output):
+        first(output)
+        return second(output)
+    return callback
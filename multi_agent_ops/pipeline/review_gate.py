@@ -0,0 +1,82 @@
+"""
+Validation stage between the coder and reviewer tasks.
+
+The coder task's callback validates every file the run wrote (plus any fenced
+code in the coder's answer) and appends the compact report to the review task.
+With the "skip_if_clean" review profile the review task becomes a ConditionalTask
+that doesn't call the LLM at all when validation is clean.
+With SANDBOX_EXECUTION=1, syntactically valid files are also run in the
+sandbox and the execution summary goes to the reviewer as well. It is off by
+default: the sandbox limits resources but doesn't isolate the network.
+"""
+
+import os
+
+from crewai import Task
+from crewai.tasks.conditional_task import ConditionalTask
+
+from pipeline.static_check import validate_files, extract_code_blocks, should_skip_review
+from pipeline.sandbox import execute_generated
+from tools.manifest import manifest as default_manifest
+
+
+class ValidationGate:
+    def __init__(self, review_profile="always", linter=None, execute=None, manifest=None):
+        self.review_profile = review_profile
+        self.manifest = manifest or default_manifest  # the run workspace's manifest
+        self.linter = linter
+        if execute is None:
+            execute = os.getenv("SANDBOX_EXECUTION", "0") == "1"
+        self.execute = execute
+        self.report = None
+        self.execution = None
+        self.review_task = None
+
+    def run(self, code_output=None):
+        """Validate generated files and the coder's inline code"""
+        sources = {
+            f"<coder-output-{i}>": block
+            for i, block in enumerate(extract_code_blocks(str(code_output or "")), start=1)
+        }
+        self.report = validate_files(paths=self.manifest.files(), sources=sources, linter=self.linter)
+        print(f"🔎 {self.report.to_context().splitlines()[0]} ({self.report.duration * 1000:.0f} ms)")
+        context = self.report.to_context()
+
+        broken = {f.path for f in self.report.errors}
+        runnable = [p for p in self.manifest.files() if p not in broken]
+        if self.execute and runnable:
+            self.execution = execute_generated(runnable)
+            print(f"🧪 {self.execution.to_context().splitlines()[0]}")
+            context += "\n" + self.execution.to_context()
+
+        if self.review_task is not None:
+            # built on the current description so budgeted upstream context (if any) stays
+            self.review_task.description = (
+                f"{self.review_task.description}\n\n{context}\n"
+                "Focus the review on the findings above and on logic the checks cannot see."
+            )
+        return self.report
+
+    def on_code_task_done(self, output):
+        """Task callback for the coder task"""
+        self.run(getattr(output, "raw", output))
+
+    def should_review(self, _previous_output=None):
+        """ConditionalTask condition: False means skip the reviewer LLM call"""
+        if self.report is None:
+            return True
+        skip = should_skip_review(self.report, self.review_profile)
+        if self.execution is not None and not self.execution.passed:
+            skip = False
+        if skip:
+            print("⏭️ Static validation clean - skipping reviewer LLM call")
+        return not skip
+
+    def attach(self, code_task, review_task_kwargs):
+        """Wire the gate into a coder task and build the matching review task"""
+        code_task.callback = self.on_code_task_done
+        if self.review_profile == "skip_if_clean":
+            self.review_task = ConditionalTask(condition=self.should_review, **review_task_kwargs)
+        else:
+            self.review_task = Task(**review_task_kwargs)
+        return self.review_task
@@ -0,0 +1,264 @@
+"""
+Diff-based revision loop for generated code.
+
+Instead of re-running the whole crew, the coder LLM gets the reviewer's and
+validator's findings and answers with a unified diff (or JSON patch operations).
+The patch is applied, the files are re-validated, and the loop repeats up to
+max_iterations times - so each round's output tokens scale with the change,
+not with the file size. A run whose review approved (or was skipped) and whose
+files validate clean makes no revision call at all.
+"""
+
+import json
+import os
+import re
+
+from pipeline.static_check import validate_files
+from tools.manifest import manifest as default_manifest
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_FENCE = re.compile(r"```(?:diff|patch|json)?\s*\n(.*?)```", re.DOTALL)
+
+REVISION_SYSTEM_PROMPT = (
+    "You are a Python developer fixing code after review. "
+    "Answer ONLY with a unified diff (--- a/file, +++ b/file, @@ hunks) against the files shown. "
+    "Change only what the findings require. Do not repeat unchanged code outside hunk context."
+)
+
+
+class PatchError(Exception):
+    pass
+
+
+def review_feedback(built):
+    """
+    The reviewer's findings for the revision loop, from a built crew after
+    kickoff: "" when there was no review, it was skipped, or its structured
+    verdict is "approve".
+    """
+    reviewer = built.agents.get("reviewer")
+    findings = []
+    for task in built.tasks.values():
+        output = getattr(task, "output", None)
+        if reviewer is None or task.agent is not reviewer or output is None:
+            continue
+        verdict = getattr(getattr(output, "pydantic", None), "verdict", None)
+        if verdict == "approve":
+            continue
+        if str(output.raw or "").strip():
+            findings.append(str(output.raw).strip())
+    return "\n\n".join(findings)
+
+
+class Hunk:
+    def __init__(self, old_start, lines):
+        self.old_start = old_start
+        self.lines = lines  # (tag, text) with tag in " ", "-", "+"
+
+    @property
+    def before(self):
+        return [text for tag, text in self.lines if tag in " -"]
+
+    @property
+    def after(self):
+        return [text for tag, text in self.lines if tag in " +"]
+
+
+def _strip_prefix(path):
+    path = path.split("\t")[0].strip()
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def parse_unified_diff(text):
+    """Parse a (possibly multi-file) unified diff into {path: [Hunk, ...]}"""
+    patches = {}
+    current = None
+    hunk = None
+    for line in text.splitlines():
+        if line.startswith("--- "):
+            hunk = None
+            continue
+        if line.startswith("+++ "):
+            current = _strip_prefix(line[4:])
+            patches.setdefault(current, [])
+            hunk = None
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match:
+            if current is None:
+                raise PatchError("Hunk found before any +++ file header")
+            hunk = Hunk(int(match.group(1)), [])
+            patches[current].append(hunk)
+            continue
+        if hunk is None:
+            continue
+        if line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        tag, body = (line[:1], line[1:]) if line else (" ", "")
+        if tag not in " -+":
+            continue
+        hunk.lines.append((tag, body))
+    return patches
+
+
+def _find_block(lines, block, hint):
+    """Locate block in lines, trying the hinted position first, then nearest matches"""
+    if not block:
+        return min(max(hint, 0), len(lines))
+    candidates = range(len(lines) - len(block) + 1)
+    for start in sorted(candidates, key=lambda i: abs(i - hint)):
+        if lines[start:start + len(block)] == block:
+            return start
+    # Tolerate trailing-whitespace differences from the model
+    stripped = [l.rstrip() for l in lines]
+    target = [l.rstrip() for l in block]
+    for start in sorted(candidates, key=lambda i: abs(i - hint)):
+        if stripped[start:start + len(target)] == target:
+            return start
+    return None
+
+
+def apply_hunks(source, hunks):
+    """Apply hunks to source text, allowing line offsets when context still matches"""
+    lines = source.splitlines()
+    offset = 0
+    for hunk in hunks:
+        hint = hunk.old_start - 1 + offset
+        if not hunk.before:
+            hint += 1  # pure insertion: "-N,0" means insert after line N
+        start = _find_block(lines, hunk.before, hint)
+        if start is None:
+            preview = "\n".join(hunk.before[:3])
+            raise PatchError(f"Hunk at line {hunk.old_start} does not match:\n{preview}")
+        lines[start:start + len(hunk.before)] = hunk.after
+        offset = start - (hunk.old_start - 1) + len(hunk.after) - len(hunk.before)
+    return "\n".join(lines) + "\n"
+
+
+def apply_operations(sources, operations):
+    """
+    Apply JSON patch operations to {path: text}:
+    {"op": "replace", "path": p, "find": old, "replace": new}
+    {"op": "insert_after", "path": p, "anchor": text, "content": new}
+    {"op": "delete", "path": p, "find": old}
+    """
+    result = dict(sources)
+    for op in operations:
+        path = op.get("path")
+        if path not in result:
+            raise PatchError(f"Unknown file in operation: {path}")
+        text = result[path]
+        kind = op.get("op")
+        if kind == "replace":
+            find, new = op["find"], op.get("replace", "")
+        elif kind == "delete":
+            find, new = op["find"], ""
+        elif kind == "insert_after":
+            find = op["anchor"]
+            new = find + op.get("content", "")
+        else:
+            raise PatchError(f"Unknown operation: {kind}")
+        if find not in text:
+            raise PatchError(f"Text to {kind} not found in {path}: {find[:60]!r}")
+        result[path] = text.replace(find, new, 1)
+    return result
+
+
+def apply_revision(sources, answer):
+    """Apply an LLM answer (unified diff or JSON operations) to {path: text}"""
+    blocks = _FENCE.findall(answer) or [answer]
+    body = "\n".join(blocks).strip()
+    if body.startswith("[") or body.startswith("{"):
+        try:
+            operations = json.loads(body)
+        except ValueError as e:
+            raise PatchError(f"Invalid JSON operations: {e}")
+        if isinstance(operations, dict):
+            operations = operations.get("operations", [operations])
+        return apply_operations(sources, operations)
+
+    patches = parse_unified_diff(body)
+    if not patches:
+        raise PatchError("Answer contained no diff hunks")
+    by_name = {os.path.basename(p): p for p in sources}
+    result = dict(sources)
+    for path, hunks in patches.items():
+        target = path if path in result else by_name.get(os.path.basename(path))
+        if target is None:
+            raise PatchError(f"Diff targets unknown file: {path}")
+        result[target] = apply_hunks(result[target], hunks)
+    return result
+
+
+def _file_block(path, text):
+    return f"### {path}\n{text}"
+
+
+class RevisionLoop:
+    """
+    Iteratively patch files until validation is clean or max_iterations is reached.
+    `llm` is any object with a call(messages) -> str method (crewai.LLM works).
+    """
+
+    def __init__(self, llm, max_iterations=3, validate=None, manifest=None):
+        self.llm = llm
+        self.max_iterations = max_iterations
+        self.validate = validate or (lambda paths: validate_files(paths=paths))
+        self.manifest = manifest or default_manifest
+        self.history = []
+
+    def _prompt(self, sources, feedback, report, error):
+        parts = []
+        if feedback:
+            parts.append(f"Reviewer findings:\n{feedback.strip()}")
+        if report is not None and not report.is_clean:
+            parts.append(report.to_context())
+        if error:
+            parts.append(f"Your previous patch could not be applied: {error}\nSend a corrected diff.")
+        parts.append("Current files:\n\n" + "\n\n".join(_file_block(p, t) for p, t in sources.items()))
+        return [
+            {"role": "system", "content": REVISION_SYSTEM_PROMPT},
+            {"role": "user", "content": "\n\n".join(parts)},
+        ]
+
+    def run(self, paths, feedback="", root=None):
+        """
+        Revise the files at paths in place. Returns the final validation report.
+        The model sees the paths relative to root (the run's workspace; default the cwd).
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        rel = {os.path.relpath(p, root or os.curdir): p for p in paths}
+        report = self.validate(paths)
+        error = None
+        for iteration in range(1, self.max_iterations + 1):
+            if report.is_clean and not feedback:
+                break
+            sources = {}
+            for name, path in rel.items():
+                with open(path, encoding="utf-8") as f:
+                    sources[name] = f.read()
+            answer = self.llm.call(self._prompt(sources, feedback, report, error))
+            try:
+                revised = apply_revision(sources, answer)
+            except PatchError as e:
+                error = str(e)
+                print(f"⚠️ Revision {iteration}: patch rejected ({error.splitlines()[0]})")
+                self.history.append({"iteration": iteration, "applied": False, "error": error,
+                                     "answer_chars": len(answer)})
+                continue
+            error = None
+            changed = [name for name in revised if revised[name] != sources[name]]
+            for name in changed:
+                with open(rel[name], "w", encoding="utf-8") as f:
+                    f.write(revised[name])
+                self.manifest.record(rel[name])
+            report = self.validate(paths)
+            self.history.append({"iteration": iteration, "applied": True, "changed": changed,
+                                 "answer_chars": len(answer), "findings": len(report.findings)})
+            print(f"🔁 Revision {iteration}: patched {len(changed)} file(s), "
+                  f"{len(report.findings)} finding(s) left")
+            # Reviewer feedback has been addressed once; later rounds chase validator findings
+            feedback = ""
+        return report
@@ -0,0 +1,212 @@
+"""
+Sandboxed execution of generated programs and tests.
+
+Each run happens in its own subprocess, inside a throwaway directory holding
+a copy of the run's generated files (not the rest of the directory they were
+written to), with CPU / memory / file-size limits, a wall-clock timeout and a
+scripted stdin for interactive CLIs. Runs are spread over a process pool and
+every result is appended to a JSONL log for throughput dashboards.
+
+The limits are rlimits only: there is no network or filesystem isolation, so
+the validation gate only executes LLM-written code with SANDBOX_EXECUTION=1.
+"""
+
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, timeout still applies
+    resource = None
+
+RESULTS_LOG = os.path.join("runs", "sandbox_runs.jsonl")
+
+# Generic menu walk for to-do style CLIs: add, list, delete, quit
+DEFAULT_STDIN_SCRIPT = "1\nBuy milk\n2\n3\n1\n4\n"
+
+PASSED = "passed"
+FAILED = "failed"
+TIMEOUT = "timeout"
+INPUT_EXHAUSTED = "input exhausted"   # still prompting when the scripted stdin ran out
+
+
+class RunSpec:
+    def __init__(self, path, kind="program", stdin=None, args=(), timeout=10,
+                 cpu_seconds=5, memory_mb=256, files=()):
+        self.path = os.path.abspath(path)
+        self.files = [os.path.abspath(f) for f in files]   # copied next to path (e.g. modules it imports)
+        self.kind = kind
+        self.stdin = DEFAULT_STDIN_SCRIPT if stdin is None and kind == "program" else (stdin or "")
+        self.args = list(args)
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+
+
+class SandboxReport:
+    def __init__(self, results, duration):
+        self.results = results
+        self.duration = duration
+
+    @property
+    def passed(self):
+        return all(r["status"] == PASSED for r in self.results)
+
+    def to_context(self, tail_lines=5):
+        """Compact execution summary for the reviewer prompt"""
+        if not self.results:
+            return "Execution: nothing to run."
+        ok = sum(r["status"] == PASSED for r in self.results)
+        lines = [f"Execution: {ok}/{len(self.results)} run(s) passed."]
+        for r in self.results:
+            line = f"- {r['name']} ({r['kind']}): {r['status']}, exit {r['returncode']}, {r['duration']:.2f}s"
+            if r.get("note"):
+                line += f", {r['note']}"
+            lines.append(line)
+            if r["status"] != PASSED and r["stderr"]:
+                err = r["stderr"].strip().splitlines()[-tail_lines:]
+                lines.extend(f"    {e}" for e in err)
+        return "\n".join(lines)
+
+
+def _limit_resources(cpu_seconds, memory_mb):
+    """Runs in the child before exec: new session plus rlimits"""
+    os.setsid()
+    if resource is None:
+        return
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    file_size = 16 * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_FSIZE, (file_size, file_size))
+
+
+def _command(spec, script):
+    if spec.kind == "test":
+        return [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", script, *spec.args]
+    # -E -s rather than -I: ignore PYTHON* variables and user site-packages but keep the
+    # script's directory on sys.path, so a generated program can import its sibling modules
+    return [sys.executable, "-E", "-s", script, *spec.args]
+
+
+def _copy_files(spec, workdir):
+    """Copy the spec's script and files, keeping their layout relative to the script"""
+    src_dir = os.path.dirname(spec.path)
+    for path in dict.fromkeys([spec.path, *spec.files]):
+        if not os.path.isfile(path):
+            continue
+        rel = os.path.relpath(path, src_dir)
+        if rel.startswith(".."):
+            rel = os.path.basename(path)
+        target = os.path.join(workdir, rel)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(path, target)
+
+
+def run_one(spec):
+    """Execute one spec in a throwaway directory with only its files; returns a result dict"""
+    workdir = tempfile.mkdtemp(prefix="sandbox-")
+    _copy_files(spec, workdir)
+    script = os.path.join(workdir, os.path.basename(spec.path))
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONDONTWRITEBYTECODE": "1", "HOME": workdir}
+
+    preexec = None
+    if os.name == "posix":
+        preexec = lambda: _limit_resources(spec.cpu_seconds, spec.memory_mb)
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        _command(spec, script), cwd=workdir, env=env, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        preexec_fn=preexec,
+    )
+    note = ""
+    try:
+        stdout, stderr = proc.communicate(spec.stdin, timeout=spec.timeout)
+        status = PASSED if proc.returncode == 0 else FAILED
+        if status == FAILED and "EOFError" in stderr and spec.kind == "program":
+            # still prompting when the scripted input ran out: not a pass, not necessarily a bug
+            status, note = INPUT_EXHAUSTED, "stdin script exhausted"
+        elif proc.returncode is not None and proc.returncode < 0:
+            note = f"killed by {signal.Signals(-proc.returncode).name}"
+    except subprocess.TimeoutExpired:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+        stdout, stderr = proc.communicate()
+        status, note = TIMEOUT, f"exceeded {spec.timeout}s"
+    duration = time.perf_counter() - start
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "name": os.path.basename(spec.path),
+        "path": spec.path,
+        "kind": spec.kind,
+        "status": status,
+        "returncode": proc.returncode,
+        "duration": round(duration, 4),
+        "note": note,
+        "stdout": stdout[-2000:],
+        "stderr": stderr[-2000:],
+    }
+
+
+def discover_specs(paths, stdin=None, **limits):
+    """
+    Programs run with the scripted stdin; generated test_*.py files run under
+    pytest. Every run gets all of paths, so generated modules can import each other.
+    """
+    specs = []
+    for path in paths:
+        if not path.endswith(".py") or not os.path.exists(path):
+            continue
+        name = os.path.basename(path)
+        if name.startswith("test_") or name.endswith("_test.py"):
+            specs.append(RunSpec(path, kind="test", files=paths, **limits))
+        else:
+            specs.append(RunSpec(path, kind="program", stdin=stdin, files=paths, **limits))
+    return specs
+
+
+def record_results(results, run_id, log_path=RESULTS_LOG):
+    """Append one line per run (pass/fail and runtime) for dashboards"""
+    if not log_path:
+        return
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps({
+                "run_id": run_id,
+                "timestamp": time.time(),
+                "name": r["name"],
+                "kind": r["kind"],
+                "status": r["status"],
+                "returncode": r["returncode"],
+                "duration": r["duration"],
+            }) + "\n")
+
+
+def run_all(specs, max_workers=None, run_id=None, log_path=RESULTS_LOG):
+    """Run every spec in parallel across a process pool"""
+    start = time.perf_counter()
+    results = []
+    if specs:
+        workers = max_workers or min(len(specs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_one, specs))
+    record_results(results, run_id or uuid.uuid4().hex[:8], log_path)
+    return SandboxReport(results, time.perf_counter() - start)
+
+
+def execute_generated(paths, stdin=None, max_workers=None, run_id=None, log_path=RESULTS_LOG, **limits):
+    """Convenience wrapper: discover and run everything generated in this run"""
+    return run_all(discover_specs(paths, stdin=stdin, **limits), max_workers, run_id, log_path)
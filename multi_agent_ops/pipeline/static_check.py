@@ -0,0 +1,251 @@
+"""
+Fast static validation of generated code.
+
+Runs ast parsing, compile checks, import resolution, a few crash-pattern rules
+and an optional linter over every generated file in parallel, in-process.
+The compact report is handed to the reviewer agent so the LLM doesn't spend
+tokens rediscovering what a parser finds instantly.
+"""
+
+import ast
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ERROR = "error"
+WARNING = "warning"
+
+# Review profiles: "always" runs the reviewer LLM every time,
+# "skip_if_clean" skips it when static validation found nothing.
+REVIEW_PROFILES = ("always", "skip_if_clean")
+
+_CODE_BLOCK = re.compile(r"```(?:python|py)?\s*\n(.*?)```", re.DOTALL)
+
+
+class Finding:
+    def __init__(self, path, line, code, message, severity=ERROR):
+        self.path = path
+        self.line = line
+        self.code = code
+        self.message = message
+        self.severity = severity
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "line": self.line,
+            "code": self.code,
+            "message": self.message,
+            "severity": self.severity,
+        }
+
+    def __str__(self):
+        return f"{self.path}:{self.line} [{self.severity}] {self.code} {self.message}"
+
+
+class ValidationReport:
+    def __init__(self, files, findings, duration):
+        self.files = files
+        self.findings = findings
+        self.duration = duration
+
+    @property
+    def errors(self):
+        return [f for f in self.findings if f.severity == ERROR]
+
+    @property
+    def is_clean(self):
+        return not self.findings
+
+    def to_dict(self):
+        return {
+            "files": self.files,
+            "duration": round(self.duration, 4),
+            "findings": [f.to_dict() for f in self.findings],
+        }
+
+    def to_context(self, max_items=20):
+        """Compact, structured summary for the reviewer prompt"""
+        if self.is_clean:
+            return f"Static validation: PASSED ({len(self.files)} file(s), no findings)."
+        lines = [
+            f"Static validation: {len(self.errors)} error(s), "
+            f"{len(self.findings) - len(self.errors)} warning(s) in {len(self.files)} file(s)."
+        ]
+        for finding in self.findings[:max_items]:
+            lines.append(f"- {finding}")
+        if len(self.findings) > max_items:
+            lines.append(f"- ... {len(self.findings) - max_items} more")
+        return "\n".join(lines)
+
+
+def extract_code_blocks(text):
+    """Pull fenced Python code out of an agent's text output"""
+    return [block.strip() + "\n" for block in _CODE_BLOCK.findall(text or "")]
+
+
+def _is_guarded(node, parents):
+    """True when node sits inside a try block that catches ValueError (or anything broader)"""
+    child = node
+    for parent in parents:
+        if isinstance(parent, ast.Try) and child in parent.body:
+            for handler in parent.handlers:
+                if handler.type is None:
+                    return True
+                names = [handler.type] if not isinstance(handler.type, ast.Tuple) else handler.type.elts
+                for name in names:
+                    if isinstance(name, ast.Name) and name.id in ("ValueError", "Exception", "BaseException"):
+                        return True
+        child = parent
+    return False
+
+
+def check_crash_patterns(path, tree):
+    """Flag conversions of raw user input that crash on bad input, e.g. int(input())"""
+    findings = []
+
+    def visit(node, parents):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in ("int", "float") and node.args
+                and isinstance(node.args[0], ast.Call)
+                and isinstance(node.args[0].func, ast.Name)
+                and node.args[0].func.id == "input"
+                and not _is_guarded(node, parents)):
+            findings.append(Finding(
+                path, node.lineno, "unguarded-input",
+                f"{node.func.id}(input()) raises ValueError on bad input; wrap in try/except",
+                WARNING,
+            ))
+        for child in ast.iter_child_nodes(node):
+            visit(child, [node] + parents)
+
+    visit(tree, [])
+    return findings
+
+
+def check_imports(path, tree):
+    """Report imports that can't be resolved from this interpreter or next to the file"""
+    findings = []
+    base_dir = os.path.dirname(os.path.abspath(path)) if os.path.exists(path) else os.getcwd()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            top = name.split(".")[0]
+            if top in sys.builtin_module_names:
+                continue
+            if os.path.exists(os.path.join(base_dir, top + ".py")) or os.path.isdir(os.path.join(base_dir, top)):
+                continue
+            try:
+                found = importlib.util.find_spec(top) is not None
+            except (ImportError, ValueError):
+                found = False
+            if not found:
+                findings.append(Finding(path, node.lineno, "import-unresolved",
+                                        f"cannot resolve import '{name}'", WARNING))
+    return findings
+
+
+def run_linter(path, source, linter):
+    """Run the configured linter: 'pyflakes' (in-process), 'ruff' (subprocess) or None"""
+    if not linter or linter == "none":
+        return []
+    if linter == "pyflakes":
+        try:
+            from pyflakes import api, reporter
+        except ImportError:
+            return []
+        messages = []
+
+        class _Collector(reporter.Reporter):
+            def __init__(self):
+                pass
+
+            def flake(self, message):
+                messages.append(message)
+
+            def unexpectedError(self, filename, msg):
+                pass
+
+            def syntaxError(self, filename, msg, lineno, offset, text):
+                pass
+
+        api.check(source, path, _Collector())
+        return [Finding(path, m.lineno, type(m).__name__, m.message % m.message_args, WARNING)
+                for m in messages]
+    if linter == "ruff":
+        try:
+            result = subprocess.run(
+                ["ruff", "check", "--output-format", "json", "--stdin-filename", path, "-"],
+                input=source, capture_output=True, text=True, timeout=30,
+            )
+            items = json.loads(result.stdout or "[]")
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return []
+        return [Finding(path, item["location"]["row"], item["code"] or "ruff", item["message"], WARNING)
+                for item in items]
+    raise ValueError(f"Unknown linter: {linter}")
+
+
+def validate_source(path, source, linter=None):
+    """All checks for one file; stops after a syntax error since nothing else is meaningful"""
+    try:
+        tree = ast.parse(source, filename=path)
+    except SyntaxError as e:
+        return [Finding(path, e.lineno or 0, "syntax-error", e.msg)]
+    try:
+        compile(source, path, "exec")
+    except SyntaxError as e:
+        return [Finding(path, e.lineno or 0, "compile-error", e.msg)]
+    findings = check_crash_patterns(path, tree)
+    findings += check_imports(path, tree)
+    findings += run_linter(path, source, linter)
+    return findings
+
+
+def validate_files(paths=None, sources=None, linter=None, max_workers=None):
+    """
+    Validate files on disk and/or in-memory sources ({name: code}) in parallel.
+    The linter defaults to the CODE_LINTER environment variable.
+    """
+    if linter is None:
+        linter = os.getenv("CODE_LINTER", "pyflakes")
+    items = dict(sources or {})
+    for path in paths or []:
+        if not path.endswith(".py"):
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                items[path] = f.read()
+        except OSError as e:
+            items[path] = None
+            print(f"⚠️ Could not read {path}: {e}")
+
+    start = time.perf_counter()
+    findings = []
+    workers = max_workers or min(8, max(1, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(validate_source, name, source, linter)
+            for name, source in items.items() if source is not None
+        ]
+        for future in futures:
+            findings.extend(future.result())
+    findings.sort(key=lambda f: (f.severity != ERROR, f.path, f.line))
+    return ValidationReport(list(items), findings, time.perf_counter() - start)
+
+
+def should_skip_review(report, review_profile="always"):
+    """Only skip the reviewer LLM when the profile allows it and the code is clean"""
+    if review_profile not in REVIEW_PROFILES:
+        raise ValueError(f"Unknown review profile: {review_profile}")
+    return review_profile == "skip_if_clean" and report.is_clean and bool(report.files)
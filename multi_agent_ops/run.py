@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Multi-Agent Development System - profile-driven runner
+
+    python run.py --list
+    python run.py --profile local
+    python run.py --profile ultra_fast --query "password generator"
+    python run.py --profile local --batch queries.txt   (one query per line)
+    python run.py --profile local --batch queries.txt --workers 4   (one process per crew)
+    python run.py --profile fast --async --query "CLI calculator"
+    python run.py --queue /shared/jobs --profile local --batch queries.txt   (submit to a job queue)
+    python run.py --queue /shared/jobs --work   (consume it; start any number, on any host)
+"""
+
+import argparse
+
+from dotenv import load_dotenv
+
+from config.profiles import PROFILES
+from runner.runner import run_profile
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the multi-agent crew with a profile")
+    parser.add_argument("--profile", default="local", choices=sorted(PROFILES))
+    parser.add_argument("--query", help="Project description (asked interactively when omitted)")
+    parser.add_argument("--batch", help="File with one project description per line; tasks are grouped by model")
+    parser.add_argument("--workers", type=int, help="With --batch: run crews in this many worker processes")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run through the asyncio runner (per-task timeouts, non-blocking I/O)")
+    parser.add_argument("--queue", help="Job queue (SQLite file or directory): submit --query/--batch jobs to it")
+    parser.add_argument("--priority", type=int, default=0, help="With --queue: priority of submitted jobs")
+    parser.add_argument("--work", action="store_true", help="With --queue: run a worker consuming the queue")
+    parser.add_argument("--max-jobs", type=int, help="With --work: stop after this many jobs")
+    parser.add_argument("--list", action="store_true", help="List available profiles")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, profile in sorted(PROFILES.items()):
+            print(f"{name:<20} {profile['description']}")
+        return
+    if args.queue:
+        run_queue(args)
+        return
+    if args.batch:
+        from runner.batch import run_batch
+        with open(args.batch, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+        if args.workers:
+            from runner.pool import CrewPool
+            with CrewPool(args.profile, workers=args.workers) as pool:
+                pool.map(queries)
+            return
+        run_batch(args.profile, queries)
+        return
+    if args.use_async:
+        import asyncio
+        from runner.async_runner import arun_profile
+        from runner.runner import get_project_query
+        from config.profiles import get_profile
+        query = args.query or get_project_query(get_profile(args.profile))
+        asyncio.run(arun_profile(args.profile, query))
+        return
+    run_profile(args.profile, args.query)
+
+
+def run_queue(args):
+    from runner.job_queue import JobQueue, work
+    queue = JobQueue(args.queue)
+    if args.work:
+        from memory.memory_store import share_between_processes
+        share_between_processes()   # other workers' runs read outputs from the same store
+        work(queue, max_jobs=args.max_jobs)
+        return
+    queries = [args.query] if args.query else []
+    if args.batch:
+        with open(args.batch, encoding="utf-8") as f:
+            queries += [line.strip() for line in f if line.strip()]
+    for query in queries:
+        job_id = queue.submit(query, args.profile, priority=args.priority)
+        print(f"📮 Job {job_id}: {query}")
+    print(f"📊 {queue.path}: " + ", ".join(f"{n} {status}" for status, n in queue.stats().items()))
+    for job in queue.dead_letters():
+        print(f"💀 Job {job['id']} ({job['attempts']} attempts): {job['query']} - {job['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Asyncio API for building and running crews, for embedding the system in an
+async service.
+
+    result = await arun_profile("fast", "CLI calculator")
+
+    built = await abuild_crew(get_profile("local"), query)
+    output = await arun_crew(built, profile, task_timeouts={"code": 120})
+
+Tasks run through crewai's native async path (Task.aexecute_sync), so LLM
+calls go out over litellm's async HTTP client and the researcher gets the
+httpx-based search tool; the event loop stays free while they are in flight.
+Blocking work (embedding model, vector search, memory saves, git, preload
+hints) runs in a thread pool. Every task has its own timeout (the profile's
+task_timeouts, overridable per call) and the whole run can be cancelled with
+the usual asyncio.Task.cancel().
+
+Each run writes to its own workspace (tools/workspace.py: output directory,
+write manifest and commit pipeline) and its own trace file: the workspace and
+the tracer are context variables, so overlapping runs in one event loop keep
+their spans, routing records and run ids apart.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.profiles import get_profile
+from runner.crew_builder import build_crew, should_run, upstream_context
+from tracing.tracer import start_run, end_run, get_tracer, instrument_llm, instrument_tool
+
+# Embedding and vector-store work is CPU-bound and not thread-hungry
+EMBED_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="embed")
+
+
+class TaskTimeout(Exception):
+    def __init__(self, task_name, seconds):
+        super().__init__(f"Task '{task_name}' timed out after {seconds}s")
+        self.task_name = task_name
+        self.seconds = seconds
+
+
+async def offload(func, *args, executor=None, **kwargs):
+    """Run a blocking call in a thread, keeping the caller's trace context"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(ctx.run, func, *args, **kwargs))
+
+
+async def abuild_crew(profile, query, workspace=None, run_id=None):
+    """build_crew in a thread: agent builds may load the embedding model and search memory"""
+    return await offload(build_crew, profile, query, async_tools=True, run_id=run_id, workspace=workspace,
+                         executor=EMBED_EXECUTOR)
+
+
+async def arun_crew(built, profile, task_timeouts=None, residency=None):
+    """
+    Run the crew's tasks in order with per-task timeouts. Returns the last
+    task's output text. Raises TaskTimeout or asyncio.CancelledError.
+    """
+    timeouts = {**profile["task_timeouts"], **(task_timeouts or {})}
+    for agent in built.agents.values():
+        instrument_llm(agent.llm, agent.role)
+        for tool in agent.tools or []:
+            instrument_tool(tool)
+    specs = profile["tasks"]
+    models = [profile["llms"][spec["agent"]]["model"] for spec in specs]
+    done = []
+    for index, spec in enumerate(specs):
+        task = built.tasks[spec["name"]]
+        if not should_run(built, spec, done):
+            print(f"⏭️ Skipping {spec['name']}")
+            done.append(spec["name"])
+            continue
+        if residency is not None:
+            await offload(residency.ensure, models[index], keep=models[index:])
+        seconds = timeouts.get(spec["name"])
+        with get_tracer().span("task", spec["name"], agent=spec["agent"], timeout=seconds):
+            try:
+                await asyncio.wait_for(
+                    task.aexecute_sync(agent=task.agent, context=upstream_context(built, spec, done)),
+                    timeout=seconds)
+            except asyncio.TimeoutError:
+                raise TaskTimeout(spec["name"], seconds) from None
+        done.append(spec["name"])
+    last = built.tasks[done[-1]].output if done else None
+    return last.raw if last is not None else None
+
+
+async def arun_profile(name, query, task_timeouts=None, workdir=None):
+    """Async counterpart of runner.run_profile. Returns the final output, or None on failure."""
+    from runner.runner import print_banner, revise_and_commit, save_results_to_memory
+    from tools.workspace import Workspace
+
+    profile = get_profile(name)
+    print_banner(profile)
+    tracer = start_run()
+    residency = None
+    from config.ollama_balancer import get_balancer
+    if os.getenv("OLLAMA_RESIDENCY", "1") == "1" and get_balancer() is None:   # residency manages one host
+        from config.ollama_residency import ResidencyManager
+        residency = ResidencyManager()
+
+    start_time = time.time()
+    try:
+        print(f"\n🔧 Creating development team for: {query}")
+        workspace = Workspace(tracer.run_id, workdir or os.curdir)
+        built = await abuild_crew(profile, query, workspace, run_id=tracer.run_id)
+        with workspace.activate():
+            result = await arun_crew(built, profile, task_timeouts, residency)
+            await offload(revise_and_commit, built, profile)
+    except asyncio.CancelledError:
+        print("\n🛑 Run cancelled")
+        raise
+    except TaskTimeout as e:
+        print(f"\n⏱️ {e}")
+        return None
+    except Exception as e:
+        print(f"\n❌ Development process failed: {e}")
+        return None
+    finally:
+        end_run()
+
+    if profile["memory"]:
+        await offload(save_results_to_memory, result, query, profile, executor=EMBED_EXECUTOR)
+    print(f"\n🎉 DEVELOPMENT COMPLETE in {time.time() - start_time:.2f} seconds")
+    if residency is not None:
+        stats = residency.stats()
+        print(f"🔁 Model swaps: {stats['swaps']} ({stats['swap_seconds']:.1f}s loading)")
+    print(f"🔬 Trace: {tracer.path}")
+    return result
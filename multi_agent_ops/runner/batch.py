@@ -0,0 +1,123 @@
+"""
+Batch mode: run one profile over many queries with as few model swaps as possible.
+
+Each query gets its own crew, but instead of running crews one after another
+(which reloads models at every planner/coder boundary of every query), tasks
+are executed individually in the order config.ollama_residency.plan_order
+picks: all steps that can run on the loaded model run before the next swap,
+while each query's own task order is kept.
+
+With several OLLAMA_HOSTS (config/ollama_balancer.py) queries run
+concurrently instead, each as its own sticky run, so the balancer spreads
+them over the hosts and throughput grows with the number of hosts.
+
+Every query writes to its own workspace (runs/work/<run_id>-<n>/), and is
+validated, revised and committed on its own.
+"""
+
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.ollama_balancer import get_balancer, sticky
+from config.ollama_residency import ResidencyManager, plan_order
+from config.profiles import get_profile
+from runner.crew_builder import build_crew, should_run, upstream_context
+from tools.workspace import Workspace
+from tracing.tracer import start_run, end_run, instrument_llm, get_tracer
+
+
+def run_task(built, spec, done, query, model):
+    """Run one task of a query's crew unless its condition skips it"""
+    if not should_run(built, spec, done):
+        print(f"⏭️ {query}: skipping {spec['name']}")
+    else:
+        task = built.tasks[spec["name"]]
+        with get_tracer().span("task", spec["name"], query=query, model=model), built.workspace.activate():
+            task.execute_sync(agent=task.agent, context=upstream_context(built, spec, done))
+    done.append(spec["name"])
+
+
+def run_concurrent(built, queries, specs, models, balancer, run_id):
+    """
+    One thread per query (per host slot), each query sticky to the host it lands on.
+    Queries write only to their own workspace, so the threads never share an output file or manifest.
+    """
+    def run_query(job):
+        with sticky(f"{run_id}:{job}"):
+            for step, spec in enumerate(specs):
+                print(f"▶️ [{job + 1}] {spec['name']} on {models[step]}")
+                run_task(built[job], spec, done[job], queries[job], models[step])
+
+    done = [[] for _ in queries]
+    with ThreadPoolExecutor(max_workers=min(len(queries), len(balancer.hosts))) as pool:
+        # each thread gets a copy of this context, so its spans go to the batch's trace
+        futures = [pool.submit(contextvars.copy_context().run, run_query, job) for job in range(len(queries))]
+        for future in futures:
+            future.result()
+    return done
+
+
+def run_batch(name, queries, residency=None):
+    """Run profile `name` for every query; returns {query: final output or None}"""
+    from runner.runner import print_banner, revise_and_commit, save_results_to_memory
+
+    profile = get_profile(name)
+    print_banner(profile)
+    residency = residency or ResidencyManager()
+    balancer = get_balancer()
+    tracer = start_run()
+    specs = profile["tasks"]
+    models = [profile["llms"][spec["agent"]]["model"] for spec in specs]
+    if balancer is None:
+        resident = [f"ollama/{m}" for m in residency.resident()]
+        order = plan_order([models] * len(queries), resident)
+        print(f"🗂️ Batch of {len(queries)} queries, {len(order)} tasks scheduled by model")
+    else:
+        print(f"🗂️ Batch of {len(queries)} queries over {len(balancer.hosts)} Ollama hosts")
+
+    results = {}
+    start_time = time.time()
+    try:
+        built = []
+        for job, query in enumerate(queries):
+            workspace = Workspace(f"{tracer.run_id}-{job + 1}")
+            built.append(build_crew(profile, query, run_id=workspace.run_id, workspace=workspace))
+        for crew in built:
+            for agent in crew.agents.values():
+                instrument_llm(agent.llm, agent.role)
+        if balancer is None:
+            done = [[] for _ in queries]
+            for position, (job, step) in enumerate(order):
+                upcoming = [models[s] for _, s in order[position:]]
+                residency.ensure(models[step], keep=upcoming)
+                print(f"▶️ [{job + 1}] {specs[step]['name']} on {models[step]}")
+                run_task(built[job], specs[step], done[job], queries[job], models[step])
+        else:
+            done = run_concurrent(built, queries, specs, models, balancer, tracer.run_id)
+
+        for job, query in enumerate(queries):
+            with built[job].workspace.activate():
+                revise_and_commit(built[job], profile)
+            last = built[job].tasks[done[job][-1]].output if done[job] else None
+            results[query] = last.raw if last is not None else None
+            print(f"📁 [{job + 1}] {built[job].workspace.path}")
+    except Exception as e:
+        print(f"\n❌ Batch failed: {e}")
+    finally:
+        get_tracer().record("residency", "batch", time.time() - start_time, **residency.stats())
+        end_run()
+
+    if profile["memory"]:
+        for query, result in results.items():
+            if result is not None:
+                save_results_to_memory(result, query, profile)
+    stats = residency.stats()
+    print(f"\n🎉 Batch complete: {sum(r is not None for r in results.values())}/{len(queries)} queries "
+          f"in {time.time() - start_time:.2f}s")
+    print(f"🔁 Model swaps: {stats['swaps']} ({stats['swap_seconds']:.1f}s loading)")
+    if balancer is not None:
+        for url, host in balancer.stats().items():
+            print(f"🖥️ {url}: {host['served']} calls, {host['failures']} failures")
+    print(f"🔬 Trace: {tracer.path}")
+    return results
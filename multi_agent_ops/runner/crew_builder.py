@@ -0,0 +1,207 @@
+"""
+Build a crew from a declarative profile (see config/profiles.py).
+
+Only the agents, tools and stores a profile asks for are imported: agent
+modules are imported on first use, and vector memory / web search / git are
+only touched when the profile switches them on.
+"""
+
+import importlib
+import os
+import uuid
+
+AGENT_CLASSES = {
+    "planner": ("agents.planner", "PlannerAgent"),
+    "researcher": ("agents.researcher", "ResearcherAgent"),
+    "coder": ("agents.coder", "CoderAgent"),
+    "reviewer": ("agents.reviewer", "ReviewerAgent"),
+}
+
+
+def agent_timeout(profile, agent):
+    """Agent max execution time: the profile timeout, else the longest task timeout of the agent's tasks"""
+    if profile["timeout"]:
+        return profile["timeout"]
+    timeouts = [profile["task_timeouts"][t["name"]] for t in profile["tasks"]
+                if t["agent"] == agent and t["name"] in profile["task_timeouts"]]
+    return max(timeouts) if timeouts else None
+
+
+def build_agent(name, profile, query, llm, memory_tokens=None, async_tools=False, store=None, workspace=None):
+    """
+    Returns (agent, memory context). With the stable prompt layout the agent's
+    backstory is static and its memory context goes at the end of its tasks.
+    """
+    module_name, class_name = AGENT_CLASSES[name]
+    builder = getattr(importlib.import_module(module_name), class_name)()
+    layout = profile["prompt_layout"]
+    # the async runner enforces task timeouts itself with asyncio
+    timeout = None if async_tools else agent_timeout(profile, name)
+    if name == "planner":
+        agent = builder.build(llm=llm, use_memory=profile["memory"], max_execution_time=timeout,
+                              memory_tokens=memory_tokens, layout=layout)
+    elif name == "researcher":
+        search_tool = None
+        if async_tools and profile["web_search"]:
+            from tools.web_search import async_web_search_tool as search_tool
+        agent = builder.build(query=query, llm=llm, use_memory=profile["memory"],
+                              web_search=profile["web_search"], max_execution_time=timeout,
+                              memory_tokens=memory_tokens, search_tool=search_tool, layout=layout)
+    elif name == "coder":
+        agent = builder.build(llm=llm, use_git=profile["git"], max_execution_time=timeout,
+                              memory_tokens=memory_tokens, store=store, layout=layout, workspace=workspace)
+    else:
+        agent = builder.build(llm=llm, max_execution_time=timeout)
+    memory_context = getattr(builder, "memory_context", None) if layout == "stable" else None
+    return agent, memory_context
+
+
+class BuiltCrew:
+    """The crew plus the pieces the runner needs after kickoff"""
+
+    def __init__(self, crew, agents, tasks, gate=None, assembler=None, router=None, store=None, workspace=None):
+        self.crew = crew
+        self.agents = agents
+        self.tasks = tasks
+        self.gate = gate
+        self.assembler = assembler
+        self.router = router
+        self.store = store
+        self.workspace = workspace
+
+
+def memory_tokens_for(profile, agent):
+    """Backstory memory budget for an agent, or None when the profile doesn't budget context"""
+    from pipeline.context_budget import memory_budget, MEMORY_SHARE
+    budget = profile["context_budget"]
+    if budget is None:
+        return None
+    if budget == "auto":
+        return memory_budget(profile["llms"][agent])
+    return int(budget * MEMORY_SHARE)
+
+
+PLAN_POINTER = 'The plan is saved in this run\'s memory: read it with read_run_output("plan") before writing code.'
+
+
+def reads_plan_by_key(task_specs, spec):
+    """
+    True for the code task when the plan task runs before it but isn't in its
+    context: the coder then fetches the plan from the run's scope by key.
+    """
+    names = [s["name"] for s in task_specs]
+    if spec["name"] != "code" or "plan" not in names or names.index("plan") > names.index("code"):
+        return False
+    return "plan" not in (spec.get("context") or names[:names.index("code")])
+
+
+def save_outputs(tasks, store):
+    """Save each task's output in the run's memory scope under the task name"""
+    from pipeline.context_budget import chain_callbacks
+
+    def saver(name):
+        def callback(output):
+            store.save(name, str(output.raw))
+        return callback
+
+    for name, task in tasks.items():
+        task.callback = chain_callbacks(saver(name), task.callback)
+
+
+def build_crew(profile, query, async_tools=False, run_id=None, workspace=None):
+    """
+    Build agents, tasks (with validation gate, context budget and model routing
+    if enabled) and the crew. Task outputs are saved in memory scope run_id.
+    The coder writes, and validation, routing and commits read, the files of
+    `workspace` (default: a workspace in the current directory).
+    """
+    from crewai import Crew, Task
+    from config.llm_config import get_llm_for
+    from memory.memory_store import memory
+
+    from agents.prompt_layout import task_description
+    from pipeline.context_budget import chain_callbacks
+    from tools.workspace import Workspace
+
+    workspace = workspace or Workspace(run_id, os.curdir)
+    store = memory.scope(run_id or f"run-{uuid.uuid4().hex[:12]}")
+    agents, memories = {}, {}
+    for name in profile["agents"]:
+        agents[name], memories[name] = build_agent(name, profile, query, get_llm_for(profile["llms"][name]),
+                                                   memory_tokens=memory_tokens_for(profile, name),
+                                                   async_tools=async_tools, store=store, workspace=workspace)
+
+    router = None
+    if profile["routing"]:
+        from config.routing import ModelRouter
+        router = ModelRouter(profile["routing"], files_fn=workspace.files)
+
+    from config.structured import AGENT_SCHEMAS, schema_hint, structured_callback
+    structured = {name: AGENT_SCHEMAS[name] for name in profile["structured_outputs"] if name in agents}
+
+    tasks = {}
+    gate = None
+    for spec in profile["tasks"]:
+        template = spec["description"]
+        if spec["agent"] in structured:
+            hint = schema_hint(structured[spec["agent"]]).replace("{", "{{").replace("}", "}}")
+            template = f"{template}\n{hint}"
+        if spec["agent"] == "coder" and reads_plan_by_key(profile["tasks"], spec):
+            template = f"{template}\n{PLAN_POINTER}"
+        kwargs = dict(
+            description=task_description(template, query, profile["prompt_layout"], memories[spec["agent"]]),
+            expected_output=spec["expected_output"],
+            agent=agents[spec["agent"]],
+        )
+        if spec.get("context"):
+            kwargs["context"] = [tasks[name] for name in spec["context"]]
+        if router is not None:
+            router.route(kwargs, spec["name"], spec["agent"])
+        if spec["agent"] == "reviewer" and profile["validation"] and "code" in tasks:
+            from pipeline.review_gate import ValidationGate
+            gate = ValidationGate(review_profile=profile["review_profile"], manifest=workspace.manifest)
+            tasks[spec["name"]] = gate.attach(tasks["code"], kwargs)
+        else:
+            tasks[spec["name"]] = Task(**kwargs)
+
+    assembler = None
+    if profile["context_budget"] is not None:
+        from pipeline.context_budget import ContextAssembler
+        budget = None if profile["context_budget"] == "auto" else profile["context_budget"]
+        assembler = ContextAssembler(budget=budget).wire(tasks, profile["tasks"], profile["llms"], query)
+    for spec in profile["tasks"]:
+        if spec["agent"] in structured:
+            # runs before the assembler, so it and crewai's context get the compact rendering;
+            # save_outputs (chained below) still stores the JSON
+            task = tasks[spec["name"]]
+            task.callback = chain_callbacks(structured_callback(structured[spec["agent"]]), task.callback)
+    save_outputs(tasks, store)
+
+    crew = Crew(
+        agents=list(agents.values()),
+        tasks=list(tasks.values()),
+        verbose=True,
+        memory=False  # crewai's own memory re-embeds every step; we use vector memory explicitly
+    )
+    return BuiltCrew(crew, agents, tasks, gate, assembler, router, store, workspace)
+
+
+def upstream_context(built, spec, done):
+    """
+    crewai-style context for a task run outside Crew.kickoff (batch and async
+    runners). None when the context assembler already put it in the description.
+    """
+    task = built.tasks[spec["name"]]
+    if task.context == []:
+        return None
+    names = spec.get("context") or done
+    return "\n\n".join(str(built.tasks[name].output.raw) for name in names if built.tasks[name].output)
+
+
+def should_run(built, spec, done):
+    """False when a ConditionalTask's condition says to skip it"""
+    task = built.tasks[spec["name"]]
+    should_execute = getattr(task, "should_execute", None)
+    if should_execute is None or not done:
+        return True
+    return should_execute(built.tasks[done[-1]].output)
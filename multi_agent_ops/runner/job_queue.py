@@ -0,0 +1,311 @@
+"""
+Durable job queue on a shared SQLite file, for crew workers on many machines.
+
+CrewPool scales one machine; the job queue scales out without a broker. Any
+process that can open the file (a local path, or a shared mount) can submit
+jobs or consume them:
+
+    python run.py --queue /shared/jobs --profile local --batch queries.txt   (submit)
+    python run.py --queue /shared/jobs --work                                (on every host)
+
+A job is a project query plus a profile. Workers take one job at a time:
+
+- leasing: a worker leases the next available job (highest priority, then
+  oldest) for JOB_LEASE_SECONDS inside one write transaction, so two workers
+  never get the same job. A heartbeat thread extends the lease while the crew
+  runs; a job whose worker died is leased again once its lease runs out.
+- retries: a failed run goes back to the queue after an exponential backoff
+  (JOB_RETRY_BASE * 2^(attempt-1), capped at JOB_RETRY_MAX, with jitter).
+- dead letters: a job that failed (or lost its worker) max_attempts times is
+  marked dead with its last error; requeue() puts it back.
+- results: the final output, the trace path on the worker's host and the
+  trace itself are written back to the job's row.
+
+The file uses the rollback journal, not WAL: WAL needs shared memory, which
+doesn't work across hosts. A network filesystem must support POSIX locks
+(NFSv4, or a local disk shared with a single host); lease times use the wall
+clock, so hosts should be NTP-synced to well under the lease length.
+"""
+
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+
+QUEUE_PATH = os.getenv("JOB_QUEUE", os.path.join("runs", "jobs"))
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+RETRY_BASE = float(os.getenv("JOB_RETRY_BASE", "30"))
+RETRY_MAX = float(os.getenv("JOB_RETRY_MAX", "900"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+
+STATUSES = ("queued", "running", "done", "dead")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    trace_path TEXT,
+    trace TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_next ON jobs (status, priority DESC, id);
+"""
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    path: the SQLite file, or a directory to keep jobs.sqlite in.
+    retry_base/retry_max: backoff in seconds between attempts of a failed job.
+    """
+
+    def __init__(self, path=QUEUE_PATH, retry_base=RETRY_BASE, retry_max=RETRY_MAX):
+        if os.path.isdir(path) or not os.path.splitext(path)[1]:
+            path = os.path.join(path, "jobs.sqlite")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=DELETE")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql, params=()):
+        """One statement in its own write transaction; returns its cursor"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor
+
+    def submit(self, query, profile, priority=0, max_attempts=MAX_ATTEMPTS):
+        """Queue one job; higher priority runs first. Returns the job id."""
+        now = time.time()
+        cursor = self._write("INSERT INTO jobs (query, profile, priority, max_attempts, available_at, created_at) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", (query, profile, priority, max_attempts, now, now))
+        return cursor.lastrowid
+
+    def lease(self, worker=None, lease_seconds=LEASE_SECONDS):
+        """
+        Lease the next job for worker: a queued job that is due, or a running
+        one whose lease ran out. Returns the job as a dict, or None.
+        """
+        worker = worker or worker_name()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            # jobs whose worker vanished on their last attempt won't be retried
+            conn.execute("UPDATE jobs SET status = 'dead', finished_at = ?, lease_owner = NULL, "
+                         "error = COALESCE(error || '; ', '') || 'lease expired on attempt ' || attempts "
+                         "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                         (now, now))
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE (status = 'queued' AND available_at <= ?) "
+                "OR (status = 'running' AND lease_expires < ?) ORDER BY priority DESC, id LIMIT 1",
+                (now, now)).fetchone()
+            job = None
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                             "lease_expires = ?, started_at = ? WHERE id = ?",
+                             (worker, now + lease_seconds, now, row["id"]))
+                job = dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job
+
+    def heartbeat(self, job, lease_seconds=LEASE_SECONDS):
+        """Extend job's lease; False when the worker no longer holds it"""
+        owned = (job["id"], job["lease_owner"], job["attempts"])
+        return self._write("UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'running' "
+                           "AND lease_owner = ? AND attempts = ?", (time.time() + lease_seconds, *owned)).rowcount == 1
+
+    def complete(self, job, result, trace_path=None, trace=None):
+        """Store the result; False when the lease was lost (another worker owns the job now)"""
+        owned = (job["id"], job["lease_owner"], job["attempts"])
+        return self._write("UPDATE jobs SET status = 'done', finished_at = ?, result = ?, trace_path = ?, "
+                           "trace = ?, error = NULL, lease_owner = NULL WHERE id = ? AND status = 'running' "
+                           "AND lease_owner = ? AND attempts = ?",
+                           (time.time(), result, trace_path, trace, *owned)).rowcount == 1
+
+    def backoff(self, attempts):
+        """Seconds before attempt attempts + 1 of a failed job"""
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.75, 1.0)
+
+    def fail(self, job, error, trace_path=None, trace=None):
+        """Queue the job again after a backoff, or dead-letter it after max_attempts"""
+        now = time.time()
+        dead = job["attempts"] >= job["max_attempts"]
+        owned = (job["id"], job["lease_owner"], job["attempts"])
+        if dead:
+            return self._write("UPDATE jobs SET status = 'dead', finished_at = ?, error = ?, trace_path = ?, "
+                               "trace = ?, lease_owner = NULL WHERE id = ? AND status = 'running' "
+                               "AND lease_owner = ? AND attempts = ?",
+                               (now, error, trace_path, trace, *owned)).rowcount == 1
+        return self._write("UPDATE jobs SET status = 'queued', available_at = ?, error = ?, trace_path = ?, "
+                           "trace = ?, lease_owner = NULL, lease_expires = NULL WHERE id = ? "
+                           "AND status = 'running' AND lease_owner = ? AND attempts = ?",
+                           (now + self.backoff(job["attempts"]), error, trace_path, trace, *owned)).rowcount == 1
+
+    def requeue(self, job_id, attempts=0):
+        """Put a dead (or done) job back in the queue with a fresh attempt count"""
+        return self._write("UPDATE jobs SET status = 'queued', attempts = ?, available_at = ?, "
+                           "lease_owner = NULL, lease_expires = NULL WHERE id = ? AND status IN ('dead', 'done')",
+                           (attempts, time.time(), job_id)).rowcount == 1
+
+    def get(self, job_id):
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def jobs(self, status=None):
+        sql, params = "SELECT * FROM jobs", ()
+        if status is not None:
+            sql, params = sql + " WHERE status = ?", (status,)
+        return [dict(row) for row in self._conn().execute(sql + " ORDER BY id", params)]
+
+    def dead_letters(self):
+        return self.jobs("dead")
+
+    def stats(self):
+        """{status: job count} for every status"""
+        counts = dict(self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in STATUSES}
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class _Heartbeat:
+    """Extends a job's lease every lease_seconds / 3 until stopped"""
+
+    def __init__(self, queue, job, lease_seconds):
+        self.queue = queue
+        self.job = job
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def _beat(self):
+        # the worker's connection belongs to its thread; this one opens its own
+        try:
+            while not self._stop.wait(self.lease_seconds / 3):
+                try:
+                    if not self.queue.heartbeat(self.job, self.lease_seconds):
+                        self.lost = True
+                        print(f"⚠️ Lost the lease on job {self.job['id']}")
+                        return
+                except sqlite3.Error as e:   # a busy or unreachable file: try again next beat
+                    print(f"⚠️ Heartbeat for job {self.job['id']} failed: {e}")
+        finally:
+            self.queue.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_job(profile, query, run_id):
+    """
+    Default job runner: the profile's crew, in its own workspace (runs/work/<run_id>/).
+    Returns the final output; a failed run raises, so the job records why.
+    """
+    from runner.runner import run_profile
+    from tools.workspace import WORKSPACE_DIR
+    result = run_profile(profile, query, run_id=run_id, workdir=os.path.join(WORKSPACE_DIR, run_id),
+                         raise_errors=True)
+    return None if result is None else str(result)
+
+
+def _trace_of(run_id):
+    from tracing.tracer import TRACE_DIR
+    path = os.path.join(TRACE_DIR, f"{run_id}.jsonl")
+    if not os.path.exists(path):
+        return None, None
+    with open(path, encoding="utf-8") as f:
+        return os.path.abspath(path), f.read()
+
+
+def work(queue, run=run_job, worker=None, lease_seconds=LEASE_SECONDS, poll=POLL_INTERVAL,
+         max_jobs=None, exit_when_idle=False):
+    """
+    Consume jobs until max_jobs have run (or, with exit_when_idle, until none
+    is available). run(profile, query, run_id) returns the output or None.
+    Returns the number of jobs this worker ran.
+    """
+    if not isinstance(queue, JobQueue):
+        queue = JobQueue(queue)
+    worker = worker or worker_name()
+    ran = 0
+    print(f"👷 Worker {worker} consuming {queue.path}")
+    while max_jobs is None or ran < max_jobs:
+        job = queue.lease(worker, lease_seconds)
+        if job is None:
+            if exit_when_idle:
+                break
+            time.sleep(poll)
+            continue
+        run_id = f"job-{job['id']}-{job['attempts']}"
+        print(f"📥 Job {job['id']} (attempt {job['attempts']}/{job['max_attempts']}, "
+              f"profile '{job['profile']}'): {job['query']}")
+        with _Heartbeat(queue, job, lease_seconds) as heartbeat:
+            try:
+                result, error = run(job["profile"], job["query"], run_id), None
+            except Exception as e:   # a crashed run is a failed attempt, not a dead worker
+                result, error = None, f"{type(e).__name__}: {e}"
+        ran += 1
+        trace_path, trace = _trace_of(run_id)
+        if heartbeat.lost:
+            continue   # another worker has the job now; its result is the one that counts
+        if result is not None:
+            stored = queue.complete(job, result, trace_path, trace)
+            print(f"✅ Job {job['id']} done" if stored else f"⚠️ Job {job['id']} finished after losing its lease")
+        else:
+            queue.fail(job, error or "run failed", trace_path, trace)
+            if job["attempts"] >= job["max_attempts"]:
+                print(f"💀 Job {job['id']} dead-lettered after {job['attempts']} attempts: {error or 'run failed'}")
+            else:
+                print(f"🔁 Job {job['id']} failed, will retry: {error or 'run failed'}")
+    print(f"👋 Worker {worker} stopping after {ran} jobs ({queue.stats()})")
+    return ran
@@ -0,0 +1,140 @@
+"""
+Process pool for running many crews at once (batch and server modes).
+
+Embedding, parsing and validation run under the GIL, so one process only uses
+one core. CrewPool runs each query in a worker process:
+
+- The parent exports a memory snapshot once (runner's queries and the
+  planner's search are embedded here, by the only embedding model loaded).
+  Workers memory-map it read-only (memory/snapshot.py), so RSS grows by the
+  per-worker crew state, not by another model or index copy.
+- Workers keep their runs' task outputs in one SQLite memory store
+  (memory/memory_store.py share_between_processes), so outputs saved in one
+  worker are readable by key from every other.
+- Memory writes from workers (new documents and background summaries) go
+  over a queue to a single writer process that owns the Chroma store and the
+  summary file, so neither ever has concurrent writers.
+
+    with CrewPool("local", workers=4) as pool:
+        results = pool.map(["todo app", "calculator"])
+
+Model residency management is switched off in workers: with several crews
+sharing one Ollama server, unloading "unused" models would evict a model
+another worker is in the middle of using.
+
+Each query runs in its own workspace (runs/work/<pool run>-<n>/), so workers
+never overwrite or commit each other's generated files.
+"""
+
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from config.profiles import get_profile
+from memory.snapshot import SNAPSHOT_DIR
+
+DEFAULT_WORKERS = int(os.getenv("CREW_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _writer_loop(writes):
+    """Single writer: apply queued memory writes to the real vector store"""
+    from memory.vector_store import get_vector_memory
+    from memory.summaries import get_summary_store
+    written = summarized = 0
+    while True:
+        item = writes.get()
+        if item is None:
+            break
+        op, text, metadata = item
+        if op == "add":
+            get_vector_memory().add(text, metadata)
+            written += 1
+        elif op == "summarize":
+            get_summary_store().submit(text)
+            summarized += 1
+    if written or summarized:
+        get_summary_store().drain(timeout=float(os.getenv("SUMMARY_WAIT", "120")))
+    print(f"✍️ Memory writer applied {written} writes, queued {summarized} summaries")
+
+
+def _init_worker(snapshot, writes):
+    import memory.vector_store as vector_store
+    from memory.memory_store import share_between_processes
+    from memory.snapshot import SnapshotMemory
+    from memory.summaries import get_summary_store
+    os.environ["OLLAMA_RESIDENCY"] = "0"
+    share_between_processes()
+    if snapshot is not None:
+        vector_store._vector_memory = SnapshotMemory(snapshot, writer=writes)
+    if writes is not None:
+        get_summary_store().writer = writes
+
+
+def _run_query(name, query, run_id):
+    from runner.runner import run_profile
+    from tools.workspace import WORKSPACE_DIR
+    result = run_profile(name, query, run_id=run_id, workdir=os.path.join(WORKSPACE_DIR, run_id))
+    return None if result is None else str(result)
+
+
+class CrewPool:
+    def __init__(self, profile_name, workers=None, snapshot=SNAPSHOT_DIR):
+        self.profile_name = profile_name
+        self.profile = get_profile(profile_name)
+        self.workers = workers or DEFAULT_WORKERS
+        self.snapshot = snapshot
+        self._context = multiprocessing.get_context("spawn")
+        self._executor = None
+        self._writer = None
+        self._writes = None
+
+    def start(self, queries=()):
+        """Export the snapshot (embedding queries) and start the writer and workers"""
+        snapshot = None
+        if self.profile["memory"]:
+            from agents.planner import PLANNING_QUERY
+            from memory.snapshot import export_snapshot
+            snapshot = export_snapshot(self.snapshot, queries=[PLANNING_QUERY, *queries])
+            self._writes = self._context.Queue()
+            self._writer = self._context.Process(target=_writer_loop, args=(self._writes,), name="memory-writer")
+            self._writer.start()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context,
+                                             initializer=_init_worker, initargs=(snapshot, self._writes))
+        return self
+
+    def map(self, queries):
+        """Run every query on the pool; returns {query: final output or None}"""
+        if self._executor is None:
+            self.start(queries)
+        start_time = time.time()
+        pool_run = f"pool-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        futures = {query: self._executor.submit(_run_query, self.profile_name, query, f"{pool_run}-{n}")
+                   for n, query in enumerate(queries, start=1)}
+        results = {}
+        for query, future in futures.items():
+            try:
+                results[query] = future.result()
+            except Exception as e:
+                print(f"❌ Worker failed on '{query}': {e}")
+                results[query] = None
+        done = sum(r is not None for r in results.values())
+        print(f"\n🎉 Pool complete: {done}/{len(queries)} queries on {self.workers} workers "
+              f"in {time.time() - start_time:.2f}s")
+        return results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
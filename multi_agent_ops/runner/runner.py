@@ -0,0 +1,154 @@
+"""
+Single entry point for every profile: build the crew, run it, then revise,
+commit and save to memory according to the profile.
+"""
+
+import os
+import time
+
+from config.profiles import get_profile
+from tracing.tracer import start_run, end_run, get_tracer, CrewTracer
+
+
+def get_project_query(profile):
+    """Get project requirements from user"""
+    print("\n🎯 What would you like to build today?")
+    print("Examples:")
+    for example in profile["examples"]:
+        print(f"- {example}")
+    query = input("\n📝 Enter your project description: ").strip()
+    return query or profile["default_query"]
+
+
+def print_banner(profile):
+    print(f"🚀 Multi-Agent Development System - profile '{profile['name']}'")
+    print(f"⚙️ {profile['description']}")
+    print("=" * 50)
+    routing = profile["routing"] or {}
+    for agent in profile["agents"]:
+        models = [spec["model"] for spec in routing.get(agent, [profile["llms"][agent]])]
+        print(f"🤖 {agent.capitalize()}: {' → '.join(models)}")
+    print(f"🧠 Memory: {'Enabled' if profile['memory'] else 'Disabled'}")
+    print(f"🔍 Web Search: {'Enabled' if profile['web_search'] else 'Disabled'}")
+    print(f"🐙 Git Integration: {'Enabled' if profile['git'] else 'Disabled'}")
+    if profile["coder_candidates"] > 1 and "coder" in profile["agents"]:
+        print(f"🏁 Coder candidates: {profile['coder_candidates']} per call, first valid wins")
+    print("=" * 50)
+
+
+def kickoff_with_retry(crew, retries):
+    """Run crew, retrying on rate-limit errors"""
+    for attempt in range(retries + 1):
+        try:
+            return CrewTracer(crew).kickoff()
+        except Exception as e:
+            if ("rate_limit" in str(e).lower() or "rate limit" in str(e).lower()) and attempt < retries:
+                print(f"⚠️ Rate limit hit on attempt {attempt + 1}, waiting 30s...")
+                time.sleep(30)
+                continue
+            raise
+
+
+def save_results_to_memory(result, project_query, profile):
+    """Save results to vector memory"""
+    from memory.vector_store import get_vector_memory
+    text = str(result)
+    if profile["memory_chars"]:
+        text = text[:profile["memory_chars"]]
+    try:
+        get_vector_memory().add(
+            text=f"Project: {project_query}\n\nResults:\n{text}",
+            metadata={
+                "project": project_query,
+                "timestamp": str(int(time.time())),
+                "status": "completed",
+                "type": f"{profile['name']}_project"
+            }
+        )
+        print("✅ Results saved to memory for future reference")
+        from memory.summaries import get_summary_store
+        store = get_summary_store()
+        if store.pending():
+            print("🧾 Summarizing new memories for future prompts...")
+            if not store.drain(timeout=float(os.getenv("SUMMARY_WAIT", "120"))):
+                print("⚠️ Summaries not finished; run: python -m memory.summaries --backfill")
+    except Exception as e:
+        print(f"⚠️ Could not save to memory: {e}")
+
+
+def revise_and_commit(built, profile):
+    """Revise the files the run wrote (validation and reviewer findings), then commit them"""
+    workspace = built.workspace
+    iterations = int(os.getenv("REVISION_ITERATIONS", profile["revision_iterations"]))
+    if iterations > 0 and "coder" in built.agents and workspace.files():
+        from pipeline.revision import RevisionLoop, review_feedback
+        loop = RevisionLoop(built.agents["coder"].llm, max_iterations=iterations, manifest=workspace.manifest)
+        loop.run(workspace.files(), feedback=review_feedback(built), root=workspace.path)
+    if profile["git"]:
+        workspace.flush_commits()
+
+
+def run_profile(name, query=None, run_id=None, workdir=None, raise_errors=False):
+    """
+    Run one profile end to end. Returns the crew result, or None on failure
+    (with raise_errors, the failure is re-raised for the caller to record).
+    Generated files go to workdir (default: the current directory).
+    """
+    from runner.crew_builder import build_crew
+    from tools.workspace import Workspace
+
+    profile = get_profile(name)
+    print_banner(profile)
+    project_query = query or get_project_query(profile)
+
+    tracer = start_run(run_id)
+    print(f"\n🔧 Creating development team for: {project_query}")
+    workspace = Workspace(tracer.run_id, workdir or os.curdir)
+    built = build_crew(profile, project_query, run_id=tracer.run_id, workspace=workspace)
+    residency = None
+    from config.ollama_balancer import get_balancer
+    if os.getenv("OLLAMA_RESIDENCY", "1") == "1" and get_balancer() is None:   # residency manages one host
+        from config.ollama_residency import ResidencyManager
+        residency = ResidencyManager().attach(built, profile)
+    print(f"👥 Team: {' → '.join(a.capitalize() for a in profile['agents'])}")
+    print("-" * 60)
+
+    start_time = time.time()
+    try:
+        with workspace.activate():
+            result = kickoff_with_retry(built.crew, profile["retries"])
+            revise_and_commit(built, profile)
+    except Exception as e:
+        print(f"\n❌ Development process failed: {e}")
+        print("💡 Check that Ollama is running (ollama serve) and the models are pulled (ollama list)")
+        if raise_errors:
+            raise
+        return None
+    finally:
+        if residency is not None:
+            get_tracer().record("residency", "run", 0.0, **residency.stats())
+        end_run()
+
+    duration = time.time() - start_time
+    print("\n" + "=" * 60)
+    print("🎉 DEVELOPMENT COMPLETE!")
+    print("=" * 60)
+    if profile["memory"]:
+        save_results_to_memory(result, project_query, profile)
+    print(f"📝 Project: {project_query}")
+    print(f"⏱️ Duration: {duration:.2f} seconds")
+    if residency is not None:
+        stats = residency.stats()
+        print(f"🔁 Model swaps: {stats['swaps']} ({stats['swap_seconds']:.1f}s loading)")
+    if built.router is not None:
+        print(f"🔀 Routing: {built.router.summary()} (log: {built.router.log_path})")
+    if profile["backends"]:
+        from config.backend_pool import pool_summaries
+        for name, backends in pool_summaries().items():
+            print(f"🛰️ {name}: " + ", ".join(
+                f"{b} {s['wins']}/{s['calls']} won, {s['errors']} errors, p95 {s['latency']['p95']}s"
+                for b, s in backends.items()))
+    print(f"🔬 Trace: {tracer.path} (summary: python -m tracing.summarize {tracer.path})")
+    print("📋 Final Output:")
+    print(result)
+    return result
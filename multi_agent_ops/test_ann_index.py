@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the IVF approximate index and its use in the NumPy vector store
+"""
+
+import numpy as np
+
+from bench.ann_benchmark import clustered_vectors
+from memory.ann_index import IVFIndex
+from memory.numpy_store import NumpyVectorStore
+
+DIM = 48
+
+
+def _exact(matrix, query, k):
+    return set(np.argsort(-(matrix @ query))[:k].tolist())
+
+
+def test_nprobe_trades_recall():
+    matrix = clustered_vectors(3000, DIM)
+    queries = clustered_vectors(30, DIM, seed=1)
+    index = IVFIndex().train(matrix)
+    assert len(index) == 3000 and sum(len(rows) for rows in index.lists()) == 3000
+
+    def recall(nprobe):
+        found = index.search(matrix, queries, 10, nprobe)
+        return np.mean([len(_exact(matrix, q, 10) & set(rows.tolist())) / 10 for q, (rows, _) in zip(queries, found)])
+
+    assert recall(index.nlist) == 1.0          # probing every list is exact search
+    assert recall(1) < recall(16) <= 1.0
+    assert recall(16) >= 0.85
+
+
+def test_store_uses_index_and_keeps_it_updated(tmp_path):
+    matrix = clustered_vectors(2000, DIM)
+    store = NumpyVectorStore(str(tmp_path), index="ivf", ann_min_rows=1000)
+    store.add_texts([str(i) for i in range(2000)], embeddings=matrix)
+    assert store.search_rows(matrix[:1], k=1)[0].tolist() == [0]
+    assert store.index is not None and len(store.index) == 2000
+
+    extra = clustered_vectors(10, DIM, seed=5)
+    store.add_texts([f"new {i}" for i in range(10)], embeddings=extra)
+    assert len(store.index) == 2010                   # new rows assigned, no retrain
+    assert store.similarity_search_by_vector_batch(extra[:1], k=1)[0][0].page_content == "new 0"
+    store.persist()
+
+    reloaded = NumpyVectorStore(str(tmp_path), index="ivf", ann_min_rows=1000)
+    assert reloaded.index is not None and len(reloaded.index) == 2010
+    trained = reloaded.index.trained_count
+    reloaded.add_texts([str(i) for i in range(6000)], embeddings=clustered_vectors(6000, DIM, seed=7))
+    reloaded.search_rows(extra[:1], k=1)
+    assert reloaded.index.trained_count > trained     # grew 4x: retrained
+
+
+def test_logged_rows_are_indexed_on_load(tmp_path):
+    store = NumpyVectorStore(str(tmp_path), index="ivf", ann_min_rows=1000)
+    store.add_texts([str(i) for i in range(2000)], embeddings=clustered_vectors(2000, DIM))
+    store.search_rows(clustered_vectors(1, DIM), k=1)
+    store.persist()                                   # base files with the trained index
+    extra = clustered_vectors(10, DIM, seed=5)
+    store.add_texts([f"new {i}" for i in range(10)], embeddings=extra)
+    store.persist()                                   # appended to the logs only
+    assert (tmp_path / "vectors.log").exists()
+
+    reloaded = NumpyVectorStore(str(tmp_path), index="ivf", ann_min_rows=1000)
+    assert len(reloaded.index) == 2010 and reloaded.index.trained_count == store.index.trained_count
+    assert reloaded.similarity_search_by_vector_batch(extra[:1], k=1)[0][0].page_content == "new 0"
+
+
+def test_small_store_stays_exact(tmp_path):
+    store = NumpyVectorStore(str(tmp_path), index="ivf", ann_min_rows=1000)
+    store.add_texts(["a", "b"], embeddings=clustered_vectors(2, DIM))
+    store.search_rows(clustered_vectors(1, DIM), k=1)
+    assert store.index is None
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_nprobe_trades_recall()
+    for test in (test_store_uses_index_and_keeps_it_updated, test_logged_rows_are_indexed_on_load,
+                 test_small_store_stays_exact):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("\n🎯 ANN index tests completed!")
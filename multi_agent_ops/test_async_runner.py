@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the asyncio crew runner: completion, per-task timeouts and cancellation
+"""
+
+import asyncio
+
+import pytest
+
+from bench.fake_llm_server import FakeBackend, start_in_thread
+
+GENERAL = "ollama/llama3.1:8b"
+CODER = "ollama/qwen2.5-coder:7b"
+
+PROFILE = {
+    "description": "async test", "agents": ["planner", "coder"],
+    "llms": {"planner": {"model": GENERAL}, "coder": {"model": CODER}},
+    "memory": False, "web_search": False, "git": False, "validation": False,
+    "tasks": [
+        {"name": "plan", "agent": "planner", "description": "Plan {query}", "expected_output": "steps"},
+        {"name": "code", "agent": "coder", "context": ["plan"],
+         "description": "Write code for {query}", "expected_output": "code"},
+    ],
+}
+
+
+@pytest.fixture
+def fake_server(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+    from config.profiles import PROFILES
+
+    backend = FakeBackend(speedup=1000)
+    server, url = start_in_thread(backend)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OLLAMA_RESIDENCY", "0")
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", url)
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    PROFILES["_async"] = PROFILE
+    try:
+        yield backend
+    finally:
+        del PROFILES["_async"]
+        server.shutdown()
+
+
+def test_async_run_completes(fake_server):
+    from runner.async_runner import arun_profile
+    result = asyncio.run(arun_profile("_async", "todo app"))
+    assert result
+    assert {call["model"] for call in fake_server.stats()["calls"]} == {"llama3.1:8b", "qwen2.5-coder:7b"}
+
+
+def test_task_timeout_stops_the_run(fake_server):
+    from config.profiles import get_profile
+    from runner.async_runner import TaskTimeout, abuild_crew, arun_crew
+
+    fake_server.extra_latency = 2000  # 2s at speedup 1000
+    profile = get_profile("_async")
+
+    async def run():
+        built = await abuild_crew(profile, "todo app")
+        await arun_crew(built, profile, task_timeouts={"plan": 0.3})
+
+    with pytest.raises(TaskTimeout) as info:
+        asyncio.run(run())
+    assert info.value.task_name == "plan"
+
+
+def test_cancellation_propagates(fake_server):
+    from runner.async_runner import arun_profile
+
+    fake_server.extra_latency = 2000
+
+    async def run():
+        job = asyncio.create_task(arun_profile("_async", "todo app"))
+        await asyncio.sleep(0.5)
+        job.cancel()
+        await job
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
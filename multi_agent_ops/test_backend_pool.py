@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the backend pool: latency histograms, hedging and failover on two fake servers
+"""
+
+import time
+
+import pytest
+
+from config.backend_pool import HEDGE_AFTER, BackendPool, LatencyHistogram
+from bench.fake_llm_server import FakeBackend, start_in_thread
+
+MESSAGES = [{"role": "user", "content": "Create a plan for a todo app"}]
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram(buckets=(0.1, 0.5, 1.0, 5.0))
+    assert histogram.percentile(0.95) is None
+    for seconds in (0.05, 0.2, 0.3, 0.4, 0.7, 0.8, 0.9, 2.0, 3.0, 9.0):
+        histogram.add(seconds)
+    assert histogram.percentile(0.1) == 0.1
+    assert histogram.percentile(0.5) == 1.0
+    assert histogram.percentile(0.9) == 5.0
+    assert histogram.percentile(1.0) == float("inf")
+    assert histogram.to_dict()["count"] == 10
+
+
+def test_hedge_delay_follows_the_percentile():
+    pool = BackendPool([("a", None), ("b", None)], hedge_percentile=0.5, min_samples=3)
+    backend = pool.backends[0]
+    assert pool.hedge_delay(backend) == HEDGE_AFTER
+    for seconds in (0.2, 0.2, 3.0):
+        backend.latency.add(seconds)
+    assert pool.hedge_delay(backend) < 1.0
+
+
+def sleeper(seconds, answer, fail=False):
+    def call(messages, *args, **kwargs):
+        time.sleep(seconds)
+        if fail:
+            raise ConnectionError("backend down")
+        return answer
+    return call
+
+
+def test_slow_primary_is_hedged():
+    pool = BackendPool([("slow", sleeper(1.0, "slow")), ("fast", sleeper(0.0, "fast"))], hedge_after=0.05)
+    start = time.perf_counter()
+    assert pool.call(MESSAGES) == "fast"
+    assert time.perf_counter() - start < 0.5
+    summary = pool.summary()
+    assert summary["fast"]["hedges"] == 1 and summary["fast"]["wins"] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    pool = BackendPool([("a", sleeper(0.0, "a")), ("b", sleeper(0.0, "b"))], hedge_after=1.0)
+    assert [pool.call(MESSAGES) for _ in range(3)] == ["a", "a", "a"]
+    assert pool.summary()["b"]["calls"] == 0
+
+
+def test_errors_fail_over_and_cool_down():
+    pool = BackendPool([("down", sleeper(0.0, None, fail=True)), ("up", sleeper(0.0, "up"))],
+                       hedge_after=5.0, cooldown=60)
+    assert pool.call(MESSAGES) == "up"
+    assert pool.call(MESSAGES) == "up"
+    assert pool.summary()["down"]["calls"] == 1   # skipped as first choice while cooling down
+
+
+def test_all_backends_failing_raises():
+    pool = BackendPool([("a", sleeper(0.0, None, fail=True)), ("b", sleeper(0.0, None, fail=True))])
+    with pytest.raises(ConnectionError):
+        pool.call(MESSAGES)
+
+
+@pytest.fixture
+def two_servers(monkeypatch):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+
+    slow, fast = FakeBackend(speedup=100, extra_latency=200), FakeBackend(speedup=100)
+    servers = [start_in_thread(slow), start_in_thread(fast)]
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", servers[0][1])
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    monkeypatch.setattr("config.backend_pool.HEDGE_AFTER", 0.2)
+    try:
+        yield (slow, fast), [url for _, url in servers]
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+
+
+def test_pooled_llm_takes_the_first_answer(two_servers):
+    from config.llm_config import get_llm_for
+    (slow, fast), (_, fast_url) = two_servers
+
+    llm = get_llm_for({"model": "ollama/llama3.2:3b", "backends": (fast_url,)})
+    start = time.perf_counter()
+    assert "data model" in llm.call(MESSAGES)
+    assert time.perf_counter() - start < 1.5   # the primary alone takes 2s
+    assert len(fast.stats()["calls"]) >= 1
+    time.sleep(2.1)
+    assert len(slow.stats()["calls"]) >= 1     # the losing call still finished
+
+
+def test_pooled_llm_fails_over_on_server_errors(two_servers):
+    from config.llm_config import get_llm_for
+    (slow, fast), (_, fast_url) = two_servers
+    slow.extra_latency, slow.fail_next = 0.0, 10
+
+    llm = get_llm_for({"model": "ollama/llama3.2:3b", "backends": (fast_url,)})
+    assert "data model" in llm.call(MESSAGES)
+    assert not slow.stats()["calls"] and len(fast.stats()["calls"]) == 1
+
+
+def test_get_profile_adds_backends_to_every_llm(monkeypatch):
+    from config.profiles import PROFILES, get_profile
+    monkeypatch.setitem(PROFILES, "_pooled", dict(PROFILES["cascade"], backends=["http://b:11434", "openai"]))
+    profile = get_profile("_pooled")
+    assert all(spec["backends"] == ("http://b:11434", "openai") for spec in profile["llms"].values())
+    assert all(spec["backends"] for tiers in profile["routing"].values() for spec in tiers)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
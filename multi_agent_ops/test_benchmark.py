@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark's fake LLM backend and result comparison
+"""
+
+import json
+import time
+
+import requests
+
+from bench.fake_llm_server import FakeBackend, start_in_thread
+from bench.compare import compare
+
+
+def test_fake_backend_ollama_and_openai():
+    print("🧪 Testing fake LLM backend")
+    backend = FakeBackend(speedup=50)
+    server, url = start_in_thread(backend)
+    try:
+        # Non-streaming Ollama generate (what litellm's ollama provider sends)
+        body = requests.post(f"{url}/api/generate", json={
+            "model": "llama3.2:3b", "prompt": "Create a plan for a todo app", "stream": False}).json()
+        assert body["done"] and body["response"].startswith("1. Define")
+        assert body["eval_count"] > 0
+
+        # Streaming chat: NDJSON chunks then a final done message
+        with requests.post(f"{url}/api/chat", stream=True, json={
+                "model": "qwen2.5-coder:7b",
+                "messages": [{"role": "user", "content": "You are a Python developer. Write code."}]}) as r:
+            chunks = [json.loads(line) for line in r.iter_lines() if line]
+        text = "".join(c["message"]["content"] for c in chunks)
+        assert chunks[-1]["done"] and "def main" in text
+
+        # OpenAI-compatible endpoint
+        body = requests.post(f"{url}/v1/chat/completions", json={
+            "model": "llama3.1:8b", "messages": [{"role": "user", "content": "Review this"}]}).json()
+        assert body["usage"]["completion_tokens"] > 0
+
+        stats = requests.get(f"{url}/__stats").json()
+        assert len(stats["calls"]) == 3
+        assert stats["swaps"] == 3  # one resident model, three different models
+        assert stats["resident"] == ["llama3.1:8b"]
+        assert all(c["first_token"] >= c["start"] for c in stats["calls"])
+    finally:
+        server.shutdown()
+
+
+def test_latency_model_charges_model_swaps():
+    backend = FakeBackend(speedup=100)
+    start = time.perf_counter()
+    _, cold = backend.generate("llama3.1:8b", "plan")
+    _, warm = backend.generate("llama3.1:8b", "plan")
+    assert cold["load_seconds"] > 0 and warm["load_seconds"] == 0
+    assert time.perf_counter() - start >= 4.0 / 100
+
+
+def test_compare_flags_regressions():
+    old = {"summary": {"main_fast": {"latency_seconds": 10.0, "llm_calls": 4}}}
+    new = {"summary": {"main_fast": {"latency_seconds": 12.0, "llm_calls": 4}}}
+    rows = {metric: regressed for _, metric, _, _, _, regressed in compare(old, new, 0.1)}
+    assert rows == {"latency_seconds": True, "llm_calls": False}
+
+
+if __name__ == "__main__":
+    test_fake_backend_ollama_and_openai()
+    test_latency_model_charges_model_swaps()
+    test_compare_flags_regressions()
+    print("\n🎯 Benchmark tests completed!")
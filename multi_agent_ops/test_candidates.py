@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for parallel coder candidates: streamed validation, first-valid-wins and cancellation
+"""
+
+import time
+
+import pytest
+
+from pipeline.candidates import CandidateRace, Cancelled, check_code
+from pipeline.static_check import extract_code_blocks
+from bench.fake_llm_server import FakeBackend, start_in_thread
+
+VALID = "```python\nprint('ok')\n```"
+BROKEN = "```python\ndef broken(:\n    pass\n```"
+
+
+def scripted(answers):
+    """stream() for CandidateRace: candidate with seed i streams answers[i] as (delay, text) pieces"""
+    closed = set()
+
+    def stream(messages, options, cancelled):
+        seed = options["seed"]
+        try:
+            for delay, text in answers[seed]:
+                time.sleep(delay)
+                if cancelled.is_set():
+                    raise Cancelled()
+                yield text
+        finally:
+            closed.add(seed)
+
+    stream.closed = closed
+    return stream
+
+
+def test_check_code_waits_for_a_closed_block():
+    assert check_code("Here is the code:\n```python\nprint(1)\n") is None
+    assert check_code(VALID) == (True, "")
+    ok, reason = check_code(BROKEN)
+    assert not ok and "syntax-error" in reason
+
+
+def test_options_vary_seed_and_temperature():
+    race = CandidateRace(3, None, {"temperature": 0.0, "max_tokens": 800})
+    options = [race.options_for(i) for i in range(3)]
+    assert [o["seed"] for o in options] == [0, 1, 2]
+    assert options[0]["temperature"] == 0.0 and options[1]["temperature"] != options[2]["temperature"]
+    assert all(o["max_tokens"] == 800 for o in options)
+
+
+def test_first_valid_candidate_wins_and_the_rest_are_cancelled():
+    stream = scripted({
+        0: [(0.0, "```python\n"), (0.3, "print('slow')\n"), (0.3, "```")],   # valid but slow
+        1: [(0.0, BROKEN)],                                                    # fails at once
+        2: [(0.05, "Sure!\n"), (0.05, VALID)],                                 # valid, fastest
+    })
+    race = CandidateRace(3, stream)
+    winner = race.run([{"role": "user", "content": "code"}])
+    assert winner.index == 2 and winner.status == "passed"
+    assert race.candidates[1].status == "failed"
+    time.sleep(0.4)
+    assert race.candidates[0].status == "cancelled"
+    assert stream.closed == {0, 1, 2}
+
+
+def test_first_finished_answer_is_used_when_none_passes():
+    race = CandidateRace(2, scripted({0: [(0.1, BROKEN)], 1: [(0.0, "no code, sorry")]}))
+    winner = race.run("code")
+    assert winner.index == 1 and winner.status == "no code"
+
+
+def test_unexpected_stream_error_finishes_the_candidate():
+    def stream(messages, options, cancelled):
+        if options["seed"] == 0:
+            raise KeyError("choices")
+        yield "no code, sorry"
+
+    race = CandidateRace(2, stream)
+    winner = race.run("code")   # used to wait forever for candidate 0
+    assert winner.index == 1
+    assert race.candidates[0].status == "error" and "KeyError" in race.candidates[0].reason
+
+
+def test_get_profile_tags_the_coder_llm(monkeypatch):
+    from config.profiles import PROFILES, get_profile
+    profile = get_profile("candidates")
+    assert profile["llms"]["coder"]["candidates"] == 3
+    assert "candidates" not in profile["llms"]["planner"]
+    monkeypatch.setitem(PROFILES, "_candidates", dict(PROFILES["candidates"], coder_candidates=0))
+    with pytest.raises(ValueError):
+        get_profile("_candidates")
+
+
+@pytest.fixture
+def fake_server(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+
+    slow_valid = "```python\n" + "# thinking it through\n" * 40 + "print('slow')\n```"
+    backend = FakeBackend(speedup=20, fixtures=[
+        {"match": "python developer", "seed": 0, "response": slow_valid},
+        {"match": "python developer", "seed": 1, "response": BROKEN},
+    ])
+    server, url = start_in_thread(backend)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", url)
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    try:
+        yield backend
+    finally:
+        server.shutdown()
+
+
+def test_llm_races_candidates_on_the_server(fake_server, tmp_path):
+    from config.llm_config import get_llm_for
+
+    llm = get_llm_for({"model": "ollama/llama3.2:3b", "candidates": 3})
+    answer = llm.call([{"role": "system", "content": "You are a Python Developer."},
+                       {"role": "user", "content": "Write a todo app."}])
+    assert "def main():" in answer   # seed 2 gets the canned working code
+    assert "def main():" in (tmp_path / "generated_output.py").read_text()
+    time.sleep(0.5)
+    calls = fake_server.stats()["calls"]
+    assert len(calls) == 3
+    assert sum(1 for c in calls if c.get("cancelled")) >= 1   # the slow candidate was stopped
+
+
+def test_fallback_answer_is_saved_when_none_passes(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+    from config.llm_config import get_llm_for
+
+    server, url = start_in_thread(FakeBackend(speedup=1000, fixtures=[{"match": "python developer", "response": BROKEN}]))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", url)
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    try:
+        llm = get_llm_for({"model": "ollama/llama3.2:3b", "candidates": 2})
+        llm.call([{"role": "system", "content": "You are a Python Developer."},
+                  {"role": "user", "content": "Write a todo app."}])
+    finally:
+        server.shutdown()
+    assert (tmp_path / "generated_output.py").read_text() == extract_code_blocks(BROKEN)[0]
+
+
+def test_crew_coder_answers_with_the_winner(fake_server, tmp_path, monkeypatch):
+    from config.profiles import PROFILES, get_profile
+    from runner.crew_builder import build_crew
+
+    monkeypatch.setenv("OLLAMA_RESIDENCY", "0")
+    monkeypatch.setitem(PROFILES, "_candidates", {
+        "description": "candidates test", "agents": ["planner", "coder"], "coder_candidates": 3,
+        "llms": {"planner": {"model": "ollama/llama3.2:3b"}, "coder": {"model": "ollama/llama3.2:3b"}},
+        "memory": False, "web_search": False, "git": False, "validation": False,
+        "tasks": [{"name": "plan", "agent": "planner", "description": "Plan {query}", "expected_output": "steps"},
+                  {"name": "code", "agent": "coder", "context": ["plan"],
+                   "description": "Write code for {query}", "expected_output": "code"}],
+    })
+    built = build_crew(get_profile("_candidates"), "todo app")
+    built.crew.kickoff()
+    assert "def main():" in built.tasks["code"].output.raw
+    assert "def main():" in (tmp_path / "generated_output.py").read_text()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for float16 / product-quantized vector storage and the migration tool
+"""
+
+import numpy as np
+import pytest
+
+from bench.ann_benchmark import clustered_vectors
+from memory.migrate import disk_bytes, migrate, recall_report
+from memory.numpy_store import NumpyVectorStore
+from memory.pq import ProductQuantizer
+
+DIM = 384
+
+
+def test_pq_roundtrip():
+    vectors = clustered_vectors(1500, DIM)
+    pq = ProductQuantizer(DIM).train(vectors)
+    codes = pq.encode(vectors)
+    assert codes.shape == (1500, 96) and codes.dtype == np.uint8
+    query = vectors[0]
+    assert np.allclose(pq.scores(codes, query), pq.decode(codes) @ query, atol=1e-4)
+    with pytest.raises(ValueError):
+        ProductQuantizer(100, m=48)
+
+
+@pytest.mark.parametrize("encoding,rerank,min_recall", [
+    ("float16", True, 0.99), ("pq", True, 0.95), ("pq", False, 0.5)])
+def test_encodings_keep_recall(tmp_path, encoding, rerank, min_recall):
+    vectors = clustered_vectors(3000, DIM)
+    store = NumpyVectorStore(str(tmp_path), encoding=encoding, rerank=rerank)
+    store.add_texts([str(i) for i in range(3000)], embeddings=vectors)
+    assert recall_report(vectors, store) >= min_recall
+    store.persist()
+    reloaded = NumpyVectorStore(str(tmp_path), encoding=encoding, rerank=rerank)
+    assert (reloaded.pq is not None) == (encoding == "pq")
+    assert (reloaded._matrix is not None) == (encoding != "pq" or rerank)
+    reloaded.add_texts(["late"], embeddings=vectors[:1])   # encoded with the trained codebooks
+    assert len(reloaded) == 3001
+
+
+def test_default_pq_store_meets_the_footprint_target(tmp_path):
+    vectors = clustered_vectors(3000, DIM)
+    store = NumpyVectorStore(str(tmp_path), encoding="pq")
+    store.add_texts([str(i) for i in range(3000)], embeddings=vectors)
+    footprint = store.footprint()
+    assert footprint["code_bytes"] + footprint["vector_bytes"] == 480   # 96 B codes + 384 B int8 re-rank rows
+    assert footprint["float32_bytes"] / 480 == 3.2
+    assert store._matrix.dtype == np.int8
+    assert recall_report(vectors, store) >= 0.95
+    store.persist()
+    assert disk_bytes(str(tmp_path)) < 3000 * DIM * 4 / 2.5          # codebooks included
+    reloaded = NumpyVectorStore(str(tmp_path), encoding="pq")
+    assert reloaded.pq.scales is not None and recall_report(vectors, reloaded) >= 0.95
+
+
+def test_migrating_a_small_store_never_grows_it(tmp_path):
+    vectors = clustered_vectors(300, DIM)
+    source = NumpyVectorStore(str(tmp_path / "f32"))
+    source.add_texts([str(i) for i in range(300)], embeddings=vectors)
+    source.persist()
+    report = migrate(str(tmp_path / "f32"), str(tmp_path / "pq"), "pq")
+    assert report["bytes_per_vector"] == DIM * 2                       # float16 until PQ_MIN_ROWS
+    assert report["disk_bytes"] < report["float32_disk_bytes"] / 1.9 and report["recall@10"] >= 0.99
+
+
+def test_pq_store_trains_once_enough_rows(tmp_path):
+    store = NumpyVectorStore(str(tmp_path), encoding="pq", rerank=False)
+    store.add_texts(["a", "b"], embeddings=clustered_vectors(2, DIM))
+    assert store.pq is None and store._matrix is not None
+    store.add_texts([str(i) for i in range(1100)], embeddings=clustered_vectors(1100, DIM, seed=3))
+    assert store.pq is not None and store._matrix is None
+    assert store.footprint()["code_bytes"] == 96
+
+
+def test_migrate_from_chroma(tmp_path):
+    chromadb = pytest.importorskip("chromadb")
+    vectors = clustered_vectors(1200, DIM)
+    ids = [str(i) for i in range(1200)]
+    client = chromadb.PersistentClient(path=str(tmp_path / "vector_db"))
+    collection = client.create_collection("agent_memory")
+    collection.add(ids=ids, embeddings=vectors.tolist(), documents=ids, metadatas=[{"i": i} for i in range(1200)])
+
+    report = migrate(str(tmp_path / "vector_db"), str(tmp_path / "pq"), "pq", rerank=False)
+    assert report["vectors"] == 1200 and report["bytes_per_vector"] == 96
+    assert report["compression"] == 16 and report["recall@10"] > 0.3
+    report = migrate(str(tmp_path / "pq"), str(tmp_path / "f16"), "float16")
+    assert report["vector_bytes"] == DIM * 2 and report["compression"] == 2
+    assert report["disk_bytes"] < report["float32_disk_bytes"] / 1.9
+    store = NumpyVectorStore(str(tmp_path / "f16"))
+    assert store.get()["metadatas"][5] == {"i": 5}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for token-budgeted context assembly
+"""
+
+import pytest
+
+from pipeline.context_budget import (
+    ContextAssembler, Section, allocate, count_tokens, fit_memory, fit_sections,
+    prompt_budget, register_tokenizer, trim_extractive, _tokenizers,
+)
+
+FAST = {"model": "ollama/llama3.2:3b", "max_tokens": 500}
+
+
+class FakeAgent:
+    role = "Python Developer"
+    goal = "Write code"
+    backstory = "You write code."
+    tools = []
+
+
+class FakeTask:
+    def __init__(self, description):
+        self.description = description
+        self.agent = FakeAgent()
+        self.context = None
+        self.callback = None
+
+
+class FakeOutput:
+    def __init__(self, raw):
+        self.raw = raw
+
+
+def _filler(topic, paragraphs):
+    return "\n\n".join(f"Paragraph {i} about {topic} " + "lorem ipsum dolor " * 20 for i in range(paragraphs))
+
+
+def test_token_counts_per_model():
+    text = "def add(a, b):\n    return a + b\n" * 10
+    assert count_tokens(text, "ollama/qwen2.5-coder:7b") > count_tokens(text, "ollama/llama3.1:8b")
+    register_tokenizer("fake-model", lambda t: len(t.split()))
+    try:
+        assert count_tokens("one two three", "fake-model") == 3
+    finally:
+        del _tokenizers["fake-model"]
+    assert prompt_budget(FAST) < prompt_budget({"model": "ollama/llama3.1:8b", "num_ctx": 8192})
+
+
+def test_allocate_redistributes_unused_share():
+    alloc = allocate({"small": 10, "big": 1000, "other": 1000}, {"small": 1, "big": 1, "other": 1}, 310)
+    assert alloc["small"] == 10
+    assert alloc["big"] == alloc["other"] == 150
+
+
+def test_trim_keeps_relevant_paragraphs_in_order():
+    text = "\n\n".join([
+        "Overview of the project.",
+        "Unrelated notes " * 30,
+        "Use sqlite3 for database persistence of todo items.",
+        "More unrelated notes " * 30,
+    ])
+    trimmed = trim_extractive(text, 40, "ollama/llama3.2:3b", query="todo database persistence")
+    assert count_tokens(trimmed, "ollama/llama3.2:3b") <= 40
+    assert "sqlite3" in trimmed and "[...]" in trimmed
+    assert trimmed.index("Overview") < trimmed.index("sqlite3")
+
+
+def test_fit_sections_reports_trimmed_and_dropped():
+    sections = [
+        Section("description", "Write the code.", required=True),
+        Section("plan", _filler("plan", 10), weight=2),
+        Section("research", _filler("research", 10), weight=0.01),
+    ]
+    fitted, report = fit_sections(sections, 300, "ollama/llama3.2:3b")
+    assert fitted["description"] == "Write the code."
+    assert "plan" in report.trimmed and "research" in report.dropped
+    assert report.used <= 300
+
+
+def test_fit_memory_drops_lowest_ranked_first():
+    snippets = [_filler("best", 3), _filler("second", 3), _filler("third", 3)]
+    text = fit_memory(snippets, 200, "ollama/llama3.2:3b")
+    assert "best" in text and "third" not in text
+    assert fit_memory(snippets) == "\n".join(snippets)
+
+
+def test_assembler_rewrites_downstream_description():
+    tasks = {"plan": FakeTask("Plan it"), "research": FakeTask("Research it"), "code": FakeTask("Code it")}
+    specs = [
+        {"name": "plan", "agent": "planner"},
+        {"name": "research", "agent": "researcher", "context": ["plan"]},
+        {"name": "code", "agent": "coder", "context": ["plan", "research"]},
+    ]
+    seen = []
+    tasks["research"].callback = seen.append
+    llms = {"planner": FAST, "researcher": FAST, "coder": FAST}
+    assembler = ContextAssembler().wire(tasks, specs, llms, query="calculator")
+
+    assert tasks["code"].context == [] and tasks["plan"].callback is not None
+    tasks["plan"].callback(FakeOutput("1. parse input\n2. compute"))
+    assert "1. parse input" in tasks["research"].description
+    assert tasks["code"].description == "Code it"  # research not done yet
+
+    tasks["research"].callback(FakeOutput(_filler("research", 40)))
+    assert len(seen) == 1  # existing callback still runs
+    code_prompt = tasks["code"].description
+    assert code_prompt.startswith("Code it") and "### plan" in code_prompt
+    report = assembler.reports["code"]
+    assert "research" in report.trimmed
+    assert count_tokens(code_prompt, FAST["model"]) <= report.budget + 10
+
+
+def test_crew_builder_wires_assembler():
+    pytest.importorskip("crewai")
+    from config.profiles import get_profile
+    from runner.crew_builder import build_crew
+
+    built = build_crew(get_profile("ultra_fast"), "simple calculator")
+    assert built.assembler is not None
+    assert built.tasks["code"].context == []
+    built.tasks["plan"].callback(FakeOutput("Step 1: read numbers"))
+    assert "Step 1: read numbers" in built.tasks["code"].description
+
+
+if __name__ == "__main__":
+    test_token_counts_per_model()
+    test_allocate_redistributes_unused_share()
+    test_trim_keeps_relevant_paragraphs_in_order()
+    test_fit_sections_reports_trimmed_and_dropped()
+    test_fit_memory_drops_lowest_ranked_first()
+    test_assembler_rewrites_downstream_description()
+    print("\n🎯 Context budget tests completed!")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the embedding backends (pooling, batching, parity with the original backend)
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from memory.embeddings import BACKENDS, ONNX_MODEL_DIR, SAMPLE_TEXTS, OnnxEmbeddings, get_embeddings, mean_pool
+
+
+class FakeInput:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeSession:
+    """Token vector = one-hot of the token id; records batch sizes"""
+
+    def __init__(self, dim=16):
+        self.dim = dim
+        self.batches = []
+
+    def get_inputs(self):
+        return [FakeInput("input_ids"), FakeInput("attention_mask")]
+
+    def run(self, _outputs, feeds):
+        assert set(feeds) == {"input_ids", "attention_mask"}
+        self.batches.append(len(feeds["input_ids"]))
+        return [np.eye(self.dim, dtype=np.float32)[feeds["input_ids"]]]
+
+
+class FakeOnnxEmbeddings(OnnxEmbeddings):
+    def _load(self):
+        from tokenizers import Tokenizer
+        from tokenizers.models import WordLevel
+        from tokenizers.pre_tokenizers import Whitespace
+        vocab = {"[PAD]": 0, "[UNK]": 1, "todo": 2, "app": 3, "calculator": 4, "cli": 5}
+        self.tokenizer = Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+        self.tokenizer.pre_tokenizer = Whitespace()
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        self.session = FakeSession()
+
+
+def test_mean_pool_ignores_padding():
+    hidden = np.array([[[1.0, 0.0], [0.0, 1.0], [9.0, 9.0]]], dtype=np.float32)
+    pooled = mean_pool(hidden, np.array([[1, 1, 0]]))
+    assert np.allclose(pooled, [[2 ** -0.5, 2 ** -0.5]])
+
+
+def test_onnx_backend_batches_and_normalizes():
+    model = FakeOnnxEmbeddings(batch_size=2)
+    vectors = np.array(model.embed_documents(["todo app", "cli calculator", "todo", "app todo"]))
+    assert model.session.batches == [2, 2]
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert np.allclose(vectors[0], vectors[3])            # bag of tokens, order-free
+    assert np.allclose(model.embed_query("todo"), vectors[2])
+    assert model.embed_documents([]) == []
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_embeddings("nope")
+    assert {"huggingface", "onnx"} <= set(BACKENDS)
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(ONNX_MODEL_DIR, "model.onnx")),
+                    reason="ONNX model not downloaded (python -m memory.embeddings --download)")
+def test_onnx_matches_huggingface():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("langchain_community")
+    pytest.importorskip("sentence_transformers")
+    reference = np.array(get_embeddings("huggingface").embed_documents(SAMPLE_TEXTS))
+    for quantized in (False, True):
+        vectors = np.array(OnnxEmbeddings(quantized=quantized).embed_documents(SAMPLE_TEXTS))
+        cosine = np.sum(vectors * reference, axis=1)
+        assert cosine.min() > (0.97 if quantized else 0.999)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched git commit pipeline.
+Runs against a local bare repository and a fake GitHub API server - no network needed.
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from tools.git_pipeline import CommitPipeline
+from tools.manifest import WriteManifest
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeGitHubHandler.requests_seen.append((self.path, body))
+        payload = json.dumps({"html_url": f"http://fake-github/pull/{len(self.requests_seen)}"}).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def make_repo(root):
+    """Bare 'origin' plus a working clone with one commit on main"""
+    bare = os.path.join(root, "origin.git")
+    work = os.path.join(root, "work")
+    git(root, "init", "--bare", "-b", "main", bare)
+    git(root, "clone", bare, work)
+    git(work, "config", "user.email", "agent@example.com")
+    git(work, "config", "user.name", "Agent")
+    git(work, "checkout", "-b", "main")
+    with open(os.path.join(work, "README.md"), "w") as f:
+        f.write("base\n")
+    git(work, "add", "README.md")
+    git(work, "commit", "-m", "base")
+    git(work, "push", "origin", "main")
+    return bare, work
+
+
+def test_batched_commit_to_run_branch():
+    """Only manifest files are committed, in one commit, on the run branch"""
+    print("🧪 Testing batched commit pipeline")
+    server = HTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeGitHubHandler.requests_seen = []
+
+    with tempfile.TemporaryDirectory() as root:
+        bare, work = make_repo(root)
+        manifest = WriteManifest()
+        for name in ["app.py", "utils.py"]:
+            path = os.path.join(work, name)
+            with open(path, "w") as f:
+                f.write(f"# {name}\n")
+            manifest.record(path)
+        # An unrelated file in the working tree must NOT be committed
+        with open(os.path.join(work, "scratch.txt"), "w") as f:
+            f.write("not part of the run\n")
+
+        pipeline = CommitPipeline(
+            repo_dir=work,
+            branch="agent/run-test",
+            github_repo="owner/repo",
+            github_token="fake-token",
+            api_url=f"http://127.0.0.1:{server.server_port}",
+            manifest=manifest,
+        )
+        pipeline.queue("Add app")
+        pipeline.queue("Add utils")
+        result = pipeline.flush()
+        pr_url = result.wait_for_pr(timeout=10)
+
+        files = git(bare, "ls-tree", "-r", "--name-only", "agent/run-test").split("\n")
+        assert sorted(files) == ["README.md", "app.py", "utils.py"], files
+        assert git(bare, "rev-list", "--count", "main..agent/run-test") == "1"
+        assert git(bare, "rev-parse", "main") == git(work, "rev-parse", "HEAD")
+        assert "scratch.txt" in git(work, "status", "--porcelain")
+        assert manifest.files() == []
+
+        path, body = FakeGitHubHandler.requests_seen[0]
+        assert path == "/repos/owner/repo/pulls"
+        assert body["head"] == "agent/run-test" and body["base"] == "main"
+        assert body["title"] == "Add app"
+        assert pr_url == "http://fake-github/pull/1"
+
+    server.shutdown()
+    print("✅ Batched commit test passed")
+
+
+def test_flush_without_files_is_noop():
+    with tempfile.TemporaryDirectory() as root:
+        bare, work = make_repo(root)
+        pipeline = CommitPipeline(repo_dir=work, branch="agent/run-empty", manifest=WriteManifest())
+        pipeline.queue("Nothing written")
+        assert pipeline.flush() is None
+        assert "agent/run-empty" not in git(bare, "branch", "--list")
+
+
+def test_deleted_files_are_committed_as_removals():
+    with tempfile.TemporaryDirectory() as root:
+        bare, work = make_repo(root)
+        manifest = WriteManifest()
+        for name in ["README.md", "scratch.py"]:   # one tracked file, one never committed
+            path = os.path.join(work, name)
+            with open(path, "w") as f:
+                f.write("x\n")
+            manifest.record(path)
+            os.remove(path)
+        manifest.record(os.path.join(work, "app.py"))
+        with open(os.path.join(work, "app.py"), "w") as f:
+            f.write("print('app')\n")
+        pipeline = CommitPipeline(repo_dir=work, branch="agent/run-delete", manifest=manifest)
+        pipeline.queue("Replace README with app")
+        assert pipeline.pending_files() == ["README.md", "scratch.py", "app.py"]
+        pipeline.flush(open_pr=False)
+        assert git(bare, "ls-tree", "-r", "--name-only", "agent/run-delete") == "app.py"
+
+
+def test_unflushed_commits_are_flushed_at_exit():
+    import tools.git_pipeline as git_pipeline
+    with tempfile.TemporaryDirectory() as root:
+        bare, work = make_repo(root)
+        manifest = WriteManifest()
+        with open(os.path.join(work, "app.py"), "w") as f:
+            f.write("print('app')\n")
+        manifest.record(os.path.join(work, "app.py"))
+        git_pipeline._pipeline = CommitPipeline(repo_dir=work, branch="agent/run-exit", manifest=manifest,
+                                                github_repo="", github_token="")
+        git_pipeline._pipeline.queue("Add app")
+        git_pipeline._flush_at_exit()
+        assert git_pipeline._pipeline is None
+        assert "app.py" in git(bare, "ls-tree", "-r", "--name-only", "agent/run-exit")
+
+
+if __name__ == "__main__":
+    test_batched_commit_to_run_branch()
+    test_flush_without_files_is_noop()
+    test_deleted_files_are_committed_as_removals()
+    test_unflushed_commits_are_flushed_at_exit()
+    print("\n🎯 Git pipeline tests completed!")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite job queue: priorities, leases and heartbeats, retries with
+backoff, dead letters, and several worker processes sharing one queue file
+"""
+
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from runner.job_queue import JobQueue, work
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs"), retry_base=0.2, retry_max=1.0)
+
+
+def test_directory_path_holds_the_database(queue, tmp_path):
+    assert queue.path == str(tmp_path / "jobs" / "jobs.sqlite")
+    assert os.path.exists(queue.path)
+
+
+def test_higher_priority_first_then_oldest(queue):
+    low = queue.submit("todo app", "local")
+    high = queue.submit("calculator", "fast", priority=5)
+    later = queue.submit("file counter", "local")
+    assert [queue.lease("w")["id"] for _ in range(3)] == [high, low, later]
+    assert queue.lease("w") is None
+    assert queue.stats() == {"queued": 0, "running": 3, "done": 0, "dead": 0}
+
+
+def test_complete_writes_result_and_trace(queue):
+    queue.submit("todo app", "local")
+    job = queue.lease("w")
+    assert queue.complete(job, "print('done')", "/tmp/trace.jsonl", '{"kind": "crew"}\n')
+    stored = queue.get(job["id"])
+    assert stored["status"] == "done" and stored["result"] == "print('done')"
+    assert stored["trace"] == '{"kind": "crew"}\n' and stored["lease_owner"] is None
+
+
+def test_expired_lease_is_taken_over(queue):
+    queue.submit("todo app", "local")
+    first = queue.lease("w1", lease_seconds=0.1)
+    assert queue.lease("w2") is None           # still leased
+    time.sleep(0.15)
+    second = queue.lease("w2")
+    assert second["id"] == first["id"] and second["attempts"] == 2
+    assert not queue.heartbeat(first)          # the first worker lost it
+    assert not queue.complete(first, "late")
+    assert queue.complete(second, "ok")
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    queue.submit("todo app", "local")
+    job = queue.lease("w1", lease_seconds=0.2)
+    for _ in range(3):
+        time.sleep(0.1)
+        assert queue.heartbeat(job, lease_seconds=0.2)
+    assert queue.lease("w2") is None
+
+
+def test_failures_back_off_then_dead_letter(queue):
+    job_id = queue.submit("todo app", "local", max_attempts=2)
+    job = queue.lease("w")
+    queue.fail(job, "ollama down")
+    assert queue.get(job_id)["status"] == "queued"
+    assert queue.lease("w") is None            # backing off
+    time.sleep(0.25)
+    job = queue.lease("w")
+    assert job["attempts"] == 2
+    queue.fail(job, "ollama still down")
+    dead = queue.dead_letters()
+    assert [j["id"] for j in dead] == [job_id] and dead[0]["error"] == "ollama still down"
+    assert queue.requeue(job_id) and queue.lease("w")["attempts"] == 1
+
+
+def test_lease_expiring_on_the_last_attempt_dead_letters(queue):
+    job_id = queue.submit("todo app", "local", max_attempts=1)
+    queue.lease("w1", lease_seconds=0.05)
+    time.sleep(0.1)
+    assert queue.lease("w2") is None
+    assert "lease expired" in queue.get(job_id)["error"]
+
+
+def test_worker_retries_crashed_runs(queue):
+    calls = []
+
+    def flaky(profile, query, run_id):
+        calls.append(run_id)
+        if len(calls) == 1:
+            raise RuntimeError("crew crashed")
+        return f"{profile}: {query}"
+
+    job_id = queue.submit("todo app", "local")
+    queue.retry_base = 0.0
+    assert work(queue, run=flaky, worker="w", exit_when_idle=True) == 2
+    assert calls == [f"job-{job_id}-1", f"job-{job_id}-2"]
+    assert queue.get(job_id)["result"] == "local: todo app"
+
+
+def slow_run(profile, query, run_id):
+    time.sleep(0.05)
+    if query.startswith("bad"):
+        return None
+    return f"{profile}: {query}"
+
+
+def _worker(path):
+    work(JobQueue(path, retry_base=0.0), run=slow_run, lease_seconds=5, poll=0.01, exit_when_idle=True)
+
+
+def test_worker_processes_share_the_queue(queue):
+    for i in range(20):
+        queue.submit(f"project {i}", "local", priority=i % 3)
+    queue.submit("bad project", "local", max_attempts=2)
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_worker, args=(queue.path,)) for _ in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    done = queue.jobs("done")
+    assert len(done) == 20 and all(job["attempts"] == 1 for job in done)   # each job ran exactly once
+    assert [job["query"] for job in queue.dead_letters()] == ["bad project"]
+
+
+def test_worker_runs_the_crew_and_stores_its_trace(queue, monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+    from bench.fake_llm_server import FakeBackend, start_in_thread
+    from config.profiles import PROFILES
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OLLAMA_RESIDENCY", "0")
+    monkeypatch.setitem(PROFILES, "_queued", {
+        "description": "job queue test", "agents": ["planner"], "llms": {"planner": {"model": "ollama/llama3.2:3b"}},
+        "memory": False, "web_search": False, "git": False, "validation": False,
+        "tasks": [{"name": "plan", "agent": "planner", "description": "Plan {query}", "expected_output": "steps"}],
+    })
+    server, url = start_in_thread(FakeBackend(speedup=1000))
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", url)
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    try:
+        job_id = queue.submit("todo app", "_queued")
+        assert work(queue, worker="w", exit_when_idle=True) == 1
+    finally:
+        server.shutdown()
+    job = queue.get(job_id)
+    assert job["status"] == "done" and job["result"]
+    assert job["trace_path"].endswith(f"job-{job_id}-1.jsonl") and '"kind": "crew"' in job["trace"]
+    from memory.memory_store import memory
+    assert memory.scope(f"job-{job_id}-1").retrieve("plan")   # task outputs saved under the job's run id
+    assert (tmp_path / "runs" / "work" / f"job-{job_id}-1").is_dir()
+
+
+def test_failed_run_records_the_error(queue, monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import runner.runner as runner
+    from config.profiles import PROFILES
+
+    def kickoff(crew, retries):
+        raise RuntimeError("model 'llama3.2:3b' not found")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OLLAMA_RESIDENCY", "0")
+    monkeypatch.setattr(runner, "kickoff_with_retry", kickoff)
+    monkeypatch.setitem(PROFILES, "_failing", {
+        "description": "job queue failure test", "agents": ["planner"], "llms": {"planner": {"model": "ollama/llama3.2:3b"}},
+        "memory": False, "web_search": False, "git": False, "validation": False,
+        "tasks": [{"name": "plan", "agent": "planner", "description": "Plan {query}", "expected_output": "steps"}],
+    })
+    job_id = queue.submit("todo app", "_failing", max_attempts=1)
+    assert work(queue, worker="w", exit_when_idle=True) == 1
+    assert queue.get(job_id)["error"] == "RuntimeError: model 'llama3.2:3b' not found"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the scoped, bounded key-value memory store
+"""
+
+import asyncio
+import multiprocessing
+import threading
+
+import pytest
+
+from memory.memory_store import MemoryStore
+
+
+def test_scopes_are_isolated():
+    store = MemoryStore()
+    run_a, run_b = store.scope("run-a"), store.scope("run-b")
+    run_a.save("plan", "plan A")
+    run_b.save("plan", "plan B")
+    assert run_a.retrieve("plan") == "plan A"
+    assert run_b.retrieve("plan") == "plan B"
+    assert store.retrieve("plan") is None
+    run_a.clear()
+    assert run_a.all() == {} and run_b.all() == {"plan": "plan B"}
+
+
+def test_lru_bounds():
+    store = MemoryStore(max_entries=2)
+    store.save("a", "1")
+    store.save("b", "2")
+    store.retrieve("a")          # a is now the most recently used
+    store.save("c", "3")
+    assert store.all() == {"a": "1", "c": "3"}
+
+    small = MemoryStore(max_bytes=10)
+    small.save("x", "12345")
+    small.save("y", "123456")
+    assert small.all() == {"y": "123456"}
+
+
+def test_threads_and_async():
+    store = MemoryStore(max_entries=10000)
+
+    def writer(n):
+        for i in range(200):
+            store.scope(f"t{n}").save(str(i), f"{n}-{i}")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(len(store.scope(f"t{n}").all()) == 200 for n in range(8))
+
+    async def roundtrip():
+        await store.asave("async", "value")
+        return await store.aretrieve("async")
+    assert asyncio.run(roundtrip()) == "value"
+
+
+def _write_from_child(path):
+    MemoryStore(path=path).scope("batch-1").save("plan", "written by another process")
+
+
+def test_sqlite_shared_across_processes(tmp_path):
+    path = str(tmp_path / "memory.db")
+    child = multiprocessing.get_context("spawn").Process(target=_write_from_child, args=(path,))
+    child.start()
+    child.join(60)
+    assert child.exitcode == 0
+    store = MemoryStore(path=path, max_entries=2)
+    assert store.scope("batch-1").retrieve("plan") == "written by another process"
+    store.save("a", "1")
+    store.save("b", "2")
+    assert store.scope("batch-1").retrieve("plan") is None  # evicted: least recently used
+
+
+def test_crew_saves_task_outputs_in_run_scope():
+    pytest.importorskip("crewai")
+    from config.profiles import get_profile
+    from runner.crew_builder import build_crew
+
+    class Output:
+        raw = "1. parse input\n2. compute"
+
+    profile = {**get_profile("local"), "memory": False}
+    built = build_crew(profile, "simple calculator", run_id="run-test")
+    built.tasks["plan"].callback(Output())
+    assert built.store.namespace == "run-test"
+    assert built.store.retrieve("plan") == Output.raw
+
+
+def test_sqlite_evicts_least_recently_used(tmp_path):
+    store = MemoryStore(path=str(tmp_path / "memory.db"), max_entries=3, max_bytes=12)
+    for key in "abc":
+        store.save(key, "1234")
+    store.retrieve("a")                       # a is now the most recently used
+    store.save("d", "1234")
+    assert sorted(store.all()) == ["a", "c", "d"]
+    store.save("e", "123456789012")           # over max_bytes: everything older goes
+    assert store.all() == {"e": "123456789012"}
+    store.save("f", "1" * 20)                 # the row just saved is never evicted
+    assert store.all() == {"f": "1" * 20}
+
+
+@pytest.mark.parametrize("layout", ["inline", "stable"])
+def test_coder_reads_the_plan_by_key(layout):
+    pytest.importorskip("crewai")
+    from config.profiles import get_profile
+    from runner.crew_builder import PLAN_POINTER, build_crew
+
+    class Output:
+        raw = "1. parse input\n2. compute"
+
+    profile = get_profile("local")
+    tasks = [dict(spec, context=["research"]) if spec["name"] == "code" else spec for spec in profile["tasks"]]
+    profile = {**profile, "memory": False, "prompt_layout": layout, "tasks": tasks}
+    built = build_crew(profile, "simple calculator", run_id=f"run-plan-{layout}")
+    coder, code = built.agents["coder"], built.tasks["code"]
+    assert "No plan provided" not in coder.backstory + code.description
+    assert PLAN_POINTER in code.description
+    reader = next(tool for tool in coder.tools if tool.name == "read_run_output")
+    assert reader.run(key="plan").startswith("No output saved under 'plan'")
+    built.tasks["plan"].callback(Output())
+    assert reader.run(key="plan") == Output.raw
+    assert Output.raw not in coder.backstory + code.description   # fetched by key, never pasted
+
+
+def test_coder_context_already_has_the_plan():
+    pytest.importorskip("crewai")
+    from config.profiles import get_profile
+    from runner.crew_builder import PLAN_POINTER, build_crew
+
+    built = build_crew({**get_profile("local"), "memory": False}, "simple calculator", run_id="run-context")
+    assert PLAN_POINTER not in built.tasks["code"].description
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_scopes_are_isolated()
+    test_lru_bounds()
+    test_threads_and_async()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_sqlite_shared_across_processes(Path(tmp))
+    print("\n🎯 Memory store tests completed!")
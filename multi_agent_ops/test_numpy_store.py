@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the NumPy vector store engine (and parity with Chroma)
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pytest
+
+from memory.numpy_store import NumpyVectorStore, top_k
+
+DIM = 32
+
+
+class HashEmbeddings:
+    """Deterministic pseudo-random vector per text"""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        seed = int(hashlib.sha1(text.encode()).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).normal(size=DIM).tolist()
+
+
+def _random(n, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_top_k():
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+    assert top_k(scores, 0).tolist() == []
+
+
+def test_add_search_persist_reload(tmp_path):
+    store = NumpyVectorStore(str(tmp_path / "numpy"), HashEmbeddings())
+    assert store.similarity_search("anything") == []
+    texts = [f"memory {i}" for i in range(100)]      # grows past the initial capacity
+    store.add_texts(texts, metadatas=[{"i": i} for i in range(100)])
+    hits = store.similarity_search("memory 42", k=3)
+    assert hits[0].page_content == "memory 42" and hits[0].metadata == {"i": 42}
+    store.persist()
+
+    reloaded = NumpyVectorStore(str(tmp_path / "numpy"), HashEmbeddings())
+    assert isinstance(reloaded._matrix, np.memmap) and len(reloaded) == 100
+    assert reloaded.similarity_search("memory 7", k=1)[0].page_content == "memory 7"
+    reloaded.add_texts(["memory 100"])                 # first add copies the mapping
+    assert len(reloaded) == 101
+    assert reloaded.get(include=["embeddings"])["embeddings"].shape == (101, DIM)
+
+
+def test_persist_appends_new_rows_instead_of_rewriting(tmp_path, monkeypatch):
+    import memory.numpy_store as numpy_store
+    monkeypatch.setattr(numpy_store, "COMPACT_MIN_ROWS", 8)
+    path = tmp_path / "numpy"
+    store = NumpyVectorStore(str(path), HashEmbeddings(), dtype=np.float16)
+    store.add_texts(["memory 0"])
+    store.persist()                                    # first save writes the base files
+    base = (path / "vectors.npy").stat().st_mtime_ns
+    for i in range(1, 9):
+        store.add_texts([f"memory {i}"], metadatas=[{"i": i}])
+        store.persist()
+    assert (path / "vectors.npy").stat().st_mtime_ns == base
+    assert (path / "vectors.log").stat().st_size == 8 * DIM * 2
+
+    reloaded = NumpyVectorStore(str(path), HashEmbeddings())
+    assert len(reloaded) == 9 and reloaded.docs == store.docs
+    assert reloaded.similarity_search("memory 5", k=1)[0].metadata == {"i": 5}
+    np.testing.assert_array_equal(reloaded.vectors, store.vectors)
+
+    reloaded.add_texts(["memory 9"])
+    reloaded.persist()                                 # logs outgrew the base: rewritten, logs dropped
+    assert not (path / "vectors.log").exists() and not (path / "docs.log").exists()
+    assert len(NumpyVectorStore(str(path), HashEmbeddings())) == 10
+
+
+def test_torn_or_stale_logs_are_ignored(tmp_path):
+    path = tmp_path / "numpy"
+    store = NumpyVectorStore(str(path), HashEmbeddings())
+    store.add_texts(["memory 0", "memory 1"])
+    store.persist()
+    store.add_texts(["memory 2", "memory 3"])
+    store.persist()
+    with open(path / "vectors.log", "r+b") as f:
+        f.truncate(f.seek(0, 2) - 5)                   # crash in the middle of the last row
+    assert [d["text"] for d in NumpyVectorStore(str(path), HashEmbeddings()).docs] == [
+        "memory 0", "memory 1", "memory 2"]
+
+    store._write_all()                                 # a rewrite that crashed before dropping the logs
+    np.asarray(store.vectors[2:3]).tofile(path / "vectors.log")
+    with open(path / "docs.log", "w") as f:
+        f.write(json.dumps({"base": 2}) + "\n" + json.dumps({"id": "x", "text": "memory 2", "metadata": {}}) + "\n")
+    assert len(NumpyVectorStore(str(path), HashEmbeddings())) == 4
+
+
+def test_batch_matches_single_queries_and_float16(tmp_path):
+    vectors = _random(500)
+    texts = [str(i) for i in range(500)]
+    store32 = NumpyVectorStore(str(tmp_path / "a"))
+    store16 = NumpyVectorStore(str(tmp_path / "b"), dtype=np.float16)
+    for store in (store32, store16):
+        store.add_texts(texts, embeddings=vectors)
+    queries = _random(20, seed=1)
+    batch = store32.similarity_search_by_vector_batch(queries, k=5)
+    for query, hits in zip(queries, batch):
+        single = store32.similarity_search_by_vector_batch([query], k=5)[0]
+        assert [d.page_content for d in hits] == [d.page_content for d in single]
+    half = store16.similarity_search_by_vector_batch(queries, k=5)
+    overlap = np.mean([len({d.page_content for d in a} & {d.page_content for d in b}) / 5
+                       for a, b in zip(batch, half)])
+    assert overlap >= 0.9
+
+
+def test_vector_memory_numpy_engine(tmp_path, monkeypatch):
+    import memory.summaries as summaries
+    from memory.vector_store import VectorMemory
+
+    class NoSummaries:
+        def submit(self, text):
+            pass
+
+    monkeypatch.setattr(summaries, "_summary_store", NoSummaries())
+    memory = VectorMemory(str(tmp_path), engine="numpy", embeddings=HashEmbeddings())
+    memory.add("Flask todo app plan", {"agent": "Planner"})
+    memory.add("CLI calculator plan")
+    assert memory.search("CLI calculator plan", k=1)[0].page_content == "CLI calculator plan"
+    many = memory.search_many(["Flask todo app plan", "CLI calculator plan"], k=1)
+    assert [hits[0].page_content for hits in many] == ["Flask todo app plan", "CLI calculator plan"]
+
+
+def test_parity_with_chroma(tmp_path):
+    chromadb = pytest.importorskip("chromadb")
+    vectors = _random(300)
+    ids = [str(i) for i in range(300)]
+    collection = chromadb.PersistentClient(path=str(tmp_path / "chroma")).create_collection("parity")
+    collection.add(ids=ids, embeddings=vectors.tolist(), documents=ids)
+    store = NumpyVectorStore(str(tmp_path / "numpy"))
+    store.add_texts(ids, embeddings=vectors, ids=ids)
+
+    queries = _random(10, seed=2)
+    expected = collection.query(query_embeddings=queries.tolist(), n_results=5)["documents"]
+    actual = store.similarity_search_by_vector_batch(queries, k=5)
+    assert [[d.page_content for d in hits] for hits in actual] == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for the Ollama host balancer: model-aware least-outstanding picks, stickiness,
+health checks and batch throughput over several fake hosts
+"""
+
+import time
+
+import pytest
+import requests
+
+from bench.fake_llm_server import FakeBackend, start_in_thread
+from config.ollama_balancer import OllamaBalancer, sticky
+
+MODEL = "ollama/llama3.2:3b"
+
+
+@pytest.fixture
+def hosts():
+    backends = [FakeBackend(speedup=1000) for _ in range(3)]
+    servers = [start_in_thread(backend) for backend in backends]
+    try:
+        yield backends, [url for _, url in servers]
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+
+
+def test_prefers_hosts_with_the_model_resident(hosts):
+    _, urls = hosts
+    requests.post(f"{urls[2]}/api/generate", json={"model": "llama3.2:3b", "prompt": ""})   # preload
+    balancer = OllamaBalancer(urls)
+    assert balancer.pick(MODEL).url == urls[2]
+    assert balancer.pick("ollama/llama3.1:8b").url == urls[0]
+
+
+def test_least_outstanding_spreads_new_runs(hosts):
+    _, urls = hosts
+    balancer = OllamaBalancer(urls)
+    leases = [balancer.lease(MODEL, use_sticky=False) for _ in range(3)]
+    picked = [lease.__enter__() for lease in leases]
+    assert sorted(picked) == sorted(urls)
+    for lease in leases:
+        lease.__exit__(None, None, None)
+    assert all(host["outstanding"] == 0 for host in balancer.stats().values())
+
+
+def test_runs_stick_to_their_host(hosts):
+    _, urls = hosts
+    balancer = OllamaBalancer(urls)
+    first = balancer.pick(MODEL, "run-a")
+    first.outstanding = 5   # busy now, but the run's prompt cache is there
+    assert balancer.pick(MODEL, "run-b") is not first
+    with sticky("run-a"):
+        with balancer.lease(MODEL) as url:
+            assert url == first.url
+
+
+def test_unhealthy_hosts_are_skipped(hosts):
+    _, urls = hosts
+    balancer = OllamaBalancer(urls + ["http://127.0.0.1:9"], check_interval=0)
+    chosen = {balancer.pick(MODEL, key=f"run-{i}").url for i in range(8)}
+    assert "http://127.0.0.1:9" not in chosen
+    assert not balancer.stats()["http://127.0.0.1:9"]["healthy"]
+
+
+def test_batch_throughput_scales_with_hosts(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+    import config.ollama_balancer as ollama_balancer
+    from config.profiles import PROFILES
+    from runner.batch import run_batch
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(PROFILES, "_balanced", {
+        "description": "balancer test", "agents": ["planner"], "llms": {"planner": {"model": MODEL}},
+        "memory": False, "web_search": False, "git": False, "validation": False,
+        "tasks": [{"name": "plan", "agent": "planner", "description": "Plan {query}", "expected_output": "steps"}],
+    })
+    queries = ["todo app", "calculator", "file counter"]
+
+    def timed(n):
+        backends = [FakeBackend(speedup=5, parallel=1) for _ in range(n)]   # model time dominates run overhead
+        servers = [start_in_thread(backend) for backend in backends]
+        urls = [url for _, url in servers]
+        monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", urls[0])
+        monkeypatch.setattr(llm_config, "_llm_instances", {})
+        monkeypatch.setattr(ollama_balancer, "OLLAMA_HOSTS", urls)
+        try:
+            start = time.perf_counter()
+            results = run_batch("_balanced", queries)
+            assert all(results.values())
+            return time.perf_counter() - start, [len(b.stats()["calls"]) for b in backends]
+        finally:
+            for server, _ in servers:
+                server.shutdown()
+
+    one, calls_one = timed(1)
+    three, calls_three = timed(3)
+    assert calls_one == [3] and calls_three == [1, 1, 1]
+    assert three < one * 0.75
+
+
+def test_concurrent_batch_queries_keep_their_own_files(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+    import config.ollama_balancer as ollama_balancer
+    from config.profiles import PROFILES
+    from runner.batch import run_batch
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(PROFILES, "_balanced_code", {
+        "description": "concurrent coder test", "agents": ["planner", "coder"], "coder_candidates": 2,
+        "llms": {"planner": {"model": MODEL}, "coder": {"model": MODEL}},
+        "memory": False, "web_search": False, "git": False, "validation": False,
+        "tasks": [{"name": "plan", "agent": "planner", "description": "Plan {query}", "expected_output": "steps"},
+                  {"name": "code", "agent": "coder", "context": ["plan"],
+                   "description": "Write code for {query}", "expected_output": "code"}],
+    })
+    queries = ["todo app", "calculator", "file counter"]
+    fixtures = [{"match": f"project: {query}", "response": f"```python\nprint({query!r})\n```"}
+                for query in queries]
+    backends = [FakeBackend(speedup=1000, fixtures=fixtures) for _ in range(3)]
+    servers = [start_in_thread(backend) for backend in backends]
+    urls = [url for _, url in servers]
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", urls[0])
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    monkeypatch.setattr(ollama_balancer, "OLLAMA_HOSTS", urls)
+    try:
+        results = run_batch("_balanced_code", queries)
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+
+    assert all(results.values())
+    workspaces = sorted((tmp_path / "runs" / "work").iterdir())
+    assert len(workspaces) == 3
+    written = sorted((w / "generated_output.py").read_text() for w in workspaces)
+    assert written == sorted(f"print({query!r})\n" for query in queries)
+    assert not (tmp_path / "generated_output.py").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory snapshot and the multi-process crew pool
+"""
+
+import os
+import queue
+
+import numpy as np
+import pytest
+
+from memory.snapshot import SnapshotMemory, write_snapshot
+
+TEXTS = ["Flask todo app with SQLite storage", "CLI calculator using argparse", "Password generator script"]
+
+
+def _snapshot(path):
+    vectors = np.eye(3, 8, dtype=np.float32)
+    return write_snapshot(str(path / "snapshot"), TEXTS, [{"i": i} for i in range(3)], vectors,
+                          queries=["calculator"], query_vectors=vectors[1:2] * 3)
+
+
+def test_snapshot_search_is_memory_mapped(tmp_path):
+    memory = SnapshotMemory(_snapshot(tmp_path))
+    assert isinstance(memory.vectors, np.memmap)
+    hits = memory.search("calculator", k=1)               # cached embedding: cosine
+    assert hits[0].page_content == TEXTS[1] and hits[0].metadata == {"i": 1}
+    hits = memory.search("todo app storage", k=2)         # not cached: BM25
+    assert hits[0].page_content == TEXTS[0] and len(hits) == 1
+    assert memory.search("nothing matches", k=3) == []
+
+
+def test_snapshot_writes_go_to_writer_queue(tmp_path):
+    writes = queue.Queue()
+    memory = SnapshotMemory(_snapshot(tmp_path), writer=writes)
+    memory.add("new plan", {"agent": "Planner"})
+    assert writes.get_nowait() == ("add", "new plan", {"agent": "Planner"})
+    _snapshot(tmp_path)  # re-export replaces the directory
+    assert len(SnapshotMemory(str(tmp_path / "snapshot"))) == 3
+
+
+def test_snapshot_holds_documents_and_lexical_index_as_mapped_arrays(tmp_path):
+    memory = SnapshotMemory(_snapshot(tmp_path))
+    assert len(memory) == 3 and not any(name.endswith(".json") and name != "queries.json"
+                                        for name in os.listdir(memory.path))
+    for array in (memory.texts, memory.metadata, memory.terms, memory.posting_docs, memory.posting_tf):
+        assert isinstance(array, np.memmap)
+    assert memory.document(2).page_content == TEXTS[2] and memory.document(2).metadata == {"i": 2}
+    scores = memory._bm25("calculator argparse")
+    assert scores.argmax() == 1 and scores[0] == scores[2] == 0
+
+
+def test_worker_init_installs_snapshot(tmp_path, monkeypatch):
+    import memory.memory_store as memory_store
+    import memory.summaries as summaries
+    import memory.vector_store as vector_store
+    from runner.pool import _init_worker
+    monkeypatch.setattr(vector_store, "_vector_memory", None)
+    monkeypatch.setattr(memory_store.memory, "_backend", memory_store.memory._backend)   # restored afterwards
+    monkeypatch.setenv("MEMORY_DB", str(tmp_path / "memory.sqlite"))
+    monkeypatch.setattr(summaries, "_summary_store", summaries.SummaryStore(str(tmp_path / "summaries.json")))
+    monkeypatch.setenv("OLLAMA_RESIDENCY", "1")
+    writes = queue.Queue()
+    _init_worker(_snapshot(tmp_path), writes)
+    assert isinstance(vector_store.get_vector_memory(), SnapshotMemory)
+    assert os.environ["OLLAMA_RESIDENCY"] == "0"
+    memory_store.memory.scope("pool-1").save("plan", "shared plan")   # workers share one SQLite store
+    assert memory_store.MemoryStore(path=str(tmp_path / "memory.sqlite")).scope("pool-1").retrieve("plan") == "shared plan"
+    summaries.get_summary_store().submit("a long plan")   # summarized by the writer, not in the worker
+    assert writes.get_nowait() == ("summarize", "a long plan", {})
+    assert summaries.get_summary_store().pending() == 0
+
+
+def test_writer_applies_summaries(tmp_path, monkeypatch):
+    import memory.summaries as summaries
+    from runner.pool import _writer_loop
+    store = summaries.SummaryStore(str(tmp_path / "summaries.json"), summarize_fn=summaries.extractive_summarizer)
+    monkeypatch.setattr(summaries, "_summary_store", store)
+    writes = queue.Queue()
+    writes.put(("summarize", "Plan: build a todo app. Use Flask.", {}))
+    writes.put(None)
+    _writer_loop(writes)
+    assert store.get("Plan: build a todo app. Use Flask.")["line"]
+    assert os.path.exists(tmp_path / "summaries.json")
+
+
+def test_pool_runs_queries_in_worker_processes(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from bench.fake_llm_server import FakeBackend, start_in_thread
+    from runner.pool import CrewPool
+
+    backend = FakeBackend(speedup=1000)
+    server, url = start_in_thread(backend)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OLLAMA_BASE_URL", url)  # read by llm_config when workers import it
+    try:
+        with CrewPool("ultra_fast", workers=2) as pool:
+            results = pool.map(["todo app", "calculator"])
+        assert all(results.values())
+        assert len(backend.stats()["calls"]) >= 2
+    finally:
+        server.shutdown()
+    workspaces = list((tmp_path / "runs" / "work").iterdir())
+    assert len(workspaces) == 2 and all(w.name.startswith("pool-") for w in workspaces)
+    assert not (tmp_path / "generated_output.py").exists()
+
+
+def test_pool_jobs_write_to_their_own_workspace(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+    from bench.fake_llm_server import FakeBackend, start_in_thread
+    from config.profiles import PROFILES
+    from runner.pool import _run_query
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OLLAMA_RESIDENCY", "0")
+    monkeypatch.setitem(PROFILES, "_pooled", {
+        "description": "pool workspace test", "agents": ["coder"], "coder_candidates": 2,
+        "llms": {"coder": {"model": "ollama/llama3.2:3b"}},
+        "memory": False, "web_search": False, "git": False, "validation": False,
+        "tasks": [{"name": "code", "agent": "coder", "description": "Write code for {query}", "expected_output": "code"}],
+    })
+    queries = ["todo app", "calculator"]
+    backend = FakeBackend(speedup=1000, fixtures=[
+        {"match": f"project: {query}", "response": f"```python\nprint({query!r})\n```"} for query in queries])
+    server, url = start_in_thread(backend)
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", url)
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    try:
+        for n, query in enumerate(queries, start=1):
+            assert _run_query("_pooled", query, f"pool-test-{n}")
+    finally:
+        server.shutdown()
+    for n, query in enumerate(queries, start=1):
+        code = tmp_path / "runs" / "work" / f"pool-test-{n}" / "generated_output.py"
+        assert code.read_text() == f"print({query!r})\n"
+    assert not (tmp_path / "generated_output.py").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the declarative profiles and the profile runner
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from config.profiles import PROFILES, get_profile
+
+HEAVY_MODULES = ["chromadb", "langchain_community", "sentence_transformers", "torch"]
+
+
+def test_all_profiles_are_valid():
+    for name in PROFILES:
+        profile = get_profile(name)
+        print(f"✅ {name}: {len(profile['tasks'])} task(s), agents {profile['agents']}")
+
+
+def test_bad_profile_wiring_is_rejected():
+    PROFILES["_broken"] = {"description": "", "agents": ["planner"],
+                           "tasks": [{"name": "code", "agent": "coder", "description": "", "expected_output": ""}]}
+    try:
+        with pytest.raises(ValueError):
+            get_profile("_broken")
+    finally:
+        del PROFILES["_broken"]
+    with pytest.raises(ValueError):
+        get_profile("does_not_exist")
+
+
+def _modules_after(code):
+    """Run code in a fresh interpreter and return the heavy modules it imported"""
+    probe = code + f"\nimport sys, json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_runner_import_is_light():
+    assert _modules_after("import runner.runner, runner.crew_builder, config.profiles") == []
+
+
+def test_ultra_fast_profile_never_imports_vector_stack():
+    pytest.importorskip("crewai")
+    # some crewai releases pull in chromadb themselves; only count what we add
+    baseline = set(_modules_after("import crewai"))
+    code = (
+        "import crewai\n"
+        "from config.profiles import get_profile\n"
+        "from runner.crew_builder import build_crew\n"
+        "build_crew(get_profile('ultra_fast'), 'simple calculator')\n"
+    )
+    assert set(_modules_after(code)) - baseline == set()
+
+
+if __name__ == "__main__":
+    test_all_profiles_are_valid()
+    test_runner_import_is_light()
+    print("\n🎯 Profile tests completed!")
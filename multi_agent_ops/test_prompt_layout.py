@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the prompt layouts: rendering, prefix measurement and KV-cache reuse on the fake server
+"""
+
+import pytest
+
+from agents.prompt_layout import PrefixTracker, common_prefix, task_description
+from bench.fake_llm_server import FakeBackend, start_in_thread
+
+GENERAL = "ollama/llama3.1:8b"
+TEMPLATE = ("Create a development plan for {query}. List the components, their interfaces, "
+            "the order to build them in and the tests each one needs. Keep every step small "
+            "enough to finish in a day and name its dependencies.")
+
+PROFILE = {
+    "description": "prompt layout test", "agents": ["planner"],
+    "llms": {"planner": {"model": GENERAL}},
+    "memory": False, "web_search": False, "git": False, "validation": False,
+    "tasks": [{"name": "plan", "agent": "planner", "description": TEMPLATE, "expected_output": "steps"}],
+}
+
+
+def test_inline_layout_is_the_plain_template():
+    assert task_description("Plan {query} now", "todo app") == "Plan todo app now"
+
+
+def test_stable_layout_puts_dynamic_text_last():
+    text = task_description("Plan {query} now", "todo app", "stable", "Memory:\nold plan")
+    assert text.startswith("Plan the project below now")
+    assert text.endswith("Project: todo app\n\nMemory:\nold plan")
+    other = task_description("Plan {query} now", "chat bot", "stable", "Memory:\nnew plan")
+    assert common_prefix(text, other) == len("Plan the project below now\n\nProject: ")
+
+
+def test_common_prefix():
+    assert common_prefix("abcdef", "abcxyz") == 3
+    assert common_prefix("abc", "abc") == 3
+    assert common_prefix("", "abc") == 0
+    assert common_prefix("abc", "xbc") == 0
+
+
+def test_prefix_tracker_compares_per_model():
+    tracker = PrefixTracker()
+    assert tracker.observe("a", "system prompt one") == (0, 0.0)
+    shared, ratio = tracker.observe("a", "system prompt two")
+    assert shared == len("system prompt ")
+    assert ratio == pytest.approx(shared / len("system prompt two"))
+    assert tracker.observe("b", "system prompt two") == (0, 0.0)
+    assert set(tracker.summary()) == {"a", "b"}
+
+
+def test_get_profile_validates_layout(monkeypatch):
+    from config.profiles import PROFILES, get_profile
+    monkeypatch.setitem(PROFILES, "_layout", dict(PROFILE, prompt_layout="sideways"))
+    with pytest.raises(ValueError):
+        get_profile("_layout")
+
+
+@pytest.fixture
+def fake_server(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+
+    backend = FakeBackend(speedup=1000)
+    server, url = start_in_thread(backend)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OLLAMA_RESIDENCY", "0")
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", url)
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    try:
+        yield backend
+    finally:
+        server.shutdown()
+
+
+def second_run_calls(backend, layout):
+    """Fake-server records of the second of two runs with different queries"""
+    from config.profiles import PROFILES, get_profile
+    from runner.crew_builder import build_crew
+    backend.reset()
+    PROFILES["_layout"] = dict(PROFILE, prompt_layout=layout)
+    try:
+        profile = get_profile("_layout")
+    finally:
+        del PROFILES["_layout"]
+    for query in ("a todo list web app", "a command line chat client"):
+        start = len(backend.stats()["calls"])
+        build_crew(profile, query).crew.kickoff()
+    return backend.stats()["calls"][start:]
+
+
+def test_stable_layout_reuses_more_of_the_cache(fake_server):
+    inline = second_run_calls(fake_server, "inline")
+    stable = second_run_calls(fake_server, "stable")
+    assert sum(c["cached_tokens"] for c in stable) > sum(c["cached_tokens"] for c in inline)
+    assert sum(c["prompt_eval_seconds"] for c in stable) < sum(c["prompt_eval_seconds"] for c in inline)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the Ollama residency manager and the batch scheduler
+"""
+
+import pytest
+import requests
+
+from bench.fake_llm_server import FakeBackend, start_in_thread
+from config.ollama_residency import ResidencyManager, count_swaps, plan_order
+
+GENERAL = "ollama/llama3.1:8b"
+CODER = "ollama/qwen2.5-coder:7b"
+CREW = [GENERAL, GENERAL, CODER, GENERAL]  # planner, researcher, coder, reviewer
+
+
+class FakeTask:
+    def __init__(self):
+        self.callback = None
+
+
+class FakeBuilt:
+    def __init__(self, names):
+        self.tasks = {name: FakeTask() for name in names}
+
+
+def test_plan_order_groups_steps_by_model():
+    jobs = [CREW] * 3
+    order = plan_order(jobs)
+    assert sorted(order) == [(j, s) for j in range(3) for s in range(4)]
+    for job in range(3):
+        steps = [s for j, s in order if j == job]
+        assert steps == sorted(steps)  # each query keeps its task order
+    sequential = count_swaps(CREW * 3)
+    planned = count_swaps([jobs[j][s] for j, s in order])
+    assert sequential == 7 and planned == 3
+
+
+def test_plan_order_starts_on_resident_model():
+    order = plan_order([[CODER, GENERAL], [GENERAL]], resident=[GENERAL])
+    assert order[0] == (1, 0)
+
+
+def test_manager_reports_resident_models_and_swaps():
+    backend = FakeBackend(speedup=1000)
+    server, url = start_in_thread(backend)
+    try:
+        manager = ResidencyManager(base_url=url)
+        assert manager.resident() == []
+        assert manager.ensure(GENERAL) > 0
+        assert manager.resident() == ["llama3.1:8b"]
+        assert manager.ensure(GENERAL) == 0.0  # already resident: no swap
+        manager.ensure(CODER, keep=[CODER])     # general not needed any more: unloaded first
+        stats = manager.stats()
+        assert stats["swaps"] == 2 and stats["unloads"] == 1
+        assert stats["loads"] == {"llama3.1:8b": 1, "qwen2.5-coder:7b": 1}
+        assert manager.ensure("gpt-4o") == 0.0  # not an Ollama model
+
+        # generation right after a preload doesn't pay the load again
+        requests.post(f"{url}/api/generate", json={"model": "qwen2.5-coder:7b", "prompt": "write code",
+                                                   "stream": False})
+        assert backend.stats()["calls"][-1]["load_seconds"] == 0
+    finally:
+        server.shutdown()
+
+
+def test_attach_preloads_next_task_model():
+    backend = FakeBackend(speedup=1000)
+    server, url = start_in_thread(backend)
+    try:
+        profile = {
+            "tasks": [{"name": "plan", "agent": "planner"}, {"name": "code", "agent": "coder"}],
+            "llms": {"planner": {"model": GENERAL}, "coder": {"model": CODER}},
+        }
+        built = FakeBuilt(["plan", "code"])
+        manager = ResidencyManager(base_url=url).attach(built, profile)
+        assert manager.resident() == ["llama3.1:8b"]
+        built.tasks["plan"].callback("plan output")
+        assert manager.resident() == ["qwen2.5-coder:7b"]
+        assert manager.stats()["swaps"] == 2
+    finally:
+        server.shutdown()
+
+
+def test_batch_runs_each_query_with_grouped_models(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+    from config.profiles import PROFILES
+    from runner.batch import run_batch
+
+    backend = FakeBackend(speedup=1000)
+    server, url = start_in_thread(backend)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", url)
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    PROFILES["_batch"] = {
+        "description": "batch test", "agents": ["planner", "coder"],
+        "llms": {"planner": {"model": GENERAL}, "coder": {"model": CODER}},
+        "memory": False, "web_search": False, "git": False, "validation": False,
+        "tasks": [
+            {"name": "plan", "agent": "planner", "description": "Plan {query}", "expected_output": "steps"},
+            {"name": "code", "agent": "coder", "context": ["plan"],
+             "description": "Write code for {query}", "expected_output": "code"},
+        ],
+    }
+    try:
+        manager = ResidencyManager(base_url=url)
+        results = run_batch("_batch", ["todo app", "calculator", "file counter"], residency=manager)
+        assert all(results.values())
+        assert manager.stats()["swaps"] == 2  # 3 plans on one model, then 3 code tasks
+        assert len(backend.stats()["loads"]) == 2
+    finally:
+        del PROFILES["_batch"]
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_plan_order_groups_steps_by_model()
+    test_plan_order_starts_on_resident_model()
+    test_manager_reports_resident_models_and_swaps()
+    test_attach_preloads_next_task_model()
+    print("\n🎯 Residency tests completed!")
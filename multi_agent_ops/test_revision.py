@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the diff-based revision loop
+"""
+
+import os
+import tempfile
+
+from pipeline.revision import RevisionLoop, apply_revision, review_feedback, PatchError
+from tools.manifest import WriteManifest
+
+ORIGINAL = (
+    "def delete_task(tasks):\n"
+    "    index = int(input('Number: '))\n"
+    "    tasks.pop(index - 1)\n"
+    "\n"
+    "def main():\n"
+    "    delete_task([])\n"
+)
+
+FIX_DIFF = """Here is the fix:
+```diff
+--- a/todo.py
++++ b/todo.py
+@@ -1,3 +1,6 @@
+ def delete_task(tasks):
+-    index = int(input('Number: '))
++    try:
++        index = int(input('Number: '))
++    except ValueError:
++        return
+     tasks.pop(index - 1)
+```
+"""
+
+
+class ScriptedLLM:
+    """Stands in for crewai.LLM: returns canned answers and records prompts"""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    def call(self, messages):
+        self.prompts.append(messages)
+        return self.answers.pop(0)
+
+
+def test_apply_diff_with_offset():
+    shifted = "# header comment\n\n" + ORIGINAL
+    result = apply_revision({"todo.py": shifted}, FIX_DIFF)
+    assert "except ValueError:" in result["todo.py"]
+    assert result["todo.py"].startswith("# header comment")
+
+
+def test_apply_json_operations():
+    ops = '[{"op": "replace", "path": "todo.py", "find": "delete_task([])", "replace": "delete_task([1])"}]'
+    result = apply_revision({"todo.py": ORIGINAL}, ops)
+    assert "delete_task([1])" in result["todo.py"]
+
+
+def test_mismatched_hunk_is_rejected():
+    bad = "--- a/todo.py\n+++ b/todo.py\n@@ -1,1 +1,1 @@\n-not in the file\n+x\n"
+    try:
+        apply_revision({"todo.py": ORIGINAL}, bad)
+    except PatchError:
+        return
+    raise AssertionError("expected PatchError")
+
+
+def test_revision_loop_fixes_and_stops():
+    """A bad patch is fed back, the corrected diff is applied, then validation is clean"""
+    print("🧪 Running revision loop")
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "todo.py")
+        with open(path, "w") as f:
+            f.write(ORIGINAL)
+        llm = ScriptedLLM(["no diff here, sorry", FIX_DIFF])
+        manifest = WriteManifest()
+        loop = RevisionLoop(llm, max_iterations=3, manifest=manifest)
+        cwd = os.getcwd()
+        os.chdir(d)
+        try:
+            report = loop.run([path], feedback="int(input()) crashes on bad input")
+        finally:
+            os.chdir(cwd)
+        print(report.to_context())
+        assert report.is_clean
+        assert [h["applied"] for h in loop.history] == [False, True]
+        assert "could not be applied" in llm.prompts[1][1]["content"]
+        assert manifest.files() == [os.path.abspath(path)]
+
+
+def built_with_review(raw, verdict=None):
+    from types import SimpleNamespace
+    reviewer, coder = object(), object()
+    review = SimpleNamespace(raw=raw, pydantic=SimpleNamespace(verdict=verdict) if verdict else None)
+    tasks = {"code": SimpleNamespace(agent=coder, output=SimpleNamespace(raw="print('final answer')")),
+             "review": SimpleNamespace(agent=reviewer, output=review)}
+    return SimpleNamespace(agents={"coder": coder, "reviewer": reviewer}, tasks=tasks)
+
+
+def test_feedback_is_the_review_only():
+    assert review_feedback(built_with_review("Handle bad input in int(input())")) == \
+        "Handle bad input in int(input())"
+    assert review_feedback(built_with_review("Review verdict: approve", verdict="approve")) == ""
+    assert review_feedback(built_with_review("")) == ""   # review skipped by the gate
+
+
+def test_approved_clean_code_makes_no_llm_call():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "todo.py")
+        with open(path, "w") as f:
+            f.write("print('ok')\n")
+        llm = ScriptedLLM([])
+        loop = RevisionLoop(llm)
+        report = loop.run([path], feedback=review_feedback(built_with_review("", "approve")))
+        assert report.is_clean and llm.prompts == [] and loop.history == []
+
+
+if __name__ == "__main__":
+    test_apply_diff_with_offset()
+    test_apply_json_operations()
+    test_mismatched_hunk_is_rejected()
+    test_revision_loop_fixes_and_stops()
+    test_feedback_is_the_review_only()
+    test_approved_clean_code_makes_no_llm_call()
+    print("\n🎯 Revision loop tests completed!")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for per-agent model routing and the escalation cascade
+"""
+
+import json
+
+import pytest
+
+from config.profiles import FAST_3B_CODING, CODER_7B, get_profile
+from config.routing import ModelRouter, validate_code_output, validate_text_output
+
+GOOD_CODE = "Here it is:\n```python\ndef add(a, b):\n    return a + b\n```"
+BAD_CODE = "Here it is:\n```python\ndef add(a, b)\n    return a + b\n```"
+
+
+class FakeLLM:
+    def __init__(self, spec):
+        self.model = spec["model"]
+
+    def call(self, messages):
+        return ""
+
+
+class FakeAgent:
+    role = "Python Developer"
+
+    def __init__(self):
+        self.llm = FakeLLM(FAST_3B_CODING)
+
+
+class FakeOutput:
+    def __init__(self, raw):
+        self.raw = raw
+
+
+def _router(tmp_path, files=()):
+    return ModelRouter({"coder": [FAST_3B_CODING, CODER_7B]}, llm_factory=FakeLLM,
+                       log_path=str(tmp_path / "routing.jsonl"), files_fn=lambda: list(files))
+
+
+def test_validators():
+    assert validate_code_output(GOOD_CODE)[0]
+    ok, reason = validate_code_output(BAD_CODE)
+    assert not ok and "syntax-error" in reason
+    assert not validate_code_output("I would write a function.")[0]
+    assert validate_text_output("1. Set up the project\n2. Write the parser\n3. Add tests")[0]
+    assert not validate_text_output("Agent stopped due to iteration limit or time limit.")[0]
+
+
+def test_escalates_on_broken_code_then_drops_back(tmp_path):
+    router = _router(tmp_path)
+    agent = FakeAgent()
+    kwargs = router.route({"agent": agent}, "code", "coder")
+    guardrail = kwargs["guardrail"]
+    assert kwargs["guardrail_max_retries"] == 1
+    assert not (tmp_path / "routing.jsonl").exists()   # nothing logged until the task answers
+
+    ok, reason = guardrail(FakeOutput(BAD_CODE))
+    assert not ok and "syntax-error" in reason
+    assert agent.llm.model == CODER_7B["model"]
+
+    ok, output = guardrail(FakeOutput(GOOD_CODE))
+    assert ok and output.raw == GOOD_CODE
+    assert agent.llm.model == FAST_3B_CODING["model"]  # next task starts cheap again
+
+    events = [json.loads(line)["event"] for line in open(tmp_path / "routing.jsonl")]
+    assert events == ["route", "escalate", "accept"]
+    assert router.summary() == {"coder": {"route": 1, "escalate": 1, "accept": 1}}
+
+
+def test_largest_model_failure_keeps_answer(tmp_path):
+    router = _router(tmp_path)
+    agent = FakeAgent()
+    guardrail = router.route({"agent": agent}, "code", "coder")["guardrail"]
+    guardrail(FakeOutput(BAD_CODE))
+    ok, _ = guardrail(FakeOutput(BAD_CODE))
+    assert ok
+    assert router.events[-1]["event"] == "exhausted"
+
+
+def test_written_files_are_validated(tmp_path):
+    broken = tmp_path / "app.py"
+    broken.write_text("print('hi'\n")
+    router = _router(tmp_path, files=[str(broken)])
+    guardrail = router.route({"agent": FakeAgent()}, "code", "coder")["guardrail"]
+    ok, reason = guardrail(FakeOutput("Saved the code to app.py"))
+    assert not ok and "app.py" in reason
+
+
+def test_profile_routing_sets_first_tier():
+    profile = get_profile("cascade")
+    assert profile["llms"]["coder"] == profile["routing"]["coder"][0]
+    assert len(profile["routing"]["planner"]) == 2
+
+
+def test_crew_builder_installs_guardrails(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from runner.crew_builder import build_crew
+    monkeypatch.chdir(tmp_path)
+    profile = {**get_profile("cascade"), "memory": False}
+    built = build_crew(profile, "simple calculator")
+    assert built.router is not None
+    assert built.tasks["code"].guardrail is not None
+    assert built.tasks["code"].guardrail_max_retries == 1
+    assert not (tmp_path / "runs").exists()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_validators()
+    for test in (test_escalates_on_broken_code_then_drops_back, test_largest_model_failure_keeps_answer,
+                 test_written_files_are_validated):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_profile_routing_sets_first_tier()
+    print("\n🎯 Routing tests completed!")
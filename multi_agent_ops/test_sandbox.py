@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the sandboxed execution harness
+"""
+
+import json
+import os
+import tempfile
+
+from pipeline.sandbox import RunSpec, run_all, execute_generated, PASSED, FAILED, TIMEOUT, INPUT_EXHAUSTED
+
+
+def write(directory, name, source):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(source)
+    return path
+
+
+def test_interactive_cli_with_scripted_stdin():
+    """A menu-driven CLI gets the scripted input and exits cleanly"""
+    print("🧪 Running interactive CLI in sandbox")
+    with tempfile.TemporaryDirectory() as d:
+        app = write(d, "todo.py", (
+            "tasks = []\n"
+            "while True:\n"
+            "    choice = input('> ')\n"
+            "    if choice == '1':\n"
+            "        tasks.append(input('task: '))\n"
+            "    elif choice == '2':\n"
+            "        print(tasks)\n"
+            "    elif choice == '3':\n"
+            "        tasks.pop(int(input('number: ')) - 1)\n"
+            "    elif choice == '4':\n"
+            "        break\n"
+        ))
+        log = os.path.join(d, "runs.jsonl")
+        report = run_all([RunSpec(app)], log_path=log, run_id="t1")
+        print(report.to_context())
+        assert report.passed
+        assert "Buy milk" in report.results[0]["stdout"]
+        with open(log) as f:
+            entry = json.loads(f.readline())
+        assert entry["run_id"] == "t1" and entry["status"] == PASSED
+
+
+def test_limits_and_failures_in_parallel():
+    with tempfile.TemporaryDirectory() as d:
+        specs = [
+            RunSpec(write(d, "spin.py", "while True:\n    pass\n"), timeout=1, cpu_seconds=5),
+            RunSpec(write(d, "crash.py", "int(input())\n"), stdin="abc\n"),
+            RunSpec(write(d, "hog.py", "x = bytearray(512 * 1024 * 1024)\n"), memory_mb=128),
+        ]
+        report = run_all(specs, log_path=None)
+        status = {r["name"]: r["status"] for r in report.results}
+        assert status == {"spin.py": TIMEOUT, "crash.py": FAILED, "hog.py": FAILED}, status
+        assert "ValueError" in report.to_context()
+
+
+def test_generated_tests_are_run():
+    with tempfile.TemporaryDirectory() as d:
+        calc = write(d, "calc.py", "def add(a, b):\n    return a + b\n")
+        test_file = write(d, "test_calc.py", "from calc import add\n\ndef test_add():\n    assert add(2, 2) == 4\n")
+        report = execute_generated([calc, test_file], log_path=None)
+        assert [r["kind"] for r in report.results] == ["program", "test"]
+        assert report.passed, report.to_context()
+
+
+def test_program_imports_a_generated_module():
+    with tempfile.TemporaryDirectory() as d:
+        calc = write(d, "calc.py", "def add(a, b):\n    return a + b\n")
+        main = write(d, "main.py", "from calc import add\nprint(add(2, 3))\n")
+        report = execute_generated([calc, main], log_path=None)
+        assert report.passed, report.to_context()
+        assert report.results[1]["stdout"].strip() == "5"
+
+
+def test_only_the_run_files_are_copied():
+    with tempfile.TemporaryDirectory() as d:
+        write(d, "run.py", "print('not part of the run')\n")
+        app = write(d, "app.py", "import os\nprint(sorted(os.listdir('.')))\n")
+        report = execute_generated([app], log_path=None)
+        assert report.results[0]["stdout"].strip() == "['app.py']"
+
+
+def test_exhausted_stdin_is_not_a_pass():
+    with tempfile.TemporaryDirectory() as d:
+        report = run_all([RunSpec(write(d, "ask.py", "while True:\n    input('> ')\n"))], log_path=None)
+        assert report.results[0]["status"] == INPUT_EXHAUSTED
+        assert not report.passed and "stdin script exhausted" in report.to_context()
+
+
+if __name__ == "__main__":
+    test_interactive_cli_with_scripted_stdin()
+    test_limits_and_failures_in_parallel()
+    test_generated_tests_are_run()
+    test_only_the_run_files_are_copied()
+    test_exhausted_stdin_is_not_a_pass()
+    print("\n🎯 Sandbox tests completed!")
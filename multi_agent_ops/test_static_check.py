@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the static validation gate
+"""
+
+from pipeline.static_check import validate_files, should_skip_review, extract_code_blocks
+
+
+def test_generated_files_findings():
+    """The checked-in generated files have a syntax error and an int(input()) crash"""
+    print("🧪 Validating generated files")
+    report = validate_files(["generated_cli_todo.py", "generated_output.py"], linter="none")
+    print(report.to_context())
+    codes = {(f.path, f.code) for f in report.findings}
+    assert ("generated_output.py", "syntax-error") in codes
+    assert ("generated_cli_todo.py", "unguarded-input") in codes
+    assert not should_skip_review(report, "skip_if_clean")
+
+
+def test_clean_code_and_guarded_input():
+    source = (
+        "import os\n"
+        "try:\n"
+        "    n = int(input('n: '))\n"
+        "except ValueError:\n"
+        "    n = 0\n"
+        "print(os.getcwd(), n)\n"
+    )
+    report = validate_files(sources={"clean.py": source}, linter="none")
+    assert report.is_clean, report.to_context()
+    assert should_skip_review(report, "skip_if_clean")
+    assert not should_skip_review(report, "always")
+
+
+def test_compile_and_import_errors():
+    sources = {
+        "outside.py": "return 1\n",
+        "missing.py": "import definitely_not_a_real_module_xyz\n",
+    }
+    report = validate_files(sources=sources, linter="none")
+    codes = {f.code for f in report.findings}
+    assert codes == {"compile-error", "import-unresolved"}, codes
+
+
+def test_extract_code_blocks():
+    text = "Here is the code:\n```python\nprint('hi')\n```\nDone."
+    assert extract_code_blocks(text) == ["print('hi')\n"]
+
+
+if __name__ == "__main__":
+    test_generated_files_findings()
+    test_clean_code_and_guarded_input()
+    test_compile_and_import_errors()
+    test_extract_code_blocks()
+    print("\n🎯 Static validation tests completed!")
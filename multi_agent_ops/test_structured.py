@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for structured outputs: tolerant JSON parsing, repair, compact rendering and a fake-server crew
+"""
+
+import json
+
+import pytest
+
+from config.structured import (JSONStreamParser, Plan, Review, parse_json, parse_output, render,
+                               structure_llm)
+from bench.fake_llm_server import FakeBackend, example_for, start_in_thread
+
+PLAN = {"steps": [{"id": 1, "title": "Data model", "files": ["models.py"]},
+                  {"id": 2, "title": "CLI commands", "depends_on": [1]}],
+        "technologies": ["sqlite3"]}
+
+
+def test_parse_json_ignores_prose_and_fences():
+    text = f"Thought: done\nFinal Answer: ```json\n{json.dumps(PLAN)}\n```\nHope this helps! {{not json}}"
+    assert parse_json(text) == PLAN
+
+
+def test_parse_json_closes_truncated_values():
+    full = json.dumps(PLAN)
+    assert parse_json(full[:full.index("CLI") + 2]) == {"steps": [PLAN["steps"][0], {"id": 2, "title": "CL"}]}
+    assert parse_json('{"steps": [{"id": 1, "title": "A"}, {"id": 2, "tit') == {"steps": [{"id": 1, "title": "A"}, {"id": 2}]}
+    assert parse_json('{"verdict": "revise", "issues": [{"line": 1') == {"verdict": "revise", "issues": [{"line": 1}]}
+    assert parse_json('{"a": tru') == {}
+    assert parse_json('{"a": [1, 2,], }') == {"a": [1, 2]}
+    assert parse_json("no json here") is None
+
+
+def test_stream_parser_stops_at_the_end_of_the_value():
+    parser = JSONStreamParser()
+    assert not parser.feed('Sure: {"a": "}{"')
+    assert parser.feed(', "b": [1]} and then some rambling {')
+    assert json.loads(parser.text()) == {"a": "}{", "b": [1]}
+
+
+def test_parse_output_coerces_and_reports_errors():
+    plan, error = parse_output('["Design the schema", "Write the CLI"]', "plan")
+    assert error is None and [s.title for s in plan.steps] == ["Design the schema", "Write the CLI"]
+    review, error = parse_output('{"verdict": "maybe"}', "review")
+    assert review is None and "verdict" in error
+
+
+def test_render_is_more_compact_than_json():
+    plan = Plan.model_validate(PLAN)
+    text = render(plan)
+    assert text.splitlines() == ["Plan:", "1. Data model [models.py]", "2. CLI commands (after 1)",
+                                 "Technologies: sqlite3"]
+    assert len(text) < len(plan.model_dump_json())
+    review = Review.model_validate({"verdict": "revise", "issues": [
+        {"severity": "high", "file": "app.py", "line": 3, "issue": "SQL injection", "fix": "use parameters"}]})
+    assert render(review).splitlines()[1] == "- [high] app.py:3 SQL injection -> use parameters"
+
+
+class StubLLM:
+    model = "stub"
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    def call(self, messages, *args, **kwargs):
+        self.prompts.append(messages)
+        return self.answers.pop(0)
+
+
+def test_structured_llm_repairs_then_answers_in_crewai_format():
+    llm = structure_llm(StubLLM(['{"steps": []}', json.dumps(PLAN)]), "plan")
+    answer = llm.call("plan it")
+    assert len(llm.prompts) == 2 and "steps" in llm.prompts[1][1]["content"]
+    assert answer.startswith("Thought:")
+    assert Plan.model_validate_json(answer.split("Final Answer:", 1)[1]) == Plan.model_validate(PLAN)
+
+
+def test_structured_llm_keeps_text_when_repair_fails():
+    llm = structure_llm(StubLLM(["1. do it", "still prose"]), "plan", repairs=1)
+    assert llm.call("plan it") == "Final Answer: 1. do it"
+
+
+def test_fake_server_answers_with_the_schema():
+    assert Plan.model_validate(example_for(Plan.model_json_schema()))
+    assert Review.model_validate(example_for(Review.model_json_schema()))
+
+
+PROFILE = {
+    "description": "structured test", "agents": ["planner", "coder", "reviewer"],
+    "llms": {"planner": {"model": "ollama/llama3.1:8b"}, "coder": {"model": "ollama/qwen2.5-coder:7b"},
+             "reviewer": {"model": "ollama/llama3.1:8b"}},
+    "memory": False, "web_search": False, "git": False, "validation": False,
+    "structured_outputs": ["planner", "reviewer"],
+    "tasks": [
+        {"name": "plan", "agent": "planner", "description": "Plan {query}", "expected_output": "steps"},
+        {"name": "code", "agent": "coder", "context": ["plan"],
+         "description": "Write code for {query}", "expected_output": "code"},
+        {"name": "review", "agent": "reviewer", "context": ["code"],
+         "description": "Review the code for {query}", "expected_output": "issues"},
+    ],
+}
+
+
+@pytest.fixture
+def fake_server(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    import config.llm_config as llm_config
+    from config.profiles import PROFILES
+
+    backend = FakeBackend(speedup=1000)
+    server, url = start_in_thread(backend)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OLLAMA_RESIDENCY", "0")
+    monkeypatch.setattr(llm_config, "OLLAMA_BASE_URL", url)
+    monkeypatch.setattr(llm_config, "_llm_instances", {})
+    monkeypatch.setitem(PROFILES, "_structured", PROFILE)
+    try:
+        yield backend
+    finally:
+        server.shutdown()
+
+
+def test_get_profile_rejects_agents_without_a_schema(monkeypatch):
+    from config.profiles import PROFILES, get_profile
+    monkeypatch.setitem(PROFILES, "_structured", dict(PROFILE, structured_outputs=["coder"]))
+    with pytest.raises(ValueError):
+        get_profile("_structured")
+
+
+def test_crew_passes_compact_structured_outputs_downstream(fake_server):
+    from config.profiles import get_profile
+    from runner.crew_builder import build_crew
+
+    built = build_crew(get_profile("_structured"), "todo app")
+    built.crew.kickoff()
+    plan = built.tasks["plan"].output
+    assert isinstance(plan.pydantic, Plan)
+    assert plan.raw.startswith("Plan:\n1. ")
+    assert isinstance(built.tasks["review"].output.pydantic, Review)
+    assert built.tasks["code"].output.pydantic is None
+    assert plan.raw in built.tasks["code"].description   # the coder sees the step list, not the JSON
+    assert Plan.model_validate_json(built.store.retrieve("plan")) == plan.pydantic
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for cached multi-level memory summaries
+"""
+
+from memory.summaries import SummaryStore, backfill, extractive_summarizer
+from pipeline.context_budget import count_tokens, fit_memory
+
+TRANSCRIPT = "\n\n".join(
+    f"Step {i}: built the todo CLI with sqlite3 persistence and argparse commands. " + "details " * 60
+    for i in range(12)
+)
+
+
+class CountingSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text, level, max_tokens):
+        self.calls.append(level)
+        return f"{level} summary of {len(text)} chars"
+
+
+def test_levels_are_built_once_and_persisted(tmp_path):
+    path = str(tmp_path / "summaries.json")
+    summarizer = CountingSummarizer()
+    store = SummaryStore(path=path, summarize_fn=summarizer)
+    entry = store.summarize(TRANSCRIPT)
+    # long transcript: several chunk paragraphs, one merge, one line
+    assert summarizer.calls.count("paragraph") > 2 and summarizer.calls.count("line") == 1
+    calls = len(summarizer.calls)
+    store.summarize(TRANSCRIPT)
+    assert len(summarizer.calls) == calls
+
+    reloaded = SummaryStore(path=path, summarize_fn=CountingSummarizer())
+    assert reloaded.get(TRANSCRIPT) == entry
+
+
+def test_level_for_picks_largest_that_fits(tmp_path):
+    store = SummaryStore(path=str(tmp_path / "s.json"), summarize_fn=extractive_summarizer)
+    assert store.level_for("short note", 100) == ("full", "short note")
+    assert store.level_for(TRANSCRIPT, 300) is None
+    store.summarize(TRANSCRIPT)
+    level, text = store.level_for(TRANSCRIPT, 300)
+    assert level == "paragraph" and count_tokens(text) <= 300
+    level, text = store.level_for(TRANSCRIPT, 45)
+    assert level == "line" and "Step 0" in text
+
+
+def test_background_worker_and_fit_hook(tmp_path):
+    summarizer = CountingSummarizer()
+    store = SummaryStore(path=str(tmp_path / "s.json"), summarize_fn=summarizer)
+    assert store.fit(TRANSCRIPT, 100) is None  # not ready: queued, caller trims
+    assert store.drain(timeout=10)
+    assert store.fit(TRANSCRIPT, 100).startswith("paragraph summary")
+
+    text = fit_memory([TRANSCRIPT], 100, summarizer=store.fit)
+    assert text.startswith("paragraph summary")
+    assert backfill(store, [TRANSCRIPT, "another memory " * 300]) == 1
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    for test in (test_levels_are_built_once_and_persisted, test_level_for_picks_largest_that_fits,
+                 test_background_worker_and_fit_hook):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("\n🎯 Summary tests completed!")
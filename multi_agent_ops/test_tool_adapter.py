@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the tool argument repair layer: coercion, rejection, both crewai call paths and call counting
+"""
+
+import pytest
+from pydantic import BaseModel
+
+from tools.tool_adapter import AdaptedTool, ToolCallStats, check_arguments, coerce_arguments, get_tool_stats, tool
+
+
+class QuerySchema(BaseModel):
+    query: str
+
+
+class CommitSchema(BaseModel):
+    path: str
+    commit_message: str = "Auto-commit"
+
+
+class FileSchema(BaseModel):
+    text: str
+
+
+@pytest.mark.parametrize("raw, fix", [
+    ({"query": "todo app"}, None),
+    ({"q": "todo app"}, "'q' as 'query'"),
+    ({"description": "todo app"}, "'description' as 'query'"),
+    ({"query": {"description": "todo app", "type": "str"}}, "query: took 'description' from an object"),
+    ({"input": {"query": "todo app"}}, "unwrapped 'input'"),
+    ("todo app", "bare value as 'query'"),
+    ('{"query": "todo app"}', "parsed a string"),
+    ({"query": ["todo", "app"]}, "query: joined a list"),
+    ({"query": '"todo app"'}, "query: stripped quotes"),
+    ({"topic": "todo app"}, "'topic' as 'query'"),
+])
+def test_coerce_arguments_repairs_common_shapes(raw, fix):
+    args, fixes = coerce_arguments(raw, QuerySchema)
+    assert args == {"query": "todo app"}
+    assert fixes == ([fix] if fix else [])
+
+
+def test_placeholders_fall_back_to_defaults():
+    args, _ = coerce_arguments({"path": "app.py", "message": "str"}, CommitSchema)
+    assert args == {"path": "app.py"}
+    assert check_arguments("commit", CommitSchema, {"path": "app.py", "msg": "Add CLI"}) == \
+        {"path": "app.py", "commit_message": "Add CLI"}
+
+
+@pytest.mark.parametrize("code", [
+    '"""Calculator module."""\nprint("He said \\"hi\\"")\nx = \'a\'',
+    "'a' + 'b'",
+    '"hello"',
+])
+def test_code_passes_through_unchanged(code):
+    assert coerce_arguments({"text": code}, FileSchema) == ({"text": code}, [])
+
+
+def test_escaped_quotes_are_never_rewritten():
+    query = '"say \\"hi\\""'
+    assert coerce_arguments({"query": query}, QuerySchema) == ({"query": query}, [])
+
+
+def test_unrepairable_arguments_are_rejected_with_a_hint():
+    with pytest.raises(ValueError, match='Expected a JSON object with: "query"'):
+        check_arguments("search", QuerySchema, {"query": "str"})
+    with pytest.raises(ValueError):
+        check_arguments("commit", CommitSchema, {"a": "x", "b": "y"})
+
+
+def test_stats_count_crewai_retries_once():
+    stats = ToolCallStats()
+    stats.record("search", "rejected", {})
+    stats.record("search", "repaired", {"q": "todo app"}, ["'q' as 'query'"])   # the unfiltered retry
+    stats.record("search", "rejected", {"query": "str"})
+    stats.record("search", "valid", {"query": "todo app"})   # a new call, not a retry
+    stats.record("search", "rejected", {"query": "int"})
+    assert stats.summary() == {"search": {"valid": 1, "repaired": 1, "rejected": 2}}
+    assert stats.fixes == {"'q' as 'query'": 1}
+
+
+@tool("Echo")
+def echo(text: str) -> str:
+    """Return text unchanged."""
+    return text
+
+
+def test_decorated_tools_repair_on_both_call_paths():
+    get_tool_stats().reset()
+    assert isinstance(echo, AdaptedTool)
+    assert echo.run(content="hello") == "hello"   # native function calling
+    assert echo.to_structured_tool().invoke({"input": {"code": "print(1)"}}) == "print(1)"   # ReAct
+    assert get_tool_stats().summary() == {"Echo": {"valid": 0, "repaired": 2, "rejected": 0}}
+
+
+def test_repo_tools_use_the_adapter(tmp_path, monkeypatch):
+    from tools.file_writer import write_to_file
+    from tools.web_search import google_search
+    assert isinstance(google_search, AdaptedTool)
+    monkeypatch.chdir(tmp_path)
+    write_to_file.to_structured_tool().invoke({"content": "print('hi')"})
+    assert "print('hi')" in "".join(p.read_text() for p in tmp_path.rglob("*.py"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for run tracing and the trace summarizer
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+
+from tracing.tracer import start_run, end_run, get_tracer, instrument_llm
+from tracing.summarize import load_spans, summarize, by_model
+
+
+class SlowLLM:
+    model = "ollama/fake:1b"
+
+    def call(self, messages):
+        time.sleep(0.02)
+        return "x" * 400
+
+
+def test_spans_nest_and_summarize():
+    print("🧪 Tracing a fake run")
+    with tempfile.TemporaryDirectory() as d:
+        tracer = start_run("test-run", path=os.path.join(d, "trace.jsonl"))
+        llm = instrument_llm(SlowLLM(), agent_role="Planner")
+        try:
+            with get_tracer().span("crew", "kickoff"):
+                with get_tracer().span("vector_search", "similarity_search", k=3):
+                    time.sleep(0.01)
+                for _ in range(2):
+                    llm.call([{"role": "user", "content": "plan " * 40}])
+        finally:
+            end_run()
+
+        spans = load_spans(tracer.path)
+        assert {s["kind"] for s in spans} == {"crew", "vector_search", "llm_call"}
+        crew = next(s for s in spans if s["kind"] == "crew")
+        assert all(s["parent_id"] == crew["span_id"] for s in spans if s is not crew)
+
+        llm_span = next(s for s in spans if s["kind"] == "llm_call")
+        assert llm_span["model"] == "ollama/fake:1b" and llm_span["agent"] == "Planner"
+        assert llm_span["prompt_tokens"] > 0 and llm_span["completion_tokens"] == 100
+
+        rows, wall = summarize(spans)
+        assert rows[0]["kind"] == "crew" and wall >= 0.05
+        llm_row = next(r for r in rows if r["kind"] == "llm_call")
+        assert llm_row["count"] == 2
+        assert by_model(spans)["ollama/fake:1b"]["completion_tokens"] == 200
+
+
+def test_no_trace_written_without_run():
+    with get_tracer().span("llm_call", "untraced") as span:
+        span.set(prompt_tokens=1)
+    assert get_tracer().path is None
+
+
+def test_overlapping_runs_keep_their_own_trace(tmp_path):
+    import asyncio
+
+    async def run(name, delay):
+        tracer = start_run(name, path=str(tmp_path / f"{name}.jsonl"))
+        try:
+            for step in range(3):
+                with get_tracer().span("task", f"{name}-{step}"):
+                    await asyncio.sleep(delay)
+            return get_tracer().run_id
+        finally:
+            end_run()
+
+    async def both():
+        return await asyncio.gather(run("a", 0.01), run("b", 0.015))
+
+    assert asyncio.run(both()) == ["a", "b"]
+    for name in ("a", "b"):
+        spans = load_spans(str(tmp_path / f"{name}.jsonl"))
+        assert [s["name"] for s in spans] == [f"{name}-{step}" for step in range(3)]
+        assert {s["run_id"] for s in spans} == {name}
+    assert get_tracer().path is None
+
+
+def test_backend_usage_and_prompt_cache_hits(tmp_path):
+    pytest.importorskip("crewai")
+    from crewai import LLM
+    from bench.fake_llm_server import FakeBackend, start_in_thread
+
+    server, url = start_in_thread(FakeBackend(speedup=1000))
+    tracer = start_run("usage-run", path=str(tmp_path / "trace.jsonl"))
+    try:
+        llm = instrument_llm(LLM(model="ollama/llama3.2:3b", base_url=url))
+        for _ in range(2):
+            llm.call([{"role": "user", "content": "Create a plan for a todo app " * 20}])
+    finally:
+        end_run()
+        server.shutdown()
+    first, second = [s for s in load_spans(tracer.path) if s["kind"] == "llm_call"]
+    assert first["tokens_estimated"] is False and first["prompt_tokens"] > 0
+    assert not first["cache_hit"] and second["cache_hit"] and second["cached_tokens"] > 0
+    assert by_model([first, second])[first["model"]]["cached_tokens"] == second["cached_tokens"]
+
+
+def test_store_lookups_record_cache_hits(tmp_path):
+    from memory.snapshot import SnapshotMemory, write_snapshot
+    from memory.summaries import SummaryStore
+    import numpy as np
+
+    vectors = np.eye(2, 4, dtype=np.float32)
+    snapshot = write_snapshot(str(tmp_path / "snapshot"), ["todo app", "calculator"], [{}, {}], vectors,
+                              queries=["todo"], query_vectors=vectors[:1])
+    store = SummaryStore(str(tmp_path / "summaries.json"), summarize_fn=lambda text, level, tokens: text[:20])
+    tracer = start_run("cache-run", path=str(tmp_path / "trace.jsonl"))
+    try:
+        memory = SnapshotMemory(snapshot)
+        memory.search("todo")
+        memory.search("calculator")
+        store.summarize("a long memory " * 50)
+        store.summarize("a long memory " * 50)
+    finally:
+        end_run()
+    spans = load_spans(tracer.path)
+    assert [s["cache_hit"] for s in spans if s["kind"] == "vector_search"] == [True, False]
+    assert [s.get("cache_hit", False) for s in spans if s["kind"] == "summary"] == [False, True]
+    rows, _ = summarize(spans, top=0)
+    assert {(r["kind"], r["cache_hits"]) for r in rows} == {("vector_search", 1), ("summary", 1)}
+
+
+if __name__ == "__main__":
+    test_spans_nest_and_summarize()
+    test_no_trace_written_without_run()
+    print("\n🎯 Tracing tests completed!")
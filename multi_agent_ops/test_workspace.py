@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for per-run workspaces: each run writes, validates and commits its
+own files, so runs side by side don't overwrite each other's output
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from test_git_ops import git, make_repo
+from tools.file_writer import file_writer_for
+from tools.git_ops import git_tool_for
+from tools.workspace import Workspace, current_workspace
+
+
+def test_runs_write_their_own_files(tmp_path):
+    first, second = Workspace("run-a", tmp_path / "a"), Workspace("run-b", tmp_path / "b")
+    file_writer_for(first).run(text="print('a')\n")
+    file_writer_for(second).run(text="print('b')\n")
+    assert (tmp_path / "a" / "generated_output.py").read_text() == "print('a')\n"
+    assert (tmp_path / "b" / "generated_output.py").read_text() == "print('b')\n"
+    assert first.files() == [str(tmp_path / "a" / "generated_output.py")]
+    assert second.files() == [str(tmp_path / "b" / "generated_output.py")]
+
+
+def test_default_path_is_under_the_workspace_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    workspace = Workspace()
+    assert os.path.dirname(workspace.path) == str(tmp_path / "runs" / "work")
+    assert os.path.basename(workspace.path) == workspace.run_id
+
+
+def test_workspace_commits_its_files_at_workspace_paths(monkeypatch):
+    with tempfile.TemporaryDirectory() as root:
+        bare, work = make_repo(root)
+        monkeypatch.chdir(work)
+        runs = [Workspace(f"run-{n}", os.path.join(work, "runs", "work", f"run-{n}")) for n in (1, 2)]
+        for n, workspace in enumerate(runs, start=1):
+            workspace.write(f"print({n})\n")
+            workspace.commits.github_repo = ""
+            git_tool_for(workspace).run(commit_message=f"Add run {n}")
+        branches = [workspace.commits.branch for workspace in runs]
+        assert branches[0] != branches[1]
+        for n, (workspace, branch) in enumerate(zip(runs, branches), start=1):
+            assert workspace.flush_commits(wait_for_pr=False).files == ["generated_output.py"]
+            assert sorted(git(bare, "ls-tree", "-r", "--name-only", branch).split()) == [
+                "README.md", "generated_output.py"]
+            assert git(bare, "show", f"{branch}:generated_output.py") == f"print({n})"
+            assert workspace.files() == []
+        assert "runs/" in git(work, "status", "--porcelain")   # the checkout itself is untouched
+
+
+def test_activate_sets_the_current_workspace(tmp_path):
+    from pipeline.candidates import save_code
+
+    workspace = Workspace("run-c", tmp_path / "c")
+    assert current_workspace() is None
+    with workspace.activate():
+        assert current_workspace() is workspace
+        path = save_code("```python\nprint('winner')\n```")
+    assert current_workspace() is None
+    assert path == str(tmp_path / "c" / "generated_output.py") and workspace.files() == [path]
+
+
+def test_crew_is_bound_to_its_workspace(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from config.profiles import PROFILES, get_profile
+    from runner.crew_builder import build_crew
+    import tools.git_pipeline as git_pipeline
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(PROFILES, "_workspace", {
+        "description": "workspace test", "agents": ["coder", "reviewer"],
+        "llms": {"coder": {"model": "ollama/llama3.2:3b"}, "reviewer": {"model": "ollama/llama3.2:3b"}},
+        "memory": False, "web_search": False, "git": True, "validation": True,
+        "tasks": [{"name": "code", "agent": "coder", "description": "Write {query}", "expected_output": "code"},
+                  {"name": "review", "agent": "reviewer", "description": "Review", "expected_output": "review"}],
+    })
+    workspace = Workspace("run-d")
+    built = build_crew(get_profile("_workspace"), "todo app", workspace=workspace)
+    tools = {tool.name: tool for tool in built.agents["coder"].tools}
+    writer, committer = tools["write_to_file"], tools["git_commit_and_pr"]
+    writer.run(text="print('todo')\n")
+    assert os.path.exists(tmp_path / "runs" / "work" / "run-d" / "generated_output.py")
+    assert not os.path.exists(tmp_path / "generated_output.py")
+    assert built.workspace is workspace and built.gate.manifest is workspace.manifest
+    assert "generated_output.py" in committer.run(commit_message="Add todo")
+    assert workspace.commits.pending_files() == ["generated_output.py"]
+    git_pipeline._queued.discard(workspace.commits)   # not a repository: nothing to flush at exit
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,4 +1,5 @@
-from crewai.tools import tool  # ✅ not from crewai.tools
+from tools.tool_adapter import tool  # crewai's @tool plus argument repair
+from tools.manifest import manifest
 
 @tool  # ✅ decorator style, no arguments
 def write_to_file(text: str) -> str:
@@ -8,4 +9,19 @@ def write_to_file(text: str) -> str:
     filename = "generated_output.py"
     with open(filename, "w", encoding="utf-8") as f:
         f.write(text)
+    manifest.record(filename)
     return f"✅ Code written to {filename}"
+
+
+def file_writer_for(workspace):
+    """write_to_file for one run: saves to the run's workspace and records it in the run's manifest"""
+
+    @tool("write_to_file")
+    def write_workspace_file(text: str) -> str:
+        """
+        Writes the given Python code to a file named generated_output.py.
+        """
+        workspace.write(text)
+        return "✅ Code written to generated_output.py"
+
+    return write_workspace_file
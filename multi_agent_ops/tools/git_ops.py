@@ -1,39 +1,33 @@
-import os
-import subprocess
-import requests
-from crewai.tools import tool  # ✅ decorator-based import
+from tools.tool_adapter import tool  # crewai's @tool plus argument repair
+from tools.git_pipeline import get_commit_pipeline
+
+
+def _queue_commit(pipeline, commit_message):
+    pipeline.queue(commit_message)
+    files = pipeline.pending_files()
+    if not files:
+        return "⚠️ Nothing to commit yet - write the code to a file first."
+    return f"✅ Queued {len(files)} file(s) for commit on branch {pipeline.branch}: {', '.join(files)}"
 
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-GITHUB_REPO = os.getenv("GITHUB_REPO")  # Format: username/repo
 
 @tool  # ✅ this turns your function into a Tool object
-def git_commit_and_pr(commit_message="Auto-commit from AI agent") -> str:
+def git_commit_and_pr(commit_message: str = "Auto-commit from AI agent") -> str:
     """
-    Commits all changes to the GitHub repo and creates a pull request to the main branch.
+    Queues the files written in this run for commit. All queued changes are committed
+    together at the end of the run, pushed to a run branch, and a pull request to main is opened.
     """
-    try:
-        subprocess.run(["git", "add", "."], check=True)
-        subprocess.run(["git", "commit", "-m", commit_message], check=True)
-        subprocess.run(["git", "push", "-u", "origin", "main"], check=True)
-
-        # Create Pull Request
-        url = f"https://api.github.com/repos/{GITHUB_REPO}/pulls"
-        headers = {
-            "Authorization": f"token {GITHUB_TOKEN}",
-            "Accept": "application/vnd.github+json"
-        }
-        data = {
-            "title": commit_message,
-            "head": "main",
-            "base": "main",
-            "body": "This PR was created by an autonomous AI agent."
-        }
-        response = requests.post(url, headers=headers, json=data)
-
-        if response.status_code in [200, 201]:
-            return f"✅ Code committed and PR created: {response.json().get('html_url')}"
-        else:
-            return f"❌ Commit done, but PR failed: {response.text}"
-
-    except subprocess.CalledProcessError as e:
-        return f"❌ Git command failed: {e}"
+    return _queue_commit(get_commit_pipeline(), commit_message)
+
+
+def git_tool_for(workspace):
+    """git_commit_and_pr for one run: queues on the workspace's own commit pipeline"""
+
+    @tool("git_commit_and_pr")
+    def git_commit_workspace(commit_message: str = "Auto-commit from AI agent") -> str:
+        """
+        Queues the files written in this run for commit. All queued changes are committed
+        together at the end of the run, pushed to a run branch, and a pull request to main is opened.
+        """
+        return _queue_commit(workspace.commits, commit_message)
+
+    return git_commit_workspace
@@ -0,0 +1,272 @@
+"""
+Batched git commit pipeline for agent-written files.
+
+Agents queue commit requests during a run; at the end of the run the pipeline
+makes ONE commit containing only the files listed in the write manifest,
+pushes it to a per-run branch and opens the pull request in the background.
+
+The commit is built with a private index file (read-tree / update-index /
+write-tree / commit-tree), so the user's checkout, branch and staging area
+are never touched. Recorded files that were deleted since are committed as
+deletions. Commits still queued when the process exits are flushed then, so
+an entry point that never calls flush_commits() doesn't lose them.
+
+A pipeline with a base_dir commits the files at their paths under that
+directory: a run's workspace (runs/work/<run_id>/generated_output.py) lands
+as generated_output.py on the run branch, like a run in the checkout root.
+"""
+
+import atexit
+import os
+import subprocess
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tools.manifest import manifest as default_manifest
+
+DEFAULT_API_URL = "https://api.github.com"
+
+# One pooled HTTP session and one background worker for every PR request
+_http_session = None
+_pr_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="git-pr")
+
+
+def get_http_session():
+    """Get shared HTTP session (singleton pattern) with keep-alive connection pooling"""
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _http_session = session
+    return _http_session
+
+
+def make_run_branch(prefix="agent/run-"):
+    """Unique branch name for one crew run, e.g. agent/run-20250101-120000-1a2b3c"""
+    return f"{prefix}{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class CommitResult:
+    def __init__(self, sha, branch, files, pr_future=None):
+        self.sha = sha
+        self.branch = branch
+        self.files = files
+        self.pr_future = pr_future
+
+    def wait_for_pr(self, timeout=30):
+        """Block until the PR request finishes; returns the PR URL or an error string"""
+        if self.pr_future is None:
+            return None
+        return self.pr_future.result(timeout=timeout)
+
+
+class CommitPipeline:
+    """
+    Collects commit requests for one run and flushes them as a single commit.
+    """
+
+    def __init__(self, repo_dir=".", remote="origin", base_branch="main", branch=None,
+                 github_repo=None, github_token=None, api_url=None, manifest=None, base_dir=None):
+        self.repo_dir = os.path.abspath(repo_dir)
+        self.base_dir = os.path.abspath(base_dir) if base_dir else self.repo_dir
+        self.remote = remote
+        self.base_branch = base_branch
+        self.branch = branch or make_run_branch()
+        self.github_repo = github_repo if github_repo is not None else os.getenv("GITHUB_REPO")
+        self.github_token = github_token if github_token is not None else os.getenv("GITHUB_TOKEN")
+        self.api_url = (api_url or os.getenv("GITHUB_API_URL") or DEFAULT_API_URL).rstrip("/")
+        self.manifest = manifest or default_manifest
+        self._messages = []
+
+    def queue(self, message):
+        """Record a commit request; nothing touches git until flush()"""
+        message = (message or "").strip() or "Auto-commit from AI agent"
+        if message not in self._messages:
+            self._messages.append(message)
+        _queued.add(self)
+        return len(self._messages)
+
+    def _entries(self):
+        """(path in the commit, file on disk) for every manifest file under base_dir"""
+        entries = []
+        for path in self.manifest.files():
+            rel = os.path.relpath(path, self.base_dir)
+            if rel.startswith(".."):
+                print(f"⚠️ Skipping {path}: outside {self.base_dir}")
+                continue
+            entries.append((rel.replace(os.sep, "/"), path))
+        return entries
+
+    def pending_files(self):
+        """
+        Manifest files as paths relative to base_dir (the repository by default).
+        Files deleted since they were written are included: flush removes them.
+        """
+        return [rel for rel, _ in self._entries()]
+
+    def _git(self, *args, env=None, input_text=None):
+        result = subprocess.run(
+            ["git", *args],
+            cwd=self.repo_dir,
+            env=env,
+            input=input_text,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+
+    def _commit_message(self):
+        if not self._messages:
+            return "Auto-commit from AI agent"
+        subject = self._messages[0]
+        if len(self._messages) == 1:
+            return subject
+        body = "\n".join(f"- {m}" for m in self._messages[1:])
+        return f"{subject}\n\n{body}"
+
+    def flush(self, open_pr=True):
+        """
+        Commit every manifest file in one commit on top of HEAD, push it to the
+        run branch and (optionally) open the PR asynchronously.
+        Returns a CommitResult, or None when there is nothing to commit.
+        """
+        entries = self._entries()
+        files = [rel for rel, _ in entries]
+        if not files:
+            self._messages = []
+            _queued.discard(self)
+            return None
+
+        try:
+            parent = self._git("rev-parse", "--verify", "--quiet", "HEAD")
+        except subprocess.CalledProcessError:
+            parent = None
+
+        fd, index_path = tempfile.mkstemp(prefix="agent-index-")
+        os.close(fd)
+        os.remove(index_path)
+        env = dict(os.environ, GIT_INDEX_FILE=index_path)
+        try:
+            if parent:
+                self._git("read-tree", parent, env=env)
+            self._git("update-index", "-z", "--index-info", env=env, input_text=self._index_info(entries))
+            tree = self._git("write-tree", env=env)
+        finally:
+            if os.path.exists(index_path):
+                os.remove(index_path)
+
+        commit_args = ["commit-tree", tree, "-F", "-"]
+        if parent:
+            commit_args += ["-p", parent]
+        sha = self._git(*commit_args, input_text=self._commit_message())
+
+        self._git("push", self.remote, f"{sha}:refs/heads/{self.branch}")
+        self.manifest.clear()
+        title = self._messages[0] if self._messages else "Auto-commit from AI agent"
+        self._messages = []
+        _queued.discard(self)
+        print(f"✅ Committed {len(files)} file(s) as {sha[:8]} on {self.branch}")
+
+        pr_future = None
+        if open_pr:
+            pr_future = _pr_executor.submit(self.open_pull_request, title)
+        return CommitResult(sha, self.branch, files, pr_future)
+
+    def _index_info(self, entries):
+        """update-index --index-info input: written files as new blobs, deleted ones as removals"""
+        present = [(rel, path) for rel, path in entries if os.path.isfile(path)]
+        shas = self._git("hash-object", "-w", "--stdin-paths",
+                         input_text="".join(f"{path}\n" for _, path in present)).split() if present else []
+        blobs = {rel: (sha, "100755" if os.access(path, os.X_OK) else "100644")
+                 for (rel, path), sha in zip(present, shas)}
+        lines = []
+        for rel, _ in entries:
+            if rel in blobs:
+                sha, mode = blobs[rel]
+                lines.append(f"{mode} {sha}\t{rel}")
+            else:
+                lines.append(f"0 {'0' * 40}\t{rel}")
+        return "".join(line + "\0" for line in lines)
+
+    def open_pull_request(self, title):
+        """Create the PR from the run branch into the base branch"""
+        if not self.github_repo or not self.github_token:
+            return "⚠️ PR skipped: GITHUB_REPO / GITHUB_TOKEN not configured"
+        url = f"{self.api_url}/repos/{self.github_repo}/pulls"
+        headers = {
+            "Authorization": f"token {self.github_token}",
+            "Accept": "application/vnd.github+json"
+        }
+        data = {
+            "title": title,
+            "head": self.branch,
+            "base": self.base_branch,
+            "body": "This PR was created by an autonomous AI agent."
+        }
+        try:
+            response = get_http_session().post(url, headers=headers, json=data, timeout=15)
+        except requests.RequestException as e:
+            return f"❌ PR request failed: {e}"
+        if response.status_code in [200, 201]:
+            return response.json().get("html_url")
+        return f"❌ PR failed: {response.text}"
+
+
+# Pipeline for the current run (created lazily so each run gets its own branch)
+_pipeline = None
+# Every pipeline holding queued commits, including the ones per-run workspaces own
+_queued = set()
+
+
+def get_commit_pipeline():
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = CommitPipeline()
+    return _pipeline
+
+
+@atexit.register
+def _flush_at_exit():
+    """Commit what is still queued; the PR executor is already shut down, so open the PR inline"""
+    global _pipeline
+    _pipeline = None
+    for pipeline in list(_queued):
+        _queued.discard(pipeline)
+        if not pipeline._messages:
+            continue
+        print(f"⚠️ Queued commits for {pipeline.branch} were never flushed - committing them at exit")
+        title = pipeline._messages[0]
+        try:
+            result = pipeline.flush(open_pr=False)
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Git command failed: {e.stderr or e}")
+            continue
+        if result:
+            print(f"🐙 Pull request: {pipeline.open_pull_request(title)}")
+
+
+def flush_commits(wait_for_pr=True):
+    """
+    Flush the current run's queued commits. Call once after crew.kickoff().
+    A new branch is used for the next run.
+    """
+    global _pipeline
+    if _pipeline is None:
+        return None
+    pipeline, _pipeline = _pipeline, None
+    try:
+        result = pipeline.flush()
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Git command failed: {e.stderr or e}")
+        return None
+    if result and wait_for_pr:
+        print(f"🐙 Pull request: {result.wait_for_pr()}")
+    return result
@@ -0,0 +1,40 @@
+import os
+import threading
+
+
+class WriteManifest:
+    """
+    Records every file written by agent tools during a run.
+    The git pipeline stages exactly these paths instead of the whole working tree.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = []
+
+    def record(self, path):
+        """Remember a written file (stored as an absolute path, de-duplicated)"""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._paths:
+                self._paths.append(path)
+        return path
+
+    def files(self):
+        """All files recorded so far, in write order"""
+        with self._lock:
+            return list(self._paths)
+
+    def drain(self):
+        """Return recorded files and reset the manifest"""
+        with self._lock:
+            paths, self._paths = self._paths, []
+        return paths
+
+    def clear(self):
+        with self._lock:
+            self._paths = []
+
+
+# Shared manifest used by the file writer and git tools
+manifest = WriteManifest()
@@ -0,0 +1,26 @@
+"""
+Read access to a run's memory scope (memory/memory_store.py) for agents.
+
+build_crew saves every task's output in the run's scope under the task name.
+An agent that needs an earlier output (the coder reading the plan) fetches it
+by key with this tool instead of getting the whole text pasted into its prompt.
+"""
+
+from tools.tool_adapter import tool
+
+
+def run_memory_tool_for(store):
+    """read_run_output bound to one run's memory scope"""
+
+    @tool("read_run_output")
+    def read_run_output(key: str) -> str:
+        """
+        Reads the saved output of an earlier task of this run by task name, e.g. "plan" or "research".
+        """
+        value = store.retrieve(key.strip().strip("'\""))
+        if value is None:
+            saved = ", ".join(sorted(store.all())) or "none yet"
+            return f"No output saved under '{key}'. Saved outputs: {saved}"
+        return value
+
+    return read_run_output
@@ -0,0 +1,278 @@
+"""
+Argument repair for agent tools.
+
+Small models often call a tool with its arguments in the wrong shape: the
+schema echoed back ({"query": {"description": "todo app", "type": "str"}}),
+the argument under another name ({"q": ...}, {"description": ...}), wrapped
+in {"input": {...}}, a bare string instead of an object, a list where a
+string is expected, or the literal type name "str". crewai rejects those
+and the agent spends a whole LLM round-trip reading the validation error.
+
+`tool` here is a drop-in for crewai's decorator. Its tools check arguments
+against the function signature and, before validating, coerce the common
+malformed shapes deterministically. What still doesn't validate is rejected
+with the expected arguments, as before. Every call is counted as valid,
+repaired or rejected (get_tool_stats(), and a tool_args span in the trace;
+python -m tracing.summarize prints the totals),
+so the turns saved are visible.
+"""
+
+import ast
+import json
+import threading
+import time
+import typing
+
+from crewai.tools import tool as crewai_tool
+from crewai.tools.base_tool import Tool
+from crewai.tools.structured_tool import CrewStructuredTool
+from pydantic import ValidationError
+
+from tracing.tracer import get_tracer
+
+# other names models use for an argument
+ARG_ALIASES = {
+    "query": ("q", "search", "search_query", "query_string", "question", "description", "input", "text"),
+    "text": ("code", "content", "contents", "file_content", "source", "data", "input", "description"),
+    "commit_message": ("message", "msg", "commit", "title", "description"),
+}
+WRAPPER_KEYS = ("input", "arguments", "args", "kwargs", "parameters", "params", "tool_input", "properties")
+VALUE_KEYS = ("value", "description", "default", "content", "text", "title")   # in an echoed schema
+UNQUOTE_FIELDS = ("query", "commit_message")   # one-line values; code and file content pass through verbatim
+TYPE_NAMES = {"str", "string", "int", "integer", "float", "bool", "any", "none", "null", "dict", "object"}
+RETRY_WINDOW = 1.0   # crewai re-invokes a rejected call with unfiltered arguments right away
+
+_MISSING = object()
+
+
+def _parse_literal(text):
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            return parse(text)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            pass
+    return None
+
+
+def _only_field(fields):
+    """The field a bare value belongs to: the only field, or the only required one"""
+    if len(fields) == 1:
+        return next(iter(fields))
+    required = [name for name, field in fields.items() if field.is_required()]
+    return required[0] if len(required) == 1 else None
+
+
+def _coerce_value(name, value, annotation):
+    """(value, fix or None); _MISSING when the value is a placeholder"""
+    if annotation is str:
+        if isinstance(value, dict):
+            for key in VALUE_KEYS:
+                if isinstance(value.get(key), (str, int, float)) and str(value[key]).strip().lower() not in TYPE_NAMES:
+                    return str(value[key]), f"took '{key}' from an object"
+            return value, None
+        if isinstance(value, (list, tuple)) and all(isinstance(v, (str, int, float)) for v in value):
+            return " ".join(str(v) for v in value), "joined a list"
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value), "number to string"
+        if isinstance(value, str):
+            stripped = value.strip()
+            # the whole value is one quoted scalar: "todo app", not code that starts and ends with quotes
+            quoted = len(stripped) >= 2 and stripped[0] == stripped[-1] and stripped[0] in "\"'" \
+                and stripped[0] not in stripped[1:-1]
+            inner = stripped[1:-1].strip() if quoted else stripped
+            if inner.lower() in TYPE_NAMES or not inner:
+                return _MISSING, "placeholder value"
+            if quoted and name in UNQUOTE_FIELDS:
+                return inner, "stripped quotes"
+            return value, None
+    if annotation is int and isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value), "string to int"
+    if annotation is bool and isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true", "string to bool"
+    return value, None
+
+
+def coerce_arguments(raw, schema):
+    """(arguments dict, [fixes]) for raw tool input against a pydantic args schema"""
+    fields = schema.model_fields
+    fixes = []
+    args = raw
+    if isinstance(args, str):
+        parsed = _parse_literal(args)
+        if isinstance(parsed, dict):
+            args = parsed
+            fixes.append("parsed a string")
+    if not isinstance(args, dict):
+        name = _only_field(fields)
+        if name is None:
+            return {}, fixes
+        args = {name: args}
+        fixes.append(f"bare value as '{name}'")
+
+    while len(args) == 1:
+        (key, value), = args.items()
+        if key in fields or key not in WRAPPER_KEYS or not isinstance(value, dict):
+            break
+        args = value
+        fixes.append(f"unwrapped '{key}'")
+
+    args = dict(args)
+    for name in fields:
+        if name not in args:
+            alias = next((a for a in ARG_ALIASES.get(name, ()) if a in args and a not in fields), None)
+            if alias is not None:
+                args[name] = args.pop(alias)
+                fixes.append(f"'{alias}' as '{name}'")
+    unknown = [key for key in args if key not in fields]
+    missing = [name for name, field in fields.items() if name not in args and field.is_required()]
+    if len(missing) == 1 and len(unknown) == 1:
+        args[missing[0]] = args.pop(unknown[0])
+        fixes.append(f"'{unknown[0]}' as '{missing[0]}'")
+
+    coerced = {}
+    for name, field in fields.items():
+        if name not in args:
+            continue
+        value, fix = _coerce_value(name, args[name], typing.get_origin(field.annotation) or field.annotation)
+        if fix:
+            fixes.append(f"{name}: {fix}")
+        if value is not _MISSING:
+            coerced[name] = value
+    return coerced, fixes
+
+
+def _schema_hint(schema):
+    fields = ", ".join(f'"{name}"' + ("" if field.is_required() else " (optional)")
+                       for name, field in schema.model_fields.items())
+    return f" Expected a JSON object with: {fields}."
+
+
+class ToolCallStats:
+    """Per-tool counts of valid, repaired and rejected calls"""
+
+    def __init__(self):
+        self.counts = {}
+        self.fixes = {}
+        self._pending = {}   # (thread, tool) -> (time, raw, fixes) of a rejection crewai may be about to retry
+        self._lock = threading.Lock()
+
+    def _count(self, tool, outcome, fixes=()):
+        entry = self.counts.setdefault(tool, {"valid": 0, "repaired": 0, "rejected": 0})
+        entry[outcome] += 1
+        get_tracer().record("tool_args", tool, 0.0, outcome=outcome, fixes=list(fixes))
+
+    def record(self, tool, outcome, raw=None, fixes=()):
+        """
+        crewai first invokes a tool with only the arguments the schema knows
+        and, when that fails, again with everything the model sent. A
+        rejection followed at once by a call with a superset of its arguments
+        is that retry, not a rejected call.
+        """
+        key = (threading.get_ident(), tool)
+        with self._lock:
+            pending = self._pending.pop(key, None)
+            if pending is not None:
+                at, previous, previous_fixes = pending
+                retried = (time.monotonic() - at < RETRY_WINDOW and isinstance(previous, dict)
+                           and isinstance(raw, dict) and all(raw.get(k, _MISSING) == v for k, v in previous.items()))
+                if not retried:
+                    self._count(tool, "rejected", previous_fixes)
+            if outcome == "rejected":
+                self._pending[key] = (time.monotonic(), dict(raw) if isinstance(raw, dict) else raw, fixes)
+            else:
+                self._count(tool, outcome, fixes)
+            if outcome == "repaired":
+                for fix in fixes:
+                    self.fixes[fix] = self.fixes.get(fix, 0) + 1
+
+    def summary(self):
+        """{tool: {"valid": n, "repaired": n, "rejected": n}}"""
+        with self._lock:
+            for (_, tool), (_, _, fixes) in self._pending.items():
+                self._count(tool, "rejected", fixes)
+            self._pending.clear()
+            return {tool: dict(entry) for tool, entry in self.counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self.counts, self.fixes, self._pending = {}, {}, {}
+
+
+_tool_stats = None
+
+
+def get_tool_stats():
+    """Get shared ToolCallStats instance (singleton pattern)"""
+    global _tool_stats
+    if _tool_stats is None:
+        _tool_stats = ToolCallStats()
+    return _tool_stats
+
+
+def check_arguments(tool_name, schema, raw):
+    """Validated arguments for raw input, repaired if needed; ValueError when they can't be"""
+    args, fixes = coerce_arguments(raw, schema)
+    try:
+        validated = schema.model_validate(args).model_dump()
+    except ValidationError as e:
+        get_tool_stats().record(tool_name, "rejected", raw, fixes)
+        raise ValueError(f"Tool '{tool_name}' arguments validation failed: {e}{_schema_hint(schema)}") from e
+    outcome = "repaired" if fixes else "valid"
+    get_tool_stats().record(tool_name, outcome, raw, fixes)
+    if fixes:
+        print(f"🔧 Repaired {tool_name} arguments: {', '.join(fixes)}")
+    return validated
+
+
+class AdaptedStructuredTool(CrewStructuredTool):
+    """What crewai agents actually call (ReAct tool use)"""
+
+    def _parse_args(self, raw_args):
+        return check_arguments(self.name, self.args_schema, raw_args)
+
+
+class AdaptedTool(Tool):
+    """A crewai function tool whose arguments are repaired before validation"""
+
+    def _validate_kwargs(self, kwargs):
+        # native function calling: tool.run(**arguments)
+        return check_arguments(self.name, self.args_schema, kwargs)
+
+    def to_structured_tool(self):
+        self._set_args_schema()
+        structured = AdaptedStructuredTool(
+            name=self.name,
+            description=self.description,
+            args_schema=self.args_schema,
+            result_schema=self.result_schema,
+            func=self._run,
+            result_as_answer=self.result_as_answer,
+            max_usage_count=self.max_usage_count,
+            current_usage_count=self.current_usage_count,
+            cache_function=self.cache_function,
+            tool_failure_policy=self.tool_failure_policy,
+        )
+        structured._original_tool = self
+        return structured
+
+
+def adapt(base):
+    """AdaptedTool with the same function, schema and options as a crewai Tool"""
+    return AdaptedTool(
+        name=base.name,
+        description=base.description,
+        func=base.func,
+        args_schema=base.args_schema,
+        result_schema=base.result_schema,
+        result_as_answer=base.result_as_answer,
+        max_usage_count=base.max_usage_count,
+        current_usage_count=0,
+    )
+
+
+def tool(*args, **options):
+    """Drop-in for crewai.tools.tool (@tool, @tool("name"), @tool(result_as_answer=True))"""
+    made = crewai_tool(*args, **options)
+    if isinstance(made, Tool):
+        return adapt(made)
+    return lambda func: adapt(made(func))
@@ -1,11 +1,11 @@
-from crewai.tools import tool
+from tools.tool_adapter import tool
 import requests
 import os
 
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 
 @tool
-def google_search(query) -> str:
+def google_search(query: str) -> str:
     """
     Research tool that either uses web search or provides knowledge-based recommendations.
     
@@ -16,18 +16,8 @@ def google_search(query) -> str:
         str: Research findings or recommendations
     """
     
-    # Handle different input formats from CrewAI
-    if isinstance(query, dict):
-        if 'description' in query:
-            search_query = str(query['description'])
-        elif 'query' in query:
-            search_query = str(query['query'])
-        else:
-            search_query = str(query.get(list(query.keys())[0], query))
-    else:
-        search_query = str(query)
-    
-    search_query = search_query.strip('"\'').replace('\\"', '').lower()
+    # malformed tool arguments are repaired by tools.tool_adapter before we get here
+    search_query = str(query).strip().lower()
     
     # If no API key, provide knowledge-based recommendations
     if not SERPER_API_KEY:
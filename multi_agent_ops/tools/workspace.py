@@ -0,0 +1,92 @@
+"""
+Per-run output directory, write manifest and commit queue.
+
+The file writer used to save generated_output.py in the current directory and
+record it in one process-wide manifest, so crews running side by side (batch
+mode, the process pool, job queue workers) overwrote each other's code, and
+validation, revision and the commit only saw whichever query wrote last.
+A Workspace gives one run its own:
+
+- directory the coder's tools write to (runs/work/<run_id>/ unless a path is given)
+- manifest of the files written there, read by validation, the sandbox,
+  routing and the revision loop
+- commit pipeline, committing those files at their workspace-relative paths
+  on the run's own branch
+
+build_crew binds the coder's tools to its workspace. Code that never sees
+the crew (parallel candidates) writes to current_workspace(), which the
+runners set around each run with workspace.activate().
+"""
+
+import contextvars
+import os
+import subprocess
+import uuid
+from contextlib import contextmanager
+
+from tools.git_pipeline import CommitPipeline
+from tools.manifest import WriteManifest
+
+WORKSPACE_DIR = os.getenv("RUN_WORKSPACES", os.path.join("runs", "work"))
+OUTPUT_FILE = "generated_output.py"
+
+_current = contextvars.ContextVar("workspace", default=None)
+
+
+class Workspace:
+    def __init__(self, run_id=None, path=None, manifest=None):
+        self.run_id = run_id or f"run-{uuid.uuid4().hex[:12]}"
+        self.path = os.path.abspath(path if path is not None else os.path.join(WORKSPACE_DIR, self.run_id))
+        os.makedirs(self.path, exist_ok=True)
+        self.manifest = manifest or WriteManifest()
+        self._commits = None
+
+    def file(self, name=OUTPUT_FILE):
+        return os.path.join(self.path, name)
+
+    def write(self, text, name=OUTPUT_FILE):
+        """Write a file in the workspace and record it in the manifest"""
+        path = self.file(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        self.manifest.record(path)
+        return path
+
+    def files(self):
+        return self.manifest.files()
+
+    @property
+    def commits(self):
+        """This run's commit pipeline (created on first use, so each run gets its own branch)"""
+        if self._commits is None:
+            self._commits = CommitPipeline(manifest=self.manifest, base_dir=self.path)
+        return self._commits
+
+    def flush_commits(self, wait_for_pr=True):
+        """Flush this run's queued commits; see tools.git_pipeline.flush_commits"""
+        pipeline, self._commits = self._commits, None
+        if pipeline is None:
+            return None
+        try:
+            result = pipeline.flush()
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Git command failed: {e.stderr or e}")
+            return None
+        if result and wait_for_pr:
+            print(f"🐙 Pull request: {result.wait_for_pr()}")
+        return result
+
+    @contextmanager
+    def activate(self):
+        """Make this the current workspace for the calling thread or task"""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def current_workspace():
+    """The workspace activated around the running crew, or None outside a run"""
+    return _current.get()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Print where the time in a traced run went.
+
+Usage:
+    python -m tracing.summarize runs/traces/<run_id>.jsonl [--top 10]
+    python -m tracing.summarize --latest
+"""
+
+import argparse
+import glob
+import json
+import os
+from collections import defaultdict
+
+from tracing.tracer import TRACE_DIR
+
+
+def load_spans(path):
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(spans, top=10):
+    """Aggregate spans by (kind, name) and return rows sorted by total time"""
+    groups = defaultdict(list)
+    for span in spans:
+        if span.get("duration") is not None:
+            groups[(span["kind"], span["name"])].append(span)
+
+    rows = []
+    for (kind, name), items in groups.items():
+        durations = [s["duration"] for s in items]
+        rows.append({
+            "kind": kind,
+            "name": name,
+            "count": len(items),
+            "total": sum(durations),
+            "mean": sum(durations) / len(durations),
+            "p95": _percentile(durations, 95),
+            "prompt_tokens": sum(s.get("prompt_tokens", 0) for s in items),
+            "completion_tokens": sum(s.get("completion_tokens", 0) for s in items),
+            "cache_hits": sum(1 for s in items if s.get("cache_hit")),
+            "errors": sum(1 for s in items if s.get("status") == "error"),
+        })
+    # The crew span wraps everything else; rank the leaves that actually consume time
+    rows.sort(key=lambda r: r["total"], reverse=True)
+    wall = sum(r["total"] for r in rows if r["kind"] == "crew") or None
+    return rows[:top] if top else rows, wall
+
+
+def by_model(spans):
+    models = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                                  "prefix_tokens": 0, "cached_tokens": 0, "estimated": 0})
+    for span in spans:
+        if span.get("kind") != "llm_call":
+            continue
+        entry = models[span.get("model") or span["name"]]
+        entry["calls"] += 1
+        entry["seconds"] += span.get("duration") or 0.0
+        entry["prompt_tokens"] += span.get("prompt_tokens", 0)
+        entry["completion_tokens"] += span.get("completion_tokens", 0)
+        entry["prefix_tokens"] += span.get("prefix_tokens", 0)
+        entry["cached_tokens"] += span.get("cached_tokens", 0)
+        entry["estimated"] += bool(span.get("tokens_estimated"))
+    return dict(models)
+
+
+def tool_args(spans):
+    """{tool: {"valid": n, "repaired": n, "rejected": n}} from tools.tool_adapter spans"""
+    tools = defaultdict(lambda: {"valid": 0, "repaired": 0, "rejected": 0})
+    for span in spans:
+        if span.get("kind") == "tool_args":
+            tools[span["name"]][span.get("outcome", "valid")] += 1
+    return dict(tools)
+
+
+def print_summary(path, top=10):
+    spans = load_spans(path)
+    rows, wall = summarize(spans, top)
+    print(f"📊 Trace: {path} ({len(spans)} spans)")
+    if wall:
+        print(f"⏱️ Crew wall time: {wall:.2f}s")
+    print(f"\n{'kind':<14}{'name':<40}{'count':>6}{'total s':>10}{'mean s':>9}{'p95 s':>9}{'share':>8}")
+    print("-" * 96)
+    for r in rows:
+        share = f"{100 * r['total'] / wall:.0f}%" if wall and r["kind"] != "crew" else ""
+        print(f"{r['kind']:<14}{r['name'][:38]:<40}{r['count']:>6}{r['total']:>10.2f}"
+              f"{r['mean']:>9.2f}{r['p95']:>9.2f}{share:>8}")
+
+    models = by_model(spans)
+    if models:
+        print("\n🤖 LLM usage by model:")
+        for model, m in sorted(models.items(), key=lambda kv: kv[1]["seconds"], reverse=True):
+            rate = m["completion_tokens"] / m["seconds"] if m["seconds"] else 0
+            reuse = m["prefix_tokens"] / m["prompt_tokens"] if m["prompt_tokens"] else 0
+            estimated = f", {m['estimated']} estimated" if m["estimated"] else ""
+            print(f"  {model}: {m['calls']} call(s), {m['seconds']:.2f}s, "
+                  f"{m['prompt_tokens']} prompt / {m['completion_tokens']} completion tokens{estimated} "
+                  f"(~{rate:.1f} tok/s), {reuse:.0%} prompt prefix reused, {m['cached_tokens']} served from cache")
+
+    hits = [r for r in summarize(spans, top=0)[0] if r["cache_hits"]]
+    if hits:
+        print("\n💾 Cache hits: " + ", ".join(f"{r['kind']} {r['name']} {r['cache_hits']}/{r['count']}"
+                                             for r in hits))
+
+    calls = tool_args(spans)
+    if calls:
+        print("\n🔧 Tool arguments:")
+        for name, c in sorted(calls.items()):
+            print(f"  {name}: {c['valid']} valid, {c['repaired']} repaired (LLM turns saved), {c['rejected']} rejected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a run trace")
+    parser.add_argument("trace", nargs="?", help="Path to a trace JSONL file")
+    parser.add_argument("--latest", action="store_true", help="Use the newest trace in runs/traces")
+    parser.add_argument("--top", type=int, default=10, help="Number of time sinks to show")
+    args = parser.parse_args()
+
+    path = args.trace
+    if args.latest or not path:
+        traces = sorted(glob.glob(os.path.join(TRACE_DIR, "*.jsonl")), key=os.path.getmtime)
+        if not traces:
+            parser.error(f"No traces found in {TRACE_DIR}")
+        path = traces[-1]
+    print_summary(path, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Structured per-run tracing.
+
+Spans (crew, task, agent_turn, llm_call, tool_call, embedding, vector_search)
+carry durations, token counts, cache hits and model names, and are written as
+one JSON object per line to runs/traces/<run_id>.jsonl. The active tracer is
+held in a context variable like the current span, so runs overlapping in one
+process (asyncio tasks, batch threads) each write to their own file.
+
+Token counts are the backend's usage when the response reports it
+(tokens_estimated=False); otherwise ~4 characters per token. cache_hit marks
+LLM calls whose prompt was partly served from the server's prompt cache,
+tool calls answered from crewai's tool cache, and summary and embedding
+lookups answered from their stores.
+Summarize a trace with:  python -m tracing.summarize runs/traces/<run_id>.jsonl
+"""
+
+import contextvars
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+TRACE_DIR = os.path.join("runs", "traces")
+
+SPAN_KINDS = ("crew", "task", "agent_turn", "llm_call", "tool_call", "embedding", "vector_search")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token) when the backend doesn't report usage"""
+    if not text:
+        return 0
+    return max(1, len(str(text)) // 4)
+
+
+class Span:
+    def __init__(self, tracer, kind, name, parent_id, attrs):
+        self.tracer = tracer
+        self.kind = kind
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:12]
+        self.parent_id = parent_id
+        self.attrs = dict(attrs)
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration = None
+        self.status = "ok"
+
+    def set(self, **attrs):
+        self.attrs.update({k: v for k, v in attrs.items() if v is not None})
+        return self
+
+    def to_dict(self):
+        return {
+            "run_id": self.tracer.run_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "status": self.status,
+            **self.attrs,
+        }
+
+
+class Tracer:
+    def __init__(self, run_id=None, path=None):
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.path = path or os.path.join(TRACE_DIR, f"{self.run_id}.jsonl")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _write(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    @contextmanager
+    def span(self, kind, name, **attrs):
+        parent = _current_span.get()
+        span = Span(self, kind, name, parent.span_id if parent else None, attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration = time.perf_counter() - span._t0
+            self._write(span.to_dict())
+
+    def record(self, kind, name, duration, **attrs):
+        """Write a span that was timed elsewhere (e.g. from a crewai callback)"""
+        parent = _current_span.get()
+        span = Span(self, kind, name, parent.span_id if parent else None, attrs)
+        span.start = time.time() - duration
+        span.duration = duration
+        self._write(span.to_dict())
+        return span
+
+
+class NullTracer:
+    """Used when no run is being traced: spans cost nothing and write nothing"""
+    run_id = None
+    path = None
+
+    @contextmanager
+    def span(self, kind, name, **attrs):
+        yield Span(self, kind, name, None, attrs)
+
+    def record(self, kind, name, duration, **attrs):
+        return None
+
+
+_null_tracer = NullTracer()
+_tracer = contextvars.ContextVar("tracer", default=_null_tracer)
+
+
+def get_tracer():
+    """The tracer of the run in the current context (thread or asyncio task)"""
+    return _tracer.get()
+
+
+def start_run(run_id=None, path=None):
+    """
+    Begin tracing a run in the current context; every span until end_run() goes to
+    this run's file, including spans from threads started with a copy of the context.
+    """
+    tracer = Tracer(run_id, path)
+    _tracer.set(tracer)
+    return tracer
+
+
+def end_run():
+    tracer = _tracer.get()
+    _tracer.set(_null_tracer)
+    return tracer
+
+
+def _model_name(llm):
+    return getattr(llm, "model", None) or type(llm).__name__
+
+
+_hooks_installed = False
+
+
+def _install_crewai_hooks():
+    """
+    Once per process: copy the usage crewai reads from each response onto the
+    llm_call span making it, and record tool calls crewai answers from its cache
+    (those never reach the wrapped tool function).
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+    try:
+        from crewai.events import crewai_event_bus
+        from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent
+        from crewai.llms.base_llm import BaseLLM
+    except ImportError:
+        return
+    track = BaseLLM._track_token_usage_internal
+
+    def track_usage(self, usage_data):
+        track(self, usage_data)
+        span = _current_span.get()
+        if span is None or span.kind != "llm_call" or not (usage_data or {}).get("prompt_tokens"):
+            return
+        reported = span.attrs.get("tokens_estimated") is False   # a second response in the same call adds up
+        cached = (usage_data.get("cached_prompt_tokens") or 0) + (span.attrs.get("cached_tokens", 0) if reported else 0)
+        span.set(prompt_tokens=usage_data["prompt_tokens"] + (span.attrs["prompt_tokens"] if reported else 0),
+                 completion_tokens=(usage_data.get("completion_tokens") or 0)
+                 + (span.attrs.get("completion_tokens", 0) if reported else 0),
+                 cached_tokens=cached, cache_hit=cached > 0, tokens_estimated=False)
+
+    BaseLLM._track_token_usage_internal = track_usage
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        if event.from_cache:
+            get_tracer().record("tool_call", event.tool_name, 0.0, cache_hit=True,
+                                output_chars=len(str(event.output)))
+
+
+def instrument_llm(llm, agent_role=None):
+    """Wrap llm.call (and llm.acall) so every completion becomes an llm_call span"""
+    if getattr(llm, "_traced", False):
+        return llm
+    _install_crewai_hooks()
+    original_call = llm.call
+    original_acall = getattr(llm, "acall", None)
+
+    def llm_span(messages):
+        from agents.prompt_layout import get_prefix_tracker
+        prompt = messages if isinstance(messages, str) else "\n".join(
+            str(m.get("content", "")) for m in messages)
+        shared, reuse = get_prefix_tracker().observe(_model_name(llm), prompt)
+        return get_tracer().span("llm_call", _model_name(llm), model=_model_name(llm),
+                                 agent=agent_role, prompt_tokens=estimate_tokens(prompt),
+                                 prefix_tokens=estimate_tokens(prompt[:shared]) if shared else 0,
+                                 prefix_reuse=round(reuse, 3), tokens_estimated=True)
+
+    def finish(span, result):
+        if span.attrs.get("tokens_estimated"):   # the backend reported no usage
+            span.set(completion_tokens=estimate_tokens(result))
+
+    def traced_call(messages, *args, **kwargs):
+        with llm_span(messages) as span:
+            result = original_call(messages, *args, **kwargs)
+            finish(span, result)
+            return result
+
+    async def traced_acall(messages, *args, **kwargs):
+        with llm_span(messages) as span:
+            result = await original_acall(messages, *args, **kwargs)
+            finish(span, result)
+            return result
+
+    try:
+        object.__setattr__(llm, "call", traced_call)
+        if original_acall is not None:
+            object.__setattr__(llm, "acall", traced_acall)
+        object.__setattr__(llm, "_traced", True)
+    except (AttributeError, TypeError) as e:
+        print(f"⚠️ Could not instrument LLM {_model_name(llm)}: {e}")
+    return llm
+
+
+def instrument_tool(tool):
+    """Wrap a crewai tool's function so each invocation becomes a tool_call span"""
+    func = getattr(tool, "func", None)
+    if func is None or getattr(func, "_traced", False):
+        return tool
+    name = getattr(tool, "name", getattr(func, "__name__", "tool"))
+
+    if inspect.iscoroutinefunction(func):
+        async def traced_func(*args, **kwargs):
+            with get_tracer().span("tool_call", name) as span:
+                result = await func(*args, **kwargs)
+                span.set(output_chars=len(str(result)))
+                return result
+    else:
+        def traced_func(*args, **kwargs):
+            with get_tracer().span("tool_call", name) as span:
+                result = func(*args, **kwargs)
+                span.set(output_chars=len(str(result)))
+                return result
+
+    traced_func._traced = True
+    try:
+        object.__setattr__(tool, "func", traced_func)
+    except (AttributeError, TypeError) as e:
+        print(f"⚠️ Could not instrument tool {name}: {e}")
+    return tool
+
+
+class CrewTracer:
+    """
+    Hooks a crew's step/task callbacks: each agent step becomes an agent_turn span
+    and each finished task a task span, timed from the previous boundary.
+    """
+
+    def __init__(self, crew):
+        self.crew = crew
+        self._last_step = None
+        self._last_task = None
+        self._crew_start = time.perf_counter()
+        for agent in crew.agents:
+            instrument_llm(agent.llm, agent.role)
+            for tool in agent.tools or []:
+                instrument_tool(tool)
+        self._user_step_callback = crew.step_callback
+        self._user_task_callback = crew.task_callback
+        crew.step_callback = self.on_step
+        crew.task_callback = self.on_task
+
+    def on_step(self, step):
+        now = time.perf_counter()
+        start = self._last_step or self._last_task or self._crew_start
+        get_tracer().record("agent_turn", type(step).__name__, now - start,
+                            tool=getattr(step, "tool", None))
+        self._last_step = now
+        if self._user_step_callback:
+            self._user_step_callback(step)
+
+    def on_task(self, output):
+        now = time.perf_counter()
+        get_tracer().record("task", (getattr(output, "description", "") or "task")[:80],
+                            now - (self._last_task or self._crew_start),
+                            agent=getattr(output, "agent", None),
+                            output_tokens=estimate_tokens(getattr(output, "raw", "")))
+        self._last_task = now
+        self._last_step = None
+        if self._user_task_callback:
+            self._user_task_callback(output)
+
+    def kickoff(self, **kwargs):
+        with get_tracer().span("crew", "kickoff", agents=len(self.crew.agents),
+                               tasks=len(self.crew.tasks)):
+            self._crew_start = time.perf_counter()
+            return self.crew.kickoff(**kwargs)